@@ -0,0 +1,46 @@
+#!/bin/bash
+# Client-side UDP heartbeat script
+# Send a signed heartbeat datagram to the monitoring server's UDP listener.
+# Much cheaper than an HTTP/TLS request for routers and IoT devices.
+#
+# Usage:
+#   ./client-heartbeat-udp.sh <host_id> <token> <server_host> [port]
+#
+# Example:
+#   ./client-heartbeat-udp.sh router01 abc123token monitor.example.com 8081
+#
+# Setup as cron job (every minute):
+#   * * * * * /path/to/client-heartbeat-udp.sh router01 abc123token monitor.example.com
+#
+# Requires: openssl, and either bash /dev/udp support or nc (netcat)
+
+set -e
+
+# Configuration
+HOST_ID="${1:-}"
+TOKEN="${2:-}"
+SERVER_HOST="${3:-localhost}"
+SERVER_PORT="${4:-8081}"
+
+# Validation
+if [ -z "$HOST_ID" ] || [ -z "$TOKEN" ]; then
+    echo "Error: Missing required arguments"
+    echo "Usage: $0 <host_id> <token> [server_host] [port]"
+    exit 1
+fi
+
+# Build datagram: HB1 <host_id> <timestamp> <nonce> <hmac>
+TIMESTAMP=$(date +%s)
+NONCE=$(head -c 8 /dev/urandom | od -An -tx1 | tr -d ' \n')
+MESSAGE="HB1 ${HOST_ID} ${TIMESTAMP} ${NONCE}"
+SIGNATURE=$(printf '%s' "$MESSAGE" | openssl dgst -sha256 -hmac "$TOKEN" | sed 's/^.* //')
+DATAGRAM="${MESSAGE} ${SIGNATURE}"
+
+# Send datagram (fire and forget)
+if command -v nc >/dev/null 2>&1; then
+    printf '%s' "$DATAGRAM" | nc -u -w1 "$SERVER_HOST" "$SERVER_PORT"
+else
+    printf '%s' "$DATAGRAM" > "/dev/udp/${SERVER_HOST}/${SERVER_PORT}"
+fi
+
+echo "[$(date '+%Y-%m-%d %H:%M:%S')] UDP heartbeat sent for ${HOST_ID}"
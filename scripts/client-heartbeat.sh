@@ -10,6 +10,9 @@
 #
 # Setup as cron job (every 5 minutes):
 #   */5 * * * * /path/to/client-heartbeat.sh web01 abc123token http://monitor.example.com:8080
+#
+# Set SEND_METRICS=true to include load, memory, disk and temperature readings:
+#   SEND_METRICS=true ./client-heartbeat.sh web01 abc123token http://monitor.example.com:8080
 
 set -e
 
@@ -28,10 +31,28 @@ fi
 # Build heartbeat URL
 HEARTBEAT_URL="${SERVER_URL}/api/v1/heartbeat/${HOST_ID}"
 
+# Collect optional metrics (Linux /proc and coreutils)
+BODY=""
+if [ "${SEND_METRICS:-false}" = "true" ]; then
+    METRICS=""
+    LOAD=$(cut -d' ' -f1 /proc/loadavg 2>/dev/null || true)
+    [ -n "$LOAD" ] && METRICS="${METRICS}\"load\": ${LOAD}, "
+    MEMORY=$(awk '/MemTotal/ {t=$2} /MemAvailable/ {a=$2} END {if (t) printf "%.1f", (t-a)*100/t}' /proc/meminfo 2>/dev/null || true)
+    [ -n "$MEMORY" ] && METRICS="${METRICS}\"memory\": ${MEMORY}, "
+    DISK=$(df -P / 2>/dev/null | awk 'NR==2 {sub("%", "", $5); print $5}' || true)
+    [ -n "$DISK" ] && METRICS="${METRICS}\"disk\": ${DISK}, "
+    if [ -r /sys/class/thermal/thermal_zone0/temp ]; then
+        TEMP=$(awk '{printf "%.1f", $1/1000}' /sys/class/thermal/thermal_zone0/temp)
+        METRICS="${METRICS}\"temperature\": ${TEMP}, "
+    fi
+    BODY="{\"metrics\": {${METRICS%, }}}"
+fi
+
 # Send heartbeat
 RESPONSE=$(curl -s -X POST "${HEARTBEAT_URL}" \
     -H "Authorization: Bearer ${TOKEN}" \
     -H "Content-Type: application/json" \
+    ${BODY:+-d "$BODY"} \
     -w "\nHTTP_STATUS:%{http_code}" \
     2>&1)
 
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Add columns introduced after M8.5 to existing databases.
+
+New tables are created by init_db(); this script only handles columns added
+to tables that already exist. It is idempotent and safe to run repeatedly.
+"""
+
+import sys
+from pathlib import Path
+
+# Ensure repository root is on sys.path
+REPO_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(REPO_ROOT))
+
+from sqlalchemy import inspect, text
+
+from src.database import engine, get_db_context, init_db
+from src.services.response_store import migrate_inline_bodies
+
+# (table, column, SQL column definition)
+COLUMN_MIGRATIONS = [
+    # Adaptive heartbeat deadlines
+    ("hosts", "adaptive_deadline", "BOOLEAN NOT NULL DEFAULT 0"),
+    ("hosts", "interval_mean", "FLOAT"),
+    ("hosts", "interval_variance", "FLOAT"),
+    ("hosts", "interval_samples", "INTEGER NOT NULL DEFAULT 0"),
+    ("hosts", "interval_clipped", "INTEGER NOT NULL DEFAULT 0"),
+    # Project poller response size cap
+    ("project_services", "max_response_bytes", "INTEGER"),
+    # Deduplicated health check bodies
+    ("project_services", "last_response_hash", "VARCHAR(64)"),
+    (
+        "service_health_checks",
+        "response_blob_hash",
+        "VARCHAR(64) REFERENCES response_blobs(hash)",
+    ),
+    # Service level objectives
+    ("project_services", "slo_target", "FLOAT"),
+    # Circuit breaker for unhealthy services
+    ("project_services", "circuit_state", "VARCHAR(20) NOT NULL DEFAULT 'closed'"),
+    ("project_services", "next_check_at", "DATETIME"),
+    # Options for tcp/tls/dns checks
+    ("project_services", "check_config", "TEXT"),
+    # Per-template rate baselines for the log prefilter
+    ("log_templates", "rate_mean", "FLOAT"),
+    ("log_templates", "rate_samples", "INTEGER NOT NULL DEFAULT 0"),
+    # One log analysis per host at a time, across the API and scheduler processes
+    ("hosts", "log_analysis_started_at", "DATETIME"),
+]
+
+
+def column_exists(inspector, table_name: str, column_name: str) -> bool:
+    """Check if a column exists in the specified table."""
+    columns = inspector.get_columns(table_name)
+    return any(col["name"] == column_name for col in columns)
+
+
+def migrate():
+    """Create missing tables and add missing columns."""
+    print("Running column migrations...")
+
+    init_db()
+
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table, column, definition in COLUMN_MIGRATIONS:
+            if column_exists(inspector, table, column):
+                print(f"{table}.{column} already exists")
+                continue
+
+            print(f"Adding {table}.{column}...")
+            connection.execute(text(f"ALTER TABLE {table} ADD COLUMN {column} {definition}"))
+
+    with get_db_context() as db:
+        moved = migrate_inline_bodies(db)
+    if moved:
+        print(f"Moved {moved} inline response bodies into response_blobs")
+        print("Run VACUUM on the database to reclaim the freed space")
+
+    print("Column migrations complete!")
+
+
+if __name__ == "__main__":
+    migrate()
@@ -39,6 +39,24 @@ python -m src.services.internet_monitor &
 MONITOR_PID=$!
 echo "    Internet monitor started (PID: $MONITOR_PID)"
 
+# Start UDP heartbeat listener (optional)
+UDP_PID=""
+if [ "${UDP_HEARTBEAT_ENABLED:-false}" = "true" ]; then
+    echo "  - Starting UDP heartbeat listener..."
+    python -m src.services.udp_heartbeat &
+    UDP_PID=$!
+    echo "    UDP heartbeat listener started (PID: $UDP_PID)"
+fi
+
+# Start syslog receiver (optional)
+SYSLOG_PID=""
+if [ "${SYSLOG_RECEIVER_ENABLED:-false}" = "true" ]; then
+    echo "  - Starting syslog receiver..."
+    python -m src.services.syslog_receiver &
+    SYSLOG_PID=$!
+    echo "    Syslog receiver started (PID: $SYSLOG_PID)"
+fi
+
 echo
 echo "✅ All services started successfully!"
 echo
@@ -49,6 +67,12 @@ echo "API Server:        http://0.0.0.0:8080"
 echo "Dashboard:         http://0.0.0.0:8080/api/v1/dashboard"
 echo "Health Check:      http://0.0.0.0:8080/api/v1/health"
 echo "API Docs:          http://0.0.0.0:8080/docs"
+if [ -n "$UDP_PID" ]; then
+echo "UDP Heartbeats:    udp://0.0.0.0:8081"
+fi
+if [ -n "$SYSLOG_PID" ]; then
+echo "Syslog:            udp/tcp://0.0.0.0:${SYSLOG_UDP_PORT:-5514}"
+fi
 echo "========================================="
 echo
 
@@ -56,8 +80,8 @@ echo
 shutdown() {
     echo
     echo "🛑 Shutting down services..."
-    kill $API_PID $SCHEDULER_PID $MONITOR_PID 2>/dev/null || true
-    wait $API_PID $SCHEDULER_PID $MONITOR_PID 2>/dev/null || true
+    kill $API_PID $SCHEDULER_PID $MONITOR_PID $UDP_PID $SYSLOG_PID 2>/dev/null || true
+    wait $API_PID $SCHEDULER_PID $MONITOR_PID $UDP_PID $SYSLOG_PID 2>/dev/null || true
     echo "✅ All services stopped"
     exit 0
 }
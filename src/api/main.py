@@ -6,10 +6,20 @@ from datetime import datetime
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from src.api.routes import agents, config_view, dashboard, heartbeat, hosts
+from src.api.routes import (
+    agents,
+    config_view,
+    dashboard,
+    heartbeat,
+    hosts,
+    llm,
+    metrics,
+    project_services,
+)
 from src.api.routes import settings as settings_routes
 from src.config import get_settings
-from src.database import init_db
+from src.database import get_db_context, init_db
+from src.services.metrics_store import get_metrics_store
 
 # Configure logging
 settings = get_settings()
@@ -31,11 +41,16 @@ async def lifespan(app: FastAPI):
     logger.info(f"Initializing database: {settings.database_url}")
     init_db()
     logger.info("Database initialized")
+    get_metrics_store().start_checkpoints()
 
     yield
 
     # Shutdown
     logger.info("Shutting down Network Monitoring API")
+    get_metrics_store().stop_checkpoints()
+    with get_db_context() as db:
+        sealed = get_metrics_store().flush(db)
+    logger.info(f"Flushed {sealed} open metric chunks")
 
 
 # Create FastAPI app
@@ -58,10 +73,13 @@ app.add_middleware(
 # Include routers
 app.include_router(heartbeat.router, prefix="/api/v1", tags=["heartbeat"])
 app.include_router(hosts.router, prefix="/api/v1", tags=["hosts"])
+app.include_router(metrics.router, prefix="/api/v1", tags=["metrics"])
+app.include_router(project_services.router, prefix="/api/v1", tags=["project-services"])
 app.include_router(dashboard.router, prefix="/api/v1", tags=["dashboard"])
 app.include_router(config_view.router, prefix="/api/v1", tags=["configuration"])
 app.include_router(settings_routes.router, prefix="/api/v1", tags=["settings"])
 app.include_router(agents.router, prefix="/api/v1", tags=["agents"])
+app.include_router(llm.router, prefix="/api/v1", tags=["llm"])
 
 
 @app.get("/")
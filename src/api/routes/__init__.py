@@ -1,4 +1,22 @@
 """API routes."""
-from src.api.routes import agents, dashboard, heartbeat, hosts, settings
+from src.api.routes import (
+    agents,
+    dashboard,
+    heartbeat,
+    hosts,
+    llm,
+    metrics,
+    project_services,
+    settings,
+)
 
-__all__ = ["heartbeat", "hosts", "dashboard", "settings", "agents"]
+__all__ = [
+    "heartbeat",
+    "hosts",
+    "llm",
+    "metrics",
+    "project_services",
+    "dashboard",
+    "settings",
+    "agents",
+]
@@ -1,18 +1,59 @@
 """Heartbeat API endpoints."""
 import json
 import logging
-from datetime import datetime
-from typing import Optional
+from typing import Dict, Optional
 
 from fastapi import APIRouter, Depends, Header, HTTPException, Request
 from sqlalchemy.orm import Session
 
 from src.database import Heartbeat, Host, get_db
+from src.services.heartbeat_ingest import get_heartbeat_guard, record_heartbeat
+from src.services.metrics_store import sanitize_metrics
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Metrics payloads are small; anything larger is ignored
+MAX_METRICS_BODY_BYTES = 8192
+
+
+async def _read_metrics(request: Request) -> Dict[str, float]:
+    """
+    Extract the optional metrics map from a heartbeat request body.
+
+    Expected body: {"metrics": {"load": 0.42, "memory": 61.3, ...}}.
+    A missing or malformed body never fails the heartbeat itself.
+    """
+    if request.method != "POST":
+        return {}
+
+    body = await request.body()
+    if not body or len(body) > MAX_METRICS_BODY_BYTES:
+        return {}
+
+    try:
+        payload = json.loads(body)
+    except (json.JSONDecodeError, UnicodeDecodeError):
+        logger.debug("Ignoring non-JSON heartbeat body")
+        return {}
+
+    if not isinstance(payload, dict):
+        return {}
+
+    return sanitize_metrics(payload.get("metrics"))
+
+
+@router.get("/heartbeats/rejections")
+async def get_heartbeat_rejections():
+    """
+    Get counters for heartbeats rejected by this API process.
+
+    Returns:
+        Rejection counts by reason, negative cache size and limiter state
+    """
+    return get_heartbeat_guard().stats()
+
 
 @router.post("/heartbeat/{host_id}")
 @router.get("/heartbeat/{host_id}")
@@ -32,6 +73,10 @@ async def receive_heartbeat(
     1. As Authorization header: "Bearer <token>"
     2. As query parameter: ?token=<token>
 
+    POST requests may carry a JSON body with host metrics, e.g.
+    {"metrics": {"load": 0.42, "memory": 61.3, "disk": 72.0}}, which are
+    stored in the metrics time-series store.
+
     Args:
         host_id: Unique host identifier
         request: FastAPI request object
@@ -42,10 +87,23 @@ async def receive_heartbeat(
     Returns:
         Success message
     """
+    # Get source IP
+    source_ip = request.client.host if request.client else None
+
+    # Answer repeat offenders from memory before touching the database
+    guard = get_heartbeat_guard()
+    rejection = guard.check(host_id, source_ip)
+    if rejection == "rate_limited":
+        raise HTTPException(status_code=429, detail="Too many invalid heartbeats")
+    if rejection == "unknown_host":
+        raise HTTPException(status_code=404, detail="Host not found")
+
     # Find host by host_id
     host = db.query(Host).filter(Host.host_id == host_id).first()
 
     if not host:
+        if guard.reject_unknown(host_id, source_ip) == "rate_limited":
+            raise HTTPException(status_code=429, detail="Too many invalid heartbeats")
         logger.warning(f"Heartbeat from unknown host: {host_id}")
         raise HTTPException(status_code=404, detail="Host not found")
 
@@ -58,26 +116,13 @@ async def receive_heartbeat(
 
     if provided_token != host.token:
         logger.warning(f"Invalid token for host: {host_id}")
+        guard.reject(host_id, source_ip, "invalid_token")
         raise HTTPException(status_code=401, detail="Invalid token")
 
-    # Get source IP
-    source_ip = request.client.host if request.client else None
-
-    # Create heartbeat record
-    heartbeat = Heartbeat(
-        host_id=host.id,
-        timestamp=datetime.utcnow(),
-        source_ip=source_ip,
-    )
-    db.add(heartbeat)
-
-    # Update host last_seen and status
-    host.last_seen = datetime.utcnow()
+    metrics = await _read_metrics(request)
 
-    # Update status to 'up' if it was down
-    if host.status != "up":
-        logger.info(f"Host {host.name} status changed: {host.status} -> up")
-        host.status = "up"
+    # Create heartbeat record, update host last_seen/status and store metrics
+    heartbeat = record_heartbeat(db, host, source_ip=source_ip, metrics=metrics)
 
     db.commit()
 
@@ -88,6 +133,7 @@ async def receive_heartbeat(
         "message": "Heartbeat received",
         "host_id": host_id,
         "timestamp": heartbeat.timestamp.isoformat(),
+        "metrics_recorded": len(metrics),
     }
 
 
@@ -3,14 +3,22 @@ import json
 import logging
 import secrets
 from datetime import datetime
-from typing import List
+from typing import Any, Dict, List, Optional
 
 from croniter import croniter
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from sqlalchemy.orm import Session
 
-from src.database import Host, get_db
+from src.database import Host, LogAnalysisRequest, get_db
 from src.database.schemas import HostCreate, HostResponse, HostStatus, HostUpdate
+from src.services.analysis_requests import (
+    REQUEST_WAIT_SECONDS,
+    load_result,
+    queue_analysis,
+    wait_for_result,
+)
+from src.services.heartbeat_ingest import get_heartbeat_guard
+from src.services.log_analyzer import ANALYSIS_RUNNING
 
 logger = logging.getLogger(__name__)
 
@@ -21,6 +29,9 @@ def calculate_frequency_from_cron(cron_expr: str) -> int:
     """
     Calculate average frequency in seconds from a cron expression.
 
+    Only used for display and as a fallback; overdue checks for cron hosts
+    use the exact next fire time (see src.utils.cron_schedule).
+
     Args:
         cron_expr: Cron expression (e.g., "*/5 * * * *" for every 5 minutes)
 
@@ -44,6 +55,10 @@ def calculate_frequency_from_cron(cron_expr: str) -> int:
         return 300  # Default to 5 minutes
 
 
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value else None
+
+
 @router.get("/hosts", response_model=List[HostStatus])
 async def list_hosts(db: Session = Depends(get_db)):
     """
@@ -103,9 +118,15 @@ async def get_host(host_id: str, db: Session = Depends(get_db)):
         schedule_type=host.schedule_type,
         schedule_config=host.schedule_config,
         grace_period_seconds=host.grace_period_seconds,
+        adaptive_deadline=host.adaptive_deadline,
         log_analysis_config=host.log_analysis_config,
         last_seen=host.last_seen,
         status=host.status,
+        learned_interval_seconds=host.interval_mean,
+        learned_interval_stddev_seconds=host.interval_stats.stddev,
+        interval_samples=host.interval_samples or 0,
+        overdue_threshold_seconds=host.heartbeat_threshold_seconds(),
+        next_deadline=host.cron_deadline(),
         created_at=host.created_at,
         updated_at=host.updated_at,
     )
@@ -159,6 +180,7 @@ async def create_host(host_data: HostCreate, db: Session = Depends(get_db)):
         schedule_type=host_data.schedule_type,
         schedule_config=host_data.schedule_config,
         grace_period_seconds=host_data.grace_period_seconds,
+        adaptive_deadline=host_data.adaptive_deadline,
         log_analysis_config=host_data.log_analysis_config,
         status="unknown",
     )
@@ -169,6 +191,9 @@ async def create_host(host_data: HostCreate, db: Session = Depends(get_db)):
 
     logger.info(f"Created new host: {host.name} ({host.host_id})")
 
+    # The host_id may have been cached as unknown by the heartbeat endpoint
+    get_heartbeat_guard().forget_host(host.host_id)
+
     # Build heartbeat URL
     from src.config import get_settings
 
@@ -185,9 +210,15 @@ async def create_host(host_data: HostCreate, db: Session = Depends(get_db)):
         schedule_type=host.schedule_type,
         schedule_config=host.schedule_config,
         grace_period_seconds=host.grace_period_seconds,
+        adaptive_deadline=host.adaptive_deadline,
         log_analysis_config=host.log_analysis_config,
         last_seen=host.last_seen,
         status=host.status,
+        learned_interval_seconds=host.interval_mean,
+        learned_interval_stddev_seconds=host.interval_stats.stddev,
+        interval_samples=host.interval_samples or 0,
+        overdue_threshold_seconds=host.heartbeat_threshold_seconds(),
+        next_deadline=host.cron_deadline(),
         created_at=host.created_at,
         updated_at=host.updated_at,
     )
@@ -238,6 +269,8 @@ async def update_host(
         host.schedule_config = host_data.schedule_config
     if host_data.grace_period_seconds is not None:
         host.grace_period_seconds = host_data.grace_period_seconds
+    if host_data.adaptive_deadline is not None:
+        host.adaptive_deadline = host_data.adaptive_deadline
     if host_data.log_analysis_config is not None:
         host.log_analysis_config = host_data.log_analysis_config
 
@@ -264,9 +297,15 @@ async def update_host(
         schedule_type=host.schedule_type,
         schedule_config=host.schedule_config,
         grace_period_seconds=host.grace_period_seconds,
+        adaptive_deadline=host.adaptive_deadline,
         log_analysis_config=host.log_analysis_config,
         last_seen=host.last_seen,
         status=host.status,
+        learned_interval_seconds=host.interval_mean,
+        learned_interval_stddev_seconds=host.interval_stats.stddev,
+        interval_samples=host.interval_samples or 0,
+        overdue_threshold_seconds=host.heartbeat_threshold_seconds(),
+        next_deadline=host.cron_deadline(),
         created_at=host.created_at,
         updated_at=host.updated_at,
     )
@@ -301,6 +340,73 @@ async def delete_host(host_id: str, db: Session = Depends(get_db)):
     }
 
 
+def _analysis_response(request_id: int, result: Optional[Dict[str, Any]], response: Response):
+    """Map a manual analysis result to the endpoint's response."""
+    if result is None:
+        response.status_code = 202
+        return {"request_id": request_id, "status": "pending"}
+    if result["error"] == ANALYSIS_RUNNING:
+        raise HTTPException(status_code=409, detail=ANALYSIS_RUNNING)
+    return {"request_id": request_id, **result}
+
+
+@router.post("/hosts/{host_id}/analyze-logs")
+def trigger_log_analysis(host_id: str, response: Response, db: Session = Depends(get_db)):
+    """
+    Analyze a host's logs now.
+
+    The analysis is queued to the scheduler process, which runs it ahead of
+    scheduled analyses in its LLM dispatcher. Waits (in the threadpool) up to
+    REQUEST_WAIT_SECONDS for the result; after that it answers 202 with the
+    request id to poll. Returns 409 while a scheduled analysis of the host is
+    running.
+
+    Args:
+        host_id: Unique host identifier
+        response: Response (status set to 202 while still running)
+        db: Database session
+
+    Returns:
+        Analysis outcome and timings, or the pending request id
+    """
+    host = db.query(Host).filter(Host.host_id == host_id).first()
+
+    if not host:
+        raise HTTPException(status_code=404, detail="Host not found")
+    if not host.log_analysis_config:
+        raise HTTPException(status_code=400, detail="Log analysis is not configured for this host")
+
+    request_id = queue_analysis(db, host.id).id
+    result = wait_for_result(request_id, timeout=REQUEST_WAIT_SECONDS)
+    if result is not None:
+        logger.info(f"Manual log analysis for {host.name}: {result['status']}")
+    return _analysis_response(request_id, result, response)
+
+
+@router.get("/hosts/{host_id}/analyze-logs/{request_id}")
+def get_log_analysis_request(
+    host_id: str, request_id: int, response: Response, db: Session = Depends(get_db)
+):
+    """
+    Get the result of a manual log analysis that was still running.
+
+    Args:
+        host_id: Unique host identifier
+        request_id: Id returned by POST /hosts/{host_id}/analyze-logs
+        response: Response (status set to 202 while still running)
+        db: Database session
+
+    Returns:
+        Analysis outcome and timings, or the pending request id
+    """
+    host = db.query(Host).filter(Host.host_id == host_id).first()
+    request = db.get(LogAnalysisRequest, request_id)
+    if not host or request is None or request.host_id != host.id:
+        raise HTTPException(status_code=404, detail="Analysis request not found")
+
+    return _analysis_response(request_id, load_result(db, request_id), response)
+
+
 @router.post("/hosts/generate-token")
 async def generate_token():
     """
@@ -352,6 +458,10 @@ async def get_all_configurations(db: Session = Depends(get_db)):
             "heartbeat_frequency_minutes": host.expected_frequency_seconds // 60,
             "grace_period_seconds": host.grace_period_seconds,
             "schedule_type": host.schedule_type,
+            "adaptive_deadline": host.adaptive_deadline,
+            "learned_interval_seconds": host.interval_mean,
+            "overdue_threshold_seconds": host.heartbeat_threshold_seconds(),
+            "next_deadline": _isoformat(host.cron_deadline()),
             "log_analysis_enabled": log_analysis_enabled,
             "last_seen": host.last_seen.isoformat() if host.last_seen else None,
             "created_at": host.created_at.isoformat(),
@@ -371,6 +481,7 @@ async def update_host_config(
     frequency_seconds: int = None,
     grace_period_seconds: int = None,
     schedule_type: str = None,
+    adaptive_deadline: bool = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -382,6 +493,7 @@ async def update_host_config(
         frequency_seconds: New heartbeat frequency (optional)
         grace_period_seconds: New grace period (optional)
         schedule_type: New schedule type (optional): 'always' or 'business_hours'
+        adaptive_deadline: Use learned heartbeat intervals for overdue checks (optional)
         db: Database session
 
     Returns:
@@ -436,6 +548,10 @@ async def update_host_config(
         host.schedule_type = schedule_type
         updates.append(f"schedule to {schedule_type}")
 
+    if adaptive_deadline is not None:
+        host.adaptive_deadline = adaptive_deadline
+        updates.append(f"adaptive deadline {'enabled' if adaptive_deadline else 'disabled'}")
+
     if not updates:
         raise HTTPException(
             status_code=400,
@@ -459,5 +575,9 @@ async def update_host_config(
             "frequency_minutes": host.expected_frequency_seconds // 60,
             "grace_period_seconds": host.grace_period_seconds,
             "schedule_type": host.schedule_type,
+            "adaptive_deadline": host.adaptive_deadline,
+            "learned_interval_seconds": host.interval_mean,
+            "overdue_threshold_seconds": host.heartbeat_threshold_seconds(),
+            "next_deadline": _isoformat(host.cron_deadline()),
         }
     }
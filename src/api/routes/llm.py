@@ -0,0 +1,46 @@
+"""LLM usage API endpoints."""
+import logging
+
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.database import get_db
+from src.services.llm_cache import get_llm_cache
+from src.services.llm_metrics import load_llm_metrics
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+@router.get("/llm/cache")
+async def get_llm_cache_stats():
+    """
+    Get LLM response cache statistics.
+
+    Returns:
+        Hits, misses, hit rate and tokens saved since startup, plus the
+        number of stored entries and their lifetime hits and tokens saved
+    """
+    cache = get_llm_cache()
+    if cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **cache.stats()}
+
+
+@router.get("/llm/metrics")
+def get_llm_metrics(db: Session = Depends(get_db)):
+    """
+    Get LLM request metrics.
+
+    All LLM requests, manual and scheduled, run in the scheduler process,
+    which publishes its dispatcher, triage and batching counters every minute.
+
+    Returns:
+        Dispatcher queue depth, requests in flight, rate limits and per-model
+        requests, failures, retries, 429s, tokens (including prompt-cache
+        reads), cost and latency, triage counts (batches escalated to the
+        full model), cross-host batching counts (null if disabled) and the
+        snapshot's ``updated_at`` (null before the scheduler's first snapshot)
+    """
+    return load_llm_metrics(db) or {"updated_at": None}
@@ -0,0 +1,94 @@
+"""Host metrics API endpoints."""
+import logging
+from datetime import datetime, timedelta
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+
+from src.database import Host, get_db
+from src.services.metrics_store import get_metrics_store
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+
+def _get_host(db: Session, host_id: str) -> Host:
+    host = db.query(Host).filter(Host.host_id == host_id).first()
+    if not host:
+        raise HTTPException(status_code=404, detail="Host not found")
+    return host
+
+
+@router.get("/hosts/{host_id}/metrics")
+async def list_host_metrics(host_id: str, db: Session = Depends(get_db)):
+    """
+    List metric names reported by a host.
+
+    Args:
+        host_id: Unique host identifier
+        db: Database session
+
+    Returns:
+        Metric names
+    """
+    host = _get_host(db, host_id)
+
+    return {
+        "host_id": host_id,
+        "metrics": get_metrics_store().list_metrics(db, host.id),
+    }
+
+
+@router.get("/hosts/{host_id}/metrics/{metric}")
+async def get_host_metric(
+    host_id: str,
+    metric: str,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    resolution: Optional[int] = None,
+    aggregate: str = "avg",
+    db: Session = Depends(get_db),
+):
+    """
+    Get a metric time series for a host.
+
+    Args:
+        host_id: Unique host identifier
+        metric: Metric name (e.g. 'load', 'memory')
+        start: Range start, UTC (default: 24 hours before end)
+        end: Range end, UTC (default: now)
+        resolution: 0 (raw), 300 or 3600 seconds; chosen from the range if omitted
+        aggregate: 'avg', 'min' or 'max' for downsampled resolutions
+        db: Database session
+
+    Returns:
+        Series points as [timestamp, value] pairs
+    """
+    host = _get_host(db, host_id)
+
+    end = (end or datetime.utcnow()).replace(tzinfo=None)
+    start = (start or end - timedelta(hours=24)).replace(tzinfo=None)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+
+    try:
+        series = get_metrics_store().query(
+            db,
+            host.id,
+            metric,
+            start=start,
+            end=end,
+            resolution_seconds=resolution,
+            aggregate=aggregate,
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    return {
+        "host_id": host_id,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        **series,
+    }
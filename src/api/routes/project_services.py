@@ -0,0 +1,416 @@
+"""Project service API endpoints."""
+import json
+import logging
+import re
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple
+
+import yaml
+from fastapi import APIRouter, Depends, HTTPException, Request
+from pydantic import ValidationError
+from sqlalchemy.orm import Session, joinedload
+
+from src.database import ProjectService, ServiceHealthCheck, get_db
+from src.database.schemas import (
+    ProjectServiceCreate,
+    ProjectServiceResponse,
+    ProjectServiceUpdate,
+    ServiceHealthCheckResponse,
+)
+from src.services.service_slo import summarize_service
+
+logger = logging.getLogger(__name__)
+
+router = APIRouter()
+
+MAX_IMPORT_BYTES = 1024 * 1024
+MAX_HISTORY_PAGE = 500
+
+
+def _get_service(db: Session, service_id: int) -> ProjectService:
+    service = db.query(ProjectService).filter(ProjectService.id == service_id).first()
+    if not service:
+        raise HTTPException(status_code=404, detail="Project service not found")
+    return service
+
+
+def _validate_pattern(pattern: Optional[str]) -> None:
+    if pattern:
+        try:
+            re.compile(pattern)
+        except re.error as e:
+            raise HTTPException(status_code=400, detail=f"Invalid response pattern: {e}")
+
+
+def _find_service(db: Session, project_name: str, service_name: str) -> Optional[ProjectService]:
+    return (
+        db.query(ProjectService)
+        .filter(ProjectService.project_name == project_name)
+        .filter(ProjectService.service_name == service_name)
+        .first()
+    )
+
+
+def _settable(updates: Dict[str, Any]) -> Dict[str, Any]:
+    """Drop nulls for columns that cannot be null; null only clears nullable fields."""
+    columns = ProjectService.__table__.columns
+    return {
+        field: value
+        for field, value in updates.items()
+        if value is not None or columns[field].nullable
+    }
+
+
+def _window(
+    start: Optional[datetime], end: Optional[datetime]
+) -> Tuple[datetime, datetime]:
+    end = (end or datetime.utcnow()).replace(tzinfo=None)
+    start = (start or end - timedelta(hours=24)).replace(tzinfo=None)
+    if start >= end:
+        raise HTTPException(status_code=400, detail="start must be before end")
+    return start, end
+
+
+@router.get("/project-services", response_model=List[ProjectServiceResponse])
+async def list_project_services(
+    project_name: Optional[str] = None,
+    enabled: Optional[bool] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    List project services.
+
+    Args:
+        project_name: Only include services of this project
+        enabled: Filter by enabled flag
+        db: Database session
+
+    Returns:
+        List of project services
+    """
+    query = db.query(ProjectService)
+    if project_name:
+        query = query.filter(ProjectService.project_name == project_name)
+    if enabled is not None:
+        query = query.filter(ProjectService.enabled.is_(enabled))
+
+    return query.order_by(ProjectService.project_name, ProjectService.service_name).all()
+
+
+@router.post("/project-services", response_model=ProjectServiceResponse, status_code=201)
+async def create_project_service(
+    service_data: ProjectServiceCreate,
+    db: Session = Depends(get_db),
+):
+    """
+    Register a project service endpoint for polling.
+
+    Args:
+        service_data: Service creation data
+        db: Database session
+
+    Returns:
+        Created service
+    """
+    if _find_service(db, service_data.project_name, service_data.service_name):
+        raise HTTPException(
+            status_code=409,
+            detail="Service with this project_name and service_name already exists",
+        )
+    _validate_pattern(service_data.expected_response_pattern)
+
+    service = ProjectService(**service_data.model_dump(), status="unknown")
+    db.add(service)
+    db.commit()
+    db.refresh(service)
+
+    logger.info(f"Created project service: {service.project_name}/{service.service_name}")
+
+    return service
+
+
+@router.post("/project-services/import")
+async def import_project_services(request: Request, db: Session = Depends(get_db)):
+    """
+    Create or update many project services in one transaction.
+
+    The body is a JSON or YAML list of service definitions (or a mapping with
+    a ``services`` list). Services are matched on project_name + service_name;
+    existing ones are updated with the fields given, others are created. If
+    any entry is invalid nothing is written.
+
+    Args:
+        request: Request with a JSON or YAML body
+        db: Database session
+
+    Returns:
+        Counts and ids of created and updated services
+    """
+    body = await request.body()
+    if len(body) > MAX_IMPORT_BYTES:
+        raise HTTPException(status_code=413, detail="Import body too large")
+
+    try:
+        data = json.loads(body)
+    except ValueError:
+        try:
+            data = yaml.safe_load(body)
+        except yaml.YAMLError as e:
+            raise HTTPException(status_code=400, detail=f"Body is not valid JSON or YAML: {e}")
+
+    if isinstance(data, dict):
+        data = data.get("services")
+    if not isinstance(data, list):
+        raise HTTPException(status_code=400, detail="Expected a list of services")
+
+    entries: List[ProjectServiceCreate] = []
+    errors: List[Dict[str, Any]] = []
+    seen = set()
+    for index, raw in enumerate(data):
+        try:
+            entry = ProjectServiceCreate.model_validate(raw)
+        except ValidationError as e:
+            errors.append({"index": index, "errors": json.loads(e.json(include_url=False))})
+            continue
+        key = (entry.project_name, entry.service_name)
+        if key in seen:
+            errors.append({"index": index, "errors": [{"msg": "Duplicate service in import"}]})
+            continue
+        if entry.expected_response_pattern:
+            try:
+                re.compile(entry.expected_response_pattern)
+            except re.error as e:
+                errors.append({"index": index, "errors": [{"msg": f"Invalid response pattern: {e}"}]})
+                continue
+        seen.add(key)
+        entries.append(entry)
+
+    if errors:
+        raise HTTPException(status_code=422, detail={"message": "Import rejected", "errors": errors})
+
+    existing = {}
+    for project_name in {entry.project_name for entry in entries}:
+        for service in db.query(ProjectService).filter(ProjectService.project_name == project_name):
+            existing[(service.project_name, service.service_name)] = service
+
+    created: List[ProjectService] = []
+    updated: List[ProjectService] = []
+    try:
+        for entry in entries:
+            service = existing.get((entry.project_name, entry.service_name))
+            if service is None:
+                service = ProjectService(**entry.model_dump(), status="unknown")
+                db.add(service)
+                created.append(service)
+            else:
+                for field, value in _settable(entry.model_dump(exclude_unset=True)).items():
+                    setattr(service, field, value)
+                updated.append(service)
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
+
+    logger.info(f"Imported project services: {len(created)} created, {len(updated)} updated")
+
+    return {
+        "status": "success",
+        "created": len(created),
+        "updated": len(updated),
+        "created_ids": [service.id for service in created],
+        "updated_ids": [service.id for service in updated],
+    }
+
+
+@router.get("/project-services/stats")
+async def get_all_service_stats(
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    project_name: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Get latency percentiles and SLO figures for all project services.
+
+    Args:
+        start: Window start, UTC (default: 24 hours before end)
+        end: Window end, UTC (default: now)
+        project_name: Only include services of this project
+        db: Database session
+
+    Returns:
+        Per-service summaries
+    """
+    start, end = _window(start, end)
+
+    query = db.query(ProjectService)
+    if project_name:
+        query = query.filter(ProjectService.project_name == project_name)
+    services = query.order_by(ProjectService.project_name, ProjectService.service_name).all()
+
+    return {
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "services": [summarize_service(db, service, start, end) for service in services],
+    }
+
+
+@router.get("/project-services/{service_id}/stats")
+async def get_service_stats(
+    service_id: int,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Get latency percentiles, availability and error budget burn for a service.
+
+    Computed from 5-minute histogram buckets, so the window is widened to
+    whole buckets.
+
+    Args:
+        service_id: Project service id
+        start: Window start, UTC (default: 24 hours before end)
+        end: Window end, UTC (default: now)
+        db: Database session
+
+    Returns:
+        Service summary
+    """
+    service = _get_service(db, service_id)
+    start, end = _window(start, end)
+
+    return summarize_service(db, service, start, end)
+
+
+@router.get("/project-services/{service_id}", response_model=ProjectServiceResponse)
+async def get_project_service(service_id: int, db: Session = Depends(get_db)):
+    """
+    Get a project service.
+
+    Args:
+        service_id: Project service id
+        db: Database session
+
+    Returns:
+        Service details
+    """
+    return _get_service(db, service_id)
+
+
+@router.put("/project-services/{service_id}", response_model=ProjectServiceResponse)
+async def update_project_service(
+    service_id: int,
+    service_data: ProjectServiceUpdate,
+    db: Session = Depends(get_db),
+):
+    """
+    Update a project service. Only fields present in the body are changed;
+    null clears optional fields and is ignored for required ones.
+
+    Args:
+        service_id: Project service id
+        service_data: Update data
+        db: Database session
+
+    Returns:
+        Updated service
+    """
+    service = _get_service(db, service_id)
+    updates = _settable(service_data.model_dump(exclude_unset=True))
+
+    project_name = updates.get("project_name", service.project_name)
+    service_name = updates.get("service_name", service.service_name)
+    duplicate = _find_service(db, project_name, service_name)
+    if duplicate and duplicate.id != service.id:
+        raise HTTPException(
+            status_code=409,
+            detail="Service with this project_name and service_name already exists",
+        )
+    _validate_pattern(updates.get("expected_response_pattern"))
+
+    for field, value in updates.items():
+        setattr(service, field, value)
+    db.commit()
+    db.refresh(service)
+
+    logger.info(
+        f"Updated project service {service.project_name}/{service.service_name}: "
+        f"{', '.join(updates) or 'no changes'}"
+    )
+
+    return service
+
+
+@router.delete("/project-services/{service_id}")
+async def delete_project_service(service_id: int, db: Session = Depends(get_db)):
+    """
+    Delete a project service and its history.
+
+    Args:
+        service_id: Project service id
+        db: Database session
+
+    Returns:
+        Success message
+    """
+    service = _get_service(db, service_id)
+    label = f"{service.project_name}/{service.service_name}"
+    db.delete(service)
+    db.commit()
+
+    logger.info(f"Deleted project service: {label}")
+
+    return {
+        "status": "success",
+        "message": f"Project service {label} deleted",
+    }
+
+
+@router.get("/project-services/{service_id}/checks")
+async def get_service_checks(
+    service_id: int,
+    limit: int = 100,
+    before_id: Optional[int] = None,
+    status: Optional[str] = None,
+    db: Session = Depends(get_db),
+):
+    """
+    Get health-check history for a service, newest first.
+
+    Uses keyset pagination: pass the returned ``next_before_id`` as
+    ``before_id`` to fetch the next page.
+
+    Args:
+        service_id: Project service id
+        limit: Page size (max 500)
+        before_id: Only return checks with a smaller id
+        status: Filter by check status ('success', 'failure', 'timeout')
+        db: Database session
+
+    Returns:
+        Page of health checks and the cursor for the next page
+    """
+    _get_service(db, service_id)
+    limit = max(1, min(limit, MAX_HISTORY_PAGE))
+
+    query = (
+        db.query(ServiceHealthCheck)
+        .options(joinedload(ServiceHealthCheck.response_blob))
+        .filter(ServiceHealthCheck.service_id == service_id)
+    )
+    if before_id is not None:
+        query = query.filter(ServiceHealthCheck.id < before_id)
+    if status:
+        query = query.filter(ServiceHealthCheck.status == status)
+
+    checks = query.order_by(ServiceHealthCheck.id.desc()).limit(limit + 1).all()
+    has_more = len(checks) > limit
+    checks = checks[:limit]
+
+    return {
+        "service_id": service_id,
+        "count": len(checks),
+        "checks": [ServiceHealthCheckResponse.model_validate(check) for check in checks],
+        "next_before_id": checks[-1].id if has_more else None,
+    }
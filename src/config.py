@@ -25,6 +25,22 @@ class Settings(BaseSettings):
     llm_api_url: str = Field(..., alias="LLM_API_URL")
     llm_api_key: str = Field(..., alias="LLM_API_KEY")
     llm_default_model: str = Field(default="claude-sonnet-4.5", alias="LLM_DEFAULT_MODEL")
+    llm_cache_enabled: bool = Field(default=True, alias="LLM_CACHE_ENABLED")
+    llm_cache_ttl_seconds: int = Field(default=86400, alias="LLM_CACHE_TTL_SECONDS")
+    llm_cache_max_entries: int = Field(default=5000, alias="LLM_CACHE_MAX_ENTRIES")
+    llm_chunk_tokens: int = Field(default=24000, alias="LLM_CHUNK_TOKENS")
+    llm_chunk_concurrency: int = Field(default=4, alias="LLM_CHUNK_CONCURRENCY")
+    llm_requests_per_minute: int = Field(default=50, alias="LLM_REQUESTS_PER_MINUTE")
+    llm_tokens_per_minute: int = Field(default=100000, alias="LLM_TOKENS_PER_MINUTE")
+    llm_max_concurrency: int = Field(default=8, alias="LLM_MAX_CONCURRENCY")
+    llm_max_retries: int = Field(default=4, alias="LLM_MAX_RETRIES")
+    llm_pricing: str = Field(default="", alias="LLM_PRICING")
+    llm_triage_model: str = Field(default="", alias="LLM_TRIAGE_MODEL")
+    llm_streaming: bool = Field(default=True, alias="LLM_STREAMING")
+    llm_batch_max_hosts: int = Field(default=0, alias="LLM_BATCH_MAX_HOSTS")
+    llm_batch_window_seconds: float = Field(default=2.0, alias="LLM_BATCH_WINDOW_SECONDS")
+    llm_max_output_tokens: str = Field(default="", alias="LLM_MAX_OUTPUT_TOKENS")
+    llm_prompt_caching: bool = Field(default=False, alias="LLM_PROMPT_CACHING")
 
     # Healthchecks.io
     healthchecks_url: Optional[str] = Field(default=None, alias="HEALTHCHECKS_URL")
@@ -39,6 +55,70 @@ class Settings(BaseSettings):
         default="America/New_York", alias="BUSINESS_HOURS_TIMEZONE"
     )
 
+    # Timezone cron expressions for heartbeat schedules are evaluated in
+    cron_timezone: str = Field(default="UTC", alias="CRON_TIMEZONE")
+
+    # UDP heartbeat listener (optional)
+    udp_heartbeat_enabled: bool = Field(default=False, alias="UDP_HEARTBEAT_ENABLED")
+    udp_heartbeat_host: str = Field(default="0.0.0.0", alias="UDP_HEARTBEAT_HOST")
+    udp_heartbeat_port: int = Field(default=8081, alias="UDP_HEARTBEAT_PORT")
+    udp_heartbeat_max_skew_seconds: int = Field(
+        default=120, alias="UDP_HEARTBEAT_MAX_SKEW_SECONDS"
+    )
+    udp_heartbeat_rate_per_second: float = Field(
+        default=5.0, alias="UDP_HEARTBEAT_RATE_PER_SECOND"
+    )
+    udp_heartbeat_burst: float = Field(default=20.0, alias="UDP_HEARTBEAT_BURST")
+
+    # Syslog receiver for method "syslog" log analysis (optional)
+    syslog_receiver_enabled: bool = Field(default=False, alias="SYSLOG_RECEIVER_ENABLED")
+    syslog_host: str = Field(default="0.0.0.0", alias="SYSLOG_HOST")
+    syslog_udp_port: int = Field(default=5514, alias="SYSLOG_UDP_PORT")
+    syslog_tcp_port: int = Field(default=5514, alias="SYSLOG_TCP_PORT")
+    syslog_spool_dir: str = Field(default="data/syslog", alias="SYSLOG_SPOOL_DIR")
+    syslog_buffer_lines: int = Field(default=10000, alias="SYSLOG_BUFFER_LINES")
+    syslog_spool_max_bytes: int = Field(
+        default=10 * 1024 * 1024, alias="SYSLOG_SPOOL_MAX_BYTES"
+    )
+
+    # Project service poller
+    project_poller_enabled: bool = Field(default=True, alias="PROJECT_POLLER_ENABLED")
+    project_poll_max_concurrency: int = Field(
+        default=20, alias="PROJECT_POLL_MAX_CONCURRENCY"
+    )
+    project_poll_jitter: float = Field(default=0.1, alias="PROJECT_POLL_JITTER")
+    project_poll_max_backoff_seconds: int = Field(
+        default=1800, alias="PROJECT_POLL_MAX_BACKOFF_SECONDS"
+    )
+    project_poll_write_interval: float = Field(
+        default=1.0, alias="PROJECT_POLL_WRITE_INTERVAL"
+    )
+
+    # Log analysis
+    log_analysis_ssh_concurrency: int = Field(
+        default=8, alias="LOG_ANALYSIS_SSH_CONCURRENCY"
+    )
+    log_analysis_llm_concurrency: int = Field(
+        default=4, alias="LOG_ANALYSIS_LLM_CONCURRENCY"
+    )
+    log_analysis_deadline_seconds: int = Field(
+        default=1500, alias="LOG_ANALYSIS_DEADLINE_SECONDS"
+    )
+    log_prefilter_enabled: bool = Field(default=True, alias="LOG_PREFILTER_ENABLED")
+    log_prefilter_anomaly_factor: float = Field(
+        default=3.0, alias="LOG_PREFILTER_ANOMALY_FACTOR"
+    )
+    log_prefilter_anomaly_min_count: int = Field(
+        default=20, alias="LOG_PREFILTER_ANOMALY_MIN_COUNT"
+    )
+
+    # SSH connection pool (log retrieval)
+    ssh_pool_max_per_host: int = Field(default=2, alias="SSH_POOL_MAX_PER_HOST")
+    ssh_pool_idle_timeout_seconds: int = Field(
+        default=3600, alias="SSH_POOL_IDLE_TIMEOUT_SECONDS"
+    )
+    ssh_pool_keepalive_seconds: int = Field(default=30, alias="SSH_POOL_KEEPALIVE_SECONDS")
+
     # Logging
     log_level: str = Field(default="INFO", alias="LOG_LEVEL")
 
@@ -89,6 +169,30 @@ def load_hosts_config(config_path: Optional[str] = None) -> List[Dict[str, Any]]
     return data.get("hosts", []) if data else []
 
 
+def load_prefilter_rules(config_path: Optional[str] = None) -> Optional[List[Dict[str, Any]]]:
+    """
+    Load log prefilter rules from YAML file.
+
+    Args:
+        config_path: Path to prefilter_rules.yaml file. If None, uses default location.
+
+    Returns:
+        List of rule dictionaries ('name', 'pattern'), or None if the file
+        doesn't exist (built-in rules apply).
+    """
+    if config_path is None:
+        settings = get_settings()
+        config_path = os.path.join(settings.config_dir, "prefilter_rules.yaml")
+
+    if not os.path.exists(config_path):
+        return None
+
+    with open(config_path, "r") as f:
+        data = yaml.safe_load(f)
+
+    return data.get("rules", []) if data else []
+
+
 def save_hosts_config(hosts: List[Dict[str, Any]], config_path: Optional[str] = None):
     """
     Save host configurations to YAML file.
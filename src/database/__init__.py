@@ -5,9 +5,16 @@ from src.database.models import (
     Config,
     Heartbeat,
     Host,
+    LLMCacheEntry,
     LogAnalysis,
+    LogAnalysisRequest,
+    LogCursor,
+    LogTemplate,
+    MetricChunk,
     ProjectService,
+    ResponseBlob,
     ServiceHealthCheck,
+    ServiceLatencyBucket,
 )
 
 __all__ = [
@@ -20,8 +27,15 @@ __all__ = [
     "Host",
     "Heartbeat",
     "Alert",
+    "LLMCacheEntry",
     "LogAnalysis",
+    "LogAnalysisRequest",
+    "LogCursor",
+    "LogTemplate",
     "Config",
+    "MetricChunk",
     "ProjectService",
+    "ResponseBlob",
     "ServiceHealthCheck",
+    "ServiceLatencyBucket",
 ]
@@ -1,11 +1,25 @@
 """SQLAlchemy database models."""
+import zlib
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import Boolean, Column, DateTime, ForeignKey, Integer, String, Text
+from sqlalchemy import (
+    Boolean,
+    Column,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    LargeBinary,
+    String,
+    Text,
+)
 from sqlalchemy.orm import relationship
 
 from src.database.db import Base
+from src.utils.cron_schedule import cron_deadline
+from src.utils.interval_estimator import IntervalStats, adaptive_threshold, update_interval_stats
 
 
 class Host(Base):
@@ -28,6 +42,13 @@ class Host(Base):
     schedule_config = Column(Text, nullable=True)  # JSON for custom schedules
     grace_period_seconds = Column(Integer, nullable=False, default=60)
 
+    # Learned heartbeat intervals (EWMA, see src/utils/interval_estimator.py)
+    adaptive_deadline = Column(Boolean, nullable=False, default=False)  # Opt-in learned deadline
+    interval_mean = Column(Float, nullable=True)
+    interval_variance = Column(Float, nullable=True)
+    interval_samples = Column(Integer, nullable=False, default=0)
+    interval_clipped = Column(Integer, nullable=False, default=0)  # Consecutive late intervals
+
     # Status
     last_seen = Column(DateTime, nullable=True)
     status = Column(
@@ -36,6 +57,7 @@ class Host(Base):
 
     # Log analysis configuration (JSON)
     log_analysis_config = Column(Text, nullable=True)
+    log_analysis_started_at = Column(DateTime, nullable=True)  # Lease held while an analysis runs
 
     # Timestamps
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -45,18 +67,79 @@ class Host(Base):
 
     # Relationships
     heartbeats = relationship("Heartbeat", back_populates="host", cascade="all, delete-orphan")
+    metric_chunks = relationship("MetricChunk", cascade="all, delete-orphan")
     alerts = relationship("Alert", back_populates="host", cascade="all, delete-orphan")
     log_analyses = relationship(
         "LogAnalysis", back_populates="host", cascade="all, delete-orphan"
     )
+    log_cursors = relationship("LogCursor", cascade="all, delete-orphan")
+    log_analysis_requests = relationship("LogAnalysisRequest", cascade="all, delete-orphan")
+    log_templates = relationship("LogTemplate", cascade="all, delete-orphan")
 
     def __repr__(self):
         return f"<Host(id={self.id}, name={self.name}, status={self.status})>"
 
+    @property
+    def interval_stats(self) -> IntervalStats:
+        """Learned inter-arrival statistics."""
+        return IntervalStats(
+            mean=self.interval_mean,
+            variance=self.interval_variance,
+            samples=self.interval_samples or 0,
+            clipped=self.interval_clipped or 0,
+        )
+
+    def observe_heartbeat(self, timestamp: datetime) -> None:
+        """Update learned interval statistics for a heartbeat received at timestamp."""
+        if self.last_seen is None or timestamp <= self.last_seen:
+            return
+
+        stats = update_interval_stats(
+            self.interval_stats, (timestamp - self.last_seen).total_seconds()
+        )
+        self.interval_mean = stats.mean
+        self.interval_variance = stats.variance
+        self.interval_samples = stats.samples
+        self.interval_clipped = stats.clipped
+
+    def _uses_learned_deadline(self) -> bool:
+        return self.adaptive_deadline and adaptive_threshold(self.interval_stats) is not None
+
+    def cron_deadline(self, current_time: Optional[datetime] = None) -> Optional[datetime]:
+        """
+        Deadline derived from the cron expression: the next fire time after
+        last_seen plus the grace period, evaluated at current_time (default:
+        utcnow).
+
+        Returns None if the host has no cron expression, has not been seen yet,
+        uses a learned deadline, or the expression cannot be evaluated.
+        """
+        if not self.cron_expression or not self.last_seen or self._uses_learned_deadline():
+            return None
+        return cron_deadline(
+            self.cron_expression, self.last_seen, self.grace_period_seconds, now=current_time
+        )
+
+    def heartbeat_threshold_seconds(self) -> float:
+        """
+        Seconds after the last heartbeat before the host counts as overdue.
+
+        Uses the learned deadline when adaptive_deadline is enabled and enough
+        intervals have been observed, otherwise expected frequency.
+        """
+        if self.adaptive_deadline:
+            learned = adaptive_threshold(self.interval_stats)
+            if learned is not None:
+                return learned + self.grace_period_seconds
+
+        return self.expected_frequency_seconds + self.grace_period_seconds
+
     def is_overdue(self, current_time: Optional[datetime] = None) -> bool:
         """
         Check if host heartbeat is overdue, taking schedule into account.
 
+        For hosts with a cron expression: Alert once the next cron fire time after
+        the last heartbeat plus grace has passed (within monitoring windows).
         For 'always' schedule: Alert if time since last heartbeat exceeds frequency + grace.
         For 'business_hours'/'custom' schedule: Only check frequency within the monitoring window.
         - If last heartbeat was before current window started, wait for window_start + frequency + grace
@@ -66,7 +149,17 @@ class Host(Base):
             return True
 
         current_time = current_time or datetime.utcnow()
-        threshold = self.expected_frequency_seconds + self.grace_period_seconds
+
+        deadline = self.cron_deadline(current_time)
+        if deadline is not None:
+            if self.schedule_type in ["business_hours", "custom"]:
+                from src.utils.schedule_utils import should_monitor_host
+
+                if not should_monitor_host(self.schedule_type, self.schedule_config, current_time):
+                    return False
+            return current_time > deadline
+
+        threshold = self.heartbeat_threshold_seconds()
 
         # For 'always' schedule, use simple elapsed time check
         if self.schedule_type == "always":
@@ -119,6 +212,40 @@ class Heartbeat(Base):
         return f"<Heartbeat(id={self.id}, host_id={self.host_id}, timestamp={self.timestamp})>"
 
 
+class MetricChunk(Base):
+    """Compressed block of host metric samples (see src/utils/timeseries.py)."""
+
+    __tablename__ = "metric_chunks"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False)
+    metric = Column(String(50), nullable=False)
+    resolution_seconds = Column(Integer, nullable=False, default=0)  # 0 = raw samples
+    aggregate = Column(String(10), nullable=False, default="raw")  # 'raw', 'avg', 'min', 'max'
+    start_time = Column(DateTime, nullable=False)
+    end_time = Column(DateTime, nullable=False)
+    sample_count = Column(Integer, nullable=False)
+    data = Column(LargeBinary, nullable=False)
+    rolled_up = Column(Boolean, nullable=False, default=False)  # Downsampled into next tier
+
+    __table_args__ = (
+        Index(
+            "ix_metric_chunks_series",
+            "host_id",
+            "metric",
+            "resolution_seconds",
+            "aggregate",
+            "start_time",
+        ),
+    )
+
+    def __repr__(self):
+        return (
+            f"<MetricChunk(id={self.id}, host_id={self.host_id}, metric={self.metric}, "
+            f"resolution={self.resolution_seconds}, samples={self.sample_count})>"
+        )
+
+
 class Alert(Base):
     """Alert records."""
 
@@ -168,6 +295,86 @@ class LogAnalysis(Base):
         return f"<LogAnalysis(id={self.id}, host_id={self.host_id}, severity={self.severity})>"
 
 
+class LogAnalysisRequest(Base):
+    """Manual log analysis queued by the API and run by the scheduler."""
+
+    __tablename__ = "log_analysis_requests"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False, index=True)
+    status = Column(String(20), nullable=False, default="pending")  # pending/running/done
+    result = Column(Text, nullable=True)  # JSON HostAnalysisResult
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    def __repr__(self):
+        return f"<LogAnalysisRequest(id={self.id}, host_id={self.host_id}, status={self.status})>"
+
+
+class LogCursor(Base):
+    """Position up to which a host's log source has been analyzed."""
+
+    __tablename__ = "log_cursors"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False)
+    source = Column(String(500), nullable=False)  # File path or 'journal[:unit]'
+    inode = Column(Integer, nullable=True)  # File sources
+    offset = Column(Integer, nullable=True)  # Bytes consumed (file sources)
+    journal_cursor = Column(String(500), nullable=True)  # journalctl --show-cursor value
+    updated_at = Column(
+        DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow
+    )
+
+    __table_args__ = (Index("ix_log_cursors_source", "host_id", "source", unique=True),)
+
+    def __repr__(self):
+        return f"<LogCursor(host_id={self.host_id}, source={self.source}, offset={self.offset})>"
+
+
+class LogTemplate(Base):
+    """Log line template mined from a host's logs (see src/utils/log_templates.py)."""
+
+    __tablename__ = "log_templates"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    host_id = Column(Integer, ForeignKey("hosts.id"), nullable=False)
+    template_key = Column(String(40), nullable=False)  # SHA-1 of the first mined template
+    template = Column(Text, nullable=False)
+    total_count = Column(Integer, nullable=False, default=0)
+    # EWMA of the template's count per analyzed batch (prefilter rate baseline)
+    rate_mean = Column(Float, nullable=True)
+    rate_samples = Column(Integer, nullable=False, default=0)
+    first_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+    last_seen = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        Index("ix_log_templates_key", "host_id", "template_key", unique=True),
+    )
+
+    def __repr__(self):
+        return f"<LogTemplate(host_id={self.host_id}, count={self.total_count})>"
+
+
+class LLMCacheEntry(Base):
+    """Cached LLM response keyed by a hash of its request (see src/services/llm_cache.py)."""
+
+    __tablename__ = "llm_cache"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    cache_key = Column(String(64), nullable=False, unique=True)  # SHA-256 hex
+    model = Column(String(100), nullable=False)
+    response = Column(Text, nullable=False)
+    prompt_tokens = Column(Integer, nullable=False, default=0)
+    completion_tokens = Column(Integer, nullable=False, default=0)
+    hits = Column(Integer, nullable=False, default=0)
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+    last_used_at = Column(DateTime, nullable=False, default=datetime.utcnow, index=True)
+
+    def __repr__(self):
+        return f"<LLMCacheEntry(model={self.model}, hits={self.hits})>"
+
+
 class Config(Base):
     """System configuration key-value store."""
 
@@ -200,6 +407,8 @@ class ProjectService(Base):
     timeout_seconds = Column(Integer, nullable=False, default=10)
     expected_status_code = Column(Integer, nullable=False, default=200)
     expected_response_pattern = Column(String(500), nullable=True)
+    max_response_bytes = Column(Integer, nullable=True)  # None = poller default (1 MiB)
+    check_config = Column(Text, nullable=True)  # JSON options for tcp/tls/dns checks
 
     # Authentication
     auth_type = Column(String(50), nullable=True)
@@ -210,10 +419,14 @@ class ProjectService(Base):
     status = Column(String(20), nullable=False, default="unknown")
     consecutive_failures = Column(Integer, nullable=False, default=0)
     last_error = Column(Text, nullable=True)
+    last_response_hash = Column(String(64), nullable=True)  # Hash of the last stored body
+    circuit_state = Column(String(20), nullable=False, default="closed")  # closed/open/half_open
+    next_check_at = Column(DateTime, nullable=True)  # Backoff deadline while the circuit is open
 
     # Alerting configuration
     alert_threshold = Column(Integer, nullable=False, default=3)
     enabled = Column(Boolean, nullable=False, default=True)
+    slo_target = Column(Float, nullable=True)  # Availability objective, e.g. 0.999
 
     # Timestamps
     created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
@@ -226,6 +439,7 @@ class ProjectService(Base):
     health_checks = relationship(
         "ServiceHealthCheck", back_populates="service", cascade="all, delete-orphan"
     )
+    latency_buckets = relationship("ServiceLatencyBucket", cascade="all, delete-orphan")
 
     __table_args__ = (
         {
@@ -253,12 +467,68 @@ class ServiceHealthCheck(Base):
     response_time_ms = Column(Integer, nullable=True)
     status_code = Column(Integer, nullable=True)
     error_message = Column(Text, nullable=True)
-    response_body = Column(Text, nullable=True)
+    # Body is stored in response_blobs only when it changed or the check failed
+    response_blob_hash = Column(
+        String(64), ForeignKey("response_blobs.hash"), nullable=True, index=True
+    )
+    # Pre-blob rows kept their body inline
+    legacy_response_body = Column("response_body", Text, nullable=True)
 
     service = relationship("ProjectService", back_populates="health_checks")
+    response_blob = relationship("ResponseBlob")
+
+    @property
+    def response_body(self) -> Optional[str]:
+        """Stored response body, if one was recorded for this check."""
+        if self.response_blob is not None:
+            return self.response_blob.text
+        return self.legacy_response_body
 
     def __repr__(self):
         return (
             f"<ServiceHealthCheck(id={self.id}, service={self.service_id}, "
             f"status={self.status})>"
         )
+
+
+class ServiceLatencyBucket(Base):
+    """Per-service latency histogram and availability counts for one time bucket."""
+
+    __tablename__ = "service_latency_buckets"
+
+    id = Column(Integer, primary_key=True, autoincrement=True)
+    service_id = Column(Integer, ForeignKey("project_services.id"), nullable=False)
+    bucket_start = Column(DateTime, nullable=False)
+    bucket_seconds = Column(Integer, nullable=False, default=300)
+    total_checks = Column(Integer, nullable=False, default=0)
+    successful_checks = Column(Integer, nullable=False, default=0)
+    histogram = Column(Text, nullable=False)  # JSON, see src/utils/latency_histogram.py
+
+    __table_args__ = (
+        Index("ix_service_latency_buckets_series", "service_id", "bucket_start", unique=True),
+    )
+
+    def __repr__(self):
+        return (
+            f"<ServiceLatencyBucket(service={self.service_id}, start={self.bucket_start}, "
+            f"checks={self.total_checks})>"
+        )
+
+
+class ResponseBlob(Base):
+    """Content-addressed, zlib-compressed health check response body."""
+
+    __tablename__ = "response_blobs"
+
+    hash = Column(String(64), primary_key=True)  # SHA-256 of the UTF-8 body
+    data = Column(LargeBinary, nullable=False)
+    size = Column(Integer, nullable=False)  # Uncompressed length in bytes
+    created_at = Column(DateTime, nullable=False, default=datetime.utcnow)
+
+    @property
+    def text(self) -> str:
+        """Decompressed body."""
+        return zlib.decompress(self.data).decode("utf-8")
+
+    def __repr__(self):
+        return f"<ResponseBlob(hash={self.hash[:12]}, size={self.size})>"
@@ -1,8 +1,9 @@
 """Pydantic schemas for validation and API responses."""
 from datetime import datetime
 from typing import Any, Dict, List, Optional
+from urllib.parse import urlsplit
 
-from pydantic import BaseModel, Field, field_validator
+from pydantic import BaseModel, Field, computed_field, field_validator
 
 
 # Host Schemas
@@ -16,6 +17,7 @@ class HostBase(BaseModel):
     schedule_type: str = Field(default="always")
     schedule_config: Optional[str] = None
     grace_period_seconds: int = Field(default=60, gt=0)
+    adaptive_deadline: bool = False  # Use learned heartbeat intervals for overdue checks
     log_analysis_config: Optional[str] = None
 
 
@@ -34,6 +36,7 @@ class HostUpdate(BaseModel):
     schedule_type: Optional[str] = None
     schedule_config: Optional[str] = None
     grace_period_seconds: Optional[int] = Field(None, gt=0)
+    adaptive_deadline: Optional[bool] = None
     log_analysis_config: Optional[str] = None
 
 
@@ -44,6 +47,11 @@ class HostResponse(HostBase):
     heartbeat_url: Optional[str] = None
     last_seen: Optional[datetime] = None
     status: str
+    learned_interval_seconds: Optional[float] = None
+    learned_interval_stddev_seconds: Optional[float] = None
+    interval_samples: int = 0
+    overdue_threshold_seconds: Optional[float] = None
+    next_deadline: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
@@ -155,6 +163,20 @@ class HealthResponse(BaseModel):
     services: Dict[str, str] = Field(default_factory=dict)
 
 
+def _check_endpoint_url(url: Optional[str]) -> Optional[str]:
+    """Require a host (and a valid port, if any) in an endpoint URL."""
+    if url is None:
+        return url
+    try:
+        parts = urlsplit(url if "//" in url else f"//{url}")
+        parts.port  # Raises ValueError for an invalid port
+    except ValueError as e:
+        raise ValueError(f"Invalid endpoint URL: {e}") from e
+    if not parts.hostname:
+        raise ValueError("Endpoint URL has no host")
+    return url
+
+
 class ProjectServiceBase(BaseModel):
     """Base schema for project services."""
 
@@ -167,16 +189,19 @@ class ProjectServiceBase(BaseModel):
     timeout_seconds: int = Field(default=10, gt=0)
     expected_status_code: int = Field(default=200)
     expected_response_pattern: Optional[str] = Field(None, max_length=500)
+    max_response_bytes: Optional[int] = Field(None, gt=0)
     auth_type: Optional[str] = Field(None, pattern="^(bearer|basic|api_key)$")
     auth_config: Optional[str] = None
+    check_config: Optional[str] = None
     alert_threshold: int = Field(default=3, gt=0)
     enabled: bool = True
+    slo_target: Optional[float] = Field(None, gt=0, lt=1)
 
 
 class ProjectServiceCreate(ProjectServiceBase):
     """Schema for creating project services."""
 
-    pass
+    _endpoint_url = field_validator("endpoint_url")(_check_endpoint_url)
 
 
 class ProjectServiceUpdate(BaseModel):
@@ -191,23 +216,37 @@ class ProjectServiceUpdate(BaseModel):
     timeout_seconds: Optional[int] = Field(None, gt=0)
     expected_status_code: Optional[int] = Field(None, ge=100, le=599)
     expected_response_pattern: Optional[str] = Field(None, max_length=500)
+    max_response_bytes: Optional[int] = Field(None, gt=0)
     auth_type: Optional[str] = Field(None)
     auth_config: Optional[str] = None
+    check_config: Optional[str] = None
     alert_threshold: Optional[int] = Field(None, gt=0)
     enabled: Optional[bool] = None
+    slo_target: Optional[float] = Field(None, gt=0, lt=1)
+
+    _endpoint_url = field_validator("endpoint_url")(_check_endpoint_url)
 
 
 class ProjectServiceResponse(ProjectServiceBase):
-    """Schema for project service responses."""
+    """Schema for project service responses (credentials are never returned)."""
 
+    auth_config: Optional[str] = Field(None, exclude=True)
     id: int
     last_checked: Optional[datetime] = None
     status: str
     consecutive_failures: int
     last_error: Optional[str] = None
+    circuit_state: str = "closed"
+    next_check_at: Optional[datetime] = None
     created_at: datetime
     updated_at: datetime
 
+    @computed_field
+    @property
+    def auth_configured(self) -> bool:
+        """Whether credentials are stored for the service."""
+        return bool(self.auth_config)
+
     class Config:
         from_attributes = True
 
@@ -6,7 +6,7 @@ from typing import Any, Dict, List, Optional
 
 from sqlalchemy.orm import Session
 
-from src.database import Alert, Host, get_db_context
+from src.database import Alert, Host, ProjectService, ServiceHealthCheck, get_db_context
 from src.database.schemas import AlertCreate
 from src.utils import get_discord_client
 
@@ -31,23 +31,26 @@ class AlertService:
         host_id: Optional[int] = None,
         details: Optional[Dict[str, Any]] = None,
         send_discord: bool = True,
+        service_id: Optional[int] = None,
     ) -> Optional[Alert]:
         """
         Create an alert and optionally send to Discord.
 
         Args:
-            alert_type: Type of alert ('heartbeat', 'log_analysis', 'internet', 'system')
+            alert_type: Type of alert ('heartbeat', 'log_analysis', 'internet', 'system',
+                'project_service')
             message: Alert message
             severity: Severity level ('info', 'warning', 'critical')
             host_id: Associated host ID (if applicable)
             details: Additional alert details
             send_discord: Whether to send Discord notification
+            service_id: Associated project service ID (if applicable)
 
         Returns:
             Created Alert object or None if deduplicated
         """
         # Check for duplicate recent alerts
-        if self._is_duplicate_alert(host_id, alert_type, message):
+        if self._is_duplicate_alert(host_id, alert_type, message, service_id):
             logger.info(f"Skipping duplicate alert: {alert_type} for host {host_id}")
             return None
 
@@ -55,6 +58,7 @@ class AlertService:
         with get_db_context() as db:
             alert = Alert(
                 host_id=host_id,
+                service_id=service_id,
                 alert_type=alert_type,
                 severity=severity,
                 message=message,
@@ -207,6 +211,68 @@ class AlertService:
             send_discord=True,
         )
 
+    def project_service_failure_alert(
+        self,
+        service: ProjectService,
+        check: ServiceHealthCheck,
+    ) -> Optional[Alert]:
+        """
+        Create alert for a project service that crossed its failure threshold.
+
+        Args:
+            service: Unhealthy project service
+            check: Health check that triggered the alert
+
+        Returns:
+            Created Alert or None
+        """
+        logger.warning(
+            f"Project service unhealthy: {service.project_name}/{service.service_name}"
+        )
+
+        return self.create_alert(
+            alert_type="project_service",
+            message=f"Service '{service.project_name}/{service.service_name}' is unhealthy",
+            severity="critical",
+            service_id=service.id,
+            details={
+                "project_name": service.project_name,
+                "service_name": service.service_name,
+                "endpoint_url": service.endpoint_url,
+                "status": check.status,
+                "status_code": check.status_code,
+                "error": check.error_message,
+                "consecutive_failures": service.consecutive_failures,
+            },
+            send_discord=True,
+        )
+
+    def project_service_recovered_alert(self, service: ProjectService) -> Optional[Alert]:
+        """
+        Create alert for a project service recovery.
+
+        Args:
+            service: Recovered project service
+
+        Returns:
+            Created Alert or None
+        """
+        logger.info(
+            f"Project service recovered: {service.project_name}/{service.service_name}"
+        )
+
+        return self.create_alert(
+            alert_type="project_service",
+            message=f"Service '{service.project_name}/{service.service_name}' recovered",
+            severity="info",
+            service_id=service.id,
+            details={
+                "project_name": service.project_name,
+                "service_name": service.service_name,
+            },
+            send_discord=True,
+        )
+
     def system_alert(self, title: str, message: str, severity: str = "warning") -> Optional[Alert]:
         """
         Create a general system alert.
@@ -232,6 +298,7 @@ class AlertService:
         host_id: Optional[int],
         alert_type: str,
         message: str,
+        service_id: Optional[int] = None,
     ) -> bool:
         """
         Check if similar alert was recently created.
@@ -240,6 +307,7 @@ class AlertService:
             host_id: Host ID (or None)
             alert_type: Alert type
             message: Alert message
+            service_id: Project service ID (or None)
 
         Returns:
             True if duplicate found, False otherwise
@@ -251,6 +319,7 @@ class AlertService:
                 db.query(Alert)
                 .filter(Alert.created_at >= cutoff_time)
                 .filter(Alert.host_id == host_id)
+                .filter(Alert.service_id == service_id)
                 .filter(Alert.alert_type == alert_type)
                 .filter(Alert.message == message)
                 .filter(Alert.acknowledged == False)
@@ -311,6 +380,23 @@ class AlertService:
                         downtime = details.get("downtime_seconds")
                     self.discord.send_internet_up_alert(downtime_duration=downtime)
 
+            elif alert.alert_type == "project_service":
+                if alert.details:
+                    details = json.loads(alert.details)
+                    if "recovered" in alert.message.lower():
+                        self.discord.send_project_service_recovery(
+                            project_name=details.get("project_name", ""),
+                            service_name=details.get("service_name", ""),
+                        )
+                    else:
+                        self.discord.send_project_service_alert(
+                            project_name=details.get("project_name", ""),
+                            service_name=details.get("service_name", ""),
+                            endpoint_url=details.get("endpoint_url", ""),
+                            error=details.get("error"),
+                            consecutive_failures=details.get("consecutive_failures", 0),
+                        )
+
             elif alert.alert_type == "system":
                 self.discord.send_system_alert(
                     title="System Alert",
@@ -0,0 +1,174 @@
+"""Manual log analysis requests, run by the scheduler process.
+
+The API never calls the LLM itself. ``POST /hosts/{host_id}/analyze-logs``
+queues a ``LogAnalysisRequest`` row and waits for its result, and the
+scheduler's ``run_analysis_requests`` job runs queued requests with manual
+priority. Manual and scheduled analyses therefore share one LLM dispatcher:
+one rate-limit budget, one priority queue and one set of metrics.
+"""
+import json
+import logging
+import time
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database import LogAnalysisRequest, get_db_context
+from src.services.llm_dispatcher import PRIORITY_MANUAL
+from src.services.log_analyzer import HostAnalysisResult, LogAnalyzerService
+
+logger = logging.getLogger(__name__)
+
+REQUEST_PENDING = "pending"
+REQUEST_RUNNING = "running"
+REQUEST_DONE = "done"
+
+REQUEST_POLL_SECONDS = 0.5  # How often a waiting API request checks for its result
+REQUEST_WAIT_SECONDS = 120  # How long the API waits before answering 202
+REQUEST_MAX_AGE = timedelta(minutes=10)  # Older pending requests are not started
+REQUEST_EXPIRED = "Request expired before the scheduler picked it up"
+
+
+def queue_analysis(db: Session, host_id: int) -> LogAnalysisRequest:
+    """
+    Queue a manual log analysis of a host.
+
+    Args:
+        db: Database session (committed here, so the scheduler sees the request)
+        host_id: Host database id
+
+    Returns:
+        The pending request
+    """
+    request = LogAnalysisRequest(host_id=host_id, status=REQUEST_PENDING)
+    db.add(request)
+    db.commit()
+    return request
+
+
+def load_result(db: Session, request_id: int) -> Optional[Dict[str, Any]]:
+    """
+    Return a finished request's HostAnalysisResult as a dictionary.
+
+    Args:
+        db: Database session
+        request_id: LogAnalysisRequest id
+
+    Returns:
+        The result, or None while the request is pending or running
+    """
+    request = db.get(LogAnalysisRequest, request_id)
+    if request is None or request.status != REQUEST_DONE:
+        return None
+    return json.loads(request.result)
+
+
+def wait_for_result(request_id: int, timeout: float) -> Optional[Dict[str, Any]]:
+    """
+    Wait for the scheduler to finish a request.
+
+    Args:
+        request_id: LogAnalysisRequest id
+        timeout: Seconds to wait
+
+    Returns:
+        The result, or None if it is not done within ``timeout``
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with get_db_context() as db:
+            result = load_result(db, request_id)
+        if result is not None or time.monotonic() >= deadline:
+            return result
+        time.sleep(REQUEST_POLL_SECONDS)
+
+
+def _claim_requests(db: Session, now: datetime) -> List[LogAnalysisRequest]:
+    """Mark pending requests running, expiring those nobody waits for anymore."""
+    claimed = []
+    for request in (
+        db.query(LogAnalysisRequest)
+        .filter(LogAnalysisRequest.status == REQUEST_PENDING)
+        .order_by(LogAnalysisRequest.id)
+        .all()
+    ):
+        expired = now - request.created_at > REQUEST_MAX_AGE
+        # Conditional update: several job runs never claim the same request
+        updated = (
+            db.query(LogAnalysisRequest)
+            .filter(LogAnalysisRequest.id == request.id)
+            .filter(LogAnalysisRequest.status == REQUEST_PENDING)
+            .update(
+                {"status": REQUEST_DONE if expired else REQUEST_RUNNING},
+                synchronize_session=False,
+            )
+        )
+        if not updated:
+            continue
+        if expired:
+            expired_result = HostAnalysisResult(
+                host_id=request.host_id, host_name="", error=REQUEST_EXPIRED
+            )
+            _finish(db, request.id, expired_result, now)
+        else:
+            claimed.append(request)
+    db.commit()
+    return claimed
+
+
+def _finish(db: Session, request_id: int, result: HostAnalysisResult, now: datetime) -> None:
+    db.query(LogAnalysisRequest).filter(LogAnalysisRequest.id == request_id).update(
+        {
+            "status": REQUEST_DONE,
+            "result": json.dumps(result.to_dict()),
+            "finished_at": now,
+        },
+        synchronize_session=False,
+    )
+
+
+def run_analysis_requests(analyzer: Optional[LogAnalyzerService] = None) -> int:
+    """
+    Run all pending manual analysis requests (scheduler job).
+
+    Args:
+        analyzer: Service to run them with (default: a new LogAnalyzerService)
+
+    Returns:
+        Number of requests run
+    """
+    with get_db_context() as db:
+        claimed = [
+            (request.id, request.host_id) for request in _claim_requests(db, datetime.utcnow())
+        ]
+    if not claimed:
+        return 0
+
+    host_ids = sorted({host_id for _, host_id in claimed})
+    logger.info(f"Running {len(claimed)} manual log analysis requests")
+    try:
+        results = {
+            result.host_id: result
+            for result in (analyzer or LogAnalyzerService()).analyze_hosts(
+                host_ids, priority=PRIORITY_MANUAL
+            )
+        }
+    except Exception as e:
+        logger.error(f"Error running manual log analysis: {e}")
+        results = {
+            host_id: HostAnalysisResult(
+                host_id=host_id, host_name="", status="failed", error=str(e)
+            )
+            for host_id in host_ids
+        }
+
+    with get_db_context() as db:
+        now = datetime.utcnow()
+        for request_id, host_id in claimed:
+            result = results.get(host_id) or HostAnalysisResult(
+                host_id=host_id, host_name="", error="Log analysis is not configured for this host"
+            )
+            _finish(db, request_id, result, now)
+
+    return len(claimed)
@@ -0,0 +1,185 @@
+"""Non-HTTP check executors for project services.
+
+A service's check type comes from ``endpoint_type`` or, failing that, the
+scheme of ``endpoint_url``:
+
+- ``tcp://host:port``: time to open a TCP connection
+- ``tls://host[:port]``: TCP connect plus TLS handshake; fails when the
+  certificate does not verify or expires within ``min_days_valid`` days
+- ``dns://hostname``: time to resolve the name via the system resolver;
+  optionally requires one of the ``expected_addresses``
+
+Per-type options are read from the service's ``check_config`` JSON. Executors
+fill in a ``PollResult`` and run on the poller's event loop, under the same
+concurrency limit and ``timeout_seconds`` bound as HTTP checks.
+"""
+from __future__ import annotations
+
+import asyncio
+import json
+import logging
+import socket
+import ssl
+import time
+from datetime import datetime
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+if TYPE_CHECKING:
+    from src.services.project_poller import PollResult, PollTarget
+
+logger = logging.getLogger(__name__)
+
+HTTP_CHECK_TYPES = ("http", "https", "get", "post")
+DEFAULT_TLS_PORT = 443
+DEFAULT_MIN_DAYS_VALID = 14
+
+Executor = Callable[["PollTarget", "PollResult"], Awaitable[None]]
+
+_EXECUTORS: Dict[str, Executor] = {}
+
+
+def register_executor(check_type: str) -> Callable[[Executor], Executor]:
+    """Decorator registering an executor for a check type."""
+
+    def decorator(func: Executor) -> Executor:
+        _EXECUTORS[check_type] = func
+        return func
+
+    return decorator
+
+
+def check_type(endpoint_type: Optional[str], endpoint_url: str) -> str:
+    """
+    Determine the check type of a service.
+
+    Args:
+        endpoint_type: Configured endpoint type
+        endpoint_url: Configured endpoint URL
+
+    Returns:
+        'http' for HTTP checks, otherwise the executor name
+    """
+    kind = (endpoint_type or "http").lower()
+    if kind in HTTP_CHECK_TYPES:
+        try:
+            scheme = urlsplit(endpoint_url).scheme.lower()
+        except ValueError:  # Malformed URL: the HTTP check reports it
+            return "http"
+        if scheme in _EXECUTORS:
+            return scheme
+        return "http"
+    return kind
+
+
+def get_executor(kind: str) -> Optional[Executor]:
+    """Return the executor for a non-HTTP check type, if one is registered."""
+    return _EXECUTORS.get(kind)
+
+
+def parse_check_config(raw: Optional[str]) -> Dict[str, Any]:
+    """Parse a service's check_config JSON (invalid or empty -> {})."""
+    if not raw:
+        return {}
+    try:
+        config = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning("Ignoring invalid check_config: %s", raw[:100])
+        return {}
+    return config if isinstance(config, dict) else {}
+
+
+def split_host_port(endpoint_url: str, default_port: Optional[int] = None) -> Tuple[str, Optional[int]]:
+    """
+    Extract host and port from 'scheme://host:port' or bare 'host:port'.
+
+    Raises:
+        ValueError: If the host is missing or the port is invalid
+    """
+    parts = urlsplit(endpoint_url if "//" in endpoint_url else f"//{endpoint_url}")
+    if not parts.hostname:
+        raise ValueError(f"No host in endpoint URL: {endpoint_url}")
+    return parts.hostname, parts.port or default_port
+
+
+async def _close(writer: asyncio.StreamWriter) -> None:
+    writer.close()
+    try:
+        await writer.wait_closed()
+    except (OSError, ssl.SSLError):
+        pass
+
+
+@register_executor("tcp")
+async def check_tcp(target: PollTarget, result: PollResult) -> None:
+    """Open (and immediately close) a TCP connection."""
+    host, port = split_host_port(target.endpoint_url)
+    if port is None:
+        raise ValueError("TCP checks need a port (tcp://host:port)")
+
+    start = time.monotonic()
+    _, writer = await asyncio.open_connection(host, port)
+    result.response_time_ms = int((time.monotonic() - start) * 1000)
+    await _close(writer)
+    result.status = "success"
+
+
+@register_executor("tls")
+async def check_tls(target: PollTarget, result: PollResult) -> None:
+    """Complete a TLS handshake and check the certificate's remaining validity."""
+    host, port = split_host_port(target.endpoint_url, DEFAULT_TLS_PORT)
+    config = parse_check_config(target.check_config)
+    server_name = config.get("server_name") or host
+    min_days = int(config.get("min_days_valid", DEFAULT_MIN_DAYS_VALID))
+
+    start = time.monotonic()
+    _, writer = await asyncio.open_connection(
+        host, port, ssl=ssl.create_default_context(), server_hostname=server_name
+    )
+    result.response_time_ms = int((time.monotonic() - start) * 1000)
+    try:
+        ssl_object = writer.get_extra_info("ssl_object")
+        cert = ssl_object.getpeercert() if ssl_object else None
+        protocol = ssl_object.version() if ssl_object else None
+    finally:
+        await _close(writer)
+
+    if not cert or "notAfter" not in cert:
+        result.error_message = "No peer certificate"
+        return
+
+    expires = datetime.utcfromtimestamp(ssl.cert_time_to_seconds(cert["notAfter"]))
+    days_left = (expires - datetime.utcnow()).total_seconds() / 86400
+    result.response_body = json.dumps(
+        {
+            "days_until_expiry": int(days_left),
+            "not_after": expires.isoformat(),
+            "protocol": protocol,
+        }
+    )
+    if days_left < min_days:
+        result.error_message = f"Certificate expires in {int(days_left)} days ({expires:%Y-%m-%d})"
+    else:
+        result.status = "success"
+
+
+@register_executor("dns")
+async def check_dns(target: PollTarget, result: PollResult) -> None:
+    """Resolve a hostname and optionally verify the returned addresses."""
+    host, _ = split_host_port(target.endpoint_url)
+    config = parse_check_config(target.check_config)
+    expected = config.get("expected_addresses") or []
+    if isinstance(expected, str):
+        expected = [expected]
+
+    loop = asyncio.get_running_loop()
+    start = time.monotonic()
+    infos = await loop.getaddrinfo(host, None, type=socket.SOCK_STREAM)
+    result.response_time_ms = int((time.monotonic() - start) * 1000)
+
+    addresses = sorted({info[4][0] for info in infos})
+    result.response_body = json.dumps({"addresses": addresses})
+    if expected and not set(expected) & set(addresses):
+        result.error_message = f"Resolved {', '.join(addresses)}; expected {', '.join(expected)}"
+    else:
+        result.status = "success"
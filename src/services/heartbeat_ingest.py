@@ -0,0 +1,204 @@
+"""Shared heartbeat ingest pipeline used by the HTTP and UDP receivers."""
+import logging
+from collections import Counter
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database import Heartbeat, Host
+from src.services.metrics_store import get_metrics_store
+from src.utils.negative_cache import NegativeCache
+from src.utils.rate_limit import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+
+def record_heartbeat(
+    db: Session,
+    host: Host,
+    source_ip: Optional[str] = None,
+    timestamp: Optional[datetime] = None,
+    metrics: Optional[Dict[str, float]] = None,
+) -> Heartbeat:
+    """
+    Record a heartbeat for an authenticated host.
+
+    Adds the heartbeat row and updates the host's ``last_seen`` and status.
+    The caller owns the transaction and is responsible for committing, so
+    several heartbeats can be recorded in a single commit.
+
+    Args:
+        db: Database session
+        host: Host the heartbeat belongs to (already authenticated)
+        source_ip: Address the heartbeat was received from
+        timestamp: Receive time (defaults to now, UTC)
+        metrics: Sanitized host metrics to append to the time-series store
+
+    Returns:
+        The new (uncommitted) Heartbeat object
+    """
+    timestamp = timestamp or datetime.utcnow()
+
+    heartbeat = Heartbeat(
+        host_id=host.id,
+        timestamp=timestamp,
+        source_ip=source_ip,
+    )
+    db.add(heartbeat)
+
+    # Never move last_seen backwards if batched heartbeats arrive out of order
+    if host.last_seen is None or timestamp > host.last_seen:
+        host.observe_heartbeat(timestamp)
+        host.last_seen = timestamp
+
+    # Update status to 'up' if it was down
+    if host.status != "up":
+        logger.info(f"Host {host.name} status changed: {host.status} -> up")
+        host.status = "up"
+
+    if metrics:
+        get_metrics_store().append(db, host.id, metrics, timestamp)
+
+    return heartbeat
+
+
+class HeartbeatGuard:
+    """
+    In-memory front line for the HTTP heartbeat endpoint.
+
+    Misconfigured agents and scanners tend to repeat the same bad request in a
+    tight loop. Unknown host IDs are remembered in a bounded negative cache and
+    every rejection is charged against token buckets keyed by source IP and by
+    (source IP, host_id), so repeat offenders are answered from memory without
+    a database query or a warning log line.
+
+    Before authentication only the (source IP, host_id) bucket is checked, so
+    a bad agent behind a shared address (NAT, reverse proxy) cannot throttle
+    valid heartbeats of other hosts. The per-IP bucket applies to every
+    unknown host ID, cached or just looked up, so a scanner cycling through
+    random host IDs is throttled too.
+    """
+
+    def __init__(
+        self,
+        negative_ttl_seconds: float = 60.0,
+        negative_max_entries: int = 10000,
+        reject_rate_per_second: float = 0.2,
+        reject_burst: float = 10.0,
+    ):
+        """
+        Initialize heartbeat guard.
+
+        Args:
+            negative_ttl_seconds: How long an unknown host_id is remembered
+            negative_max_entries: Maximum number of remembered unknown host_ids
+            reject_rate_per_second: Rejections per second allowed before throttling
+            reject_burst: Rejections allowed in a burst before throttling
+        """
+        self.unknown_hosts = NegativeCache(
+            ttl_seconds=negative_ttl_seconds,
+            max_entries=negative_max_entries,
+        )
+        self.reject_limiter = TokenBucketLimiter(
+            rate=reject_rate_per_second,
+            burst=reject_burst,
+        )
+        self.counters: Counter = Counter()
+
+    @staticmethod
+    def _limiter_keys(host_id: str, source_ip: Optional[str]):
+        source = source_ip or "unknown"
+        return source, f"{source}/{host_id}"
+
+    def check(self, host_id: str, source_ip: Optional[str]) -> Optional[str]:
+        """
+        Decide whether a request can be rejected from memory.
+
+        Args:
+            host_id: Requested host identifier
+            source_ip: Client address
+
+        Returns:
+            Rejection reason ('rate_limited' or 'unknown_host') or None if the
+            request should proceed to the database
+        """
+        source_key, pair_key = self._limiter_keys(host_id, source_ip)
+        if not self.reject_limiter.has_tokens(pair_key):
+            self.counters["rate_limited"] += 1
+            return "rate_limited"
+
+        if host_id in self.unknown_hosts:
+            if not self.reject_limiter.has_tokens(source_key):
+                self.counters["rate_limited"] += 1
+                return "rate_limited"
+            self.reject(host_id, source_ip, "unknown_host_cached")
+            return "unknown_host"
+
+        return None
+
+    def reject_unknown(self, host_id: str, source_ip: Optional[str]) -> str:
+        """
+        Record a heartbeat for a host_id that is not in the database.
+
+        Args:
+            host_id: Requested host identifier
+            source_ip: Client address
+
+        Returns:
+            'rate_limited' if the source already exhausted its rejections,
+            otherwise 'unknown_host'
+        """
+        source_key, _ = self._limiter_keys(host_id, source_ip)
+        if not self.reject_limiter.has_tokens(source_key):
+            self.counters["rate_limited"] += 1
+            self._charge(host_id, source_ip)
+            self.unknown_hosts.add(host_id)
+            return "rate_limited"
+
+        self.reject(host_id, source_ip, "unknown_host")
+        return "unknown_host"
+
+    def _charge(self, host_id: str, source_ip: Optional[str]) -> None:
+        for key in self._limiter_keys(host_id, source_ip):
+            self.reject_limiter.consume(key)
+
+    def reject(self, host_id: str, source_ip: Optional[str], reason: str) -> None:
+        """
+        Record a rejected heartbeat and charge it to the offender's buckets.
+
+        Args:
+            host_id: Requested host identifier
+            source_ip: Client address
+            reason: 'unknown_host', 'unknown_host_cached' or 'invalid_token'
+        """
+        self.counters[reason] += 1
+        self._charge(host_id, source_ip)
+
+        if reason == "unknown_host":
+            self.unknown_hosts.add(host_id)
+
+    def forget_host(self, host_id: str) -> None:
+        """Drop a host_id from the negative cache (e.g. after it is created)."""
+        self.unknown_hosts.discard(host_id)
+
+    def stats(self) -> Dict[str, Any]:
+        """Return rejection counters and cache sizes."""
+        return {
+            "rejections": dict(self.counters),
+            "total_rejections": sum(self.counters.values()),
+            "negative_cache_size": len(self.unknown_hosts),
+            "rate_limiter": self.reject_limiter.stats(),
+        }
+
+
+# Global guard instance shared by the API process
+_heartbeat_guard: Optional[HeartbeatGuard] = None
+
+
+def get_heartbeat_guard() -> HeartbeatGuard:
+    """Get or create the process-wide HeartbeatGuard."""
+    global _heartbeat_guard
+    if _heartbeat_guard is None:
+        _heartbeat_guard = HeartbeatGuard()
+    return _heartbeat_guard
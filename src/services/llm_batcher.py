@@ -0,0 +1,225 @@
+"""Cross-host batching of LLM log analyses.
+
+Hosts of a homogeneous fleet usually share one long ``analysis_prompt``.
+Instead of one request per host, the batcher groups concurrent analyses with
+the same model and prompt into one request with a section per host (see
+``LLMClient.analyze_batch``), so the shared instructions are sent, and with
+prompt caching billed, once per batch.
+
+Host workers call ``analyze`` as usual. The first host of a group waits up
+to ``window_seconds`` for others to join, then sends the batch for everyone;
+a group is also sent as soon as it reaches ``max_hosts`` (at most as many
+hosts as the model's response token limit can answer) or its token budget.
+Hosts whose logs alone exceed the budget, hosts missing from a batched
+response and the hosts of a failed batched request are analyzed on their own.
+"""
+import logging
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.config import get_settings
+from src.services.llm_dispatcher import PRIORITY_NORMAL
+from src.utils import get_llm_client
+from src.utils.llm_client import LLMClient
+from src.utils.log_chunking import estimate_tokens
+
+logger = logging.getLogger(__name__)
+
+
+class _Batch:
+    """Hosts waiting to be analyzed in one request."""
+
+    def __init__(self, model: str, prompt: str, max_hosts: int):
+        self.model = model
+        self.prompt = prompt
+        self.max_hosts = max_hosts
+        self.sections: List[Tuple[str, str]] = []
+        self.tokens = 0
+        self.priority = PRIORITY_NORMAL
+        self.closed = False
+        self.done = threading.Event()
+        self.results: Dict[str, Dict[str, Any]] = {}
+
+
+class LLMBatcher:
+    """Coalesces concurrent analyses that share a model and prompt."""
+
+    def __init__(
+        self,
+        client: LLMClient,
+        max_hosts: int = 10,
+        window_seconds: float = 2.0,
+        max_tokens: Optional[int] = None,
+    ):
+        """
+        Initialize batcher.
+
+        Args:
+            client: LLM client that sends the requests
+            max_hosts: Hosts per request (lowered per model to what its
+                response token limit can answer, see ``LLMClient.batch_host_limit``)
+            window_seconds: How long the first host of a batch waits for others
+            max_tokens: Estimated log tokens per request (default: the client's chunk size)
+        """
+        self.client = client
+        self.max_hosts = max(max_hosts, 1)
+        self.window_seconds = window_seconds
+        self.max_tokens = max_tokens or client.chunk_tokens or None
+        self._cond = threading.Condition()
+        self._open: Dict[Tuple[str, str], _Batch] = {}
+        self._counts = {"batches": 0, "hosts": 0, "single": 0}
+
+    def analyze(
+        self,
+        name: str,
+        logs: str,
+        prompt: str,
+        model: Optional[str] = None,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Dict[str, Any]:
+        """
+        Analyze one host's logs, batched with other hosts using the same prompt.
+
+        Blocks until the batch has been answered.
+
+        Args:
+            name: Host name (labels the host's section)
+            logs: Log content
+            prompt: Analysis prompt
+            model: Model to use (default: the client's default model)
+            priority: Dispatcher priority (a batch runs at its most urgent host's)
+
+        Returns:
+            Result dictionary as returned by ``LLMClient.analyze_logs``
+        """
+        model = model or self.client.default_model
+        tokens = estimate_tokens(logs)
+        if self.max_tokens and tokens > self.max_tokens:
+            return self._analyze_single(logs, prompt, model, priority)
+
+        key = (model, prompt)
+        with self._cond:
+            batch = self._open.get(key)
+            if batch is not None and self.max_tokens and batch.tokens + tokens > self.max_tokens:
+                self._close(key, batch)
+                batch = None
+            leader = batch is None
+            if leader:
+                max_hosts = min(self.max_hosts, self.client.batch_host_limit(model))
+                batch = self._open[key] = _Batch(model, prompt, max_hosts)
+
+            label, index = name, 1
+            names = {section_name for section_name, _ in batch.sections}
+            while label in names:
+                index += 1
+                label = f"{name} #{index}"
+            batch.sections.append((label, logs))
+            batch.tokens += tokens
+            batch.priority = min(batch.priority, priority)
+            if len(batch.sections) >= batch.max_hosts:
+                self._close(key, batch)
+
+            if leader:
+                window_end = time.monotonic() + self.window_seconds
+                while not batch.closed:
+                    remaining = window_end - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._cond.wait(remaining)
+                self._close(key, batch)
+
+        if leader:
+            self._send(batch)
+        else:
+            batch.done.wait()
+
+        result = batch.results.get(label)
+        if result is None:
+            logger.info(f"No batched result for {name}, analyzing it on its own")
+            return self._analyze_single(logs, prompt, model, priority)
+        return result
+
+    def _close(self, key: Tuple[str, str], batch: _Batch) -> None:
+        """Stop a batch from accepting hosts (caller holds the lock)."""
+        batch.closed = True
+        if self._open.get(key) is batch:
+            del self._open[key]
+        self._cond.notify_all()
+
+    def _send(self, batch: _Batch) -> None:
+        """Analyze a closed batch and publish the results to its hosts."""
+        try:
+            if len(batch.sections) == 1:
+                (name, logs), = batch.sections
+                batch.results[name] = self._analyze_single(
+                    logs, batch.prompt, batch.model, batch.priority
+                )
+                return
+            logger.info(f"Analyzing {len(batch.sections)} hosts in one request with {batch.model}")
+            batch.results = self.client.analyze_batch(
+                batch.sections, batch.prompt, model=batch.model, priority=batch.priority
+            )
+            with self._cond:
+                self._counts["batches"] += 1
+                self._counts["hosts"] += len(batch.sections)
+        except Exception as e:
+            # Every host falls back to a request of its own
+            logger.error(f"Batched analysis failed: {e}")
+            batch.results = {}
+        finally:
+            batch.done.set()
+
+    def _analyze_single(
+        self, logs: str, prompt: str, model: str, priority: int
+    ) -> Dict[str, Any]:
+        with self._cond:
+            self._counts["single"] += 1
+        return self.client.analyze_logs(logs=logs, prompt=prompt, model=model, priority=priority)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return batching counts since startup.
+
+        Returns:
+            Batched requests sent, hosts they covered, average hosts per batch
+            and hosts analyzed on their own
+        """
+        with self._cond:
+            counts = dict(self._counts)
+        return {
+            "max_hosts": self.max_hosts,
+            "window_seconds": self.window_seconds,
+            "batches": counts["batches"],
+            "batched_hosts": counts["hosts"],
+            "avg_hosts_per_batch": (
+                round(counts["hosts"] / counts["batches"], 2) if counts["batches"] else None
+            ),
+            "single_requests": counts["single"],
+        }
+
+
+# Global batcher instance
+_llm_batcher: Optional[LLMBatcher] = None
+_llm_batcher_lock = threading.Lock()
+
+
+def get_llm_batcher() -> Optional[LLMBatcher]:
+    """
+    Get or create the process-wide LLM batcher.
+
+    Returns:
+        LLMBatcher, or None if LLM_BATCH_MAX_HOSTS is below 2
+    """
+    global _llm_batcher
+    settings = get_settings()
+    if settings.llm_batch_max_hosts < 2:
+        return None
+    with _llm_batcher_lock:
+        if _llm_batcher is None:
+            _llm_batcher = LLMBatcher(
+                get_llm_client(),
+                max_hosts=settings.llm_batch_max_hosts,
+                window_seconds=settings.llm_batch_window_seconds,
+            )
+    return _llm_batcher
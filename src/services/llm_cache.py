@@ -0,0 +1,241 @@
+"""Persistent cache of LLM responses.
+
+Responses are keyed by a SHA-256 over the model, generation parameters, the
+analysis prompt and the normalized log content. Normalization drops
+timestamps, surrounding whitespace and blank lines, so a quiet host whose
+``tail -n 1000`` only differs in timestamps hits the cache.
+
+Entries expire after a TTL and the table is bounded to ``max_entries``,
+evicting the least recently used entries first. Cache failures are logged
+and treated as misses; they never fail an analysis.
+"""
+import hashlib
+import logging
+import re
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Any, Dict, Optional
+
+from sqlalchemy import func
+from sqlalchemy.exc import SQLAlchemyError
+
+from src.config import get_settings
+from src.database import LLMCacheEntry, get_db_context
+
+logger = logging.getLogger(__name__)
+
+_TIMESTAMP_RE = re.compile(
+    r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"
+    r"|\b(?:Jan|Feb|Mar|Apr|May|Jun|Jul|Aug|Sep|Oct|Nov|Dec) [ \d]\d \d{2}:\d{2}:\d{2}\b"
+    r"|\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b"
+)
+
+
+def normalize_logs(logs: str) -> str:
+    """Strip timestamps, extra whitespace and blank lines from log text."""
+    lines = (" ".join(_TIMESTAMP_RE.sub("", line).split()) for line in logs.splitlines())
+    return "\n".join(line for line in lines if line)
+
+
+def cache_key(model: str, prompt: str, logs: str, max_tokens: int, temperature: float) -> str:
+    """
+    Compute the cache key of an analysis request.
+
+    Args:
+        model: Model name
+        prompt: Analysis prompt (instructions)
+        logs: Log content (normalized here)
+        max_tokens: Maximum tokens in response
+        temperature: Sampling temperature
+
+    Returns:
+        SHA-256 hex digest
+    """
+    digest = hashlib.sha256()
+    for part in (model, str(max_tokens), repr(float(temperature)), prompt, normalize_logs(logs)):
+        digest.update(part.encode("utf-8"))
+        digest.update(b"\0")
+    return digest.hexdigest()
+
+
+@dataclass
+class CachedResponse:
+    """A cached LLM response."""
+
+    model: str
+    response: str
+    prompt_tokens: int
+    completion_tokens: int
+
+
+class LLMResponseCache:
+    """SQLite-backed LLM response cache with TTL and LRU eviction."""
+
+    def __init__(self, ttl_seconds: int = 86400, max_entries: int = 5000):
+        """
+        Initialize cache.
+
+        Args:
+            ttl_seconds: Age after which an entry is no longer used
+            max_entries: Maximum stored entries
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._hits = 0
+        self._misses = 0
+        self._tokens_saved = 0
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        """
+        Look up a response and mark it as used.
+
+        Args:
+            key: Cache key from ``cache_key``
+
+        Returns:
+            CachedResponse, or None on a miss (including expired entries)
+        """
+        cached = None
+        try:
+            with get_db_context() as db:
+                entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == key).first()
+                if entry is not None and entry.created_at < self._expiry_cutoff():
+                    db.delete(entry)
+                    entry = None
+                if entry is not None:
+                    entry.hits = (entry.hits or 0) + 1
+                    entry.last_used_at = datetime.utcnow()
+                    cached = CachedResponse(
+                        model=entry.model,
+                        response=entry.response,
+                        prompt_tokens=entry.prompt_tokens or 0,
+                        completion_tokens=entry.completion_tokens or 0,
+                    )
+        except SQLAlchemyError as e:
+            logger.warning(f"LLM cache lookup failed: {e}")
+            cached = None
+
+        with self._lock:
+            if cached is None:
+                self._misses += 1
+            else:
+                self._hits += 1
+                self._tokens_saved += cached.prompt_tokens + cached.completion_tokens
+        return cached
+
+    def put(
+        self,
+        key: str,
+        model: str,
+        response: str,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+    ) -> None:
+        """
+        Store a response, then drop expired and least recently used entries.
+
+        Args:
+            key: Cache key from ``cache_key``
+            model: Model that produced the response
+            response: Response text
+            prompt_tokens: Prompt tokens the request cost
+            completion_tokens: Completion tokens the request cost
+        """
+        now = datetime.utcnow()
+        try:
+            with get_db_context() as db:
+                entry = db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == key).first()
+                if entry is None:
+                    entry = LLMCacheEntry(cache_key=key, hits=0)
+                    db.add(entry)
+                entry.model = model
+                entry.response = response
+                entry.prompt_tokens = prompt_tokens
+                entry.completion_tokens = completion_tokens
+                entry.created_at = entry.last_used_at = now
+                db.flush()
+
+                db.query(LLMCacheEntry).filter(
+                    LLMCacheEntry.created_at < self._expiry_cutoff()
+                ).delete(synchronize_session=False)
+
+                excess = db.query(func.count(LLMCacheEntry.id)).scalar() - self.max_entries
+                if excess > 0:
+                    stale = (
+                        db.query(LLMCacheEntry.id)
+                        .order_by(LLMCacheEntry.last_used_at)
+                        .limit(excess)
+                        .subquery()
+                    )
+                    db.query(LLMCacheEntry).filter(LLMCacheEntry.id.in_(stale.select())).delete(
+                        synchronize_session=False
+                    )
+                    logger.debug(f"Evicted {excess} LLM cache entries")
+        except SQLAlchemyError as e:
+            logger.warning(f"LLM cache store failed: {e}")
+
+    def _expiry_cutoff(self) -> datetime:
+        return datetime.utcnow() - timedelta(seconds=self.ttl_seconds)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return hit rate and savings since startup, plus stored totals.
+
+        Returns:
+            Dictionary of cache statistics
+        """
+        with self._lock:
+            hits, misses, tokens_saved = self._hits, self._misses, self._tokens_saved
+
+        with get_db_context() as db:
+            entries, stored_hits, stored_tokens_saved = db.query(
+                func.count(LLMCacheEntry.id),
+                func.coalesce(func.sum(LLMCacheEntry.hits), 0),
+                func.coalesce(
+                    func.sum(
+                        LLMCacheEntry.hits
+                        * (LLMCacheEntry.prompt_tokens + LLMCacheEntry.completion_tokens)
+                    ),
+                    0,
+                ),
+            ).one()
+
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": round(hits / lookups, 4) if lookups else None,
+            "tokens_saved": tokens_saved,
+            "entries": entries,
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl_seconds,
+            "stored_hits": stored_hits,
+            "stored_tokens_saved": stored_tokens_saved,
+        }
+
+
+# Global cache instance
+_llm_cache: Optional[LLMResponseCache] = None
+_llm_cache_lock = threading.Lock()
+
+
+def get_llm_cache() -> Optional[LLMResponseCache]:
+    """
+    Get or create the process-wide LLM response cache.
+
+    Returns:
+        LLMResponseCache, or None if LLM_CACHE_ENABLED is false
+    """
+    global _llm_cache
+    settings = get_settings()
+    if not settings.llm_cache_enabled:
+        return None
+    with _llm_cache_lock:
+        if _llm_cache is None:
+            _llm_cache = LLMResponseCache(
+                ttl_seconds=settings.llm_cache_ttl_seconds,
+                max_entries=settings.llm_cache_max_entries,
+            )
+    return _llm_cache
@@ -0,0 +1,370 @@
+"""Process-wide dispatch of LLM API requests.
+
+All LLM calls go through one dispatcher, which:
+
+- rate limits with two token buckets, one for requests and one for
+  (estimated) tokens per minute, so a burst of hosts cannot exceed the
+  provider's limits
+- admits waiting requests strictly by priority (manual triggers, then
+  critical hosts, then everything else), FIFO within a priority
+- bounds the number of requests in flight
+- retries 429, 5xx and connection errors with exponential backoff and jitter,
+  honouring ``Retry-After``
+- keeps per-model request, token, cost and latency counters
+
+After a response, the token bucket is corrected from the reported usage, so
+estimates that were too low slow down later requests.
+
+Only the scheduler process calls the LLM: manual runs are queued to it by
+the API (``src/services/analysis_requests.py``), so its dispatcher enforces
+the whole LLM_REQUESTS_PER_MINUTE, LLM_TOKENS_PER_MINUTE and
+LLM_MAX_CONCURRENCY budget and orders manual runs ahead of scheduled ones.
+"""
+import heapq
+import itertools
+import json
+import logging
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import requests
+
+from src.config import get_settings
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_MANUAL = 0
+PRIORITY_CRITICAL = 10
+PRIORITY_NORMAL = 20
+
+RETRY_STATUS_CODES = {429, 500, 502, 503, 504}
+
+
+class MinuteRateBucket:
+    """Token bucket refilled continuously at a per-minute rate."""
+
+    def __init__(self, per_minute: float, capacity: Optional[float] = None):
+        """
+        Initialize limiter.
+
+        Args:
+            per_minute: Refill rate (0 = unlimited)
+            capacity: Burst size (default: one minute's worth)
+        """
+        self.per_minute = per_minute
+        self.capacity = capacity or per_minute
+        self._level = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._level = min(self.capacity, self._level + (now - self._updated) * self.per_minute / 60)
+        self._updated = now
+
+    def wait_time(self, amount: float = 1) -> float:
+        """Seconds until ``amount`` can be consumed (0 if it can now)."""
+        if not self.per_minute:
+            return 0.0
+        with self._lock:
+            self._refill()
+            missing = min(amount, self.capacity) - self._level
+            return max(missing, 0) * 60 / self.per_minute
+
+    def consume(self, amount: float = 1) -> None:
+        """Take ``amount`` from the bucket (the level may go negative)."""
+        if not self.per_minute:
+            return
+        with self._lock:
+            self._refill()
+            self._level -= min(amount, self.capacity)
+
+    def adjust(self, amount: float) -> None:
+        """Take (positive) or return (negative) an estimate correction."""
+        if not self.per_minute:
+            return
+        with self._lock:
+            self._refill()
+            self._level = min(self.capacity, self._level - amount)
+
+
+@dataclass
+class ModelStats:
+    """Request accounting for one model."""
+
+    requests: int = 0
+    failures: int = 0
+    retries: int = 0
+    rate_limited: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    cached_prompt_tokens: int = 0
+    cost_usd: float = 0.0
+    latency_total_seconds: float = 0.0
+    latency_max_seconds: float = 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary, adding average latency."""
+        data = asdict(self)
+        data["cost_usd"] = round(self.cost_usd, 6)
+        data["latency_total_seconds"] = round(self.latency_total_seconds, 3)
+        data["latency_max_seconds"] = round(self.latency_max_seconds, 3)
+        data["latency_avg_seconds"] = (
+            round(self.latency_total_seconds / self.requests, 3) if self.requests else None
+        )
+        return data
+
+
+def parse_pricing(raw: Optional[str]) -> Dict[str, Tuple[float, float]]:
+    """
+    Parse LLM_PRICING: JSON {model: [input USD per 1M tokens, output USD per 1M tokens]}.
+
+    Invalid entries are ignored.
+    """
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning(f"Ignoring invalid LLM_PRICING: {raw[:100]}")
+        return {}
+    pricing = {}
+    for model, prices in (data.items() if isinstance(data, dict) else []):
+        try:
+            pricing[model] = (float(prices[0]), float(prices[1]))
+        except (TypeError, ValueError, IndexError):
+            logger.warning(f"Ignoring invalid LLM_PRICING entry for {model}")
+    return pricing
+
+
+class LLMDispatcher:
+    """Shared rate-limited, prioritized executor for LLM API requests."""
+
+    def __init__(
+        self,
+        requests_per_minute: float = 50,
+        tokens_per_minute: float = 100000,
+        max_concurrency: int = 8,
+        max_retries: int = 4,
+        backoff_base: float = 2.0,
+        backoff_max: float = 60.0,
+        pricing: Optional[Dict[str, Tuple[float, float]]] = None,
+    ):
+        """
+        Initialize dispatcher.
+
+        Args:
+            requests_per_minute: Request rate limit (0 = unlimited)
+            tokens_per_minute: Token rate limit (0 = unlimited)
+            max_concurrency: Maximum requests in flight
+            max_retries: Retries after a retryable failure
+            backoff_base: First retry delay in seconds (doubles per retry)
+            backoff_max: Longest retry delay in seconds
+            pricing: {model: (input, output) USD per 1M tokens} for cost accounting
+        """
+        self.request_limiter = MinuteRateBucket(requests_per_minute)
+        self.token_limiter = MinuteRateBucket(tokens_per_minute)
+        self.max_concurrency = max(max_concurrency, 1)
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.pricing = pricing or {}
+        self._cond = threading.Condition()
+        self._queue: List[Tuple[int, int]] = []  # Heap of (priority, sequence)
+        self._sequence = itertools.count()
+        self._in_flight = 0
+        self._stats: Dict[str, ModelStats] = {}
+
+    def execute(
+        self,
+        send: Callable[[], Any],
+        model: str,
+        estimated_tokens: int,
+        priority: int = PRIORITY_NORMAL,
+        usage_of: Optional[Callable[[Any], Dict[str, int]]] = None,
+    ) -> Any:
+        """
+        Run an API request once admitted, retrying retryable failures.
+
+        Args:
+            send: Performs the request and returns the parsed response
+                (raises requests exceptions on failure)
+            model: Model name for accounting
+            estimated_tokens: Prompt plus maximum completion tokens
+            priority: PRIORITY_* (lower runs first)
+            usage_of: Extracts {'prompt_tokens', 'completion_tokens'} (and
+                optionally 'cached_prompt_tokens') from a response
+
+        Returns:
+            The value returned by ``send``
+
+        Raises:
+            Exception: The last error of ``send`` once retries are exhausted
+        """
+        ticket = (priority, next(self._sequence))
+        attempt = 0
+        while True:
+            self._acquire(ticket, estimated_tokens)
+            started = time.monotonic()
+            try:
+                data = send()
+            except Exception as e:
+                self._release()
+                delay = self._retry_delay(e, attempt)
+                rate_limited = _status_code(e) == 429
+                if delay is None or attempt >= self.max_retries:
+                    self._record(model, time.monotonic() - started, failed=True, rate_limited=rate_limited)
+                    raise
+                attempt += 1
+                self._record(model, None, retried=True, rate_limited=rate_limited)
+                logger.warning(
+                    f"LLM request for {model} failed ({e}); retry {attempt}/{self.max_retries} "
+                    f"in {delay:.1f}s"
+                )
+                time.sleep(delay)
+                continue
+
+            latency = time.monotonic() - started
+            self._release()
+            usage = usage_of(data) if usage_of else {}
+            if usage:
+                actual = usage.get("prompt_tokens", 0) + usage.get("completion_tokens", 0)
+                self.token_limiter.adjust(actual - min(estimated_tokens, self.token_limiter.capacity))
+            self._record(model, latency, usage=usage)
+            return data
+
+    def _acquire(self, ticket: Tuple[int, int], estimated_tokens: int) -> None:
+        """Wait until the ticket is first in line and the limits admit it."""
+        with self._cond:
+            heapq.heappush(self._queue, ticket)
+            try:
+                while True:
+                    if self._queue[0] == ticket and self._in_flight < self.max_concurrency:
+                        wait = max(
+                            self.request_limiter.wait_time(1),
+                            self.token_limiter.wait_time(estimated_tokens),
+                        )
+                        if wait <= 0:
+                            heapq.heappop(self._queue)
+                            self.request_limiter.consume(1)
+                            self.token_limiter.consume(estimated_tokens)
+                            self._in_flight += 1
+                            self._cond.notify_all()
+                            return
+                        self._cond.wait(wait)
+                    else:
+                        self._cond.wait()
+            except BaseException:
+                self._queue.remove(ticket)
+                heapq.heapify(self._queue)
+                self._cond.notify_all()
+                raise
+
+    def _release(self) -> None:
+        with self._cond:
+            self._in_flight -= 1
+            self._cond.notify_all()
+
+    def _retry_delay(self, error: Exception, attempt: int) -> Optional[float]:
+        """Seconds to wait before retrying, or None if the error is not retryable."""
+        if isinstance(error, requests.exceptions.HTTPError):
+            status = _status_code(error)
+            if status not in RETRY_STATUS_CODES:
+                return None
+            retry_after = error.response.headers.get("Retry-After") if error.response is not None else None
+            if retry_after:
+                try:
+                    return min(float(retry_after), self.backoff_max)
+                except ValueError:
+                    pass
+        elif not isinstance(
+            error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)
+        ):
+            return None
+        delay = min(self.backoff_base * 2**attempt, self.backoff_max)
+        return delay * random.uniform(0.5, 1.0)
+
+    def _record(
+        self,
+        model: str,
+        latency: Optional[float],
+        usage: Optional[Dict[str, int]] = None,
+        failed: bool = False,
+        retried: bool = False,
+        rate_limited: bool = False,
+    ) -> None:
+        with self._cond:
+            stats = self._stats.setdefault(model, ModelStats())
+            if rate_limited:
+                stats.rate_limited += 1
+            if retried:
+                stats.retries += 1
+                return
+            stats.requests += 1
+            if failed:
+                stats.failures += 1
+            if latency is not None:
+                stats.latency_total_seconds += latency
+                stats.latency_max_seconds = max(stats.latency_max_seconds, latency)
+            if usage:
+                prompt_tokens = usage.get("prompt_tokens", 0)
+                completion_tokens = usage.get("completion_tokens", 0)
+                stats.prompt_tokens += prompt_tokens
+                stats.completion_tokens += completion_tokens
+                stats.cached_prompt_tokens += usage.get("cached_prompt_tokens", 0)
+                if model in self.pricing:
+                    input_price, output_price = self.pricing[model]
+                    stats.cost_usd += (
+                        prompt_tokens * input_price + completion_tokens * output_price
+                    ) / 1_000_000
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return queue state, limits and per-model accounting.
+
+        Returns:
+            Dictionary of dispatcher metrics
+        """
+        with self._cond:
+            return {
+                "queued": len(self._queue),
+                "in_flight": self._in_flight,
+                "max_concurrency": self.max_concurrency,
+                "requests_per_minute": self.request_limiter.per_minute,
+                "tokens_per_minute": self.token_limiter.per_minute,
+                "models": {model: stats.to_dict() for model, stats in self._stats.items()},
+            }
+
+
+def _status_code(error: Exception) -> Optional[int]:
+    response = getattr(error, "response", None)
+    return response.status_code if response is not None else None
+
+
+# Global dispatcher instance
+_llm_dispatcher: Optional[LLMDispatcher] = None
+_llm_dispatcher_lock = threading.Lock()
+
+
+def get_llm_dispatcher() -> LLMDispatcher:
+    """
+    Get or create the process-wide LLM dispatcher.
+
+    Returns:
+        LLMDispatcher with the configured limits
+    """
+    global _llm_dispatcher
+    with _llm_dispatcher_lock:
+        if _llm_dispatcher is None:
+            settings = get_settings()
+            _llm_dispatcher = LLMDispatcher(
+                requests_per_minute=settings.llm_requests_per_minute,
+                tokens_per_minute=settings.llm_tokens_per_minute,
+                max_concurrency=settings.llm_max_concurrency,
+                max_retries=settings.llm_max_retries,
+                pricing=parse_pricing(settings.llm_pricing),
+            )
+    return _llm_dispatcher
@@ -0,0 +1,69 @@
+"""LLM metrics of the scheduler process, published for the API.
+
+All LLM requests run in the scheduler process (manual runs are queued there,
+see ``src/services/analysis_requests.py``), so only its dispatcher, batcher
+and triage counters see any traffic. The scheduler periodically stores a
+snapshot in the ``config`` table and ``GET /llm/metrics`` serves it.
+"""
+import json
+import logging
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from sqlalchemy.orm import Session
+
+from src.database import Config
+from src.services.llm_batcher import get_llm_batcher
+from src.services.llm_dispatcher import get_llm_dispatcher
+from src.utils import get_llm_client
+
+logger = logging.getLogger(__name__)
+
+LLM_METRICS_KEY = "llm_metrics"
+
+
+def publish_llm_metrics(db: Session) -> Dict[str, Any]:
+    """
+    Store this process's dispatcher, triage and batching metrics.
+
+    Args:
+        db: Database session (the caller commits)
+
+    Returns:
+        The stored snapshot
+    """
+    batcher = get_llm_batcher()
+    snapshot = {
+        **get_llm_dispatcher().stats(),
+        "triage": get_llm_client().triage_stats(),
+        "batching": batcher.stats() if batcher is not None else None,
+    }
+
+    row = db.get(Config, LLM_METRICS_KEY)
+    if row is None:
+        row = Config(key=LLM_METRICS_KEY)
+        db.add(row)
+    row.value = json.dumps(snapshot)
+    row.updated_at = datetime.utcnow()
+    return snapshot
+
+
+def load_llm_metrics(db: Session) -> Optional[Dict[str, Any]]:
+    """
+    Return the last published snapshot with its ``updated_at`` time.
+
+    Args:
+        db: Database session
+
+    Returns:
+        Snapshot dictionary, or None if the scheduler has not published one yet
+    """
+    row = db.get(Config, LLM_METRICS_KEY)
+    if row is None:
+        return None
+    try:
+        snapshot = json.loads(row.value)
+    except json.JSONDecodeError:
+        logger.warning("Ignoring invalid stored LLM metrics")
+        return None
+    return {**snapshot, "updated_at": row.updated_at.isoformat()}
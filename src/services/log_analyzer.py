@@ -1,23 +1,333 @@
-"""Log analysis service using SSH and LLM."""
+"""Log analysis service using SSH and LLM.
+
+Logs are fetched over SSH, or for ``method: syslog`` hosts read from the spool
+of the built-in syslog receiver. Hosts are analyzed in parallel on a bounded thread pool. SSH fetches and LLM
+calls have separate concurrency limits, and a whole run is bounded by a
+deadline so runs never overlap the next scheduled one. Manual runs (queued
+by the API, see ``src/services/analysis_requests.py``) and scheduled runs
+take a lease on the host row first, so the two never read and advance the
+same log cursor concurrently.
+
+Before the LLM call, a local prefilter (``src/utils/log_prefilter.py``) checks
+each batch for rule matches, new templates and rate anomalies. Routine batches
+are stored with severity 'none' without calling the LLM. Batches that pass can
+be triaged by a small model first; only those it finds suspicious go to the
+full analysis model. With LLM_BATCH_MAX_HOSTS set, hosts sharing a prompt are
+analyzed together in one request (``src/services/llm_batcher.py``).
+"""
 import json
 import logging
-from datetime import datetime
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager, nullcontext
+from dataclasses import asdict, dataclass
+from datetime import datetime, timedelta
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
 
+from sqlalchemy import or_
+
+from src.config import get_settings, load_prefilter_rules
 from src.database import Host, LogAnalysis, get_db_context
 from src.services.alert_service import get_alert_service
-from src.utils import SSHClient, get_llm_client
+from src.services.log_cursor import (
+    DEFAULT_JOURNAL_LINES,
+    DEFAULT_MAX_BYTES,
+    CursorState,
+    LogDelta,
+    fetch_file_delta,
+    fetch_journal_delta,
+    load_cursor,
+    read_local_file_delta,
+    save_cursor,
+)
+from src.services.template_store import (
+    load_known_templates,
+    load_template_baselines,
+    save_templates,
+)
+from src.services.llm_batcher import get_llm_batcher
+from src.services.llm_dispatcher import PRIORITY_CRITICAL, PRIORITY_NORMAL
+from src.services.syslog_receiver import spool_path
+from src.utils import get_llm_client
+from src.utils.log_prefilter import (
+    DEFAULT_RULES,
+    PrefilterDecision,
+    RuleMatcher,
+    evaluate_batch,
+    parse_rules,
+)
+from src.utils.log_templates import LogSummary, summarize_logs
+from src.utils.ssh_pool import get_ssh_pool
 
 logger = logging.getLogger(__name__)
 
+PREFILTER_MODEL = "prefilter"  # llm_model of analyses the prefilter resolved locally
+ANALYSIS_RUNNING = "Log analysis already running for this host"
+# A host's lease is taken over after this many run deadlines (crashed process)
+ANALYSIS_LEASE_FACTOR = 2
+
+
+class DeadlineExceeded(Exception):
+    """Raised when a host would start a stage after the run deadline."""
+
+
+@dataclass
+class HostAnalysisResult:
+    """Outcome and timing of one host's log analysis."""
+
+    host_id: int
+    host_name: str
+    status: str = "skipped"  # 'analyzed', 'skipped', 'failed' or 'timeout'
+    severity: Optional[str] = None
+    findings: int = 0
+    lines_analyzed: int = 0
+    llm_skipped: bool = False  # Routine batch, resolved by the prefilter
+    escalated: Optional[bool] = None  # Triage verdict: sent to the full model (None = not triaged)
+    ssh_seconds: Optional[float] = None
+    llm_seconds: Optional[float] = None
+    total_seconds: Optional[float] = None
+    error: Optional[str] = None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary."""
+        return asdict(self)
+
 
 class LogAnalyzerService:
     """Service for analyzing logs from remote hosts."""
 
-    def __init__(self):
-        """Initialize log analyzer service."""
+    def __init__(
+        self,
+        ssh_concurrency: Optional[int] = None,
+        llm_concurrency: Optional[int] = None,
+    ):
+        """
+        Initialize log analyzer service.
+
+        Args:
+            ssh_concurrency: Maximum concurrent SSH fetches (default: LOG_ANALYSIS_SSH_CONCURRENCY)
+            llm_concurrency: Maximum concurrent LLM calls (default: LOG_ANALYSIS_LLM_CONCURRENCY)
+        """
+        settings = get_settings()
         self.llm_client = get_llm_client()
         self.alert_service = get_alert_service()
+        self.ssh_pool = get_ssh_pool()
+        self.ssh_concurrency = ssh_concurrency or settings.log_analysis_ssh_concurrency
+        self.llm_concurrency = llm_concurrency or settings.log_analysis_llm_concurrency
+        self.run_deadline_seconds = settings.log_analysis_deadline_seconds
+        self.prefilter_enabled = settings.log_prefilter_enabled
+        self.prefilter_anomaly_factor = settings.log_prefilter_anomaly_factor
+        self.prefilter_anomaly_min_count = settings.log_prefilter_anomaly_min_count
+        self.rule_matcher = RuleMatcher(self._load_rules())
+        self.triage_model = settings.llm_triage_model or None
+        self.batcher = get_llm_batcher()
+        self.syslog_spool_dir = settings.syslog_spool_dir
+        self._ssh_slots = threading.BoundedSemaphore(self.ssh_concurrency)
+        self._llm_slots = threading.BoundedSemaphore(self.llm_concurrency)
+        self._local = threading.local()
+
+    @staticmethod
+    def _load_rules():
+        """Load prefilter rules from config/prefilter_rules.yaml, else the built-in rules."""
+        try:
+            raw = load_prefilter_rules()
+            if raw is not None:
+                return parse_rules(raw)
+        except (OSError, ValueError) as e:
+            logger.error(f"Invalid prefilter rules, using built-in rules: {e}")
+        return parse_rules(DEFAULT_RULES)
+
+    def analyze_hosts(
+        self,
+        host_ids: Optional[List[int]] = None,
+        deadline_seconds: Optional[float] = None,
+        priority: Optional[int] = None,
+    ) -> List[HostAnalysisResult]:
+        """
+        Analyze logs for many hosts concurrently.
+
+        Each host runs in its own worker with its own database session. Hosts
+        still running when the deadline passes are reported as 'timeout' (their
+        remaining stages are not started); hosts not yet started are skipped.
+
+        Args:
+            host_ids: Hosts to analyze (default: all with a log analysis config)
+            deadline_seconds: Run time budget (default: LOG_ANALYSIS_DEADLINE_SECONDS)
+            priority: LLM dispatcher priority for all hosts (e.g. PRIORITY_MANUAL);
+                by default hosts configured with "priority": "critical" go first
+
+        Returns:
+            One HostAnalysisResult per host
+        """
+        budget = deadline_seconds or self.run_deadline_seconds
+        started = time.monotonic()
+        deadline = started + budget
+
+        with get_db_context() as db:
+            query = db.query(Host.id, Host.name).filter(Host.log_analysis_config.isnot(None))
+            if host_ids is not None:
+                query = query.filter(Host.id.in_(host_ids))
+            hosts = query.order_by(Host.id).all()
+
+        if not hosts:
+            return []
+
+        self.ssh_pool.evict_idle()
+
+        results = {host_id: HostAnalysisResult(host_id=host_id, host_name=name) for host_id, name in hosts}
+        workers = min(len(hosts), self.ssh_concurrency + self.llm_concurrency)
+        logger.info(f"Analyzing logs for {len(hosts)} hosts with {workers} workers")
+
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="log-analyzer")
+        try:
+            pending: Dict[Future, int] = {
+                executor.submit(
+                    self._analyze_host_id, host_id, results[host_id], deadline, priority
+                ): host_id
+                for host_id, _ in hosts
+            }
+            while pending:
+                done, _ = wait(
+                    pending, timeout=max(deadline - time.monotonic(), 0), return_when=FIRST_COMPLETED
+                )
+                if not done:
+                    break
+                for future in done:
+                    host_id = pending.pop(future)
+                    exc = future.exception()
+                    if exc is not None:
+                        results[host_id].status = "failed"
+                        results[host_id].error = str(exc)
+                        logger.error(f"Error analyzing logs for {results[host_id].host_name}: {exc}")
+
+            for future, host_id in pending.items():
+                result = results[host_id]
+                if future.cancel():
+                    result.error = "Not started before run deadline"
+                else:
+                    result.status = "timeout"
+                    result.error = "Run deadline exceeded"
+            if pending:
+                logger.warning(
+                    f"Log analysis deadline ({budget:.0f}s) reached with {len(pending)} hosts unfinished"
+                )
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        counts: Dict[str, int] = {}
+        for result in results.values():
+            counts[result.status] = counts.get(result.status, 0) + 1
+        logger.info(f"Log analysis run finished in {elapsed:.1f}s: {counts}")
+
+        return list(results.values())
+
+    def _analyze_host_id(
+        self,
+        host_id: int,
+        result: HostAnalysisResult,
+        deadline: float,
+        priority: Optional[int] = None,
+    ) -> None:
+        """Worker: analyze one host, recording timing into its result."""
+        started = time.monotonic()
+        self._local.result = result
+        self._local.deadline = deadline
+        self._local.priority = priority
+        claimed_at = None
+        try:
+            claimed_at = self._claim_host(host_id)
+            if claimed_at is None:
+                logger.info(f"Skipping {result.host_name}: {ANALYSIS_RUNNING.lower()}")
+                result.error = ANALYSIS_RUNNING
+                return
+            with get_db_context() as db:
+                host = db.query(Host).filter(Host.id == host_id).first()
+                if host is None:
+                    result.error = "Host deleted"
+                    return
+                analysis = self.analyze_host_logs(host)
+                if analysis is not None:
+                    result.status = "analyzed"
+                elif result.status == "skipped" and result.error:
+                    result.status = "failed"
+        except DeadlineExceeded as e:
+            result.status = "timeout"
+            result.error = str(e)
+        finally:
+            if claimed_at is not None:
+                self._release_host(host_id, claimed_at)
+            result.total_seconds = round(time.monotonic() - started, 3)
+            self._local.result = None
+            self._local.deadline = None
+            self._local.priority = None
+
+    def _claim_host(self, host_id: int) -> Optional[datetime]:
+        """
+        Take the host's analysis lease unless another run holds it.
+
+        Returns:
+            Lease timestamp to release with, or None if the host is busy
+        """
+        now = datetime.utcnow()
+        stale = now - timedelta(seconds=self.run_deadline_seconds * ANALYSIS_LEASE_FACTOR)
+        with get_db_context() as db:
+            claimed = (
+                db.query(Host)
+                .filter(
+                    Host.id == host_id,
+                    or_(
+                        Host.log_analysis_started_at.is_(None),
+                        Host.log_analysis_started_at < stale,
+                    ),
+                )
+                .update(
+                    {Host.log_analysis_started_at: now, Host.updated_at: Host.updated_at},
+                    synchronize_session=False,
+                )
+            )
+        return now if claimed else None
+
+    @staticmethod
+    def _release_host(host_id: int, claimed_at: datetime) -> None:
+        """Release a lease taken by _claim_host (unless it was taken over)."""
+        try:
+            with get_db_context() as db:
+                db.query(Host).filter(
+                    Host.id == host_id, Host.log_analysis_started_at == claimed_at
+                ).update(
+                    {Host.log_analysis_started_at: None, Host.updated_at: Host.updated_at},
+                    synchronize_session=False,
+                )
+        except Exception as e:
+            logger.error(f"Failed to release log analysis lease for host {host_id}: {e}")
+
+    @contextmanager
+    def _stage(self, slots: Optional[threading.BoundedSemaphore], name: str) -> Iterator[None]:
+        """Hold a concurrency slot (if any) for a stage and record its duration."""
+        deadline = getattr(self._local, "deadline", None)
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceeded(f"Run deadline passed before {name} stage")
+
+        with slots if slots is not None else nullcontext():
+            started = time.monotonic()
+            try:
+                yield
+            finally:
+                result = getattr(self._local, "result", None)
+                if result is not None:
+                    # Accumulate: a host may pass a stage more than once (triage + analysis)
+                    previous = getattr(result, f"{name}_seconds") or 0
+                    setattr(
+                        result, f"{name}_seconds", round(previous + time.monotonic() - started, 3)
+                    )
+
+    def _fail(self, message: str) -> None:
+        """Record a failure reason for the host being analyzed (if any)."""
+        result = getattr(self._local, "result", None)
+        if result is not None:
+            result.error = message
 
     def analyze_host_logs(self, host: Host) -> Optional[LogAnalysis]:
         """
@@ -70,48 +380,140 @@ class LogAnalyzerService:
         ssh_key_path = config.get("ssh_key_path")
         ssh_password = config.get("ssh_password")
         log_command = config.get("log_command")
+        log_file = config.get("log_file")
+        journal = config.get("journal")
         analysis_prompt = config.get("analysis_prompt")
 
-        if not all([ssh_host, ssh_user, log_command, analysis_prompt]):
+        if not all([ssh_host, ssh_user, analysis_prompt]) or not (
+            log_command or log_file or journal
+        ):
             logger.error(f"Incomplete SSH config for {host.name}")
+            self._fail("Incomplete SSH config")
             return None
 
+        delta: Optional[LogDelta] = None
+        if log_file:
+            log_source = f"ssh://{ssh_host}:{log_file}"
+        elif journal:
+            unit = journal if isinstance(journal, str) else None
+            log_source = f"ssh://{ssh_host}:journal" + (f":{unit}" if unit else "")
+        else:
+            log_source = f"ssh://{ssh_host}:{log_command}"
+
         logger.info(f"Analyzing logs for {host.name} via SSH to {ssh_host}")
 
         # Retrieve logs via SSH
-        try:
-            with SSHClient(
-                hostname=ssh_host,
-                username=ssh_user,
-                key_path=ssh_key_path,
-                password=ssh_password,
-            ) as ssh:
-                if not ssh.connect():
-                    logger.error(f"Failed to connect to {ssh_host}")
-                    return None
-
-                logs = ssh.get_logs(log_command)
-                if not logs:
-                    logger.error(f"Failed to retrieve logs from {ssh_host}")
-                    return None
-
-                logger.info(f"Retrieved {len(logs)} bytes of logs from {ssh_host}")
+        with self._stage(self._ssh_slots, "ssh"):
+            try:
+                with self.ssh_pool.connection(
+                    hostname=ssh_host,
+                    username=ssh_user,
+                    key_path=ssh_key_path,
+                    password=ssh_password,
+                    port=int(config.get("ssh_port", 22)),
+                ) as ssh:
+                    if log_file or journal:
+                        delta = self._fetch_delta(ssh, host, config)
+                        logs = delta.text
+                        if not logs.strip():
+                            logger.info(f"No new log data for {host.name}")
+                            # Persist rotation/offset changes; nothing to analyze
+                            with get_db_context() as db:
+                                save_cursor(db, host.id, delta.cursor)
+                            return None
+                    else:
+                        logs = ssh.get_logs(log_command)
+                    if not logs:
+                        logger.error(f"Failed to retrieve logs from {ssh_host}")
+                        self._fail(f"Failed to retrieve logs from {ssh_host}")
+                        return None
+
+                    logger.info(f"Retrieved {len(logs)} bytes of logs from {ssh_host}")
 
-        except Exception as e:
-            logger.error(f"SSH error for {host.name}: {e}")
-            return None
+            except Exception as e:
+                logger.error(f"SSH error for {host.name}: {e}")
+                self._fail(f"SSH error: {e}")
+                return None
 
         # Analyze logs with LLM
         return self._analyze_logs_with_llm(
             host=host,
             logs=logs,
-            log_source=f"ssh://{ssh_host}:{log_command}",
+            log_source=log_source,
             analysis_prompt=analysis_prompt,
+            cursor=delta.cursor if delta else None,
+            **self._llm_options(config),
         )
 
+    def _llm_options(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """LLM stage options from a host's log analysis config."""
+        return {
+            "mine_templates": bool(config.get("template_mining", True)),
+            "prefilter": bool(config.get("prefilter", True)),
+            "prefilter_rules": config.get("prefilter_rules"),
+            "priority": self._llm_priority(config),
+            "model": config.get("analysis_model"),
+            "triage_model": config.get("triage_model", self.triage_model) or None,
+            "batch": bool(config.get("batch", True)),
+        }
+
+    def _llm_priority(self, config: Dict[str, Any]) -> int:
+        """Dispatcher priority: the run's override, else the host's configured priority."""
+        priority = getattr(self._local, "priority", None)
+        if priority is not None:
+            return priority
+        if str(config.get("priority", "")).lower() == "critical":
+            return PRIORITY_CRITICAL
+        return PRIORITY_NORMAL
+
+    def _fetch_delta(self, ssh, host: Host, config: Dict[str, Any]) -> LogDelta:
+        """
+        Fetch log data added since the host's stored cursor.
+
+        Args:
+            ssh: Connected SSH client
+            host: Host being analyzed
+            config: Log analysis configuration ('log_file' or 'journal')
+
+        Returns:
+            LogDelta (its cursor is saved only after a successful analysis)
+        """
+        max_bytes = int(config.get("max_bytes", DEFAULT_MAX_BYTES))
+        log_file = config.get("log_file")
+        if log_file:
+            source = log_file
+            unit = None
+        else:
+            journal = config.get("journal")
+            unit = journal if isinstance(journal, str) else None
+            source = f"journal:{unit}" if unit else "journal"
+
+        with get_db_context() as db:
+            cursor = load_cursor(db, host.id, source)
+
+        if log_file:
+            delta = fetch_file_delta(ssh, log_file, cursor, max_bytes)
+        else:
+            delta = fetch_journal_delta(
+                ssh,
+                source,
+                cursor,
+                unit=unit,
+                initial_lines=int(config.get("initial_lines", DEFAULT_JOURNAL_LINES)),
+                max_bytes=max_bytes,
+            )
+        logger.info(
+            f"Fetched {len(delta.text)} new bytes from {source} on {host.name}"
+            + (" (rotated)" if delta.rotated else "")
+        )
+        return delta
+
     def _analyze_via_syslog(self, host: Host, config: Dict[str, Any]) -> Optional[LogAnalysis]:
         """
-        Analyze logs via syslog (placeholder for future implementation).
+        Analyze logs received by the syslog receiver (src/services/syslog_receiver.py).
+
+        Reads the host's spool file from its stored cursor, like a
+        ``log_file`` over SSH.
 
         Args:
             host: Host to analyze
@@ -120,8 +522,42 @@ class LogAnalyzerService:
         Returns:
             LogAnalysis object or None
         """
-        logger.warning(f"Syslog analysis not yet implemented for {host.name}")
-        return None
+        analysis_prompt = config.get("analysis_prompt")
+        if not analysis_prompt:
+            logger.error(f"Incomplete syslog config for {host.name}")
+            self._fail("Incomplete syslog config")
+            return None
+
+        path = spool_path(self.syslog_spool_dir, host.host_id)
+        with get_db_context() as db:
+            cursor = load_cursor(db, host.id, "syslog")
+        try:
+            delta = read_local_file_delta(
+                path, "syslog", cursor, int(config.get("max_bytes", DEFAULT_MAX_BYTES))
+            )
+        except FileNotFoundError:
+            logger.info(f"No syslog messages received yet for {host.name}")
+            return None
+        except OSError as e:
+            logger.error(f"Failed to read syslog spool for {host.name}: {e}")
+            self._fail(f"Failed to read syslog spool: {e}")
+            return None
+
+        if not delta.text.strip():
+            logger.info(f"No new syslog messages for {host.name}")
+            with get_db_context() as db:
+                save_cursor(db, host.id, delta.cursor)
+            return None
+
+        logger.info(f"Read {len(delta.text)} bytes of syslog messages for {host.name}")
+        return self._analyze_logs_with_llm(
+            host=host,
+            logs=delta.text,
+            log_source=f"syslog://{host.host_id}",
+            analysis_prompt=analysis_prompt,
+            cursor=delta.cursor,
+            **self._llm_options(config),
+        )
 
     def _analyze_logs_with_llm(
         self,
@@ -129,15 +565,39 @@ class LogAnalyzerService:
         logs: str,
         log_source: str,
         analysis_prompt: str,
+        cursor: Optional[CursorState] = None,
+        mine_templates: bool = True,
+        prefilter: bool = True,
+        prefilter_rules: Optional[List[Dict[str, Any]]] = None,
+        priority: int = PRIORITY_NORMAL,
+        model: Optional[str] = None,
+        triage_model: Optional[str] = None,
+        batch: bool = False,
     ) -> Optional[LogAnalysis]:
         """
         Analyze logs using LLM.
 
+        With template mining the LLM receives template counts and samples
+        instead of the raw lines (new templates are kept verbatim). With the
+        prefilter, batches without rule matches, new templates or rate
+        anomalies are stored with severity 'none' and no LLM call. With a
+        triage model, batches it classifies as routine are stored the same
+        way without calling the full model. With batching, the full analysis
+        shares a request with other hosts using the same prompt (not streamed).
+
         Args:
             host: Host being analyzed
             logs: Log content
             log_source: Source description
             analysis_prompt: Analysis prompt for LLM
+            cursor: Log cursor to store once the analysis is saved
+            mine_templates: Summarize lines into templates before the LLM call
+            prefilter: Skip the LLM for routine batches (if LOG_PREFILTER_ENABLED)
+            prefilter_rules: Host-specific rules added to the global ones
+            priority: LLM dispatcher priority
+            model: Full analysis model (default: LLM_DEFAULT_MODEL)
+            triage_model: Small model that decides whether to run the full analysis
+            batch: Analyze together with other hosts sharing the prompt (if enabled)
 
         Returns:
             LogAnalysis object or None
@@ -145,27 +605,146 @@ class LogAnalyzerService:
         # Count lines
         lines_analyzed = len(logs.split("\n"))
 
-        logger.info(f"Analyzing {lines_analyzed} lines for {host.name} with LLM")
+        logger.info(f"Analyzing {lines_analyzed} lines for {host.name}")
+
+        use_prefilter = prefilter and self.prefilter_enabled
+        summary: Optional[LogSummary] = None
+        prompt_logs = logs
+        if mine_templates or use_prefilter:
+            summary, rendered = self._summarize(host, logs)
+            if mine_templates:
+                prompt_logs = rendered
+
+        if use_prefilter:
+            decision = self._prefilter(host, logs, summary, prefilter_rules)
+            if not decision.analyze:
+                logger.info(f"Prefilter: routine batch for {host.name}, skipping LLM")
+                host_result = getattr(self._local, "result", None)
+                if host_result is not None:
+                    host_result.severity = "none"
+                    host_result.lines_analyzed = lines_analyzed
+                    host_result.llm_skipped = True
+                return self._store_analysis(
+                    host, log_source, lines_analyzed, PREFILTER_MODEL, [], cursor, summary
+                )
+            logger.info(f"Prefilter: analyzing {host.name} ({'; '.join(decision.reasons)})")
+
+        host_result = getattr(self._local, "result", None)
+        if triage_model:
+            with self._stage(self._llm_slots, "llm"):
+                verdict = self.llm_client.triage_logs(
+                    logs=prompt_logs,
+                    prompt=analysis_prompt,
+                    model=triage_model,
+                    priority=priority,
+                )
+            if host_result is not None:
+                host_result.escalated = verdict["suspicious"]
+            if not verdict["suspicious"]:
+                logger.info(f"Triage: routine batch for {host.name} ({verdict.get('reason')})")
+                if host_result is not None:
+                    host_result.severity = "none"
+                    host_result.lines_analyzed = lines_analyzed
+                return self._store_analysis(
+                    host, log_source, lines_analyzed, triage_model, [], cursor, summary
+                )
+            logger.info(
+                f"Triage: escalating {host.name} "
+                f"({verdict.get('reason') or verdict.get('error')})"
+            )
 
-        # Call LLM
-        result = self.llm_client.analyze_logs(
-            logs=logs,
-            prompt=analysis_prompt,
-        )
+        # Call LLM; the first critical finding is alerted while the response streams
+        alerted: List[Dict[str, Any]] = []
+        if batch and self.batcher is not None:
+            # No LLM slot: batched hosts wait for each other, the dispatcher bounds the request
+            with self._stage(None, "llm"):
+                result = self.batcher.analyze(
+                    name=host.name,
+                    logs=prompt_logs,
+                    prompt=analysis_prompt,
+                    model=model,
+                    priority=priority,
+                )
+        else:
+            with self._stage(self._llm_slots, "llm"):
+                result = self.llm_client.analyze_logs(
+                    logs=prompt_logs,
+                    prompt=analysis_prompt,
+                    model=model,
+                    priority=priority,
+                    on_finding=self._early_alert_handler(host, alerted),
+                )
 
         if not result.get("success"):
             logger.error(f"LLM analysis failed: {result.get('error')}")
+            self._fail(f"LLM analysis failed: {result.get('error')}")
             return None
 
-        findings = result.get("findings", [])
+        findings = result.get("findings") or []
         model = result.get("model")
+        if result.get("partial"):
+            logger.warning(f"LLM response for {host.name} was incomplete; kept {len(findings)} findings")
 
         # Determine highest severity
         severity = self._determine_severity(findings)
 
         logger.info(f"LLM analysis complete: {len(findings)} findings, severity: {severity}")
 
-        # Store in database
+        if host_result is not None:
+            host_result.severity = severity
+            host_result.findings = len(findings)
+            host_result.lines_analyzed = lines_analyzed
+
+        return self._store_analysis(
+            host, log_source, lines_analyzed, model, findings, cursor, summary, alerted
+        )
+
+    def _early_alert_handler(
+        self, host: Host, alerted: List[Dict[str, Any]]
+    ) -> Callable[[Dict[str, Any]], None]:
+        """
+        Build an on_finding callback that alerts on the first critical finding.
+
+        Alerted findings are appended to ``alerted`` so the final alert only
+        covers the rest.
+        """
+        lock = threading.Lock()
+
+        def on_finding(finding: Dict[str, Any]) -> None:
+            if finding.get("severity") != "critical":
+                return
+            with lock:
+                if alerted:
+                    return
+                alerted.append(finding)
+            logger.warning(
+                f"Critical finding for {host.name} during analysis: {finding.get('description')}"
+            )
+            try:
+                self.alert_service.log_analysis_alert(host=host, findings=[finding], severity="critical")
+            except Exception as e:
+                logger.error(f"Early alert for {host.name} failed: {e}")
+
+        return on_finding
+
+    def _store_analysis(
+        self,
+        host: Host,
+        log_source: str,
+        lines_analyzed: int,
+        model: Optional[str],
+        findings: List[Dict[str, Any]],
+        cursor: Optional[CursorState],
+        summary: Optional[LogSummary],
+        alerted: Optional[List[Dict[str, Any]]] = None,
+    ) -> LogAnalysis:
+        """
+        Save an analysis with its cursor and templates, and alert on problems.
+
+        Findings in ``alerted`` were already alerted while streaming and are
+        left out of the alert.
+        """
+        severity = self._determine_severity(findings)
         with get_db_context() as db:
             log_analysis = LogAnalysis(
                 host_id=host.id,
@@ -176,18 +755,82 @@ class LogAnalyzerService:
                 severity=severity,
             )
             db.add(log_analysis)
+            if cursor is not None:
+                save_cursor(db, host.id, cursor)
+            if summary is not None:
+                save_templates(db, host.id, summary)
             db.flush()
 
             # Create alert if there are critical or warning findings
-            if severity in ["critical", "warning"] and findings:
+            done = {(f.get("severity"), f.get("description")) for f in alerted or []}
+            remaining = [f for f in findings if (f.get("severity"), f.get("description")) not in done]
+            remaining_severity = self._determine_severity(remaining)
+            if remaining_severity in ["critical", "warning"]:
                 self.alert_service.log_analysis_alert(
                     host=host,
-                    findings=findings,
-                    severity=severity,
+                    findings=remaining,
+                    severity=remaining_severity,
                 )
 
             return log_analysis
 
+    def _summarize(self, host: Host, logs: str) -> Tuple[LogSummary, str]:
+        """
+        Mine templates from a batch and render the text sent to the LLM.
+
+        Returns:
+            Tuple of (summary, prompt text); the prompt text is the raw logs
+            when the summary would not be smaller
+        """
+        with get_db_context() as db:
+            known = load_known_templates(db, host.id)
+
+        summary = summarize_logs(logs, known)
+        rendered = summary.render()
+        logger.info(
+            f"Mined {len(summary.templates)} templates ({len(summary.novel)} new) from "
+            f"{summary.total_lines} lines for {host.name}: {len(logs)} -> {len(rendered)} chars"
+        )
+        return summary, rendered if len(rendered) < len(logs) else logs
+
+    def _prefilter(
+        self,
+        host: Host,
+        logs: str,
+        summary: LogSummary,
+        host_rules: Optional[List[Dict[str, Any]]] = None,
+    ) -> PrefilterDecision:
+        """
+        Decide whether a batch needs the LLM.
+
+        Args:
+            host: Host being analyzed
+            logs: Raw log text
+            summary: Templates mined from the batch
+            host_rules: Host-specific rules ('prefilter_rules' config key)
+
+        Returns:
+            PrefilterDecision
+        """
+        matcher = self.rule_matcher
+        if host_rules:
+            try:
+                matcher = RuleMatcher(matcher.rules + parse_rules(host_rules))
+            except (TypeError, ValueError) as e:
+                logger.error(f"Ignoring invalid prefilter_rules for {host.name}: {e}")
+
+        with get_db_context() as db:
+            baselines = load_template_baselines(db, host.id)
+
+        return evaluate_batch(
+            logs,
+            summary,
+            baselines,
+            matcher,
+            anomaly_factor=self.prefilter_anomaly_factor,
+            anomaly_min_count=self.prefilter_anomaly_min_count,
+        )
+
     @staticmethod
     def _determine_severity(findings: Optional[List[Dict[str, Any]]]) -> str:
         """
@@ -214,27 +857,19 @@ class LogAnalyzerService:
             return "none"
 
 
-def analyze_all_hosts():
+def analyze_all_hosts() -> List[HostAnalysisResult]:
     """Analyze logs for all hosts with log analysis enabled."""
     logger.info("Starting log analysis for all enabled hosts")
 
-    analyzer = LogAnalyzerService()
-
-    with get_db_context() as db:
-        # Get all hosts with log analysis enabled
-        hosts = db.query(Host).filter(Host.log_analysis_config.isnot(None)).all()
-
-        for host in hosts:
-            try:
-                result = analyzer.analyze_host_logs(host)
-                if result:
-                    logger.info(f"Log analysis complete for {host.name}: {result.severity}")
-                else:
-                    logger.warning(f"Log analysis skipped or failed for {host.name}")
-            except Exception as e:
-                logger.error(f"Error analyzing logs for {host.name}: {e}")
+    results = LogAnalyzerService().analyze_hosts()
+    for result in results:
+        if result.status == "analyzed":
+            logger.info(f"Log analysis complete for {result.host_name}: {result.severity}")
+        elif result.status != "skipped" or result.error:
+            logger.warning(f"Log analysis {result.status} for {result.host_name}: {result.error}")
 
     logger.info("Log analysis batch complete")
+    return results
 
 
 def get_log_analyzer() -> LogAnalyzerService:
@@ -0,0 +1,377 @@
+"""Incremental log retrieval with per-host cursors.
+
+Instead of re-running ``tail -n 1000`` every time, a host's log source can be
+read from where the previous successful analysis stopped:
+
+- Files (``log_file``): the cursor is the file's inode and a byte offset. Each
+  run stats the file (and ``<file>.1``) and fetches only the new bytes. A
+  changed inode means the file was rotated: the rest of the old file is read
+  from ``<file>.1`` when it is still there, then the new file from the start.
+  A file smaller than the offset was truncated in place and is read from the
+  start. An incomplete last line is left for the next run.
+- systemd journal (``journal``): the cursor is journalctl's own cursor string
+  (``--show-cursor`` / ``--after-cursor``), which survives journal rotation.
+- Local spool files (``method: syslog``): read like remote files, without SSH.
+
+Cursors are stored in ``log_cursors`` and only advanced after the fetched
+data was analyzed successfully.
+"""
+import logging
+import os
+import shlex
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import LogCursor
+from src.utils.ssh_client import SSHClient
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_BYTES = 1024 * 1024
+DEFAULT_JOURNAL_LINES = 1000
+JOURNAL_CURSOR_PREFIX = "-- cursor: "
+JOURNAL_MARKER_PREFIX = "-- "
+
+
+@dataclass
+class CursorState:
+    """Position in a log source."""
+
+    source: str
+    inode: Optional[int] = None
+    offset: Optional[int] = None
+    journal_cursor: Optional[str] = None
+
+
+@dataclass
+class LogDelta:
+    """Log data fetched since the last cursor and the cursor after it."""
+
+    text: str
+    cursor: CursorState
+    rotated: bool = False  # Source was rotated or truncated since the last run
+    skipped_bytes: int = 0  # Older new data dropped to stay under max_bytes
+
+
+@dataclass(frozen=True)
+class FileStat:
+    """Inode and size of a remote file."""
+
+    inode: int
+    size: int
+
+
+def load_cursor(db: Session, host_id: int, source: str) -> Optional[CursorState]:
+    """Load the stored cursor for a host's log source."""
+    row = (
+        db.query(LogCursor)
+        .filter(LogCursor.host_id == host_id)
+        .filter(LogCursor.source == source)
+        .first()
+    )
+    if row is None:
+        return None
+    return CursorState(
+        source=row.source,
+        inode=row.inode,
+        offset=row.offset,
+        journal_cursor=row.journal_cursor,
+    )
+
+
+def save_cursor(db: Session, host_id: int, state: CursorState) -> None:
+    """Create or update a host's cursor. The caller commits."""
+    row = (
+        db.query(LogCursor)
+        .filter(LogCursor.host_id == host_id)
+        .filter(LogCursor.source == state.source)
+        .first()
+    )
+    if row is None:
+        row = LogCursor(host_id=host_id, source=state.source)
+        db.add(row)
+    row.inode = state.inode
+    row.offset = state.offset
+    row.journal_cursor = state.journal_cursor
+
+
+def parse_stat_output(output: str) -> Dict[str, FileStat]:
+    """Parse ``stat -c '%i %s %n'`` output into {path: FileStat}."""
+    stats = {}
+    for line in output.splitlines():
+        parts = line.split(" ", 2)
+        if len(parts) != 3:
+            continue
+        try:
+            stats[parts[2]] = FileStat(inode=int(parts[0]), size=int(parts[1]))
+        except ValueError:
+            continue
+    return stats
+
+
+def plan_file_reads(
+    path: str,
+    current: FileStat,
+    rotated: Optional[FileStat],
+    cursor: Optional[CursorState],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> Tuple[List[Tuple[str, int, int]], bool, int]:
+    """
+    Decide which byte ranges to fetch for a file source.
+
+    Args:
+        path: Log file path
+        current: Stat of the file
+        rotated: Stat of ``<path>.1`` if it exists
+        cursor: Previous cursor (None on the first run)
+        max_bytes: Most bytes to fetch; older data beyond this is skipped
+
+    Returns:
+        Tuple of ([(path, start, end), ...] oldest first, rotated flag,
+        number of bytes skipped)
+    """
+    was_rotated = False
+    if cursor is None or cursor.inode is None or cursor.offset is None:
+        # First run: behave like tail and start near the end
+        segments = [(path, max(current.size - max_bytes, 0), current.size)]
+    elif cursor.inode == current.inode and current.size >= cursor.offset:
+        segments = [(path, cursor.offset, current.size)]
+    elif cursor.inode == current.inode:
+        # Truncated in place (copytruncate)
+        was_rotated = True
+        segments = [(path, 0, current.size)]
+    else:
+        was_rotated = True
+        segments = []
+        if rotated is not None and rotated.inode == cursor.inode and rotated.size > cursor.offset:
+            segments.append((f"{path}.1", cursor.offset, rotated.size))
+        segments.append((path, 0, current.size))
+
+    segments = [(name, start, end) for name, start, end in segments if end > start]
+
+    # Keep the newest max_bytes
+    skipped = 0
+    excess = sum(end - start for _, start, end in segments) - max_bytes
+    while excess > 0 and segments:
+        name, start, end = segments[0]
+        if end - start <= excess:
+            segments.pop(0)
+            skipped += end - start
+            excess -= end - start
+        else:
+            segments[0] = (name, start + excess, end)
+            skipped += excess
+            excess = 0
+
+    return segments, was_rotated, skipped
+
+
+def _range_command(path: str, start: int, end: int) -> str:
+    """Shell command printing bytes [start, end) of a file."""
+    return f"tail -c +{start + 1} -- {shlex.quote(path)} | head -c {end - start}"
+
+
+def fetch_file_delta(
+    ssh: SSHClient,
+    path: str,
+    cursor: Optional[CursorState],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> LogDelta:
+    """
+    Fetch the part of a remote log file added since the cursor.
+
+    Args:
+        ssh: Connected SSH client
+        path: Log file path
+        cursor: Previous cursor (None on the first run)
+        max_bytes: Most bytes to fetch per run
+
+    Returns:
+        LogDelta with the new text and the cursor to store after analysis
+
+    Raises:
+        FileNotFoundError: If the file cannot be stat'ed
+        OSError: If reading the file fails
+    """
+    rotated_path = f"{path}.1"
+    _, output, _ = ssh.execute_command(
+        f"stat -L -c '%i %s %n' -- {shlex.quote(path)} {shlex.quote(rotated_path)} 2>/dev/null; true"
+    )
+    stats = parse_stat_output(output)
+    current = stats.get(path)
+    if current is None:
+        raise FileNotFoundError(f"Cannot stat {path}")
+
+    segments, rotated, skipped = plan_file_reads(
+        path, current, stats.get(rotated_path), cursor, max_bytes
+    )
+    if rotated:
+        logger.info(f"Log file {path} was rotated or truncated since the last run")
+    if skipped:
+        logger.warning(f"Skipping {skipped} bytes of {path} to stay under {max_bytes} bytes")
+
+    parts = []
+    for name, start, end in segments:
+        success, stdout, stderr = ssh.execute_command(_range_command(name, start, end))
+        if not success:
+            raise OSError(f"Failed to read {name}: {stderr.strip()}")
+        parts.append(stdout)
+
+    # Leave an incomplete last line of the current file for the next run. The
+    # output was decoded with errors="replace", so the partial line's length
+    # in bytes is counted on the remote side.
+    offset = current.size
+    if segments and segments[-1][0] == path:
+        name, start, end = segments[-1]
+        last = parts[-1]
+        if last and not last.endswith("\n") and "\n" in last:
+            success, stdout, stderr = ssh.execute_command(
+                f"{_range_command(name, start, end)} | tail -n 1 | wc -c"
+            )
+            try:
+                partial_bytes = int(stdout.strip()) if success else -1
+            except ValueError:
+                partial_bytes = -1
+            if not 0 < partial_bytes <= end - start:
+                raise OSError(f"Failed to measure the last line of {name}: {stderr.strip()}")
+            parts[-1] = last[: last.rindex("\n") + 1]
+            offset = end - partial_bytes
+    text = "".join(parts)
+
+    return LogDelta(
+        text=text,
+        cursor=CursorState(source=path, inode=current.inode, offset=offset),
+        rotated=rotated,
+        skipped_bytes=skipped,
+    )
+
+
+def read_local_file_delta(
+    path: str,
+    source: str,
+    cursor: Optional[CursorState],
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> LogDelta:
+    """
+    Read the part of a local log file added since the cursor.
+
+    Rotation and truncation are handled as for remote files.
+
+    Args:
+        path: Log file path
+        source: Cursor source name
+        cursor: Previous cursor (None on the first run)
+        max_bytes: Most bytes to read per run
+
+    Returns:
+        LogDelta with the new text and the cursor to store after analysis
+
+    Raises:
+        FileNotFoundError: If the file does not exist
+        OSError: If reading the file fails
+    """
+    stat = os.stat(path)
+    current = FileStat(inode=stat.st_ino, size=stat.st_size)
+    try:
+        stat = os.stat(f"{path}.1")
+        rotated_stat: Optional[FileStat] = FileStat(inode=stat.st_ino, size=stat.st_size)
+    except FileNotFoundError:
+        rotated_stat = None
+
+    segments, rotated, skipped = plan_file_reads(path, current, rotated_stat, cursor, max_bytes)
+    if skipped:
+        logger.warning(f"Skipping {skipped} bytes of {path} to stay under {max_bytes} bytes")
+
+    parts = []
+    for name, start, end in segments:
+        with open(name, "rb") as f:
+            f.seek(start)
+            parts.append(f.read(end - start))
+    data = b"".join(parts)
+
+    # Leave an incomplete last line for the next run
+    offset = current.size
+    if data and not data.endswith(b"\n") and b"\n" in data:
+        end = data.rindex(b"\n") + 1
+        offset -= len(data) - end
+        data = data[:end]
+
+    return LogDelta(
+        text=data.decode("utf-8", errors="replace"),
+        cursor=CursorState(source=source, inode=current.inode, offset=offset),
+        rotated=rotated,
+        skipped_bytes=skipped,
+    )
+
+
+def fetch_journal_delta(
+    ssh: SSHClient,
+    source: str,
+    cursor: Optional[CursorState],
+    unit: Optional[str] = None,
+    initial_lines: int = DEFAULT_JOURNAL_LINES,
+    max_bytes: int = DEFAULT_MAX_BYTES,
+) -> LogDelta:
+    """
+    Fetch journal entries written since the cursor.
+
+    Args:
+        ssh: Connected SSH client
+        source: Cursor source name (e.g. 'journal:sshd')
+        cursor: Previous cursor (None on the first run)
+        unit: Only entries of this systemd unit
+        initial_lines: Entries fetched when there is no (valid) cursor
+        max_bytes: Most bytes of entries kept (newest)
+
+    Returns:
+        LogDelta with the new text and the cursor to store after analysis
+
+    Raises:
+        OSError: If journalctl fails
+    """
+    base = "journalctl --no-pager --quiet -o short-iso --show-cursor"
+    if unit:
+        base += f" -u {shlex.quote(unit)}"
+
+    rotated = False
+    previous = cursor.journal_cursor if cursor else None
+    if previous:
+        success, stdout, stderr = ssh.execute_command(
+            f"{base} --after-cursor={shlex.quote(previous)}"
+        )
+        if not success:
+            # Cursor no longer valid (journal vacuumed); start over
+            logger.info(f"Journal cursor for {source} rejected: {stderr.strip()}")
+            rotated = True
+            previous = None
+    if not previous:
+        success, stdout, stderr = ssh.execute_command(f"{base} -n {int(initial_lines)}")
+        if not success:
+            raise OSError(f"journalctl failed: {stderr.strip()}")
+
+    # Keep entries only: markers such as "-- No entries --" or "-- Boot ... --"
+    # would otherwise make a quiet journal look like it has new lines
+    lines = []
+    new_cursor = previous
+    for line in stdout.splitlines(keepends=True):
+        if line.startswith(JOURNAL_CURSOR_PREFIX):
+            new_cursor = line.strip()[len(JOURNAL_CURSOR_PREFIX):]
+        elif not line.startswith(JOURNAL_MARKER_PREFIX):
+            lines.append(line)
+    text = "".join(lines)
+
+    skipped = 0
+    if len(text) > max_bytes:
+        skipped = len(text) - max_bytes
+        text = text[skipped:]
+        text = text[text.find("\n") + 1:] if "\n" in text else text
+        logger.warning(f"Skipping {skipped} characters of {source} to stay under {max_bytes}")
+
+    return LogDelta(
+        text=text,
+        cursor=CursorState(source=source, journal_cursor=new_cursor),
+        rotated=rotated,
+        skipped_bytes=skipped,
+    )
@@ -0,0 +1,501 @@
+"""Time-series store for host metrics reported with heartbeats.
+
+Samples are kept per (host, metric) in an in-memory head chunk and sealed into
+compressed ``MetricChunk`` rows once the chunk is full or crosses an hour
+boundary. A background thread checkpoints open heads into their (future)
+chunk row every ``HEAD_CHECKPOINT_INTERVAL`` seconds, so a crash or redeploy
+loses at most that much data; sealing then updates the checkpointed row
+instead of adding one. Raw chunks are periodically downsampled into 5-minute
+and hourly avg/min/max tiers, each with its own retention.
+"""
+import calendar
+import logging
+import math
+import re
+import threading
+import time
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import MetricChunk, get_db_context
+from src.utils.timeseries import decode_chunk, encode_chunk
+
+logger = logging.getLogger(__name__)
+
+METRIC_NAME_PATTERN = re.compile(r"^[a-z][a-z0-9_.]{0,49}$")
+MAX_METRICS_PER_HEARTBEAT = 32
+CHUNK_MAX_SAMPLES = 120
+HEAD_ALIGN_SECONDS = 3600  # Raw chunks never span an hour boundary
+HEAD_SWEEP_INTERVAL = 60  # Seconds between sweeps for stale head chunks
+HEAD_CHECKPOINT_INTERVAL = 30  # Seconds between writes of open head chunks
+ROLLUP_GRACE = timedelta(hours=2)  # Let late chunks land before rolling up
+
+AGGREGATES = ("avg", "min", "max")
+
+# resolution_seconds -> (source resolution, rollup group seconds, retention)
+TIERS = {
+    0: (None, None, timedelta(days=7)),
+    300: (0, 3600, timedelta(days=90)),
+    3600: (300, 86400, timedelta(days=730)),
+}
+
+Series = Tuple[List[int], List[float]]
+
+
+def _to_epoch(dt: datetime) -> int:
+    """Convert naive UTC datetime to Unix seconds."""
+    return calendar.timegm(dt.utctimetuple())
+
+
+def _from_epoch(ts: int) -> datetime:
+    """Convert Unix seconds to naive UTC datetime."""
+    return datetime.utcfromtimestamp(ts)
+
+
+def sanitize_metrics(raw: Any) -> Dict[str, float]:
+    """
+    Validate a metrics map reported by a host.
+
+    Invalid names and non-numeric or non-finite values are dropped.
+
+    Args:
+        raw: Decoded JSON value, expected to be a {name: number} mapping
+
+    Returns:
+        Clean {name: float} mapping (possibly empty)
+    """
+    if not isinstance(raw, dict):
+        return {}
+
+    metrics: Dict[str, float] = {}
+    for name, value in raw.items():
+        if len(metrics) >= MAX_METRICS_PER_HEARTBEAT:
+            break
+        if not isinstance(name, str) or not METRIC_NAME_PATTERN.match(name):
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            continue
+        value = float(value)
+        if math.isfinite(value):
+            metrics[name] = value
+
+    return metrics
+
+
+def _make_chunk(
+    host_id: int,
+    metric: str,
+    timestamps: List[int],
+    values: List[float],
+    resolution_seconds: int = 0,
+    aggregate: str = "raw",
+) -> MetricChunk:
+    return MetricChunk(
+        host_id=host_id,
+        metric=metric,
+        resolution_seconds=resolution_seconds,
+        aggregate=aggregate,
+        start_time=_from_epoch(timestamps[0]),
+        end_time=_from_epoch(timestamps[-1]),
+        sample_count=len(timestamps),
+        data=encode_chunk(timestamps, values),
+        rolled_up=False,
+    )
+
+
+class MetricsStore:
+    """Buffers incoming samples and serves range queries."""
+
+    def __init__(
+        self,
+        chunk_max_samples: int = CHUNK_MAX_SAMPLES,
+        checkpoint_interval: float = HEAD_CHECKPOINT_INTERVAL,
+    ):
+        """
+        Initialize metrics store.
+
+        Args:
+            chunk_max_samples: Samples per chunk before it is sealed
+            checkpoint_interval: Seconds between writes of open head chunks
+        """
+        self.chunk_max_samples = chunk_max_samples
+        self.checkpoint_interval = checkpoint_interval
+        self._heads: Dict[Tuple[int, str], Series] = {}
+        # Row id of each head's checkpointed chunk
+        self._head_rows: Dict[Tuple[int, str], int] = {}
+        self._lock = threading.Lock()
+        self._last_sweep = time.monotonic()
+        self._stopping = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def append(
+        self,
+        db: Session,
+        host_id: int,
+        metrics: Dict[str, float],
+        timestamp: datetime,
+    ) -> int:
+        """
+        Append one sample per metric for a host.
+
+        Sealed chunks are written to ``db``; the caller commits. Open heads
+        are checkpointed separately (see ``checkpoint``).
+
+        Args:
+            db: Database session
+            host_id: Host database id
+            metrics: Sanitized {name: value} mapping
+            timestamp: Sample time (naive UTC)
+
+        Returns:
+            Number of samples appended
+        """
+        ts = _to_epoch(timestamp)
+        sealed: List[Tuple[Tuple[int, str], Series, Optional[int]]] = []
+
+        with self._lock:
+            for name, value in metrics.items():
+                key = (host_id, name)
+                head = self._heads.get(key)
+                if head is not None and (
+                    len(head[0]) >= self.chunk_max_samples
+                    or ts // HEAD_ALIGN_SECONDS != head[0][0] // HEAD_ALIGN_SECONDS
+                    or ts < head[0][-1]
+                ):
+                    sealed.append((key, head, self._head_rows.pop(key, None)))
+                    head = None
+                if head is None:
+                    head = ([], [])
+                    self._heads[key] = head
+                head[0].append(ts)
+                head[1].append(value)
+
+            if time.monotonic() - self._last_sweep >= HEAD_SWEEP_INTERVAL:
+                self._last_sweep = time.monotonic()
+                sealed.extend(self._take_stale_heads(ts))
+
+        for key, (timestamps, values), row_id in sealed:
+            _write_chunk(db, key, timestamps, values, row_id)
+
+        return len(metrics)
+
+    def _take_stale_heads(
+        self, now_ts: int
+    ) -> List[Tuple[Tuple[int, str], Series, Optional[int]]]:
+        """Remove heads from previous hours (hosts that stopped reporting)."""
+        current_hour = now_ts // HEAD_ALIGN_SECONDS
+        stale = [
+            key
+            for key, head in self._heads.items()
+            if head[0][-1] // HEAD_ALIGN_SECONDS < current_hour
+        ]
+        return [(key, self._heads.pop(key), self._head_rows.pop(key, None)) for key in stale]
+
+    def checkpoint(self, db: Session) -> int:
+        """
+        Write all open heads into their chunk rows, remembering new row ids.
+
+        The caller commits.
+
+        Returns:
+            Number of heads written
+        """
+        with self._lock:
+            heads = [
+                (key, (list(head[0]), list(head[1])), self._head_rows.get(key))
+                for key, head in self._heads.items()
+            ]
+
+        created = []
+        for key, (timestamps, values), row_id in heads:
+            chunk = _write_chunk(db, key, timestamps, values, row_id)
+            if chunk.id is None:
+                created.append((key, timestamps[0], chunk))
+        if not created:
+            return len(heads)
+
+        db.flush()
+        with self._lock:
+            for key, first_ts, chunk in created:
+                head = self._heads.get(key)
+                if head is not None and head[0][0] == first_ts:
+                    self._head_rows[key] = chunk.id
+                else:
+                    # Sealed meanwhile, and written as its own chunk
+                    db.delete(chunk)
+        return len(heads)
+
+    def _checkpoint_loop(self) -> None:
+        while not self._stopping.wait(self.checkpoint_interval):
+            try:
+                with get_db_context() as db:
+                    self.checkpoint(db)
+            except Exception as e:
+                logger.error(f"Failed to checkpoint metric heads: {e}")
+
+    def start_checkpoints(self) -> threading.Thread:
+        """Checkpoint open heads every ``checkpoint_interval`` seconds in a daemon thread."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        self._stopping.clear()
+        self._thread = threading.Thread(
+            target=self._checkpoint_loop, name="metrics-checkpoint", daemon=True
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop_checkpoints(self) -> None:
+        """Stop the checkpoint thread and wait for a running checkpoint."""
+        self._stopping.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+
+    def flush(self, db: Session) -> int:
+        """
+        Seal all open head chunks (e.g. on shutdown).
+
+        Returns:
+            Number of chunks written
+        """
+        with self._lock:
+            heads, self._heads = self._heads, {}
+            rows, self._head_rows = self._head_rows, {}
+
+        for key, (timestamps, values) in heads.items():
+            _write_chunk(db, key, timestamps, values, rows.get(key))
+
+        return len(heads)
+
+    def list_metrics(self, db: Session, host_id: int) -> List[str]:
+        """Return the metric names recorded for a host."""
+        names = {
+            row[0]
+            for row in db.query(MetricChunk.metric)
+            .filter(MetricChunk.host_id == host_id)
+            .distinct()
+        }
+        with self._lock:
+            names.update(metric for (head_host, metric) in self._heads if head_host == host_id)
+        return sorted(names)
+
+    def query(
+        self,
+        db: Session,
+        host_id: int,
+        metric: str,
+        start: datetime,
+        end: datetime,
+        resolution_seconds: Optional[int] = None,
+        aggregate: str = "avg",
+    ) -> Dict[str, Any]:
+        """
+        Query a metric over a time range.
+
+        Args:
+            db: Database session
+            host_id: Host database id
+            metric: Metric name
+            start: Range start (naive UTC)
+            end: Range end (naive UTC)
+            resolution_seconds: 0 (raw), 300 or 3600; chosen from the range if None
+            aggregate: 'avg', 'min' or 'max' for downsampled tiers
+
+        Returns:
+            Dictionary with resolution, aggregate and [timestamp, value] points
+        """
+        if resolution_seconds is None:
+            span = end - start
+            if span <= timedelta(days=2):
+                resolution_seconds = 0
+            elif span <= timedelta(days=60):
+                resolution_seconds = 300
+            else:
+                resolution_seconds = 3600
+        if resolution_seconds not in TIERS:
+            raise ValueError(f"Unsupported resolution: {resolution_seconds}")
+        if aggregate not in AGGREGATES:
+            raise ValueError(f"Unsupported aggregate: {aggregate}")
+
+        chunk_aggregate = "raw" if resolution_seconds == 0 else aggregate
+        chunks = (
+            db.query(MetricChunk)
+            .filter(MetricChunk.host_id == host_id)
+            .filter(MetricChunk.metric == metric)
+            .filter(MetricChunk.resolution_seconds == resolution_seconds)
+            .filter(MetricChunk.aggregate == chunk_aggregate)
+            .filter(MetricChunk.start_time <= end)
+            .filter(MetricChunk.end_time >= start)
+            .order_by(MetricChunk.start_time)
+            .all()
+        )
+
+        series: List[Series] = [decode_chunk(chunk.data) for chunk in chunks]
+        if resolution_seconds == 0:
+            with self._lock:
+                head = self._heads.get((host_id, metric))
+                if head is not None:
+                    series.append((list(head[0]), list(head[1])))
+
+        start_ts, end_ts = _to_epoch(start), _to_epoch(end)
+        merged: Dict[int, List[float]] = defaultdict(list)
+        for timestamps, values in series:
+            for ts, value in zip(timestamps, values):
+                if start_ts <= ts <= end_ts:
+                    merged[ts].append(value)
+
+        # Overlapping chunks (late data, several API workers) can repeat a timestamp
+        points = [
+            [_from_epoch(ts).isoformat(), _combine(chunk_aggregate, values)]
+            for ts, values in sorted(merged.items())
+        ]
+
+        return {
+            "metric": metric,
+            "resolution_seconds": resolution_seconds,
+            "aggregate": chunk_aggregate,
+            "points": points,
+        }
+
+
+def _write_chunk(
+    db: Session,
+    key: Tuple[int, str],
+    timestamps: List[int],
+    values: List[float],
+    row_id: Optional[int] = None,
+) -> MetricChunk:
+    """Write a raw chunk, updating its checkpointed row if it still exists."""
+    chunk = db.get(MetricChunk, row_id) if row_id is not None else None
+    if chunk is not None and (
+        (chunk.host_id, chunk.metric, chunk.resolution_seconds) != (key[0], key[1], 0)
+    ):
+        # The checkpoint was rolled back and its row id reused by another series
+        chunk = None
+    if chunk is None:
+        chunk = _make_chunk(key[0], key[1], timestamps, values)
+        db.add(chunk)
+        return chunk
+    chunk.end_time = _from_epoch(timestamps[-1])
+    chunk.sample_count = len(timestamps)
+    chunk.data = encode_chunk(timestamps, values)
+    return chunk
+
+
+def _combine(aggregate: str, values: List[float]) -> float:
+    if aggregate == "min":
+        return min(values)
+    if aggregate == "max":
+        return max(values)
+    return sum(values) / len(values)
+
+
+def _rollup_group(
+    source_aggregate: str,
+    series: Iterable[Series],
+    resolution_seconds: int,
+) -> Dict[str, Series]:
+    """Bucket samples from one group of source chunks into rollup series."""
+    buckets: Dict[int, List[float]] = defaultdict(list)
+    for timestamps, values in series:
+        for ts, value in zip(timestamps, values):
+            buckets[ts - ts % resolution_seconds].append(value)
+
+    ordered = sorted(buckets)
+    if source_aggregate == "raw":
+        targets = AGGREGATES
+    else:
+        targets = (source_aggregate,)
+
+    return {
+        target: (ordered, [_combine(target, buckets[ts]) for ts in ordered])
+        for target in targets
+    }
+
+
+def downsample_metrics(db: Session, now: Optional[datetime] = None) -> Dict[str, int]:
+    """
+    Roll up completed periods into coarser tiers and apply retention.
+
+    Args:
+        db: Database session
+        now: Current time (naive UTC)
+
+    Returns:
+        Counts of chunks rolled up, created and deleted
+    """
+    now = now or datetime.utcnow()
+    stats = {"rolled_up": 0, "created": 0, "deleted": 0}
+
+    for resolution_seconds, (source_resolution, group_seconds, _) in sorted(TIERS.items()):
+        if source_resolution is None:
+            continue
+
+        cutoff_ts = _to_epoch(now - ROLLUP_GRACE)
+        cutoff = _from_epoch(cutoff_ts - cutoff_ts % group_seconds)
+
+        sources = (
+            db.query(MetricChunk)
+            .filter(MetricChunk.resolution_seconds == source_resolution)
+            .filter(MetricChunk.rolled_up.is_(False))
+            .filter(MetricChunk.end_time < cutoff)
+            .all()
+        )
+
+        groups: Dict[Tuple[int, str, str, int], List[MetricChunk]] = defaultdict(list)
+        for chunk in sources:
+            group_start = _to_epoch(chunk.start_time)
+            group_start -= group_start % group_seconds
+            groups[(chunk.host_id, chunk.metric, chunk.aggregate, group_start)].append(chunk)
+
+        for (host_id, metric, source_aggregate, _), chunks in groups.items():
+            rollups = _rollup_group(
+                source_aggregate,
+                (decode_chunk(chunk.data) for chunk in chunks),
+                resolution_seconds,
+            )
+            for target, (timestamps, values) in rollups.items():
+                if timestamps:
+                    db.add(
+                        _make_chunk(
+                            host_id, metric, timestamps, values,
+                            resolution_seconds=resolution_seconds,
+                            aggregate=target,
+                        )
+                    )
+                    stats["created"] += 1
+            for chunk in chunks:
+                chunk.rolled_up = True
+            stats["rolled_up"] += len(chunks)
+
+        db.flush()
+
+    for resolution_seconds, (_, _, retention) in TIERS.items():
+        stats["deleted"] += (
+            db.query(MetricChunk)
+            .filter(MetricChunk.resolution_seconds == resolution_seconds)
+            .filter(MetricChunk.end_time < now - retention)
+            .delete(synchronize_session=False)
+        )
+
+    logger.info(
+        f"Metric downsampling: {stats['rolled_up']} chunks rolled up, "
+        f"{stats['created']} created, {stats['deleted']} deleted"
+    )
+    return stats
+
+
+# Global store instance for the API process
+_metrics_store: Optional[MetricsStore] = None
+
+
+def get_metrics_store() -> MetricsStore:
+    """Get or create the process-wide MetricsStore."""
+    global _metrics_store
+    if _metrics_store is None:
+        _metrics_store = MetricsStore()
+    return _metrics_store
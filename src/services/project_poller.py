@@ -1,155 +1,841 @@
-"""Project service health check polling."""
+"""Project service health check polling.
+
+Each enabled ``ProjectService`` is scheduled independently at its own
+``poll_frequency_seconds`` (with jitter) on a single asyncio event loop.
+Requests share one pooled ``httpx.AsyncClient`` and run under a concurrency
+limit, so a slow endpoint only ever occupies one slot for at most its own
+``timeout_seconds`` and never delays the other services. Besides HTTP, TCP
+connect, TLS certificate and DNS checks run on the same engine (see
+``check_executors``).
+
+Each service also has a circuit breaker. Once it is ``unhealthy`` the circuit
+opens and checks back off exponentially (up to PROJECT_POLL_MAX_BACKOFF_SECONDS);
+when the backoff expires a single half-open probe is sent, and the first
+successful check closes the circuit again. A failure alert is sent once, when
+the circuit opens, not for every failed probe.
+
+Results are not written one by one: the engine collects them for
+PROJECT_POLL_WRITE_INTERVAL seconds and persists each batch of health checks
+and service updates in a single transaction.
+"""
 from __future__ import annotations
 
+import asyncio
+import codecs
+import heapq
 import json
 import logging
+import random
 import re
+import threading
 import time
-from datetime import datetime
-from typing import Optional
+from dataclasses import dataclass, replace
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Pattern, Set, Tuple
 
-import requests
-from requests import Response
+import httpx
+
+from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import Session
 
+from src.config import get_settings
 from src.database import ProjectService, ServiceHealthCheck, get_db_context
 from src.services.alert_service import get_alert_service
+from src.services.check_executors import check_type, get_executor
+from src.services.response_store import attach_response_body
+from src.services.service_slo import get_service_stats_recorder
 
 logger = logging.getLogger(__name__)
 
+USER_AGENT = "NetworkMonitoringProjectPoller/1.0"
+# How often service definitions are reloaded from the database
+RELOAD_INTERVAL_SECONDS = 60
+# How often in-memory latency statistics are written to the database
+STATS_FLUSH_INTERVAL_SECONDS = 60
+# Lower bound on per-service polling frequency
+MIN_POLL_FREQUENCY_SECONDS = 5
+# Characters of the response body stored with each check
+MAX_STORED_BODY = 1000
+# Bytes read per response when the service does not set max_response_bytes
+DEFAULT_MAX_RESPONSE_BYTES = 1024 * 1024
+# Longest pattern match guaranteed to be found across chunk boundaries
+PATTERN_OVERLAP_CHARS = 4096
+# Most results persisted in one transaction
+MAX_WRITE_BATCH = 500
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+@dataclass(frozen=True)
+class PollTarget:
+    """Detached snapshot of a ProjectService's polling configuration."""
+
+    id: int
+    project_name: str
+    service_name: str
+    endpoint_url: str
+    endpoint_type: str
+    poll_frequency_seconds: int
+    timeout_seconds: int
+    expected_status_code: int
+    expected_response_pattern: Optional[str] = None
+    auth_type: Optional[str] = None
+    auth_config: Optional[str] = None
+    max_response_bytes: int = DEFAULT_MAX_RESPONSE_BYTES
+    check_config: Optional[str] = None
+    circuit_state: str = CIRCUIT_CLOSED
+    next_check_at: Optional[datetime] = None
+
+    @classmethod
+    def from_service(cls, service: ProjectService) -> "PollTarget":
+        """Build a target from a database row."""
+        return cls(
+            id=service.id,
+            project_name=service.project_name,
+            service_name=service.service_name,
+            endpoint_url=service.endpoint_url,
+            endpoint_type=service.endpoint_type or "http",
+            poll_frequency_seconds=service.poll_frequency_seconds or 300,
+            timeout_seconds=service.timeout_seconds or 10,
+            expected_status_code=service.expected_status_code or 200,
+            expected_response_pattern=service.expected_response_pattern,
+            auth_type=service.auth_type,
+            auth_config=service.auth_config,
+            max_response_bytes=service.max_response_bytes or DEFAULT_MAX_RESPONSE_BYTES,
+            check_config=service.check_config,
+            circuit_state=service.circuit_state or CIRCUIT_CLOSED,
+            next_check_at=service.next_check_at,
+        )
+
+    @property
+    def label(self) -> str:
+        return f"{self.project_name}/{self.service_name}"
+
+
+@dataclass
+class PollResult:
+    """Outcome of a single health check, ready to be persisted."""
+
+    service_id: int
+    timestamp: datetime
+    status: str
+    response_time_ms: Optional[int] = None
+    status_code: Optional[int] = None
+    error_message: Optional[str] = None
+    response_body: Optional[str] = None
+
+
+@dataclass
+class _Outcome:
+    """A result applied to its service, pending commit."""
+
+    target: PollTarget
+    result: PollResult
+    service: ProjectService
+    check: ServiceHealthCheck
+    next_check_at: Optional[datetime]
+    recovered: bool
+    alert: bool
+
+
+def _request_options(target: PollTarget) -> Dict[str, Any]:
+    """Build headers/auth for a target's request."""
+    headers: Dict[str, str] = {}
+    auth = None
+
+    if target.auth_type and target.auth_config:
+        try:
+            cfg = json.loads(target.auth_config)
+        except json.JSONDecodeError:
+            cfg = {}
+
+        if target.auth_type == "bearer":
+            headers["Authorization"] = f"Bearer {cfg.get('token', '')}"
+        elif target.auth_type == "api_key":
+            header_name = cfg.get("header", "X-API-Key")
+            headers[header_name] = cfg.get("token", "")
+        elif target.auth_type == "basic":
+            auth = (cfg.get("username") or "", cfg.get("password") or "")
+
+    return {"headers": headers, "auth": auth}
+
+
+@lru_cache(maxsize=256)
+def compile_pattern(pattern: str) -> Pattern[str]:
+    """Compile (and cache) an expected-response pattern."""
+    return re.compile(pattern, re.IGNORECASE)
+
+
+class StreamMatcher:
+    """
+    Incremental regex search over a text stream.
+
+    Each chunk is searched together with the tail of the previous text, so
+    matches up to ``overlap`` characters long are found even when they span a
+    chunk boundary.
+    """
+
+    def __init__(self, pattern: Pattern[str], overlap: int = PATTERN_OVERLAP_CHARS):
+        self.pattern = pattern
+        self.overlap = overlap
+        self.matched = False
+        self._tail = ""
+
+    def feed(self, text: str) -> bool:
+        """Search the next piece of text; returns True once the pattern matched."""
+        if self.matched or not text:
+            return self.matched
+        window = self._tail + text
+        if self.pattern.search(window):
+            self.matched = True
+            self._tail = ""
+        else:
+            self._tail = window[-self.overlap:]
+        return self.matched
+
+
+def _text_decoder(response: httpx.Response) -> codecs.IncrementalDecoder:
+    try:
+        factory = codecs.getincrementaldecoder(response.charset_encoding or "utf-8")
+    except LookupError:
+        factory = codecs.getincrementaldecoder("utf-8")
+    return factory(errors="replace")
+
+
+async def _read_response(response: httpx.Response, target: PollTarget, result: PollResult) -> None:
+    """
+    Read as much of a streamed response as is needed for the verdict.
+
+    Only the first MAX_STORED_BODY characters are kept. When a pattern is
+    configured the body is scanned incrementally up to the service's byte cap
+    and reading stops as soon as the pattern matches.
+    """
+    result.status_code = response.status_code
+    status_ok = response.status_code == target.expected_status_code
+    pattern = None
+    if status_ok and target.expected_response_pattern:
+        pattern = compile_pattern(target.expected_response_pattern)
+
+    decoder = _text_decoder(response)
+    matcher = StreamMatcher(pattern) if pattern else None
+    stored: List[str] = []
+    stored_chars = 0
+    bytes_read = 0
+
+    async for chunk in response.aiter_bytes():
+        bytes_read += len(chunk)
+        if bytes_read > target.max_response_bytes:
+            chunk = chunk[: len(chunk) - (bytes_read - target.max_response_bytes)]
+        text = decoder.decode(chunk)
+
+        if stored_chars < MAX_STORED_BODY:
+            stored.append(text[: MAX_STORED_BODY - stored_chars])
+            stored_chars += len(stored[-1])
+
+        if matcher is None:
+            if stored_chars >= MAX_STORED_BODY:
+                break
+        elif matcher.feed(text):
+            break
+
+        if bytes_read >= target.max_response_bytes:
+            break
+
+    result.response_body = "".join(stored)
+
+    if not status_ok:
+        result.error_message = f"Unexpected status: {response.status_code}"
+    elif matcher is not None and not matcher.matched:
+        if bytes_read >= target.max_response_bytes:
+            result.error_message = (
+                f"Response pattern not found in first {target.max_response_bytes} bytes"
+            )
+        else:
+            result.error_message = "Response pattern mismatch"
+    else:
+        result.status = "success"
+
+
+async def check_target(client: httpx.AsyncClient, target: PollTarget) -> PollResult:
+    """
+    Perform one health check against a target.
+
+    HTTP responses are streamed: at most ``max_response_bytes`` are read and
+    the connection is released as soon as the verdict is known. Other check
+    types are delegated to their executor. The whole check (connect, request
+    and body) is bounded by the target's ``timeout_seconds``.
+
+    Args:
+        client: Shared async HTTP client
+        target: Service to check
+
+    Returns:
+        PollResult describing the outcome
+    """
+    result = PollResult(
+        service_id=target.id,
+        timestamp=datetime.utcnow(),
+        status="failure",
+    )
+    kind = check_type(target.endpoint_type, target.endpoint_url)
+    method = "POST" if target.endpoint_type.lower() == "post" else "GET"
+
+    async def exchange() -> None:
+        async with client.stream(
+            method,
+            target.endpoint_url,
+            timeout=target.timeout_seconds,
+            **_request_options(target),
+        ) as response:
+            await _read_response(response, target, result)
+
+    if kind == "http":
+        check = exchange()
+    else:
+        executor = get_executor(kind)
+        if executor is None:
+            result.error_message = f"Unsupported check type: {kind}"
+            return result
+        check = executor(target, result)
+
+    start = time.monotonic()
+    try:
+        await asyncio.wait_for(check, timeout=target.timeout_seconds)
+    except (asyncio.TimeoutError, httpx.TimeoutException):
+        result.status = "timeout"
+        result.error_message = f"Timed out after {target.timeout_seconds}s"
+    except re.error as exc:
+        result.status = "failure"
+        result.error_message = f"Invalid response pattern: {exc}"
+    except (httpx.HTTPError, httpx.InvalidURL, OSError, ValueError) as exc:  # network/config errors
+        result.status = "failure"
+        result.error_message = str(exc) or exc.__class__.__name__
+    except Exception as exc:  # pylint: disable=broad-except
+        # Still a failed check: it must count towards alerts and backoff
+        logger.exception("Unexpected error checking %s: %s", target.label, exc)
+        result.status = "failure"
+        result.error_message = f"{exc.__class__.__name__}: {exc}"
+    finally:
+        # Executors report their own timing (e.g. connect time) when they succeed
+        if result.response_time_ms is None or result.status != "success":
+            result.response_time_ms = int((time.monotonic() - start) * 1000)
+
+    return result
+
+
+def next_due(due: float, now: float, frequency: float, jitter: float = 0.0) -> float:
+    """
+    Compute the next run time for a service.
+
+    Runs stay on the service's own cadence; if the engine fell behind (e.g.
+    after a long pause) the next run is scheduled from ``now`` instead of
+    firing a burst of catch-up checks.
+
+    Args:
+        due: Time the current run was due (loop clock)
+        now: Current time (loop clock)
+        frequency: Polling frequency in seconds
+        jitter: Relative jitter applied to the interval (0.1 = +/-10%)
+
+    Returns:
+        Next due time (loop clock)
+    """
+    interval = max(frequency, MIN_POLL_FREQUENCY_SECONDS)
+    if jitter:
+        interval *= 1 + random.uniform(-jitter, jitter)
+    following = due + interval
+    if following <= now:
+        following = now + interval
+    return following
+
+
+def circuit_backoff(
+    frequency: float,
+    consecutive_failures: int,
+    alert_threshold: int,
+    max_backoff: float,
+) -> float:
+    """
+    Delay before the next check of a service with an open circuit.
+
+    Doubles with every failure past the alert threshold, starting at twice the
+    normal frequency, and is capped at ``max_backoff`` (but never shorter than
+    the normal frequency).
+
+    Args:
+        frequency: Normal polling frequency in seconds
+        consecutive_failures: Failures so far, including the latest
+        alert_threshold: Failures at which the service became unhealthy
+        max_backoff: Upper bound in seconds
+
+    Returns:
+        Delay in seconds
+    """
+    exponent = max(consecutive_failures - alert_threshold + 1, 1)
+    delay = frequency * 2 ** min(exponent, 32)
+    return max(min(delay, max_backoff), frequency)
+
 
 class ProjectPollerService:
     """Polls configured project services and records their health."""
 
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            "User-Agent": "NetworkMonitoringProjectPoller/1.0",
-            "Accept": "application/json, */*",
-        })
+    def __init__(
+        self,
+        max_concurrency: Optional[int] = None,
+        jitter: Optional[float] = None,
+    ):
+        """
+        Initialize project poller.
+
+        Args:
+            max_concurrency: Maximum checks in flight (default: PROJECT_POLL_MAX_CONCURRENCY)
+            jitter: Relative interval jitter (default: PROJECT_POLL_JITTER)
+        """
+        settings = get_settings()
+        self.max_concurrency = max_concurrency or settings.project_poll_max_concurrency
+        self.jitter = settings.project_poll_jitter if jitter is None else jitter
+        self.max_backoff = settings.project_poll_max_backoff_seconds
+        self.write_interval = settings.project_poll_write_interval
         self.alert_service = get_alert_service()
+        self.stats = get_service_stats_recorder()
 
-    def poll_all_services(self) -> None:
-        """Poll all enabled project services."""
-        logger.info("Polling all project services")
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._stopping: Optional[asyncio.Event] = None
+        self._thread: Optional[threading.Thread] = None
+        self._results: Optional[asyncio.Queue] = None
+        # Loop time before which a service with an open circuit is not checked
+        self._gates: Dict[int, float] = {}
 
+    def _client(self) -> httpx.AsyncClient:
+        return httpx.AsyncClient(
+            headers={
+                "User-Agent": USER_AGENT,
+                "Accept": "application/json, */*",
+            },
+            limits=httpx.Limits(
+                max_connections=self.max_concurrency,
+                max_keepalive_connections=self.max_concurrency,
+            ),
+        )
+
+    def load_targets(self) -> Dict[int, PollTarget]:
+        """Load enabled services as detached poll targets."""
         with get_db_context() as db:
             services = (
                 db.query(ProjectService)
                 .filter(ProjectService.enabled.is_(True))
                 .all()
             )
+            return {service.id: PollTarget.from_service(service) for service in services}
 
-            for service in services:
-                try:
-                    check = self.poll_service(service, db)
-                    db.add(check)
-                    db.commit()
-                except Exception as exc:  # pylint: disable=broad-except
-                    logger.exception(
-                        "Failed to poll service %s/%s: %s",
-                        service.project_name,
-                        service.service_name,
-                        exc,
-                    )
-                    db.rollback()
+    # ------------------------------------------------------------------
+    # Engine
+    # ------------------------------------------------------------------
 
-        logger.info("Project service polling complete")
+    async def run(self) -> None:
+        """Run the polling engine until stop() is called."""
+        loop = asyncio.get_running_loop()
+        self._loop = loop
+        self._stopping = asyncio.Event()
+        self._results = asyncio.Queue()
+        semaphore = asyncio.Semaphore(self.max_concurrency)
+        writer = asyncio.create_task(self._write_results(self._results))
+
+        targets: Dict[int, PollTarget] = {}
+        schedule: List[Tuple[float, int]] = []
+        scheduled: Set[int] = set()
+        in_flight: Dict[int, asyncio.Task] = {}
+        next_reload = loop.time()
+        next_stats_flush = loop.time() + STATS_FLUSH_INTERVAL_SECONDS
 
-    def poll_service(self, service: ProjectService, db: Session) -> ServiceHealthCheck:
-        """Poll a single service and return the recorded health check."""
         logger.info(
-            "Polling %s/%s", service.project_name, service.service_name
+            "Project poller engine started (max concurrency %d)", self.max_concurrency
         )
 
-        check = ServiceHealthCheck(
-            service_id=service.id,
-            timestamp=datetime.utcnow(),
-        )
+        async with self._client() as client:
+            while not self._stopping.is_set():
+                now = loop.time()
+
+                if now >= next_reload:
+                    try:
+                        targets = await asyncio.to_thread(self.load_targets)
+                    except Exception as exc:  # pylint: disable=broad-except
+                        logger.error("Failed to load project services: %s", exc)
+                    else:
+                        self._sync_gates(targets, now)
+                    for service_id, target in targets.items():
+                        if service_id not in scheduled:
+                            # Spread first checks over one interval
+                            first = now + random.uniform(0, target.poll_frequency_seconds)
+                            heapq.heappush(schedule, (first, service_id))
+                            scheduled.add(service_id)
+                    next_reload = now + RELOAD_INTERVAL_SECONDS
 
-        start = time.monotonic()
+                if now >= next_stats_flush:
+                    await asyncio.to_thread(self.flush_stats)
+                    next_stats_flush = now + STATS_FLUSH_INTERVAL_SECONDS
+
+                while schedule and schedule[0][0] <= now:
+                    due, service_id = heapq.heappop(schedule)
+                    target = targets.get(service_id)
+                    if target is None:
+                        # Disabled or deleted since it was scheduled
+                        scheduled.discard(service_id)
+                        continue
+
+                    gate = self._gates.get(service_id)
+                    if gate is not None and now < gate:
+                        # Circuit open: wait for the backoff to expire
+                        heapq.heappush(schedule, (gate, service_id))
+                        continue
+
+                    if service_id in in_flight:
+                        logger.debug("Skipping %s: previous check still running", target.label)
+                    else:
+                        if gate is not None:
+                            del self._gates[service_id]
+                            target = await self._half_open(target)
+                        task = asyncio.create_task(self._poll(client, semaphore, target))
+                        in_flight[service_id] = task
+                        task.add_done_callback(
+                            lambda _, sid=service_id: in_flight.pop(sid, None)
+                        )
+
+                    heapq.heappush(
+                        schedule,
+                        (next_due(due, now, target.poll_frequency_seconds, self.jitter), service_id),
+                    )
+
+                wake_at = min(next_reload, next_stats_flush)
+                if schedule:
+                    wake_at = min(wake_at, schedule[0][0])
+                try:
+                    await asyncio.wait_for(
+                        self._stopping.wait(), timeout=max(wake_at - loop.time(), 0)
+                    )
+                except asyncio.TimeoutError:
+                    pass
+
+            if in_flight:
+                await asyncio.gather(*in_flight.values(), return_exceptions=True)
+
+        writer.cancel()
+        self.flush_stats()
+        logger.info("Project poller engine stopped")
+
+    def _sync_gates(self, targets: Dict[int, PollTarget], now: float) -> None:
+        """Rebuild circuit gates from persisted state (e.g. after a restart)."""
+        utcnow = datetime.utcnow()
+        gates = {}
+        for service_id, target in targets.items():
+            if target.circuit_state == CIRCUIT_OPEN and target.next_check_at:
+                delay = (target.next_check_at - utcnow).total_seconds()
+                gates[service_id] = now + max(delay, 0.0)
+        self._gates = gates
+
+    async def _half_open(self, target: PollTarget) -> PollTarget:
+        """
+        Mark a service's circuit half-open and return its probe target.
+
+        The probe keeps the service's own timeout_seconds: a shorter one would
+        keep the circuit of a slow but healthy service open forever.
+        """
+        logger.info("Sending half-open probe to %s", target.label)
         try:
-            response = self._perform_request(service)
-            elapsed_ms = int((time.monotonic() - start) * 1000)
-            check.response_time_ms = elapsed_ms
-            check.status_code = response.status_code
-            check.response_body = response.text[:1000]
-
-            if response.status_code != service.expected_status_code:
-                check.status = "failure"
-                check.error_message = (
-                    f"Unexpected status: {response.status_code}"
+            await asyncio.to_thread(self._set_circuit_state, target.id, CIRCUIT_HALF_OPEN)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Failed to update circuit state for %s: %s", target.label, exc)
+        return replace(target, circuit_state=CIRCUIT_HALF_OPEN)
+
+    async def _poll(
+        self,
+        client: httpx.AsyncClient,
+        semaphore: asyncio.Semaphore,
+        target: PollTarget,
+    ) -> None:
+        """Check one target, wait for its result to be written and apply circuit backoff."""
+        try:
+            async with semaphore:
+                result = await check_target(client, target)
+            if self._results is None:
+                next_check_at = await asyncio.to_thread(self.record_result, target, result)
+            else:
+                written = asyncio.get_running_loop().create_future()
+                self._results.put_nowait((target, result, written))
+                next_check_at = await written
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.exception("Failed to poll service %s: %s", target.label, exc)
+            return
+
+        if next_check_at is None:
+            self._gates.pop(target.id, None)
+        elif self._loop is not None:
+            delay = (next_check_at - datetime.utcnow()).total_seconds()
+            self._gates[target.id] = self._loop.time() + max(delay, 0.0)
+
+    async def _write_results(self, queue: asyncio.Queue) -> None:
+        """Persist queued results in batches, one transaction per batch."""
+        while True:
+            batch = [await queue.get()]
+            # Let the rest of the round (or time slice) finish
+            await asyncio.sleep(self.write_interval)
+            while not queue.empty() and len(batch) < MAX_WRITE_BATCH:
+                batch.append(queue.get_nowait())
+
+            try:
+                written = await asyncio.to_thread(
+                    self.record_results, [(target, result) for target, result, _ in batch]
                 )
-                self._mark_failure(service, check, db)
-            elif (
-                service.expected_response_pattern
-                and not re.search(
-                    service.expected_response_pattern,
-                    response.text,
-                    re.IGNORECASE,
+            except Exception as exc:  # pylint: disable=broad-except
+                for _, _, future in batch:
+                    if not future.done():
+                        future.set_exception(exc)
+                continue
+
+            for (_, _, future), next_check_at in zip(batch, written):
+                if not future.done():
+                    future.set_result(next_check_at)
+
+    def start_background(self) -> threading.Thread:
+        """Run the engine in a daemon thread with its own event loop."""
+        if self._thread and self._thread.is_alive():
+            return self._thread
+
+        self._thread = threading.Thread(
+            target=lambda: asyncio.run(self.run()),
+            name="project-poller",
+            daemon=True,
+        )
+        self._thread.start()
+        return self._thread
+
+    def stop(self) -> None:
+        """Ask the engine to stop (safe to call from any thread)."""
+        if self._loop and self._stopping and not self._loop.is_closed():
+            self._loop.call_soon_threadsafe(self._stopping.set)
+
+    def poll_all_services(self) -> None:
+        """Poll all enabled project services once, concurrently."""
+        logger.info("Polling all project services")
+
+        async def _check_all(targets: List[PollTarget]) -> List[Any]:
+            semaphore = asyncio.Semaphore(self.max_concurrency)
+
+            async def check(target: PollTarget) -> PollResult:
+                async with semaphore:
+                    return await check_target(client, target)
+
+            async with self._client() as client:
+                return await asyncio.gather(
+                    *(check(target) for target in targets), return_exceptions=True
                 )
-            ):
-                check.status = "failure"
-                check.error_message = "Response pattern mismatch"
-                self._mark_failure(service, check, db)
+
+        targets = list(self.load_targets().values())
+        items = []
+        for target, result in zip(targets, asyncio.run(_check_all(targets))):
+            if isinstance(result, BaseException):
+                logger.error("Failed to poll service %s: %s", target.label, result)
             else:
-                check.status = "success"
-                self._mark_success(service, db)
-        except requests.Timeout:
-            check.status = "timeout"
-            check.error_message = (
-                f"Timed out after {service.timeout_seconds}s"
+                items.append((target, result))
+
+        # The whole round is written in one transaction
+        self.record_results(items)
+        self.flush_stats()
+
+        logger.info("Project service polling complete")
+
+    # ------------------------------------------------------------------
+    # Persistence
+    # ------------------------------------------------------------------
+
+    def record_result(self, target: PollTarget, result: PollResult) -> Optional[datetime]:
+        """
+        Store a single health check and update service and circuit state.
+
+        Args:
+            target: Target the result belongs to
+            result: Check outcome
+
+        Returns:
+            Time of the next allowed check if the circuit is open, else None
+        """
+        return self.record_results([(target, result)])[0]
+
+    def record_results(
+        self, items: List[Tuple[PollTarget, PollResult]]
+    ) -> List[Optional[datetime]]:
+        """
+        Store health checks and update service and circuit state in one transaction.
+
+        A result that cannot be applied is logged and skipped without affecting
+        the others. If the commit itself fails, the results are retried one
+        transaction each so a single bad row cannot lose the whole batch.
+        Alerts are sent after the transaction commits.
+
+        Args:
+            items: (target, result) pairs
+
+        Returns:
+            For each item, the time of the next allowed check if its circuit is
+            open, else None
+        """
+        if not items:
+            return []
+
+        try:
+            with get_db_context() as db:
+                ids = {target.id for target, _ in items}
+                services = {
+                    service.id: service
+                    for service in db.query(ProjectService).filter(ProjectService.id.in_(ids))
+                }
+                outcomes = [
+                    self._apply_result(db, services.get(target.id), target, result)
+                    for target, result in items
+                ]
+                db.commit()
+
+                logger.debug("Recorded %d project service results", len(items))
+                for outcome in outcomes:
+                    if outcome is not None:
+                        self._after_commit(outcome)
+        except SQLAlchemyError as exc:
+            if len(items) == 1:
+                raise
+            logger.warning(
+                "Writing %d results failed (%s); retrying individually", len(items), exc
             )
-            self._mark_failure(service, check, db)
-        except requests.RequestException as exc:  # network errors
-            check.status = "failure"
-            check.error_message = str(exc)
-            self._mark_failure(service, check, db)
-        finally:
+            written: List[Optional[datetime]] = []
+            for target, result in items:
+                try:
+                    written.extend(self.record_results([(target, result)]))
+                except SQLAlchemyError as item_exc:
+                    logger.error("Failed to record result for %s: %s", target.label, item_exc)
+                    written.append(None)
+            return written
+
+        return [outcome.next_check_at if outcome else None for outcome in outcomes]
+
+    def _apply_result(
+        self,
+        db: Session,
+        service: Optional[ProjectService],
+        target: PollTarget,
+        result: PollResult,
+    ) -> Optional[_Outcome]:
+        """Add a result's health check and update its service (no commit)."""
+        if service is None:
+            logger.debug("Service %s was deleted; dropping result", target.label)
+            return None
+
+        check = ServiceHealthCheck(
+            service_id=service.id,
+            timestamp=result.timestamp,
+            status=result.status,
+            response_time_ms=result.response_time_ms,
+            status_code=result.status_code,
+            error_message=result.error_message,
+        )
+        try:
+            attach_response_body(db, service, check, result.response_body)
+
+            recovered = alert = False
+            if result.status == "success":
+                recovered = self._mark_success(service)
+            else:
+                alert = self._mark_failure(service, check)
+
             service.last_checked = datetime.utcnow()
+            self._update_circuit(service)
+            db.add(check)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Failed to apply result for %s: %s", target.label, exc)
+            # Discard this service's unflushed changes; the rest of the batch stands
+            db.expire(service)
+            if check in db:
+                db.expunge(check)
+            return None
 
-        return check
+        return _Outcome(
+            target=target,
+            result=result,
+            service=service,
+            check=check,
+            next_check_at=service.next_check_at,
+            recovered=recovered,
+            alert=alert,
+        )
+
+    def _after_commit(self, outcome: _Outcome) -> None:
+        """Record statistics and send alerts for a committed result (never raises)."""
+        result = outcome.result
+        self.stats.record(
+            outcome.target.id,
+            result.timestamp,
+            result.status == "success",
+            result.response_time_ms,
+        )
+        try:
+            if outcome.recovered:
+                self.alert_service.project_service_recovered_alert(outcome.service)
+            elif outcome.alert:
+                self.alert_service.project_service_failure_alert(outcome.service, outcome.check)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Failed to send alert for %s: %s", outcome.target.label, exc)
 
-    def _perform_request(self, service: ProjectService) -> Response:
-        """Execute an HTTP request based on service configuration."""
-        headers = {}
-        auth = None
+    def _update_circuit(self, service: ProjectService) -> None:
+        """Open, extend or close the circuit after a check."""
+        if service.status != "unhealthy":
+            if service.circuit_state not in (None, CIRCUIT_CLOSED):
+                logger.info(
+                    "Circuit closed for %s/%s", service.project_name, service.service_name
+                )
+            service.circuit_state = CIRCUIT_CLOSED
+            service.next_check_at = None
+            return
 
-        if service.auth_type and service.auth_config:
-            try:
-                cfg = json.loads(service.auth_config)
-            except json.JSONDecodeError:
-                cfg = {}
-
-            if service.auth_type == "bearer":
-                headers["Authorization"] = f"Bearer {cfg.get('token', '')}"
-            elif service.auth_type == "api_key":
-                header_name = cfg.get("header", "X-API-Key")
-                headers[header_name] = cfg.get("token", "")
-            elif service.auth_type == "basic":
-                auth = (cfg.get("username"), cfg.get("password"))
-
-        method = "get"
-        if service.endpoint_type.lower() == "post":
-            method = "post"
-
-        request = getattr(self.session, method)
-        response = request(
-            service.endpoint_url,
-            headers=headers,
-            timeout=service.timeout_seconds,
-            auth=auth,
+        delay = circuit_backoff(
+            service.poll_frequency_seconds,
+            service.consecutive_failures,
+            service.alert_threshold,
+            self.max_backoff,
         )
-        return response
+        if self.jitter:
+            delay *= 1 + random.uniform(0, self.jitter)
+        if service.circuit_state != CIRCUIT_OPEN:
+            logger.info(
+                "Circuit open for %s/%s; next check in %ds",
+                service.project_name,
+                service.service_name,
+                delay,
+            )
+        service.circuit_state = CIRCUIT_OPEN
+        service.next_check_at = service.last_checked + timedelta(seconds=delay)
 
-    def _mark_success(self, service: ProjectService, db: Session) -> None:
-        """Handle successful check state updates and recovery alerts."""
+    def _set_circuit_state(self, service_id: int, state: str) -> None:
+        with get_db_context() as db:
+            service = db.query(ProjectService).filter(ProjectService.id == service_id).first()
+            if service is not None:
+                service.circuit_state = state
+
+    def flush_stats(self) -> None:
+        """Persist in-memory latency/availability statistics."""
+        try:
+            with get_db_context() as db:
+                written = self.stats.flush(db)
+            logger.debug("Flushed latency statistics for %d buckets", written)
+        except Exception as exc:  # pylint: disable=broad-except
+            logger.error("Failed to flush latency statistics: %s", exc)
+
+    def _mark_success(self, service: ProjectService) -> bool:
+        """Update state after a successful check; returns True on recovery."""
         send_recovery = service.status == "unhealthy"
         service.status = "healthy"
         service.consecutive_failures = 0
         service.last_error = None
-        db.add(service)
-        db.flush()
 
         if send_recovery:
             logger.info(
@@ -157,21 +843,18 @@ class ProjectPollerService:
                 service.project_name,
                 service.service_name,
             )
-            self.alert_service.project_service_recovered_alert(service)
+        return send_recovery
 
-    def _mark_failure(
-        self, service: ProjectService, check: ServiceHealthCheck, db: Session
-    ) -> None:
-        """Handle a failed health check and alerting logic."""
-        service.consecutive_failures += 1
+    def _mark_failure(self, service: ProjectService, check: ServiceHealthCheck) -> bool:
+        """Update state after a failed check; returns True when it becomes unhealthy."""
+        was_unhealthy = service.status == "unhealthy"
+        service.consecutive_failures = (service.consecutive_failures or 0) + 1
         service.status = (
             "unhealthy"
             if service.consecutive_failures >= service.alert_threshold
             else "degraded"
         )
         service.last_error = check.error_message
-        db.add(service)
-        db.flush()
 
         if service.status == "unhealthy":
             logger.warning(
@@ -180,9 +863,17 @@ class ProjectPollerService:
                 service.service_name,
                 check.error_message,
             )
-            self.alert_service.project_service_failure_alert(service, check)
+            return not was_unhealthy
+        return False
+
+
+# Global poller instance for the scheduler process
+_project_poller: Optional[ProjectPollerService] = None
 
 
 def get_project_poller() -> ProjectPollerService:
     """Return singleton poller instance."""
-    return ProjectPollerService()
+    global _project_poller
+    if _project_poller is None:
+        _project_poller = ProjectPollerService()
+    return _project_poller
@@ -0,0 +1,155 @@
+"""Deduplicated storage of project service response bodies.
+
+Bodies are content-addressed by SHA-256 and stored zlib-compressed in the
+``response_blobs`` table. Health checks reference a blob only when the body
+changed since the previous stored one or the check failed, so the common case
+(an identical healthy response every poll) adds no body data at all.
+"""
+import hashlib
+import logging
+import zlib
+from typing import Any, Dict, Optional
+
+from sqlalchemy.dialects.mysql import insert as mysql_insert
+from sqlalchemy.dialects.postgresql import insert as postgresql_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlalchemy.orm import Session
+from sqlalchemy.sql.dml import Insert
+
+from src.database import ProjectService, ResponseBlob, ServiceHealthCheck
+
+logger = logging.getLogger(__name__)
+
+COMPRESSION_LEVEL = 6
+
+
+def body_hash(body: str) -> str:
+    """Return the content address of a response body."""
+    return hashlib.sha256(body.encode("utf-8")).hexdigest()
+
+
+def _insert_ignoring_duplicates(dialect: str, values: Dict[str, Any]) -> Optional[Insert]:
+    """INSERT of a blob that is a no-op if the hash exists (None: dialect has none)."""
+    if dialect == "sqlite":
+        return sqlite_insert(ResponseBlob).values(**values).on_conflict_do_nothing(
+            index_elements=["hash"]
+        )
+    if dialect == "postgresql":
+        return postgresql_insert(ResponseBlob).values(**values).on_conflict_do_nothing(
+            index_elements=["hash"]
+        )
+    if dialect in ("mysql", "mariadb"):
+        return mysql_insert(ResponseBlob).values(**values).prefix_with("IGNORE")
+    return None
+
+
+def store_response_body(db: Session, body: str) -> str:
+    """
+    Store a body blob if it is not stored yet.
+
+    On SQLite, PostgreSQL and MySQL the insert ignores an existing row, so
+    concurrent writers storing the same body do not conflict. Other databases
+    look the blob up first. No savepoint is used: the poller writes a whole
+    batch of results in one transaction. The caller commits.
+
+    Args:
+        db: Database session
+        body: Response body text
+
+    Returns:
+        Hash of the stored body
+    """
+    encoded = body.encode("utf-8")
+    digest = hashlib.sha256(encoded).hexdigest()
+    values = {
+        "hash": digest,
+        "data": zlib.compress(encoded, COMPRESSION_LEVEL),
+        "size": len(encoded),
+    }
+    statement = _insert_ignoring_duplicates(db.get_bind().dialect.name, values)
+    if statement is not None:
+        db.execute(statement)
+    elif db.get(ResponseBlob, digest) is None:
+        db.add(ResponseBlob(**values))
+    return digest
+
+
+def attach_response_body(
+    db: Session,
+    service: ProjectService,
+    check: ServiceHealthCheck,
+    body: Optional[str],
+) -> None:
+    """
+    Link a check to its body when the body is worth keeping.
+
+    Args:
+        db: Database session
+        service: Service the check belongs to (its last_response_hash is updated)
+        check: New health check
+        body: Response body (truncated), or None if there was no response
+    """
+    if body is None:
+        return
+
+    digest = body_hash(body)
+    if check.status != "success" or digest != service.last_response_hash:
+        check.response_blob_hash = store_response_body(db, body)
+    service.last_response_hash = digest
+
+
+def delete_orphan_blobs(db: Session) -> int:
+    """
+    Delete blobs no longer referenced by any health check.
+
+    Blobs still named by a service's last_response_hash are kept: later
+    identical healthy checks skip storing the body because that blob exists.
+
+    Returns:
+        Number of blobs deleted
+    """
+    referenced = (
+        db.query(ServiceHealthCheck.response_blob_hash)
+        .filter(ServiceHealthCheck.response_blob_hash.isnot(None))
+    )
+    last_seen = (
+        db.query(ProjectService.last_response_hash)
+        .filter(ProjectService.last_response_hash.isnot(None))
+    )
+    return (
+        db.query(ResponseBlob)
+        .filter(ResponseBlob.hash.notin_(referenced), ResponseBlob.hash.notin_(last_seen))
+        .delete(synchronize_session=False)
+    )
+
+
+def migrate_inline_bodies(db: Session, batch_size: int = 1000) -> int:
+    """
+    Move bodies stored inline on old health check rows into blobs.
+
+    Args:
+        db: Database session
+        batch_size: Rows converted per commit
+
+    Returns:
+        Number of rows converted
+    """
+    converted = 0
+    while True:
+        checks = (
+            db.query(ServiceHealthCheck)
+            .filter(ServiceHealthCheck.legacy_response_body.isnot(None))
+            .limit(batch_size)
+            .all()
+        )
+        if not checks:
+            break
+        for check in checks:
+            check.response_blob_hash = store_response_body(db, check.legacy_response_body)
+            check.legacy_response_body = None
+        db.commit()
+        converted += len(checks)
+
+    if converted:
+        logger.info(f"Moved {converted} inline response bodies into blobs")
+    return converted
@@ -73,29 +73,61 @@ def analyze_logs():
     """
     Analyze logs for all hosts with log analysis enabled.
 
-    This job runs periodically to analyze logs via SSH and LLM.
+    This job runs periodically to analyze logs via SSH and LLM. Hosts are
+    analyzed in parallel and the run is bounded by LOG_ANALYSIS_DEADLINE_SECONDS.
     """
     logger.info("Starting log analysis for all enabled hosts")
 
     log_analyzer = LogAnalyzerService()
 
-    with get_db_context() as db:
-        # Get all hosts with log analysis enabled
-        hosts = db.query(Host).filter(Host.log_analysis_config.isnot(None)).all()
-
-        for host in hosts:
-            try:
-                result = log_analyzer.analyze_host_logs(host)
-                if result:
-                    logger.info(f"Log analysis complete for {host.name}: {result.severity}")
-                else:
-                    logger.debug(f"Log analysis skipped for {host.name}")
-            except Exception as e:
-                logger.error(f"Error analyzing logs for {host.name}: {e}")
+    try:
+        results = log_analyzer.analyze_hosts()
+    except Exception as e:
+        logger.error(f"Error running log analysis: {e}")
+        return
+
+    for result in results:
+        if result.status == "analyzed":
+            logger.info(
+                f"Log analysis complete for {result.host_name}: {result.severity} "
+                f"(ssh {result.ssh_seconds}s, llm {result.llm_seconds}s)"
+            )
+        elif result.status == "skipped" and not result.error:
+            logger.debug(f"Log analysis skipped for {result.host_name}")
+        else:
+            logger.warning(f"Log analysis {result.status} for {result.host_name}: {result.error}")
 
     logger.info("Log analysis complete")
 
 
+def run_manual_analyses():
+    """
+    Run manual log analyses queued by the API.
+
+    Running them here rather than in the API process puts them in the same
+    LLM dispatcher as scheduled analyses, ahead of them in its queue.
+    """
+    from src.services.analysis_requests import run_analysis_requests
+
+    try:
+        run_analysis_requests()
+    except Exception as e:
+        logger.error(f"Error running manual log analyses: {e}")
+
+
+def publish_llm_metrics():
+    """
+    Store this process's LLM metrics for GET /api/v1/llm/metrics.
+    """
+    from src.services.llm_metrics import publish_llm_metrics as store_llm_metrics
+
+    try:
+        with get_db_context() as db:
+            store_llm_metrics(db)
+    except Exception as e:
+        logger.error(f"Error publishing LLM metrics: {e}")
+
+
 def cleanup_old_records():
     """
     Clean up old database records to prevent unbounded growth.
@@ -103,10 +135,20 @@ def cleanup_old_records():
     Removes:
     - Heartbeats older than 30 days
     - Alerts older than 90 days
-    - Log analyses older than 60 days
+    - Log analyses older than 60 days (and manual analysis requests older than 1 day)
+    - Service health checks older than 90 days (and unreferenced body blobs)
+    - Service latency buckets older than 400 days
     """
     from datetime import timedelta
-    from src.database import Alert, Heartbeat, LogAnalysis
+    from src.database import (
+        Alert,
+        Heartbeat,
+        LogAnalysis,
+        LogAnalysisRequest,
+        ServiceHealthCheck,
+        ServiceLatencyBucket,
+    )
+    from src.services.response_store import delete_orphan_blobs
 
     logger.info("Cleaning up old database records")
 
@@ -136,15 +178,52 @@ def cleanup_old_records():
             .filter(LogAnalysis.created_at < cutoff_logs)
             .delete()
         )
+        db.query(LogAnalysisRequest).filter(
+            LogAnalysisRequest.created_at < now - timedelta(days=1)
+        ).delete()
+
+        # Delete old service health checks (90 days), then their bodies
+        cutoff_checks = now - timedelta(days=90)
+        deleted_checks = (
+            db.query(ServiceHealthCheck)
+            .filter(ServiceHealthCheck.timestamp < cutoff_checks)
+            .delete()
+        )
+        deleted_blobs = delete_orphan_blobs(db)
+
+        # Delete old latency buckets (400 days)
+        cutoff_buckets = now - timedelta(days=400)
+        deleted_buckets = (
+            db.query(ServiceLatencyBucket)
+            .filter(ServiceLatencyBucket.bucket_start < cutoff_buckets)
+            .delete()
+        )
 
         db.commit()
 
         logger.info(
             f"Cleanup complete: {deleted_heartbeats} heartbeats, "
-            f"{deleted_alerts} alerts, {deleted_logs} log analyses"
+            f"{deleted_alerts} alerts, {deleted_logs} log analyses, "
+            f"{deleted_checks} health checks, {deleted_blobs} response blobs, "
+            f"{deleted_buckets} latency buckets"
         )
 
 
+def downsample_metrics():
+    """
+    Roll host metrics up into 5-minute and hourly tiers and apply retention.
+    """
+    from src.services.metrics_store import downsample_metrics as run_downsampling
+
+    logger.info("Downsampling host metrics")
+
+    try:
+        with get_db_context() as db:
+            run_downsampling(db)
+    except Exception as e:
+        logger.error(f"Error downsampling host metrics: {e}")
+
+
 def send_upstream_heartbeat():
     """
     Send heartbeat to upstream monitoring service.
@@ -229,9 +308,33 @@ def run_scheduler():
         id="log_analyzer",
         name="Analyze logs",
         replace_existing=True,
+        max_instances=1,
+        coalesce=True,
     )
     logger.info("Added job: Log analyzer (every 30 minutes)")
 
+    # Manual log analyses queued by the API - every 2 seconds
+    scheduler.add_job(
+        run_manual_analyses,
+        trigger=IntervalTrigger(seconds=2),
+        id="manual_log_analyzer",
+        name="Run manual log analyses",
+        replace_existing=True,
+        max_instances=4,
+        coalesce=True,
+    )
+    logger.info("Added job: Manual log analyses (every 2 seconds)")
+
+    # LLM metrics snapshot for the API - every minute
+    scheduler.add_job(
+        publish_llm_metrics,
+        trigger=IntervalTrigger(minutes=1),
+        id="llm_metrics",
+        name="Publish LLM metrics",
+        replace_existing=True,
+    )
+    logger.info("Added job: LLM metrics snapshot (every 1 minute)")
+
     # Database cleanup - daily at 3 AM UTC
     scheduler.add_job(
         cleanup_old_records,
@@ -242,6 +345,16 @@ def run_scheduler():
     )
     logger.info("Added job: Database cleanup (daily at 3 AM UTC)")
 
+    # Metrics downsampling - every hour
+    scheduler.add_job(
+        downsample_metrics,
+        trigger=IntervalTrigger(hours=1),
+        id="metrics_downsampler",
+        name="Downsample host metrics",
+        replace_existing=True,
+    )
+    logger.info("Added job: Metrics downsampling (every hour)")
+
     # System health check - every hour
     scheduler.add_job(
         health_check,
@@ -262,6 +375,13 @@ def run_scheduler():
     )
     logger.info("Added job: Upstream heartbeat (every 5 minutes)")
 
+    # Project service poller - async engine, each service on its own cadence
+    if settings.project_poller_enabled:
+        from src.services.project_poller import get_project_poller
+
+        get_project_poller().start_background()
+        logger.info("Started project service poller (per-service frequency)")
+
     logger.info("Starting scheduler...")
     logger.info(f"Scheduled jobs: {[job.name for job in scheduler.get_jobs()]}")
 
@@ -269,6 +389,15 @@ def run_scheduler():
         scheduler.start()
     except (KeyboardInterrupt, SystemExit):
         logger.info("Scheduler stopped")
+    finally:
+        if settings.project_poller_enabled:
+            from src.services.project_poller import get_project_poller
+
+            get_project_poller().stop()
+
+        from src.utils.ssh_pool import get_ssh_pool
+
+        get_ssh_pool().close_all()
 
 
 if __name__ == "__main__":
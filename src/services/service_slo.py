@@ -0,0 +1,234 @@
+"""Latency percentiles and SLO tracking for project services.
+
+The poller records every check into an in-memory latency histogram and
+availability counters per (service, 5-minute bucket). Buckets are merged into
+``service_latency_buckets`` rows on flush, so summaries over any window only
+read one small row per bucket instead of scanning ``service_health_checks``.
+"""
+import calendar
+import logging
+import threading
+from dataclasses import dataclass, field
+from datetime import datetime
+from typing import Any, Dict, Optional, Tuple
+
+from sqlalchemy.orm import Session
+
+from src.database import ProjectService, ServiceLatencyBucket
+from src.utils.latency_histogram import LatencyHistogram
+
+logger = logging.getLogger(__name__)
+
+BUCKET_SECONDS = 300
+DEFAULT_SLO_TARGET = 0.99
+PERCENTILES = (50, 95, 99)
+
+
+def bucket_start(timestamp: datetime, bucket_seconds: int = BUCKET_SECONDS) -> datetime:
+    """Align a naive UTC datetime to the start of its bucket."""
+    ts = calendar.timegm(timestamp.utctimetuple())
+    return datetime.utcfromtimestamp(ts - ts % bucket_seconds)
+
+
+@dataclass
+class _BucketStats:
+    histogram: LatencyHistogram = field(default_factory=LatencyHistogram)
+    total: int = 0
+    successful: int = 0
+
+
+class ServiceStatsRecorder:
+    """Accumulates per-service check statistics in memory until flushed."""
+
+    def __init__(self, bucket_seconds: int = BUCKET_SECONDS):
+        """
+        Initialize recorder.
+
+        Args:
+            bucket_seconds: Width of persisted time buckets
+        """
+        self.bucket_seconds = bucket_seconds
+        self._pending: Dict[Tuple[int, datetime], _BucketStats] = {}
+        self._lock = threading.Lock()
+
+    def record(
+        self,
+        service_id: int,
+        timestamp: datetime,
+        success: bool,
+        response_time_ms: Optional[int],
+    ) -> None:
+        """
+        Record one health check.
+
+        Args:
+            service_id: Project service id
+            timestamp: Check time (naive UTC)
+            success: Whether the check passed
+            response_time_ms: Observed latency (None if no response time was measured)
+        """
+        key = (service_id, bucket_start(timestamp, self.bucket_seconds))
+        with self._lock:
+            stats = self._pending.get(key)
+            if stats is None:
+                stats = self._pending[key] = _BucketStats()
+            stats.total += 1
+            if success:
+                stats.successful += 1
+            if response_time_ms is not None:
+                stats.histogram.record(response_time_ms)
+
+    def flush(self, db: Session) -> int:
+        """
+        Merge pending statistics into their bucket rows and commit.
+
+        Buckets of services that no longer exist are dropped. If the commit
+        fails, the statistics are kept for the next flush.
+
+        Returns:
+            Number of buckets written
+
+        Raises:
+            Exception: Database errors (after rolling back)
+        """
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return 0
+
+        try:
+            service_ids = {service_id for service_id, _ in pending}
+            existing = {
+                row[0]
+                for row in db.query(ProjectService.id).filter(ProjectService.id.in_(service_ids))
+            }
+            written = 0
+            for (service_id, start), stats in pending.items():
+                if service_id not in existing:
+                    continue
+                self._merge_into_row(db, service_id, start, stats)
+                written += 1
+            db.commit()
+        except Exception:
+            db.rollback()
+            self._restore(pending)
+            raise
+
+        return written
+
+    def _merge_into_row(
+        self, db: Session, service_id: int, start: datetime, stats: _BucketStats
+    ) -> None:
+        row = (
+            db.query(ServiceLatencyBucket)
+            .filter(ServiceLatencyBucket.service_id == service_id)
+            .filter(ServiceLatencyBucket.bucket_start == start)
+            .first()
+        )
+        if row is None:
+            db.add(
+                ServiceLatencyBucket(
+                    service_id=service_id,
+                    bucket_start=start,
+                    bucket_seconds=self.bucket_seconds,
+                    total_checks=stats.total,
+                    successful_checks=stats.successful,
+                    histogram=stats.histogram.to_json(),
+                )
+            )
+        else:
+            histogram = LatencyHistogram.from_json(row.histogram).merge(stats.histogram)
+            row.total_checks += stats.total
+            row.successful_checks += stats.successful
+            row.histogram = histogram.to_json()
+
+    def _restore(self, pending: Dict[Tuple[int, datetime], _BucketStats]) -> None:
+        """Put unwritten statistics back, merging with checks recorded meanwhile."""
+        with self._lock:
+            for key, stats in pending.items():
+                current = self._pending.get(key)
+                if current is None:
+                    self._pending[key] = stats
+                else:
+                    current.histogram.merge(stats.histogram)
+                    current.total += stats.total
+                    current.successful += stats.successful
+
+
+def summarize_service(
+    db: Session,
+    service: ProjectService,
+    start: datetime,
+    end: datetime,
+) -> Dict[str, Any]:
+    """
+    Summarize latency and availability for a service over a window.
+
+    The window is widened to whole buckets.
+
+    Args:
+        db: Database session
+        service: Project service
+        start: Window start (naive UTC)
+        end: Window end (naive UTC)
+
+    Returns:
+        Dictionary with check counts, latency percentiles, availability and
+        error budget figures
+    """
+    buckets = (
+        db.query(ServiceLatencyBucket)
+        .filter(ServiceLatencyBucket.service_id == service.id)
+        .filter(ServiceLatencyBucket.bucket_start >= bucket_start(start))
+        .filter(ServiceLatencyBucket.bucket_start < end)
+        .all()
+    )
+
+    histogram = LatencyHistogram.merged(
+        LatencyHistogram.from_json(bucket.histogram) for bucket in buckets
+    )
+    total = sum(bucket.total_checks for bucket in buckets)
+    successful = sum(bucket.successful_checks for bucket in buckets)
+    failed = total - successful
+
+    target = service.slo_target or DEFAULT_SLO_TARGET
+    budget = 1 - target
+    availability = successful / total if total else None
+    allowed_failures = total * budget
+
+    return {
+        "service_id": service.id,
+        "project_name": service.project_name,
+        "service_name": service.service_name,
+        "start": start.isoformat(),
+        "end": end.isoformat(),
+        "checks": total,
+        "failed_checks": failed,
+        "availability": availability,
+        "latency_ms": {
+            **{f"p{q}": histogram.percentile(q) for q in PERCENTILES},
+            "min": histogram.min,
+            "max": histogram.max,
+        },
+        "slo": {
+            "target": target,
+            "allowed_failures": allowed_failures,
+            # 1.0 = failing exactly as fast as the SLO allows
+            "error_budget_burn_rate": (failed / total) / budget if total else None,
+            "error_budget_remaining": (
+                1 - failed / allowed_failures if allowed_failures else None
+            ),
+        },
+    }
+
+
+# Global recorder instance for the poller process
+_stats_recorder: Optional[ServiceStatsRecorder] = None
+
+
+def get_service_stats_recorder() -> ServiceStatsRecorder:
+    """Get or create the process-wide ServiceStatsRecorder."""
+    global _stats_recorder
+    if _stats_recorder is None:
+        _stats_recorder = ServiceStatsRecorder()
+    return _stats_recorder
@@ -0,0 +1,479 @@
+"""Built-in syslog receiver for hosts analyzed with ``method: syslog``.
+
+Hosts forward their logs over UDP or TCP (RFC 6587 octet counting or
+newline framing). Messages are parsed as RFC 5424 or RFC 3164 and assigned
+to a host by sender address: by default the addresses of the host's
+``ssh_host``. ``syslog_sources`` in the host's log analysis config replaces
+the default; its IP addresses match senders, and any other entry matches the
+message's HOSTNAME field from any sender. HOSTNAME is not authenticated, so
+that matching is only done for names a host lists explicitly. Messages from
+unknown sources are counted and dropped.
+
+Each host's messages collect in a bounded ring buffer, so a burst between
+flushes costs bounded memory (the oldest lines are dropped and counted).
+Every flush interval the buffers are spilled to one spool file per host,
+``<spool dir>/<host_id>.log``, rotated to ``.log.1`` when it grows past
+``spool_max_bytes``. The log analyzer reads new spool data with a cursor,
+exactly like a ``log_file`` over SSH, but without the SSH round-trip.
+"""
+import asyncio
+import ipaddress
+import json
+import logging
+import os
+import re
+import socket
+from collections import Counter, deque
+from datetime import datetime, timezone
+from typing import Deque, Dict, List, NamedTuple, Optional
+
+from src.config import get_settings
+from src.database import Host, get_db_context
+
+logger = logging.getLogger(__name__)
+
+MAX_MESSAGE_SIZE = 64 * 1024
+
+FACILITIES = [
+    "kern", "user", "mail", "daemon", "auth", "syslog", "lpr", "news",
+    "uucp", "cron", "authpriv", "ftp", "ntp", "audit", "alert", "clock",
+    "local0", "local1", "local2", "local3", "local4", "local5", "local6", "local7",
+]
+SEVERITIES = ["emerg", "alert", "crit", "err", "warning", "notice", "info", "debug"]
+
+_PRI_RE = re.compile(rb"^<(\d{1,3})>")
+_RFC3164_TIMESTAMP_RE = re.compile(r"^[A-Z][a-z]{2} [ \d]\d \d{2}:\d{2}:\d{2} ")
+_TAG_RE = re.compile(r"^([^\s:\[]{1,48})(?:\[([^\]]*)\])?:\s?")
+_SPOOL_NAME_RE = re.compile(r"[^A-Za-z0-9._-]")
+
+
+class SyslogMessage(NamedTuple):
+    """Parsed syslog message."""
+
+    facility: int
+    severity: int
+    timestamp: Optional[str]
+    hostname: Optional[str]
+    app_name: Optional[str]
+    proc_id: Optional[str]
+    message: str
+
+
+def parse_syslog_message(data: bytes) -> Optional[SyslogMessage]:
+    """
+    Parse an RFC 5424 or RFC 3164 syslog message.
+
+    Messages without a valid PRI are kept as user.notice with no header,
+    as RFC 3164 suggests for relays.
+
+    Args:
+        data: Raw message (one datagram or one TCP frame)
+
+    Returns:
+        SyslogMessage, or None for an empty or oversized message
+    """
+    data = data.rstrip(b"\r\n\0")
+    if not data or len(data) > MAX_MESSAGE_SIZE:
+        return None
+
+    match = _PRI_RE.match(data)
+    if match is None or int(match.group(1)) > 191:
+        text = data.decode("utf-8", errors="replace")
+        return SyslogMessage(1, 5, None, None, None, None, text.strip())
+    pri = int(match.group(1))
+    rest = data[match.end():]
+
+    if rest.startswith(b"1 "):
+        return _parse_rfc5424(pri, rest[2:])
+    return _parse_rfc3164(pri, rest.decode("utf-8", errors="replace"))
+
+
+def _nil(value: str) -> Optional[str]:
+    return None if value == "-" else value
+
+
+def _parse_rfc5424(pri: int, rest: bytes) -> SyslogMessage:
+    """Parse TIMESTAMP HOSTNAME APP-NAME PROCID MSGID STRUCTURED-DATA [MSG]."""
+    fields = rest.split(b" ", 5)
+    fields += [b""] * (6 - len(fields))
+    timestamp, hostname, app_name, proc_id, _msg_id, remainder = (
+        field.decode("utf-8", errors="replace") for field in fields
+    )
+
+    # Skip structured data: "-" or one or more [id param="value" ...] elements
+    message = remainder
+    if message.startswith("-"):
+        message = message[1:]
+    else:
+        position, depth, escaped = 0, 0, False
+        for position, char in enumerate(message):
+            if escaped:
+                escaped = False
+            elif char == "\\":
+                escaped = True
+            elif char == "[":
+                depth += 1
+            elif char == "]":
+                depth -= 1
+            elif depth == 0:
+                break
+        else:
+            position = len(message)
+        message = message[position:]
+    message = message.lstrip(" ").lstrip("\ufeff")
+
+    return SyslogMessage(
+        facility=pri // 8,
+        severity=pri % 8,
+        timestamp=_nil(timestamp),
+        hostname=_nil(hostname),
+        app_name=_nil(app_name),
+        proc_id=_nil(proc_id),
+        message=message.strip(),
+    )
+
+
+def _parse_rfc3164(pri: int, rest: str) -> SyslogMessage:
+    """Parse ``Mmm dd hh:mm:ss HOSTNAME TAG[pid]: MSG`` (header parts are optional)."""
+    timestamp = hostname = app_name = proc_id = None
+    if _RFC3164_TIMESTAMP_RE.match(rest):
+        timestamp, rest = rest[:15], rest[16:]
+        parts = rest.split(" ", 1)
+        if len(parts) == 2 and not parts[0].endswith(":"):
+            hostname, rest = parts
+    tag = _TAG_RE.match(rest)
+    if tag is not None:
+        app_name, proc_id = tag.group(1), tag.group(2)
+        rest = rest[tag.end():]
+    return SyslogMessage(
+        facility=pri // 8,
+        severity=pri % 8,
+        timestamp=timestamp,
+        hostname=hostname,
+        app_name=app_name,
+        proc_id=proc_id,
+        message=rest.strip(),
+    )
+
+
+def format_spool_line(message: SyslogMessage, source: str, received_at: datetime) -> str:
+    """
+    Render a message as one spool line.
+
+    The format is ``<received ISO time> <host> <facility>.<severity> <tag>: <msg>``;
+    the receive time is used because RFC 3164 timestamps lack year and zone.
+    """
+    tag = message.app_name or "-"
+    if message.proc_id:
+        tag += f"[{message.proc_id}]"
+    text = " ".join(message.message.split("\n"))
+    return (
+        f"{received_at.isoformat(timespec='seconds')} {message.hostname or source} "
+        f"{FACILITIES[message.facility]}.{SEVERITIES[message.severity]} {tag}: {text}\n"
+    )
+
+
+def spool_path(spool_dir: str, host_id: str) -> str:
+    """Path of a host's spool file."""
+    return os.path.join(spool_dir, f"{_SPOOL_NAME_RE.sub('_', host_id)}.log")
+
+
+async def read_frame(reader: asyncio.StreamReader) -> Optional[bytes]:
+    """
+    Read one syslog message from a TCP stream.
+
+    Supports octet counting (``<length> <message>``) and newline-terminated
+    framing (RFC 6587).
+
+    Returns:
+        Message bytes, or None at end of stream
+    """
+    first = await reader.read(1)
+    if not first:
+        return None
+    if first.isdigit():
+        header = first + await reader.readuntil(b" ")
+        length = int(header[:-1])
+        if length > MAX_MESSAGE_SIZE:
+            raise ValueError(f"Syslog frame of {length} bytes exceeds {MAX_MESSAGE_SIZE}")
+        return await reader.readexactly(length)
+    try:
+        return first + await reader.readuntil(b"\n")
+    except asyncio.IncompleteReadError as e:
+        return first + e.partial
+
+
+class SyslogUDPProtocol(asyncio.DatagramProtocol):
+    """asyncio protocol that hands datagrams to the receiver."""
+
+    def __init__(self, receiver: "SyslogReceiver"):
+        self.receiver = receiver
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.receiver.handle_message(data, addr[0])
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"Syslog UDP socket error: {exc}")
+
+
+def _is_address(value: str) -> bool:
+    try:
+        ipaddress.ip_address(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _resolve(name: str) -> List[str]:
+    """Addresses of a host name or IP literal (empty if it cannot be resolved)."""
+    if _is_address(name):
+        return [name]
+    try:
+        infos = socket.getaddrinfo(name, None)
+    except OSError as e:
+        logger.warning(f"Cannot resolve syslog host {name}: {e}")
+        return []
+    return sorted({info[4][0] for info in infos})
+
+
+class SyslogReceiver:
+    """Receives syslog messages and spools them per host."""
+
+    def __init__(
+        self,
+        bind_host: str = "0.0.0.0",
+        udp_port: int = 5514,
+        tcp_port: int = 5514,
+        spool_dir: str = "data/syslog",
+        buffer_lines: int = 10000,
+        spool_max_bytes: int = 10 * 1024 * 1024,
+        flush_interval: float = 1.0,
+        host_refresh_interval: float = 30.0,
+    ):
+        """
+        Initialize syslog receiver.
+
+        Args:
+            bind_host: Address to bind
+            udp_port: UDP port to listen on (0 = no UDP)
+            tcp_port: TCP port to listen on (0 = no TCP)
+            spool_dir: Directory of the per-host spool files
+            buffer_lines: Lines buffered per host between flushes
+            spool_max_bytes: Spool file size at which it is rotated
+            flush_interval: Seconds between spills to the spool files
+            host_refresh_interval: Seconds between reloads of the host table
+        """
+        self.bind_host = bind_host
+        self.udp_port = udp_port
+        self.tcp_port = tcp_port
+        self.spool_dir = spool_dir
+        self.buffer_lines = buffer_lines
+        self.spool_max_bytes = spool_max_bytes
+        self.flush_interval = flush_interval
+        self.host_refresh_interval = host_refresh_interval
+        self.counters: Counter = Counter()
+
+        # Sender address -> host_id
+        self._addresses: Dict[str, str] = {}
+        # HOSTNAME field (lowercase), explicitly listed in syslog_sources -> host_id
+        self._hostnames: Dict[str, str] = {}
+        # host_id -> lines not yet spilled
+        self._buffers: Dict[str, Deque[str]] = {}
+        self._transport: Optional[asyncio.DatagramTransport] = None
+
+    def handle_message(
+        self, data: bytes, source_ip: str, now: Optional[datetime] = None
+    ) -> str:
+        """
+        Parse a message and buffer it for its host.
+
+        Args:
+            data: Raw message
+            source_ip: Sender address
+            now: Receive time (defaults to the current time)
+
+        Returns:
+            'accepted' or the rejection reason
+        """
+        result = self._accept(data, source_ip, now or datetime.now(timezone.utc))
+        self.counters[result] += 1
+        return result
+
+    def _accept(self, data: bytes, source_ip: str, now: datetime) -> str:
+        message = parse_syslog_message(data)
+        if message is None:
+            return "malformed"
+
+        host_id = self._addresses.get(source_ip)
+        if host_id is None and message.hostname:
+            host_id = self._hostnames.get(message.hostname.lower())
+        if host_id is None:
+            return "unknown_source"
+
+        buffer = self._buffers.get(host_id)
+        if buffer is None:
+            buffer = self._buffers[host_id] = deque(maxlen=self.buffer_lines)
+        if len(buffer) == buffer.maxlen:
+            self.counters["dropped"] += 1
+        buffer.append(format_spool_line(message, source_ip, now))
+        return "accepted"
+
+    def load_hosts(self) -> None:
+        """Reload the source -> host table from syslog hosts' configs."""
+        with get_db_context() as db:
+            rows = (
+                db.query(Host.host_id, Host.name, Host.log_analysis_config)
+                .filter(Host.log_analysis_config.isnot(None))
+                .all()
+            )
+
+        addresses: Dict[str, str] = {}
+        hostnames: Dict[str, str] = {}
+        for host_id, name, raw_config in rows:
+            try:
+                config = json.loads(raw_config)
+            except json.JSONDecodeError:
+                continue
+            if not isinstance(config, dict) or config.get("method") != "syslog":
+                continue
+            explicit = config.get("syslog_sources")
+            if explicit:
+                for source in explicit:
+                    source = str(source).strip()
+                    if _is_address(source):
+                        addresses[source] = host_id
+                    elif source:
+                        hostnames[source.lower()] = host_id
+            elif config.get("ssh_host"):
+                for address in _resolve(str(config["ssh_host"])):
+                    addresses[address] = host_id
+            else:
+                logger.warning(f"Syslog host {name} has no ssh_host or syslog_sources")
+        self._addresses = addresses
+        self._hostnames = hostnames
+        logger.debug(
+            f"Loaded {len(addresses)} syslog sender addresses and {len(hostnames)} hostnames"
+        )
+
+    def flush(self) -> int:
+        """
+        Spill all buffered lines to the spool files.
+
+        Returns:
+            Number of lines written
+        """
+        buffers, self._buffers = self._buffers, {}
+        return self._spill(buffers)
+
+    def _spill(self, buffers: Dict[str, Deque[str]]) -> int:
+        """Append buffered lines to each host's spool file, rotating full files."""
+        written = 0
+        os.makedirs(self.spool_dir, exist_ok=True)
+        for host_id, lines in buffers.items():
+            if not lines:
+                continue
+            data = "".join(lines).encode("utf-8")
+            path = spool_path(self.spool_dir, host_id)
+            try:
+                if os.path.exists(path) and os.path.getsize(path) + len(data) > self.spool_max_bytes:
+                    os.replace(path, f"{path}.1")
+                with open(path, "ab") as f:
+                    f.write(data)
+                written += len(lines)
+            except OSError as e:
+                logger.error(f"Failed to spool syslog lines for {host_id}: {e}")
+        return written
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Swap the buffers on the event loop thread so message handling
+            # never races with the writer thread
+            buffers, self._buffers = self._buffers, {}
+            try:
+                await asyncio.to_thread(self._spill, buffers)
+            except Exception as e:
+                logger.error(f"Failed to spool syslog messages: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.host_refresh_interval)
+            try:
+                await asyncio.to_thread(self.load_hosts)
+            except Exception as e:
+                logger.error(f"Failed to reload hosts for syslog: {e}")
+
+    async def _handle_connection(
+        self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter
+    ) -> None:
+        source_ip = writer.get_extra_info("peername")[0]
+        try:
+            while True:
+                frame = await read_frame(reader)
+                if frame is None:
+                    break
+                self.handle_message(frame, source_ip)
+        except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ValueError) as e:
+            logger.debug(f"Closing syslog connection from {source_ip}: {e}")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+    async def run(self) -> None:
+        """Bind the sockets and receive messages until cancelled."""
+        await asyncio.to_thread(self.load_hosts)
+
+        loop = asyncio.get_running_loop()
+        server = None
+        if self.udp_port:
+            self._transport, _ = await loop.create_datagram_endpoint(
+                lambda: SyslogUDPProtocol(self),
+                local_addr=(self.bind_host, self.udp_port),
+            )
+            logger.info(f"Syslog receiver on udp://{self.bind_host}:{self.udp_port}")
+        if self.tcp_port:
+            server = await asyncio.start_server(
+                self._handle_connection, self.bind_host, self.tcp_port, limit=MAX_MESSAGE_SIZE
+            )
+            logger.info(f"Syslog receiver on tcp://{self.bind_host}:{self.tcp_port}")
+
+        try:
+            await asyncio.gather(self._flush_loop(), self._refresh_loop())
+        finally:
+            if self._transport is not None:
+                self._transport.close()
+            if server is not None:
+                server.close()
+            self.flush()
+
+
+def get_syslog_receiver() -> SyslogReceiver:
+    """
+    Get SyslogReceiver configured from settings.
+
+    Returns:
+        SyslogReceiver instance
+    """
+    settings = get_settings()
+    return SyslogReceiver(
+        bind_host=settings.syslog_host,
+        udp_port=settings.syslog_udp_port,
+        tcp_port=settings.syslog_tcp_port,
+        spool_dir=settings.syslog_spool_dir,
+        buffer_lines=settings.syslog_buffer_lines,
+        spool_max_bytes=settings.syslog_spool_max_bytes,
+    )
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logger.info("Starting syslog receiver")
+    try:
+        asyncio.run(get_syslog_receiver().run())
+    except KeyboardInterrupt:
+        logger.info("Syslog receiver stopped")
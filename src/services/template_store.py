@@ -0,0 +1,109 @@
+"""Per-host storage of mined log templates.
+
+Templates seen in earlier analyses seed the Drain parser on the next run, so
+only genuinely new kinds of lines are flagged as novel. Each template also
+keeps a rate baseline (its typical count per batch) for the log prefilter.
+"""
+import logging
+from datetime import datetime
+from typing import Dict
+
+from sqlalchemy.orm import Session
+
+from src.database import LogTemplate
+from src.utils.log_prefilter import TemplateBaseline, update_baseline
+from src.utils.log_templates import LogSummary
+
+logger = logging.getLogger(__name__)
+
+MAX_TEMPLATES_PER_HOST = 2000
+
+
+def load_known_templates(db: Session, host_id: int) -> Dict[str, str]:
+    """
+    Load a host's stored templates.
+
+    Returns:
+        {template key: template}
+    """
+    rows = (
+        db.query(LogTemplate.template_key, LogTemplate.template)
+        .filter(LogTemplate.host_id == host_id)
+        .all()
+    )
+    return {key: template for key, template in rows}
+
+
+def load_template_baselines(db: Session, host_id: int) -> Dict[str, TemplateBaseline]:
+    """
+    Load the rate baselines of a host's stored templates.
+
+    Returns:
+        {template key: baseline} for templates with at least one sample
+    """
+    rows = (
+        db.query(LogTemplate.template_key, LogTemplate.rate_mean, LogTemplate.rate_samples)
+        .filter(LogTemplate.host_id == host_id)
+        .filter(LogTemplate.rate_samples > 0)
+        .all()
+    )
+    return {
+        key: TemplateBaseline(mean=mean or 0.0, samples=samples) for key, mean, samples in rows
+    }
+
+
+def save_templates(
+    db: Session,
+    host_id: int,
+    summary: LogSummary,
+    max_templates: int = MAX_TEMPLATES_PER_HOST,
+) -> None:
+    """
+    Merge a batch's templates into the host's stored templates. The caller commits.
+
+    Every stored template's rate baseline is updated with its count in this
+    batch (0 when absent). Templates beyond ``max_templates`` are dropped,
+    least recently seen first.
+
+    Args:
+        db: Database session
+        host_id: Host id
+        summary: Mined batch summary
+        max_templates: Templates kept per host
+    """
+    now = datetime.utcnow()
+    rows = {
+        row.template_key: row
+        for row in db.query(LogTemplate).filter(LogTemplate.host_id == host_id)
+    }
+    counts: Dict[str, int] = {}
+    for stats in summary.templates:
+        row = rows.get(stats.key)
+        if row is None:
+            row = LogTemplate(
+                host_id=host_id,
+                template_key=stats.key,
+                template=stats.template,
+                total_count=0,
+                rate_samples=0,
+                first_seen=now,
+            )
+            db.add(row)
+            rows[stats.key] = row
+        row.total_count = (row.total_count or 0) + stats.count
+        row.last_seen = now
+        counts[stats.key] = stats.count
+
+    for key, row in rows.items():
+        previous = None
+        if row.rate_samples:
+            previous = TemplateBaseline(mean=row.rate_mean or 0.0, samples=row.rate_samples)
+        baseline = update_baseline(previous, counts.get(key, 0))
+        row.rate_mean = baseline.mean
+        row.rate_samples = baseline.samples
+
+    if len(rows) > max_templates:
+        stale = sorted(rows.values(), key=lambda row: row.last_seen)[: len(rows) - max_templates]
+        for row in stale:
+            db.delete(row)
+        logger.debug(f"Dropped {len(stale)} stale log templates for host {host_id}")
@@ -0,0 +1,335 @@
+"""Lightweight UDP heartbeat listener.
+
+Small devices (routers, IoT boxes) can send a single signed datagram instead of
+a full HTTP/TLS round-trip. Datagrams are plain ASCII so they can be produced
+from a shell script with ``openssl``::
+
+    HB1 <host_id> <unix_timestamp> <nonce> <hmac_sha256_hex>
+
+The HMAC is computed with the host token as key over everything before the
+final space (``"HB1 <host_id> <unix_timestamp> <nonce>"``). Accepted heartbeats
+are coalesced per host and written through the same ingest pipeline as the
+HTTP endpoint in one transaction per flush interval.
+"""
+import asyncio
+import hashlib
+import hmac
+import logging
+import time
+from collections import Counter, OrderedDict
+from datetime import datetime
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from src.config import get_settings
+from src.database import Host, get_db_context
+from src.services.heartbeat_ingest import record_heartbeat
+from src.utils.rate_limit import TokenBucketLimiter
+
+logger = logging.getLogger(__name__)
+
+DATAGRAM_VERSION = b"HB1"
+MAX_DATAGRAM_SIZE = 512
+MAX_NONCE_LENGTH = 64
+
+
+class HeartbeatDatagram(NamedTuple):
+    """Parsed UDP heartbeat datagram."""
+
+    host_id: str
+    timestamp: int
+    nonce: bytes
+    signed_part: bytes
+    signature: bytes
+
+
+def sign_heartbeat(host_id: str, timestamp: int, nonce: str, token: str) -> bytes:
+    """
+    Build a signed heartbeat datagram.
+
+    Args:
+        host_id: Unique host identifier
+        timestamp: Unix timestamp (seconds)
+        nonce: Random per-datagram nonce
+        token: Host token used as HMAC key
+
+    Returns:
+        Datagram bytes ready to send
+    """
+    signed_part = b" ".join(
+        [DATAGRAM_VERSION, host_id.encode(), str(int(timestamp)).encode(), nonce.encode()]
+    )
+    digest = hmac.new(token.encode(), signed_part, hashlib.sha256).hexdigest()
+    return signed_part + b" " + digest.encode()
+
+
+def parse_heartbeat_datagram(data: bytes) -> Optional[HeartbeatDatagram]:
+    """
+    Parse a heartbeat datagram without verifying it.
+
+    Args:
+        data: Raw datagram payload
+
+    Returns:
+        HeartbeatDatagram or None if the payload is malformed
+    """
+    if len(data) > MAX_DATAGRAM_SIZE:
+        return None
+
+    parts = data.strip().split(b" ")
+    if len(parts) != 5 or parts[0] != DATAGRAM_VERSION:
+        return None
+
+    _, host_id, timestamp, nonce, signature = parts
+    if not host_id or not nonce or len(nonce) > MAX_NONCE_LENGTH or len(signature) != 64:
+        return None
+
+    try:
+        ts = int(timestamp)
+        host_id_str = host_id.decode("ascii")
+    except (ValueError, UnicodeDecodeError):
+        return None
+
+    signed_part = data.strip().rsplit(b" ", 1)[0]
+    return HeartbeatDatagram(host_id_str, ts, nonce, signed_part, signature.lower())
+
+
+class ReplayGuard:
+    """Remembers recently seen (host, nonce) pairs for the clock-skew window."""
+
+    def __init__(self, window_seconds: int, max_entries: int = 200000):
+        """
+        Initialize replay guard.
+
+        Args:
+            window_seconds: How long a nonce must be remembered
+            max_entries: Upper bound on remembered nonces
+        """
+        self.window_seconds = window_seconds
+        self.max_entries = max_entries
+        self._seen: "OrderedDict[Tuple[str, bytes], float]" = OrderedDict()
+
+    def check_and_remember(self, host_id: str, nonce: bytes, now: float) -> bool:
+        """
+        Record a nonce.
+
+        Returns:
+            True if the nonce is fresh, False if it is a replay
+        """
+        self._expire(now)
+
+        key = (host_id, nonce)
+        if key in self._seen:
+            return False
+
+        self._seen[key] = now
+        if len(self._seen) > self.max_entries:
+            self._seen.popitem(last=False)
+        return True
+
+    def _expire(self, now: float) -> None:
+        """Drop nonces older than the window (entries are in arrival order)."""
+        cutoff = now - self.window_seconds
+        seen = self._seen
+        while seen:
+            key, seen_at = next(iter(seen.items()))
+            if seen_at >= cutoff:
+                break
+            seen.popitem(last=False)
+
+    def __len__(self) -> int:
+        return len(self._seen)
+
+
+class UDPHeartbeatProtocol(asyncio.DatagramProtocol):
+    """asyncio protocol that hands datagrams to the listener."""
+
+    def __init__(self, listener: "UDPHeartbeatListener"):
+        self.listener = listener
+
+    def datagram_received(self, data: bytes, addr) -> None:
+        self.listener.handle_datagram(data, addr[0])
+
+    def error_received(self, exc: Exception) -> None:
+        logger.debug(f"UDP heartbeat socket error: {exc}")
+
+
+class UDPHeartbeatListener:
+    """Validates UDP heartbeats and feeds them to the ingest pipeline."""
+
+    def __init__(
+        self,
+        bind_host: str = "0.0.0.0",
+        port: int = 8081,
+        max_skew_seconds: int = 120,
+        rate_per_second: float = 5.0,
+        burst: float = 20.0,
+        flush_interval: float = 1.0,
+        host_refresh_interval: float = 30.0,
+    ):
+        """
+        Initialize UDP heartbeat listener.
+
+        Args:
+            bind_host: Address to bind
+            port: UDP port to listen on
+            max_skew_seconds: Maximum accepted clock skew between device and server
+            rate_per_second: Sustained datagrams per second allowed per source IP
+            burst: Burst size allowed per source IP
+            flush_interval: Seconds between database flushes of accepted heartbeats
+            host_refresh_interval: Seconds between reloads of the host/token table
+        """
+        self.bind_host = bind_host
+        self.port = port
+        self.max_skew_seconds = max_skew_seconds
+        self.flush_interval = flush_interval
+        self.host_refresh_interval = host_refresh_interval
+
+        self.limiter = TokenBucketLimiter(rate=rate_per_second, burst=burst)
+        self.replay_guard = ReplayGuard(window_seconds=2 * max_skew_seconds)
+        self.counters: Counter = Counter()
+
+        # host_id -> (database id, token bytes)
+        self._hosts: Dict[str, Tuple[int, bytes]] = {}
+        # database id -> (received_at, source_ip); coalesced until next flush
+        self._pending: Dict[int, Tuple[datetime, str]] = {}
+        self._transport: Optional[asyncio.DatagramTransport] = None
+
+    def handle_datagram(self, data: bytes, source_ip: str, now: Optional[float] = None) -> str:
+        """
+        Validate a single datagram and queue it for ingest.
+
+        Args:
+            data: Raw datagram payload
+            source_ip: Sender address
+            now: Current Unix time (defaults to time.time())
+
+        Returns:
+            'accepted' or the rejection reason
+        """
+        result = self._validate(data, source_ip, now if now is not None else time.time())
+        self.counters[result] += 1
+        return result
+
+    def _validate(self, data: bytes, source_ip: str, now: float) -> str:
+        if not self.limiter.allow(source_ip):
+            return "rate_limited"
+
+        datagram = parse_heartbeat_datagram(data)
+        if datagram is None:
+            return "malformed"
+
+        host = self._hosts.get(datagram.host_id)
+        if host is None:
+            return "unknown_host"
+        host_pk, token = host
+
+        if abs(now - datagram.timestamp) > self.max_skew_seconds:
+            return "stale"
+
+        expected = hmac.new(token, datagram.signed_part, hashlib.sha256).hexdigest().encode()
+        if not hmac.compare_digest(expected, datagram.signature):
+            return "bad_signature"
+
+        if not self.replay_guard.check_and_remember(datagram.host_id, datagram.nonce, now):
+            return "replay"
+
+        self._pending[host_pk] = (datetime.utcfromtimestamp(now), source_ip)
+        return "accepted"
+
+    def load_hosts(self) -> None:
+        """Reload the host_id -> token table from the database."""
+        with get_db_context() as db:
+            rows = db.query(Host.id, Host.host_id, Host.token).all()
+
+        self._hosts = {host_id: (pk, token.encode()) for pk, host_id, token in rows}
+        logger.debug(f"Loaded {len(self._hosts)} hosts for UDP heartbeats")
+
+    def flush(self) -> int:
+        """
+        Write pending heartbeats in a single transaction.
+
+        Returns:
+            Number of heartbeats written
+        """
+        pending, self._pending = self._pending, {}
+        return self._write_pending(pending)
+
+    def _write_pending(self, pending: Dict[int, Tuple[datetime, str]]) -> int:
+        """Persist a batch of coalesced heartbeats."""
+        if not pending:
+            return 0
+
+        with get_db_context() as db:
+            hosts = db.query(Host).filter(Host.id.in_(list(pending.keys()))).all()
+            for host in hosts:
+                received_at, source_ip = pending[host.id]
+                record_heartbeat(db, host, source_ip=source_ip, timestamp=received_at)
+
+        logger.debug(f"Flushed {len(hosts)} UDP heartbeats")
+        return len(hosts)
+
+    async def _flush_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.flush_interval)
+            # Swap the batch on the event loop thread so datagram handling
+            # never races with the writer thread
+            pending, self._pending = self._pending, {}
+            try:
+                await asyncio.to_thread(self._write_pending, pending)
+            except Exception as e:
+                logger.error(f"Failed to flush UDP heartbeats: {e}")
+
+    async def _refresh_loop(self) -> None:
+        while True:
+            await asyncio.sleep(self.host_refresh_interval)
+            try:
+                await asyncio.to_thread(self.load_hosts)
+            except Exception as e:
+                logger.error(f"Failed to reload hosts for UDP heartbeats: {e}")
+
+    async def run(self) -> None:
+        """Bind the UDP socket and process heartbeats until cancelled."""
+        await asyncio.to_thread(self.load_hosts)
+
+        loop = asyncio.get_running_loop()
+        self._transport, _ = await loop.create_datagram_endpoint(
+            lambda: UDPHeartbeatProtocol(self),
+            local_addr=(self.bind_host, self.port),
+        )
+        logger.info(f"UDP heartbeat listener on {self.bind_host}:{self.port}")
+
+        try:
+            await asyncio.gather(self._flush_loop(), self._refresh_loop())
+        finally:
+            self._transport.close()
+            self.flush()
+
+
+def get_udp_heartbeat_listener() -> UDPHeartbeatListener:
+    """
+    Get UDPHeartbeatListener configured from settings.
+
+    Returns:
+        UDPHeartbeatListener instance
+    """
+    settings = get_settings()
+    return UDPHeartbeatListener(
+        bind_host=settings.udp_heartbeat_host,
+        port=settings.udp_heartbeat_port,
+        max_skew_seconds=settings.udp_heartbeat_max_skew_seconds,
+        rate_per_second=settings.udp_heartbeat_rate_per_second,
+        burst=settings.udp_heartbeat_burst,
+    )
+
+
+if __name__ == "__main__":
+    settings = get_settings()
+    logging.basicConfig(
+        level=getattr(logging, settings.log_level),
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    logger.info("Starting UDP heartbeat listener")
+    try:
+        asyncio.run(get_udp_heartbeat_listener().run())
+    except KeyboardInterrupt:
+        logger.info("UDP heartbeat listener stopped")
@@ -0,0 +1,182 @@
+"""Cron-driven heartbeat deadlines with cached fire times."""
+import logging
+import threading
+from bisect import bisect_right
+from datetime import datetime, timedelta
+from functools import lru_cache
+from typing import List, Optional
+
+import pytz
+from croniter import croniter
+
+logger = logging.getLogger(__name__)
+
+# Fire times generated per cache refill
+FIRE_TIME_BATCH = 256
+# Upper bound on cached fire times per expression (oldest are dropped)
+MAX_CACHED_FIRE_TIMES = 4 * FIRE_TIME_BATCH
+# How far before now a rebuilt cache starts (recent last_seen values)
+CACHE_LOOKBACK = timedelta(hours=1)
+
+
+class CronSchedule:
+    """
+    Parsed cron expression with a sorted cache of fire times.
+
+    All datetimes are naive UTC, matching the rest of the database layer. The
+    expression itself is evaluated in ``timezone`` so that expressions like
+    ``0 9-17 * * 1-5`` follow the host's local working hours.
+
+    Many hosts usually share an expression and have ``last_seen`` values close
+    to now, so lookups are served by bisecting a cache of fire times anchored
+    around the current time. Lookups outside the cached window (long-silent
+    hosts, far-future times) are computed with croniter directly and leave the
+    cache alone, so a few stale hosts cannot make it thrash.
+    """
+
+    def __init__(self, expression: str, timezone: str = "UTC"):
+        """
+        Initialize cron schedule.
+
+        Args:
+            expression: Cron expression (validated immediately)
+            timezone: Timezone the expression is evaluated in
+
+        Raises:
+            ValueError: If the expression or timezone is invalid
+        """
+        if not croniter.is_valid(expression):
+            raise ValueError(f"Invalid cron expression: {expression}")
+        try:
+            self.timezone = pytz.timezone(timezone)
+        except pytz.UnknownTimeZoneError as e:
+            raise ValueError(f"Unknown timezone: {timezone}") from e
+
+        self.expression = expression
+        self._fire_times: List[datetime] = []
+        self._lock = threading.Lock()
+
+    def _to_local(self, dt: datetime) -> datetime:
+        return pytz.utc.localize(dt).astimezone(self.timezone)
+
+    @staticmethod
+    def _to_utc(dt: datetime) -> datetime:
+        return dt.astimezone(pytz.utc).replace(tzinfo=None)
+
+    def _generate(self, start: datetime, count: int) -> List[datetime]:
+        """Generate ``count`` fire times strictly after naive UTC ``start``."""
+        itr = croniter(self.expression, self._to_local(start))
+        return [self._to_utc(itr.get_next(datetime)) for _ in range(count)]
+
+    def _rebuild(self, dt: datetime) -> None:
+        """Restart the cache at the fire time preceding dt."""
+        itr = croniter(self.expression, self._to_local(dt))
+        previous = self._to_utc(itr.get_prev(datetime))
+        self._fire_times = [previous] + self._generate(previous, FIRE_TIME_BATCH)
+
+    def _advance(self, now: datetime) -> None:
+        """Keep the cache covering now (caller holds the lock)."""
+        fire_times = self._fire_times
+        if fire_times and fire_times[-1] > now:
+            return
+        if fire_times:
+            fire_times.extend(self._generate(fire_times[-1], FIRE_TIME_BATCH))
+        if not fire_times or fire_times[-1] <= now:
+            self._rebuild(now - CACHE_LOOKBACK)
+        elif len(fire_times) > MAX_CACHED_FIRE_TIMES:
+            del fire_times[: len(fire_times) - MAX_CACHED_FIRE_TIMES]
+
+    def next_fire_after(self, dt: datetime, now: Optional[datetime] = None) -> datetime:
+        """
+        Get the first fire time strictly after dt.
+
+        Args:
+            dt: Naive UTC datetime
+            now: Current naive UTC time the cache is anchored at (default: utcnow)
+
+        Returns:
+            Naive UTC datetime of the next fire time
+        """
+        with self._lock:
+            self._advance(now or datetime.utcnow())
+            fire_times = self._fire_times
+            if fire_times[0] <= dt < fire_times[-1]:
+                return fire_times[bisect_right(fire_times, dt)]
+
+        return self._generate(dt, 1)[0]
+
+    def deadline_after(
+        self, last_seen: datetime, grace_seconds: float, now: Optional[datetime] = None
+    ) -> datetime:
+        """
+        Time by which the next heartbeat must arrive.
+
+        A heartbeat received within the grace period *before* a fire time
+        (e.g. the host clock runs slightly fast) is counted towards that fire
+        time, so the deadline moves to the following one.
+
+        Args:
+            last_seen: Time of the last heartbeat (naive UTC)
+            grace_seconds: Allowed lateness after each fire time
+            now: Current naive UTC time (default: utcnow)
+
+        Returns:
+            Naive UTC deadline
+        """
+        grace = timedelta(seconds=grace_seconds)
+        expected = self.next_fire_after(last_seen, now)
+        if expected - last_seen <= grace:
+            expected = self.next_fire_after(expected, now)
+        return expected + grace
+
+
+@lru_cache(maxsize=1024)
+def get_cron_schedule(expression: str, timezone: str = "UTC") -> CronSchedule:
+    """
+    Get the shared CronSchedule for an expression.
+
+    Args:
+        expression: Cron expression
+        timezone: Timezone the expression is evaluated in
+
+    Returns:
+        Cached CronSchedule instance
+
+    Raises:
+        ValueError: If the expression or timezone is invalid
+    """
+    return CronSchedule(expression, timezone)
+
+
+def cron_deadline(
+    expression: str,
+    last_seen: datetime,
+    grace_seconds: float,
+    timezone: Optional[str] = None,
+    now: Optional[datetime] = None,
+) -> Optional[datetime]:
+    """
+    Heartbeat deadline for a cron-scheduled host.
+
+    Args:
+        expression: Cron expression
+        last_seen: Time of the last heartbeat (naive UTC)
+        grace_seconds: Allowed lateness after each fire time
+        timezone: Timezone the expression is evaluated in (default: CRON_TIMEZONE)
+        now: Current naive UTC time (default: utcnow)
+
+    Returns:
+        Naive UTC deadline, or None if the expression cannot be evaluated
+    """
+    if timezone is None:
+        from src.config import get_settings
+
+        timezone = get_settings().cron_timezone
+
+    try:
+        return get_cron_schedule(expression, timezone).deadline_after(
+            last_seen, grace_seconds, now
+        )
+    except (ValueError, KeyError) as e:
+        logger.error(f"Cannot evaluate cron expression '{expression}': {e}")
+        return None
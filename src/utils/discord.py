@@ -206,6 +206,61 @@ class DiscordWebhook:
             fields=fields,
         )
 
+    def send_project_service_alert(
+        self,
+        project_name: str,
+        service_name: str,
+        endpoint_url: str,
+        error: Optional[str],
+        consecutive_failures: int,
+    ) -> bool:
+        """
+        Send a project service failure alert.
+
+        Args:
+            project_name: Project the service belongs to
+            service_name: Name of the service
+            endpoint_url: Polled endpoint
+            error: Last error message
+            consecutive_failures: Number of consecutive failed checks
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.send_embed(
+            title=f"🚨 Alert: Project Service Unhealthy",
+            description=f"Service **{service_name}** in project **{project_name}** is failing health checks.",
+            color="critical",
+            fields=[
+                {"name": "Project", "value": project_name, "inline": True},
+                {"name": "Service", "value": service_name, "inline": True},
+                {"name": "Endpoint", "value": endpoint_url, "inline": False},
+                {"name": "Error", "value": (error or "Unknown")[:1000], "inline": False},
+                {"name": "Consecutive Failures", "value": str(consecutive_failures), "inline": True},
+            ],
+        )
+
+    def send_project_service_recovery(self, project_name: str, service_name: str) -> bool:
+        """
+        Send a project service recovery notification.
+
+        Args:
+            project_name: Project the service belongs to
+            service_name: Name of the service
+
+        Returns:
+            True if successful, False otherwise
+        """
+        return self.send_embed(
+            title=f"✅ Project Service Recovered",
+            description=f"Service **{service_name}** in project **{project_name}** is healthy again.",
+            color="success",
+            fields=[
+                {"name": "Project", "value": project_name, "inline": True},
+                {"name": "Service", "value": service_name, "inline": True},
+            ],
+        )
+
     def send_system_alert(
         self, title: str, message: str, severity: str = "warning"
     ) -> bool:
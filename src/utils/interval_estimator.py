@@ -0,0 +1,104 @@
+"""Streaming estimation of heartbeat inter-arrival times.
+
+Each host keeps an exponentially weighted mean and variance of the time
+between its heartbeats. Updates are O(1) and the state is four numbers, so
+it can live directly on the ``hosts`` row.
+"""
+import math
+from typing import NamedTuple, Optional
+
+# Weight of the newest interval once warmed up (~ last 20 intervals dominate)
+EWMA_ALPHA = 0.1
+# Intervals needed before the learned deadline is trusted
+MIN_SAMPLES = 10
+# Deadline = mean + STDDEV_FACTOR * stddev (before the grace period)
+STDDEV_FACTOR = 4.0
+# Never expect the next heartbeat sooner than this multiple of the mean
+MIN_HEADROOM = 1.2
+# Ignore sub-second intervals (duplicate sends)
+MIN_INTERVAL_SECONDS = 1.0
+# Consecutive intervals beyond the deadline that count as a new frequency
+SHIFT_SAMPLES = 3
+
+
+class IntervalStats(NamedTuple):
+    """EWMA inter-arrival statistics."""
+
+    mean: Optional[float]
+    variance: Optional[float]
+    samples: int
+    clipped: int = 0
+
+    @property
+    def stddev(self) -> Optional[float]:
+        if self.variance is None:
+            return None
+        return math.sqrt(max(self.variance, 0.0))
+
+
+def update_interval_stats(stats: IntervalStats, interval: float) -> IntervalStats:
+    """
+    Fold a new inter-arrival interval into the statistics.
+
+    While warming up the weight is 1/n, so early estimates are plain running
+    averages. Afterwards intervals are winsorized at the current deadline so a
+    single outage does not inflate the expectation. After SHIFT_SAMPLES
+    consecutive intervals beyond the deadline the host is assumed to have
+    changed its frequency and the estimate restarts from the newest interval.
+
+    Args:
+        stats: Current statistics
+        interval: Seconds since the previous heartbeat
+
+    Returns:
+        Updated statistics (unchanged if the interval is ignored)
+    """
+    if interval < MIN_INTERVAL_SECONDS:
+        return stats
+
+    if stats.mean is None or stats.samples == 0:
+        return IntervalStats(mean=float(interval), variance=0.0, samples=1)
+
+    samples = stats.samples + 1
+    alpha = max(EWMA_ALPHA, 1.0 / samples)
+
+    clipped = 0
+    if stats.samples >= MIN_SAMPLES:
+        deadline = learned_deadline(stats)
+        if interval > deadline:
+            clipped = stats.clipped + 1
+            if clipped >= SHIFT_SAMPLES:
+                return IntervalStats(
+                    mean=float(interval), variance=0.0, samples=MIN_SAMPLES
+                )
+            interval = deadline
+
+    diff = interval - stats.mean
+    increment = alpha * diff
+    mean = stats.mean + increment
+    variance = (1 - alpha) * ((stats.variance or 0.0) + diff * increment)
+
+    return IntervalStats(mean=mean, variance=variance, samples=samples, clipped=clipped)
+
+
+def learned_deadline(stats: IntervalStats) -> float:
+    """Seconds after the last heartbeat by which the next one is expected."""
+    return max(
+        stats.mean + STDDEV_FACTOR * (stats.stddev or 0.0),
+        stats.mean * MIN_HEADROOM,
+    )
+
+
+def adaptive_threshold(stats: IntervalStats) -> Optional[float]:
+    """
+    Learned deadline if enough intervals have been observed.
+
+    Args:
+        stats: Current statistics
+
+    Returns:
+        Deadline in seconds (excluding grace period) or None while warming up
+    """
+    if stats.mean is None or stats.samples < MIN_SAMPLES:
+        return None
+    return learned_deadline(stats)
@@ -0,0 +1,123 @@
+"""Incremental extraction of findings from a (streamed) JSON LLM response.
+
+The expected response is ``{"findings": [{...}, {...}], ...}`` or a bare list
+of findings, possibly wrapped in a markdown code fence. ``FindingsStreamParser``
+is fed text as it arrives and returns each finding as soon as its object is
+closed, so callers can act on the first critical finding before the response
+is complete. Because every finding is parsed on its own, a malformed or
+truncated finding loses only that finding, not the whole response.
+
+The scanner tracks string literals (with escapes) and bracket nesting; it
+does not validate the surrounding document.
+"""
+import json
+import logging
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+FINDINGS_KEY = "findings"
+
+
+class FindingsStreamParser:
+    """Emit completed finding objects from incrementally fed JSON text."""
+
+    def __init__(self):
+        self.findings: List[Dict[str, Any]] = []
+        self._buffer: List[str] = []
+        self._length = 0
+        self._stack: List[str] = []  # '{', '[' or 'F' (the findings array)
+        self._in_string = False
+        self._escape = False
+        self._string_start = 0
+        self._last_string: Optional[str] = None
+        self._pending_key: Optional[str] = None
+        self._object_start: Optional[int] = None
+
+    def feed(self, text: str) -> List[Dict[str, Any]]:
+        """
+        Consume more response text.
+
+        Args:
+            text: Next piece of the response
+
+        Returns:
+            Findings completed by this piece
+        """
+        completed = []
+        start = self._length
+        self._buffer.append(text)
+        self._length += len(text)
+        document = None  # Joined lazily, only when a string or object closes
+
+        for offset, char in enumerate(text):
+            position = start + offset
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    if len(self._stack) == 1:
+                        # Only top-level keys matter (to find "findings")
+                        document = document or "".join(self._buffer)
+                        self._last_string = document[self._string_start + 1:position]
+                continue
+
+            if char == '"':
+                if self._stack:
+                    self._in_string = True
+                    self._string_start = position
+            elif char == ":":
+                self._pending_key = self._last_string
+            elif char == ",":
+                self._pending_key = None
+            elif char == "{":
+                if self._stack and self._stack[-1] == "F":
+                    self._object_start = position
+                self._stack.append("{")
+            elif char == "[":
+                is_findings = (not self._stack) or (
+                    self._stack == ["{"] and self._pending_key == FINDINGS_KEY
+                )
+                self._stack.append("F" if is_findings else "[")
+            elif char in "}]" and self._stack:
+                self._stack.pop()
+                if (
+                    char == "}"
+                    and self._object_start is not None
+                    and self._stack
+                    and self._stack[-1] == "F"
+                ):
+                    document = document or "".join(self._buffer)
+                    finding = self._parse_object(document[self._object_start:position + 1])
+                    self._object_start = None
+                    if finding is not None:
+                        self.findings.append(finding)
+                        completed.append(finding)
+        return completed
+
+    @staticmethod
+    def _parse_object(text: str) -> Optional[Dict[str, Any]]:
+        try:
+            value = json.loads(text)
+        except json.JSONDecodeError as e:
+            logger.warning(f"Skipping malformed finding in LLM response: {e}")
+            return None
+        return value if isinstance(value, dict) else None
+
+
+def extract_findings(text: str) -> List[Dict[str, Any]]:
+    """
+    Salvage all complete findings from a possibly malformed or truncated response.
+
+    Args:
+        text: Response text
+
+    Returns:
+        Findings whose objects were complete and valid
+    """
+    parser = FindingsStreamParser()
+    parser.feed(text)
+    return parser.findings
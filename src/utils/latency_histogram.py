@@ -0,0 +1,109 @@
+"""Mergeable log-linear latency histogram.
+
+Values are bucketed HDR-histogram style: exact below ``2 * SUB_BUCKETS`` and
+then ``SUB_BUCKETS`` linear buckets per power of two, so any recorded value is
+reported within ~1.6% of its true value. Counts are kept sparsely, which makes
+histograms cheap to store per time bucket and trivial to merge across buckets
+or processes (merging is just adding counts).
+"""
+import json
+from typing import Dict, Iterable, Optional, Tuple
+
+SUB_BUCKET_BITS = 6
+SUB_BUCKETS = 1 << SUB_BUCKET_BITS
+MAX_VALUE = (1 << 40) - 1  # Clamp absurd values (~35 years in ms)
+
+
+def bucket_index(value: int) -> int:
+    """Return the bucket index for a non-negative integer value."""
+    value = min(max(int(value), 0), MAX_VALUE)
+    if value < 2 * SUB_BUCKETS:
+        return value
+    shift = value.bit_length() - SUB_BUCKET_BITS - 1
+    return shift * SUB_BUCKETS + (value >> shift)
+
+
+def bucket_bounds(index: int) -> Tuple[int, int]:
+    """Return the (lowest, highest) value that maps to a bucket index."""
+    if index < 2 * SUB_BUCKETS:
+        return index, index
+    shift = index // SUB_BUCKETS - 1
+    mantissa = index - shift * SUB_BUCKETS
+    return mantissa << shift, ((mantissa + 1) << shift) - 1
+
+
+class LatencyHistogram:
+    """Sparse log-linear histogram of integer latencies (milliseconds)."""
+
+    def __init__(self, counts: Optional[Dict[int, int]] = None):
+        """
+        Initialize histogram.
+
+        Args:
+            counts: Existing {bucket index: count} mapping
+        """
+        self.counts: Dict[int, int] = dict(counts or {})
+        self.total = sum(self.counts.values())
+
+    def record(self, value: float, count: int = 1) -> None:
+        """Record ``count`` occurrences of a value."""
+        index = bucket_index(round(value))
+        self.counts[index] = self.counts.get(index, 0) + count
+        self.total += count
+
+    def merge(self, other: "LatencyHistogram") -> "LatencyHistogram":
+        """Add another histogram's counts into this one (in place)."""
+        for index, count in other.counts.items():
+            self.counts[index] = self.counts.get(index, 0) + count
+        self.total += other.total
+        return self
+
+    @classmethod
+    def merged(cls, histograms: Iterable["LatencyHistogram"]) -> "LatencyHistogram":
+        """Return a new histogram combining all given histograms."""
+        result = cls()
+        for histogram in histograms:
+            result.merge(histogram)
+        return result
+
+    def percentile(self, q: float) -> Optional[int]:
+        """
+        Estimate a percentile.
+
+        Args:
+            q: Percentile in [0, 100]
+
+        Returns:
+            Value at the percentile (bucket midpoint) or None if empty
+        """
+        if self.total == 0:
+            return None
+
+        rank = max(1, -(-self.total * q // 100))  # ceil, at least the first value
+        seen = 0
+        for index in sorted(self.counts):
+            seen += self.counts[index]
+            if seen >= rank:
+                low, high = bucket_bounds(index)
+                return (low + high) // 2
+        low, high = bucket_bounds(max(self.counts))
+        return (low + high) // 2
+
+    @property
+    def min(self) -> Optional[int]:
+        return bucket_bounds(min(self.counts))[0] if self.counts else None
+
+    @property
+    def max(self) -> Optional[int]:
+        return bucket_bounds(max(self.counts))[1] if self.counts else None
+
+    def to_json(self) -> str:
+        """Serialize as a compact JSON list of [index, count] pairs."""
+        return json.dumps(sorted(self.counts.items()), separators=(",", ":"))
+
+    @classmethod
+    def from_json(cls, data: Optional[str]) -> "LatencyHistogram":
+        """Deserialize a histogram produced by to_json."""
+        if not data:
+            return cls()
+        return cls({int(index): int(count) for index, count in json.loads(data)})
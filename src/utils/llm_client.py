@@ -1,17 +1,77 @@
 """LLM API client for log analysis."""
 import json
 import logging
-from typing import Any, Dict, List, Optional
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple
 
 import requests
 
+from src.utils.json_stream import FindingsStreamParser, extract_findings
+from src.utils.log_chunking import estimate_tokens, merge_findings, split_log_chunks
+
+if TYPE_CHECKING:
+    from src.services.llm_cache import LLMResponseCache
+    from src.services.llm_dispatcher import LLMDispatcher
+
 logger = logging.getLogger(__name__)
 
+PRIORITY_NORMAL = 20  # Same as src.services.llm_dispatcher.PRIORITY_NORMAL
+
+TRIAGE_MAX_TOKENS = 100
+# Response token cap of batched requests for models without an LLM_MAX_OUTPUT_TOKENS entry
+DEFAULT_MAX_OUTPUT_TOKENS = 8192
+BATCH_TOKENS_PER_HOST = 2000  # Response tokens a batched request asks for per host
+
+TRIAGE_INSTRUCTIONS = """Triage these logs before a detailed analysis. Do not list findings.
+Answer "suspicious" if anything may need attention (errors, failures, security
+events, resource problems, unusual activity), otherwise "routine".
+Respond with only this JSON: {"verdict": "routine|suspicious", "reason": "one short sentence"}"""
+
+BATCH_INSTRUCTIONS = """The logs of several hosts follow, each in its own section headed
+"### Host: <name>". Analyze every host separately; do not mix findings between hosts.
+Respond with only JSON in this structure, with one entry per host name:
+{
+    "hosts": {
+        "<name>": {
+            "findings": [
+                {
+                    "severity": "critical|warning|info",
+                    "category": "security|performance|error|other",
+                    "description": "Brief description",
+                    "details": "Detailed explanation",
+                    "recommendation": "What to do about it"
+                }
+            ],
+            "summary": "Overall summary of findings",
+            "highest_severity": "critical|warning|info|none"
+        }
+    }
+}"""
+
+CHUNK_NOTE = (
+    "These logs are one part of a larger batch that is analyzed in parts. "
+    "Report only what this part shows."
+)
+
 
 class LLMClient:
     """Client for unified LLM API."""
 
-    def __init__(self, api_url: str, api_key: str, default_model: str = "claude-sonnet-4.5"):
+    def __init__(
+        self,
+        api_url: str,
+        api_key: str,
+        default_model: str = "claude-sonnet-4.5",
+        cache: Optional["LLMResponseCache"] = None,
+        chunk_tokens: int = 24000,
+        chunk_concurrency: int = 4,
+        dispatcher: Optional["LLMDispatcher"] = None,
+        stream: bool = False,
+        prompt_caching: bool = False,
+        max_output_tokens: Optional[Dict[str, int]] = None,
+    ):
         """
         Initialize LLM client.
 
@@ -19,10 +79,30 @@ class LLMClient:
             api_url: LLM API endpoint URL
             api_key: API key for authentication
             default_model: Default model to use
+            cache: Response cache for analyze_logs (None = no caching)
+            chunk_tokens: Estimated log tokens per request; larger logs are
+                analyzed in chunks (0 = never split)
+            chunk_concurrency: Maximum chunks of one batch analyzed at once
+            dispatcher: Shared rate limiter/retrier for API requests (None = call directly)
+            stream: Request streamed (SSE) completions for analyses
+            prompt_caching: Mark shared instructions of batched analyses with
+                ``cache_control`` so the provider caches them
+            max_output_tokens: {model: most response tokens it accepts}; caps
+                batched requests (default per model: DEFAULT_MAX_OUTPUT_TOKENS)
         """
         self.api_url = api_url
         self.api_key = api_key
         self.default_model = default_model
+        self.cache = cache
+        self.chunk_tokens = chunk_tokens
+        self.chunk_concurrency = max(chunk_concurrency, 1)
+        self.dispatcher = dispatcher
+        self.stream = stream
+        self.prompt_caching = prompt_caching
+        self.max_output_tokens = max_output_tokens or {}
+        self._triage_lock = threading.Lock()
+        self._triage_counts = {"routine": 0, "suspicious": 0, "failed": 0}
+        self._triage_seconds = 0.0
 
     def analyze_logs(
         self,
@@ -31,16 +111,29 @@ class LLMClient:
         model: Optional[str] = None,
         max_tokens: int = 2000,
         temperature: float = 0.1,
+        priority: int = PRIORITY_NORMAL,
+        on_finding: Optional[Callable[[Dict[str, Any]], None]] = None,
     ) -> Dict[str, Any]:
         """
         Analyze logs using LLM.
 
+        Logs larger than ``chunk_tokens`` are split at line boundaries and the
+        chunks are analyzed concurrently; their findings are merged and
+        deduplicated (see ``src/utils/log_chunking.py``).
+
+        With streaming, findings are parsed incrementally as the response
+        arrives and passed to ``on_finding`` one by one. If the response is
+        cut off or malformed, the complete findings are kept ('partial').
+
         Args:
             logs: Log content to analyze
             prompt: Analysis prompt/instructions
             model: Model to use (overrides default)
-            max_tokens: Maximum tokens in response
+            max_tokens: Maximum tokens in response (per chunk)
             temperature: Sampling temperature
+            priority: Dispatcher priority (PRIORITY_* in src.services.llm_dispatcher)
+            on_finding: Called with each finding as soon as it is streamed
+                (may be called from several threads for chunked logs)
 
         Returns:
             Dictionary containing analysis results with keys:
@@ -48,10 +141,383 @@ class LLMClient:
                 - model: str
                 - response: str
                 - findings: List[Dict] (if parseable as JSON)
+                - cached: bool (response came from the cache)
+                - chunks: int (requests the logs were split into)
+                - failed_chunks: int (chunks whose analysis failed)
+                - partial: bool (findings salvaged from an incomplete response)
                 - error: str (if failed)
         """
         model = model or self.default_model
 
+        chunks = split_log_chunks(logs, self.chunk_tokens) if self.chunk_tokens else [logs]
+        if len(chunks) > 1:
+            return self._analyze_chunks(
+                chunks, prompt, model, max_tokens, temperature, priority, on_finding
+            )
+
+        result = self._analyze_chunk(
+            logs, prompt, model, max_tokens, temperature, priority, on_finding
+        )
+        if result.get("success"):
+            result.update(chunks=1, failed_chunks=0)
+        return result
+
+    def triage_logs(
+        self,
+        logs: str,
+        prompt: str,
+        model: str,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Dict[str, Any]:
+        """
+        Classify logs as routine or suspicious with a small, fast model.
+
+        Logs that do not fit in one chunk are not triaged. Those logs, and
+        unparseable answers, count as suspicious, so errors escalate to the
+        full analysis instead of hiding problems.
+
+        Args:
+            logs: Log content
+            prompt: The host's analysis prompt (what matters for this host)
+            model: Triage model
+            priority: Dispatcher priority
+
+        Returns:
+            Dictionary with keys:
+                - success: bool (False if the model could not be asked)
+                - model: str
+                - suspicious: bool
+                - reason: str
+                - error: str (if failed)
+        """
+        started = time.monotonic()
+        if self.chunk_tokens and estimate_tokens(logs) > self.chunk_tokens:
+            result = {"success": False, "error": "Logs too large to triage in one request"}
+        else:
+            result = self._triage(logs, prompt, model, priority)
+
+        if result.get("success"):
+            verdict = "suspicious" if result["suspicious"] else "routine"
+        else:
+            verdict = "failed"
+            result["suspicious"] = True
+        with self._triage_lock:
+            self._triage_counts[verdict] += 1
+            self._triage_seconds += time.monotonic() - started
+        return result
+
+    def _triage(self, logs: str, prompt: str, model: str, priority: int) -> Dict[str, Any]:
+        key = None
+        triage_prompt = f"{prompt}\n\n{TRIAGE_INSTRUCTIONS}"
+        if self.cache is not None:
+            from src.services.llm_cache import cache_key
+
+            key = cache_key(model, triage_prompt, logs, TRIAGE_MAX_TOKENS, 0.0)
+            cached = self.cache.get(key)
+            if cached is not None:
+                verdict = self._parse_verdict(cached.response)
+                if verdict is not None:
+                    return {"success": True, "model": model, **verdict}
+
+        full_prompt = f"""{triage_prompt}
+
+Logs:
+
+```
+{logs}
+```
+"""
+        try:
+            usage: Dict[str, int] = {}
+            response = self._call_api(
+                prompt=full_prompt,
+                model=model,
+                max_tokens=TRIAGE_MAX_TOKENS,
+                temperature=0.0,
+                usage=usage,
+                priority=priority,
+            )
+        except Exception as e:
+            logger.error(f"LLM triage failed: {e}")
+            return {"success": False, "error": str(e)}
+
+        verdict = self._parse_verdict(response or "")
+        if verdict is None:
+            logger.warning(f"Unparseable triage answer from {model}: {(response or '')[:200]}")
+            return {"success": False, "error": "Unparseable triage answer"}
+
+        if key is not None:
+            self.cache.put(
+                key,
+                model,
+                response,
+                prompt_tokens=usage.get("prompt_tokens", len(full_prompt) // 4),
+                completion_tokens=usage.get("completion_tokens", len(response) // 4),
+            )
+        return {"success": True, "model": model, **verdict}
+
+    @staticmethod
+    def _parse_verdict(response: str) -> Optional[Dict[str, Any]]:
+        """Parse a triage answer into {'suspicious': bool, 'reason': str}."""
+        text = response.strip()
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end < start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError:
+            return None
+        verdict = str(data.get("verdict", "")).lower() if isinstance(data, dict) else ""
+        if verdict not in ("routine", "suspicious"):
+            return None
+        return {"suspicious": verdict == "suspicious", "reason": str(data.get("reason", ""))}
+
+    def triage_stats(self) -> Dict[str, Any]:
+        """
+        Return triage counts since startup.
+
+        Returns:
+            Batches triaged, escalated (suspicious or failed triage) and
+            resolved as routine, plus the escalation rate and average triage time
+        """
+        with self._triage_lock:
+            counts = dict(self._triage_counts)
+            seconds = self._triage_seconds
+        triaged = sum(counts.values())
+        escalated = counts["suspicious"] + counts["failed"]
+        return {
+            "triaged": triaged,
+            "routine": counts["routine"],
+            "escalated": escalated,
+            "failed": counts["failed"],
+            "escalation_rate": round(escalated / triaged, 4) if triaged else None,
+            "avg_triage_seconds": round(seconds / triaged, 3) if triaged else None,
+        }
+
+    def batch_host_limit(self, model: Optional[str] = None) -> int:
+        """
+        Most hosts a batched request can answer within the model's output limit.
+
+        Larger batches would have their response cut off, and every host of
+        a truncated response is analyzed again on its own.
+
+        Args:
+            model: Model to use (default: the client's default model)
+
+        Returns:
+            Hosts per batched request (at least 1)
+        """
+        cap = self.max_output_tokens.get(model or self.default_model, DEFAULT_MAX_OUTPUT_TOKENS)
+        return max(cap // BATCH_TOKENS_PER_HOST, 1)
+
+    def analyze_batch(
+        self,
+        sections: List[Tuple[str, str]],
+        prompt: str,
+        model: Optional[str] = None,
+        max_tokens: int = BATCH_TOKENS_PER_HOST,
+        temperature: float = 0.1,
+        priority: int = PRIORITY_NORMAL,
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Analyze the logs of several hosts that share a prompt in one request.
+
+        The prompt and response format are sent as a system message ahead of
+        the per-host sections, so providers can reuse them as a cached prefix.
+        Hosts answered from the cache are not sent. Each host's findings are
+        cached under the same key as a single-host analysis.
+
+        Args:
+            sections: (host name, logs) pairs; names must be unique
+            prompt: Analysis prompt shared by all hosts
+            model: Model to use (overrides default)
+            max_tokens: Maximum response tokens per host (the request is capped
+                at the model's output limit)
+            temperature: Sampling temperature
+            priority: Dispatcher priority
+
+        Returns:
+            {host name: result as returned by ``analyze_logs``}; hosts missing
+            from the response, or all sent hosts if the request fails, are left
+            out, so callers can analyze them alone
+        """
+        model = model or self.default_model
+        results: Dict[str, Dict[str, Any]] = {}
+        keys: Dict[str, str] = {}
+        pending: List[Tuple[str, str]] = []
+        for name, logs in sections:
+            if self.cache is not None:
+                from src.services.llm_cache import cache_key
+
+                keys[name] = cache_key(model, prompt, logs, max_tokens, temperature)
+                cached = self.cache.get(keys[name])
+                if cached is not None:
+                    results[name] = {
+                        "success": True,
+                        "model": cached.model,
+                        "response": cached.response,
+                        "findings": self._parse_findings(cached.response),
+                        "cached": True,
+                    }
+                    continue
+            pending.append((name, logs))
+        if not pending:
+            return results
+
+        body = "\n\n".join(f"### Host: {name}\n\n```\n{logs}\n```" for name, logs in pending)
+        try:
+            usage: Dict[str, int] = {}
+            response = self._call_api(
+                prompt=f"Here are the logs to analyze:\n\n{body}\n",
+                model=model,
+                max_tokens=min(
+                    max_tokens * len(pending),
+                    self.max_output_tokens.get(model, DEFAULT_MAX_OUTPUT_TOKENS),
+                ),
+                temperature=temperature,
+                usage=usage,
+                priority=priority,
+                system=f"{prompt}\n\n{BATCH_INSTRUCTIONS}",
+            )
+        except Exception as e:
+            logger.error(
+                f"Batched LLM analysis of {len(pending)} hosts failed, "
+                f"analyzing them on their own: {e}"
+            )
+            return results
+
+        hosts = self._parse_batch(response or "")
+        if hosts is None:
+            logger.warning(f"Unparseable batched LLM response for {len(pending)} hosts")
+            return results
+
+        for name, _ in pending:
+            data = hosts.get(name)
+            if isinstance(data, list):
+                data = {"findings": data}
+            if not isinstance(data, dict) or not isinstance(data.get("findings"), list):
+                logger.warning(f"Batched LLM response has no findings for {name}")
+                continue
+            host_response = json.dumps(data)
+            if name in keys:
+                self.cache.put(
+                    keys[name],
+                    model,
+                    host_response,
+                    prompt_tokens=usage.get("prompt_tokens", 0) // len(pending),
+                    completion_tokens=usage.get("completion_tokens", 0) // len(pending),
+                )
+            results[name] = {
+                "success": True,
+                "model": model,
+                "response": host_response,
+                "findings": data["findings"],
+                "cached": False,
+                "partial": False,
+                "batched": len(pending),
+            }
+        return results
+
+    @staticmethod
+    def _parse_batch(response: str) -> Optional[Dict[str, Any]]:
+        """Parse a batched response into {host name: host result}."""
+        text = response.strip()
+        start, end = text.find("{"), text.rfind("}")
+        if start < 0 or end < start:
+            return None
+        try:
+            data = json.loads(text[start:end + 1])
+        except json.JSONDecodeError as e:
+            logger.warning(f"Failed to parse batched LLM response as JSON: {e}")
+            return None
+        hosts = data.get("hosts") if isinstance(data, dict) else None
+        return hosts if isinstance(hosts, dict) else None
+
+    def _analyze_chunks(
+        self,
+        chunks: List[str],
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: int = PRIORITY_NORMAL,
+        on_finding: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Map-reduce analysis: analyze chunks concurrently, then merge findings.
+
+        The batch succeeds if any chunk does; failed chunks are counted in
+        ``failed_chunks``.
+        """
+        workers = min(len(chunks), self.chunk_concurrency)
+        logger.info(
+            f"Splitting {sum(estimate_tokens(chunk) for chunk in chunks)} estimated tokens "
+            f"of logs into {len(chunks)} chunks ({workers} concurrent)"
+        )
+        chunk_prompt = f"{prompt}\n\n{CHUNK_NOTE}"
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="llm-chunk") as executor:
+            results = list(
+                executor.map(
+                    lambda chunk: self._analyze_chunk(
+                        chunk, chunk_prompt, model, max_tokens, temperature, priority, on_finding
+                    ),
+                    chunks,
+                )
+            )
+
+        succeeded = [result for result in results if result.get("success")]
+        failed = len(results) - len(succeeded)
+        if not succeeded:
+            return {
+                "success": False,
+                "error": f"All {len(chunks)} chunks failed: {results[0].get('error')}",
+            }
+        if failed:
+            logger.warning(f"{failed} of {len(chunks)} log chunks failed analysis")
+
+        findings = merge_findings([result.get("findings") or [] for result in succeeded])
+        summary = f"Merged findings from {len(succeeded)} of {len(chunks)} log chunks"
+        return {
+            "success": True,
+            "model": model,
+            "response": json.dumps({"findings": findings, "summary": summary}),
+            "findings": findings,
+            "cached": all(result.get("cached") for result in succeeded),
+            "chunks": len(chunks),
+            "failed_chunks": failed,
+            "partial": any(result.get("partial") for result in succeeded),
+        }
+
+    def _analyze_chunk(
+        self,
+        logs: str,
+        prompt: str,
+        model: str,
+        max_tokens: int,
+        temperature: float,
+        priority: int = PRIORITY_NORMAL,
+        on_finding: Optional[Callable[[Dict[str, Any]], None]] = None,
+    ) -> Dict[str, Any]:
+        """Analyze logs in a single request (answered from the cache if possible)."""
+        key = None
+        if self.cache is not None:
+            from src.services.llm_cache import cache_key
+
+            key = cache_key(model, prompt, logs, max_tokens, temperature)
+            cached = self.cache.get(key)
+            if cached is not None:
+                logger.info(
+                    f"LLM cache hit for model {model} "
+                    f"({cached.prompt_tokens + cached.completion_tokens} tokens saved)"
+                )
+                return {
+                    "success": True,
+                    "model": cached.model,
+                    "response": cached.response,
+                    "findings": self._parse_findings(cached.response),
+                    "cached": True,
+                }
+
         # Build the full prompt
         full_prompt = f"""{prompt}
 
@@ -77,12 +543,23 @@ Please provide your analysis in JSON format with the following structure:
 }}
 """
 
+        parser = FindingsStreamParser()
+
+        def on_text(text: str) -> None:
+            for finding in parser.feed(text):
+                if on_finding is not None:
+                    on_finding(finding)
+
         try:
+            usage: Dict[str, int] = {}
             response = self._call_api(
                 prompt=full_prompt,
                 model=model,
                 max_tokens=max_tokens,
                 temperature=temperature,
+                usage=usage,
+                priority=priority,
+                on_text=on_text,
             )
 
             if not response:
@@ -93,12 +570,32 @@ Please provide your analysis in JSON format with the following structure:
 
             # Try to parse as JSON
             findings = self._parse_findings(response)
+            partial = False
+            if findings is None:
+                salvaged = parser.findings or extract_findings(response)
+                if salvaged:
+                    logger.warning(
+                        f"Salvaged {len(salvaged)} findings from an incomplete LLM response"
+                    )
+                    findings, partial = salvaged, True
+
+            # Only cache responses that parsed, so a malformed answer is retried
+            if key is not None and findings is not None and not partial:
+                self.cache.put(
+                    key,
+                    model,
+                    response,
+                    prompt_tokens=usage.get("prompt_tokens", len(full_prompt) // 4),
+                    completion_tokens=usage.get("completion_tokens", len(response) // 4),
+                )
 
             return {
                 "success": True,
                 "model": model,
                 "response": response,
                 "findings": findings,
+                "cached": False,
+                "partial": partial,
             }
 
         except Exception as e:
@@ -114,6 +611,10 @@ Please provide your analysis in JSON format with the following structure:
         model: str,
         max_tokens: int,
         temperature: float,
+        usage: Optional[Dict[str, int]] = None,
+        priority: int = PRIORITY_NORMAL,
+        on_text: Optional[Callable[[str], None]] = None,
+        system: Optional[str] = None,
     ) -> Optional[str]:
         """
         Call the LLM API.
@@ -123,18 +624,32 @@ Please provide your analysis in JSON format with the following structure:
             model: Model to use
             max_tokens: Maximum tokens
             temperature: Sampling temperature
+            usage: If given, filled with 'prompt_tokens' and 'completion_tokens'
+                when the API reports token usage
+            priority: Dispatcher priority
+            on_text: With streaming enabled, called with each piece of text
+                as it arrives
+            system: Instructions sent as a system message before the prompt
+                (marked cacheable with prompt caching enabled)
 
         Returns:
             API response text or None if failed
         """
+        messages: List[Dict[str, Any]] = [
+            {
+                "role": "user",
+                "content": prompt,
+            }
+        ]
+        if system:
+            content: Any = system
+            if self.prompt_caching:
+                content = [{"type": "text", "text": system, "cache_control": {"type": "ephemeral"}}]
+            messages.insert(0, {"role": "system", "content": content})
+
         payload = {
             "model": model,
-            "messages": [
-                {
-                    "role": "user",
-                    "content": prompt,
-                }
-            ],
+            "messages": messages,
             "max_tokens": max_tokens,
             "temperature": temperature,
         }
@@ -144,17 +659,38 @@ Please provide your analysis in JSON format with the following structure:
             "Authorization": f"Bearer {self.api_key}",
         }
 
-        try:
-            logger.info(f"Calling LLM API with model: {model}")
+        streaming = self.stream and on_text is not None
+
+        def send() -> Dict[str, Any]:
             response = requests.post(
                 self.api_url,
-                json=payload,
+                json={**payload, "stream": True} if streaming else payload,
                 headers=headers,
                 timeout=60,
+                stream=streaming,
             )
-            response.raise_for_status()
+            with response:
+                response.raise_for_status()
+                if streaming and "text/event-stream" in response.headers.get("Content-Type", ""):
+                    return self._read_stream(response, on_text)
+                # Not streamed (or the API ignored "stream")
+                return response.json()
 
-            data = response.json()
+        try:
+            logger.info(f"Calling LLM API with model: {model}")
+            if self.dispatcher is not None:
+                data = self.dispatcher.execute(
+                    send,
+                    model=model,
+                    estimated_tokens=estimate_tokens((system or "") + prompt) + max_tokens,
+                    priority=priority,
+                    usage_of=self._parse_usage,
+                )
+            else:
+                data = send()
+
+            if usage is not None:
+                usage.update(self._parse_usage(data))
 
             # Extract response text (format may vary by API)
             # Try common response formats
@@ -176,6 +712,79 @@ Please provide your analysis in JSON format with the following structure:
             logger.error(f"LLM API request failed: {e}")
             raise
 
+    def _read_stream(
+        self, response: requests.Response, on_text: Callable[[str], None]
+    ) -> Dict[str, Any]:
+        """
+        Read a server-sent events completion (OpenAI- or Anthropic-style).
+
+        If the stream breaks after some text arrived, the text so far is
+        returned instead of raising, so complete findings can be salvaged.
+
+        Returns:
+            {'content': text, 'usage': {...}}
+        """
+        parts: List[str] = []
+        usage: Dict[str, int] = {}
+        try:
+            for line in response.iter_lines(decode_unicode=True):
+                if not line or not line.startswith("data:"):
+                    continue
+                data = line[5:].strip()
+                if data == "[DONE]":
+                    break
+                try:
+                    event = json.loads(data)
+                except json.JSONDecodeError:
+                    continue
+                if not isinstance(event, dict):
+                    continue
+                usage.update(self._parse_usage(event))
+                usage.update(self._parse_usage(event.get("message") or {}))
+                text = self._stream_text(event)
+                if text:
+                    parts.append(text)
+                    on_text(text)
+        except requests.exceptions.RequestException as e:
+            if not parts:
+                raise
+            logger.warning(f"LLM stream cut off after {sum(map(len, parts))} characters: {e}")
+        return {"content": "".join(parts), "usage": usage}
+
+    @staticmethod
+    def _stream_text(event: Dict[str, Any]) -> str:
+        """Extract the text delta of one streamed event."""
+        choices = event.get("choices")
+        if choices:
+            delta = choices[0].get("delta") or {}
+            return delta.get("content") or choices[0].get("text") or ""
+        if event.get("type") == "content_block_delta":
+            return (event.get("delta") or {}).get("text") or ""
+        return ""
+
+    @staticmethod
+    def _parse_usage(data: Dict[str, Any]) -> Dict[str, int]:
+        """Extract token usage from an OpenAI- or Anthropic-style response."""
+        raw = data.get("usage") if isinstance(data, dict) else None
+        if not isinstance(raw, dict):
+            return {}
+        usage = {}
+        prompt_tokens = raw.get("prompt_tokens", raw.get("input_tokens"))
+        completion_tokens = raw.get("completion_tokens", raw.get("output_tokens"))
+        if isinstance(prompt_tokens, int):
+            usage["prompt_tokens"] = prompt_tokens
+        if isinstance(completion_tokens, int):
+            usage["completion_tokens"] = completion_tokens
+        # Prompt tokens read from the provider's prompt cache
+        details = raw.get("prompt_tokens_details")
+        cached_tokens = raw.get(
+            "cache_read_input_tokens",
+            details.get("cached_tokens") if isinstance(details, dict) else None,
+        )
+        if isinstance(cached_tokens, int):
+            usage["cached_prompt_tokens"] = cached_tokens
+        return usage
+
     def _parse_findings(self, response: str) -> Optional[List[Dict[str, Any]]]:
         """
         Parse LLM response to extract findings.
@@ -218,18 +827,61 @@ Please provide your analysis in JSON format with the following structure:
             return None
 
 
+# Global client instance
+_llm_client: Optional[LLMClient] = None
+_llm_client_lock = threading.Lock()
+
+
+def parse_output_limits(raw: Optional[str]) -> Dict[str, int]:
+    """
+    Parse LLM_MAX_OUTPUT_TOKENS: JSON {model: most response tokens}.
+
+    Invalid entries are ignored.
+    """
+    if not raw:
+        return {}
+    try:
+        data = json.loads(raw)
+    except json.JSONDecodeError:
+        logger.warning(f"Ignoring invalid LLM_MAX_OUTPUT_TOKENS: {raw[:100]}")
+        return {}
+    limits = {}
+    for model, limit in (data.items() if isinstance(data, dict) else []):
+        try:
+            limits[model] = max(int(limit), 1)
+        except (TypeError, ValueError):
+            logger.warning(f"Ignoring invalid LLM_MAX_OUTPUT_TOKENS entry for {model}")
+    return limits
+
+
 def get_llm_client() -> LLMClient:
     """
-    Get LLM client from settings.
+    Get or create the process-wide LLM client.
+
+    All callers share one client, so every request goes through the same
+    dispatcher (rate limits, priorities, retries and accounting).
 
     Returns:
         LLMClient instance
     """
-    from src.config import get_settings
-
-    settings = get_settings()
-    return LLMClient(
-        api_url=settings.llm_api_url,
-        api_key=settings.llm_api_key,
-        default_model=settings.llm_default_model,
-    )
+    global _llm_client
+    with _llm_client_lock:
+        if _llm_client is None:
+            from src.config import get_settings
+            from src.services.llm_cache import get_llm_cache
+            from src.services.llm_dispatcher import get_llm_dispatcher
+
+            settings = get_settings()
+            _llm_client = LLMClient(
+                api_url=settings.llm_api_url,
+                api_key=settings.llm_api_key,
+                default_model=settings.llm_default_model,
+                cache=get_llm_cache(),
+                chunk_tokens=settings.llm_chunk_tokens,
+                chunk_concurrency=settings.llm_chunk_concurrency,
+                dispatcher=get_llm_dispatcher(),
+                stream=settings.llm_streaming,
+                prompt_caching=settings.llm_prompt_caching,
+                max_output_tokens=parse_output_limits(settings.llm_max_output_tokens),
+            )
+    return _llm_client
@@ -0,0 +1,98 @@
+"""Token-aware splitting of large logs and merging of per-chunk findings.
+
+Token counts are estimated from character counts (about 4 characters per
+token for English log text). Chunks are cut at line boundaries, so each
+chunk is a contiguous run of complete lines. Only a single line longer than
+the budget is split mid-line.
+"""
+import re
+from typing import Any, Dict, List, Tuple
+
+CHARS_PER_TOKEN = 4
+
+SEVERITY_RANK = {"critical": 3, "warning": 2, "info": 1, "none": 0}
+
+_VARIABLE_RE = re.compile(r"\d+(?:[.:]\d+)*|0x[0-9a-f]+")
+
+
+def estimate_tokens(text: str) -> int:
+    """Estimate the number of tokens in text."""
+    return (len(text) + CHARS_PER_TOKEN - 1) // CHARS_PER_TOKEN
+
+
+def split_log_chunks(logs: str, max_tokens: int) -> List[str]:
+    """
+    Split logs into chunks of at most ``max_tokens`` estimated tokens.
+
+    Args:
+        logs: Log content
+        max_tokens: Token budget per chunk
+
+    Returns:
+        Chunks in log order (a single chunk if the logs fit)
+    """
+    max_chars = max(max_tokens, 1) * CHARS_PER_TOKEN
+    if len(logs) <= max_chars:
+        return [logs]
+
+    chunks: List[str] = []
+    current: List[str] = []
+    size = 0
+    for line in logs.splitlines(keepends=True):
+        while len(line) > max_chars:
+            # A single huge line: flush, then hard-split it
+            if current:
+                chunks.append("".join(current))
+                current, size = [], 0
+            chunks.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) > max_chars and current:
+            chunks.append("".join(current))
+            current, size = [], 0
+        if line:
+            current.append(line)
+            size += len(line)
+    if current:
+        chunks.append("".join(current))
+    return chunks
+
+
+def _finding_key(finding: Dict[str, Any]) -> Tuple[str, str]:
+    description = str(finding.get("description", "")).lower()
+    description = " ".join(_VARIABLE_RE.sub("#", description).split())
+    return str(finding.get("category", "other")).lower(), description
+
+
+def merge_findings(chunk_findings: List[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    """
+    Merge findings from several chunks, dropping duplicates.
+
+    Findings with the same category and description (ignoring case and
+    numbers) are merged into one with the highest severity seen and an
+    ``occurrences`` count of the chunks reporting it.
+
+    Args:
+        chunk_findings: Findings per chunk, in log order
+
+    Returns:
+        Merged findings, most severe first (log order within a severity)
+    """
+    merged: Dict[Tuple[str, str], Dict[str, Any]] = {}
+    for findings in chunk_findings:
+        for finding in findings or []:
+            if not isinstance(finding, dict):
+                continue
+            key = _finding_key(finding)
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = {**finding, "occurrences": 1}
+                continue
+            existing["occurrences"] += 1
+            new_rank = SEVERITY_RANK.get(finding.get("severity"), 1)
+            if new_rank > SEVERITY_RANK.get(existing.get("severity"), 1):
+                existing.update({k: v for k, v in finding.items() if k != "occurrences"})
+
+    return sorted(
+        merged.values(),
+        key=lambda finding: -SEVERITY_RANK.get(finding.get("severity"), 1),
+    )
@@ -0,0 +1,228 @@
+"""Local prefilter that decides whether a log batch needs LLM analysis.
+
+A batch is sent to the LLM only when at least one of these holds:
+
+- a rule matches: rules are compiled into one alternation regex with a
+  named group per rule, so a batch is scanned in a single pass (rules with
+  their own groups or backreferences, or inline flags, which would break or
+  change meaning in the alternation, are scanned separately)
+- a template is new for the host (see ``src/utils/log_templates.py``)
+- a known template's count is far above its baseline, an exponentially
+  weighted moving average of its count per analyzed batch
+
+Everything else is routine and is recorded without an API call.
+"""
+import re
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple
+
+from src.utils.log_templates import LogSummary
+
+# (name, pattern); patterns are matched case-insensitively
+DEFAULT_RULES: List[Tuple[str, str]] = [
+    ("oom", r"out of memory|oom-killer|killed process \d+"),
+    ("kernel_panic", r"kernel panic|\bBUG:|general protection fault"),
+    ("segfault", r"segfault|segmentation fault|core dumped"),
+    ("disk_full", r"no space left on device|disk (?:is )?full|quota exceeded"),
+    ("io_error", r"i/o error|read-only file system|EXT4-fs error|XFS.*(?:error|corruption)"),
+    ("hardware", r"machine check|hardware error|mce:|temperature above threshold"),
+    ("link_down", r"link (?:is )?down|carrier lost|NIC Link is Down"),
+    ("auth_failure", r"authentication failure|failed password|invalid user"),
+    ("service_failed", r"failed with result|entered failed state|start request repeated too quickly"),
+    ("emergency", r"\b(?:emerg(?:ency)?|crit(?:ical)?)\b"),
+]
+
+DEFAULT_ANOMALY_FACTOR = 3.0
+DEFAULT_ANOMALY_MIN_COUNT = 20
+DEFAULT_WARMUP_RUNS = 3
+BASELINE_ALPHA = 0.2  # EWMA weight of the newest batch
+
+
+@dataclass(frozen=True)
+class PrefilterRule:
+    """A named pattern that makes a batch worth analyzing."""
+
+    name: str
+    pattern: str
+
+
+@dataclass(frozen=True)
+class TemplateBaseline:
+    """Typical count of a template per analyzed batch."""
+
+    mean: float
+    samples: int
+
+
+@dataclass
+class PrefilterDecision:
+    """Outcome of prefiltering one batch."""
+
+    analyze: bool
+    reasons: List[str] = field(default_factory=list)
+    rule_hits: Dict[str, int] = field(default_factory=dict)
+    novel_templates: int = 0
+    anomalies: List[Tuple[str, int, float]] = field(default_factory=list)  # (template, count, baseline)
+
+
+def parse_rules(raw: Iterable[Any]) -> List[PrefilterRule]:
+    """
+    Build rules from config entries.
+
+    Args:
+        raw: Dicts with 'name' and 'pattern', or (name, pattern) tuples
+
+    Returns:
+        Rules; entries without a name or pattern are skipped
+
+    Raises:
+        ValueError: If a pattern does not compile
+    """
+    rules = []
+    for entry in raw or []:
+        if isinstance(entry, dict):
+            name, pattern = entry.get("name"), entry.get("pattern")
+        else:
+            name, pattern = entry
+        if not name or not pattern:
+            continue
+        rule = PrefilterRule(name=str(name), pattern=pattern)
+        _compile_rule(rule)
+        rules.append(rule)
+    return rules
+
+
+def _compile_rule(rule: PrefilterRule) -> Pattern[str]:
+    """Compile one rule on its own, raising ValueError if it is invalid."""
+    try:
+        return re.compile(rule.pattern, re.IGNORECASE)
+    except re.error as e:
+        raise ValueError(f"Invalid prefilter rule {rule.name!r}: {e}") from e
+
+
+def _combinable(rule: PrefilterRule, compiled: Pattern[str]) -> bool:
+    """Whether a rule keeps its meaning as a branch of the combined alternation."""
+    if compiled.groups or compiled.flags & ~(re.IGNORECASE | re.UNICODE):
+        return False
+    try:
+        re.compile(f"(?P<r>{rule.pattern})", re.IGNORECASE)
+    except re.error:
+        return False
+    return True
+
+
+class RuleMatcher:
+    """Rules compiled into one case-insensitive alternation where possible."""
+
+    def __init__(self, rules: List[PrefilterRule]):
+        """
+        Initialize matcher.
+
+        Args:
+            rules: Rules to match; later rules with the same name replace earlier ones
+
+        Raises:
+            ValueError: If a pattern does not compile
+        """
+        by_name = {rule.name: rule for rule in rules}
+        self.rules = list(by_name.values())
+        self._groups: Dict[str, PrefilterRule] = {}
+        self._separate: List[Tuple[str, Pattern[str]]] = []
+        for index, rule in enumerate(self.rules):
+            compiled = _compile_rule(rule)
+            if _combinable(rule, compiled):
+                self._groups[f"r{index}"] = rule
+            else:
+                self._separate.append((rule.name, compiled))
+        self._regex = (
+            re.compile(
+                "|".join(f"(?P<{group}>{rule.pattern})" for group, rule in self._groups.items()),
+                re.IGNORECASE,
+            )
+            if self._groups
+            else None
+        )
+
+    def match(self, text: str) -> Dict[str, int]:
+        """
+        Count matching lines per rule.
+
+        Args:
+            text: Log text
+
+        Returns:
+            {rule name: number of lines it matched}
+        """
+        hits: Dict[str, int] = {}
+        last_line: Dict[str, int] = {}
+
+        def record(name: str, start: int) -> None:
+            line_start = text.rfind("\n", 0, start)
+            if last_line.get(name) != line_start:
+                last_line[name] = line_start
+                hits[name] = hits.get(name, 0) + 1
+
+        if self._regex is not None:
+            for match in self._regex.finditer(text):
+                record(self._groups[match.lastgroup].name, match.start())
+        for name, regex in self._separate:
+            for match in regex.finditer(text):
+                record(name, match.start())
+        return hits
+
+
+def evaluate_batch(
+    text: str,
+    summary: LogSummary,
+    baselines: Dict[str, TemplateBaseline],
+    matcher: RuleMatcher,
+    anomaly_factor: float = DEFAULT_ANOMALY_FACTOR,
+    anomaly_min_count: int = DEFAULT_ANOMALY_MIN_COUNT,
+    warmup_runs: int = DEFAULT_WARMUP_RUNS,
+) -> PrefilterDecision:
+    """
+    Decide whether a batch needs LLM analysis.
+
+    Args:
+        text: Raw log text
+        summary: Templates mined from the batch against the host's known templates
+        baselines: {template key: baseline} for the host
+        matcher: Compiled rules
+        anomaly_factor: Count must exceed baseline * factor to be anomalous ...
+        anomaly_min_count: ... and exceed baseline + this many lines
+        warmup_runs: Batches needed before a template's baseline is trusted
+
+    Returns:
+        PrefilterDecision
+    """
+    decision = PrefilterDecision(analyze=False)
+
+    decision.rule_hits = matcher.match(text)
+    if decision.rule_hits:
+        decision.reasons.append(
+            "rules matched: " + ", ".join(f"{name} ({count})" for name, count in decision.rule_hits.items())
+        )
+
+    decision.novel_templates = len(summary.novel)
+    if decision.novel_templates:
+        decision.reasons.append(f"{decision.novel_templates} new templates")
+
+    for stats in summary.templates:
+        baseline = baselines.get(stats.key)
+        if stats.novel or baseline is None or baseline.samples < warmup_runs:
+            continue
+        if stats.count > baseline.mean * anomaly_factor and stats.count > baseline.mean + anomaly_min_count:
+            decision.anomalies.append((stats.template, stats.count, baseline.mean))
+    if decision.anomalies:
+        decision.reasons.append(f"{len(decision.anomalies)} templates above baseline rate")
+
+    decision.analyze = bool(decision.reasons)
+    return decision
+
+
+def update_baseline(baseline: Optional[TemplateBaseline], count: int) -> TemplateBaseline:
+    """Fold one batch's count into a template baseline."""
+    if baseline is None or baseline.samples == 0:
+        return TemplateBaseline(mean=float(count), samples=1)
+    mean = BASELINE_ALPHA * count + (1 - BASELINE_ALPHA) * baseline.mean
+    return TemplateBaseline(mean=mean, samples=baseline.samples + 1)
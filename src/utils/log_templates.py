@@ -0,0 +1,293 @@
+"""Log template mining (Drain) to compress logs before LLM analysis.
+
+Lines are tokenized after masking variable fields (timestamps, IPs, MACs,
+UUIDs, hex IDs, numbers) and clustered with a fixed-depth Drain parse tree:
+lines are routed by token count and their first tokens, then joined to the
+most similar cluster in the leaf (or start a new one). Positions where a
+cluster's lines differ become ``<*>``. Templates seeded from earlier runs are
+never generalized: a line joins one only if it fits the template as stored,
+otherwise it starts a new (novel) cluster.
+
+``summarize_logs`` turns a batch of lines into template counts with a few
+sample lines each. Templates not seen in earlier runs are "novel" and their
+lines are kept verbatim, so rare events survive while repetitive noise is
+reduced to one line per template.
+
+Reference: He et al., "Drain: An Online Log Parsing Approach with Fixed Depth
+Tree", ICWS 2017.
+"""
+import hashlib
+import re
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+WILDCARD = "<*>"
+
+# Order matters: earlier patterns win (e.g. MACs before times before IPv6)
+_MASKS = [
+    ("TS", r"\d{4}-\d{2}-\d{2}[T ]\d{2}:\d{2}:\d{2}(?:[.,]\d+)?(?:Z|[+-]\d{2}:?\d{2})?"),
+    ("UUID", r"\b[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}\b"),
+    ("MAC", r"\b(?:[0-9a-fA-F]{2}[:-]){5}[0-9a-fA-F]{2}\b"),
+    ("IP", r"\b(?:\d{1,3}\.){3}\d{1,3}(?::\d{1,5})?\b"),
+    ("TIME", r"\b\d{1,2}:\d{2}:\d{2}(?:[.,]\d+)?\b"),
+    ("IP", r"\b(?:[0-9a-fA-F]{0,4}:){2,7}[0-9a-fA-F]{1,4}\b"),  # IPv6, incl. '::' forms
+    ("HEX", r"\b0x[0-9a-fA-F]+\b|\b(?=[0-9a-fA-F]*[a-fA-F])(?=[0-9a-fA-F]*\d)[0-9a-fA-F]{8,}\b"),
+    ("NUM", r"(?<![\w.])[-+]?\d+(?:\.\d+)?(?![\w.])"),
+]
+_MASK_RE = re.compile(
+    "|".join(f"(?P<{name}{index}>{pattern})" for index, (name, pattern) in enumerate(_MASKS))
+)
+_MASK_NAMES = {f"{name}{index}": f"<{name}>" for index, (name, _) in enumerate(_MASKS)}
+
+
+def mask_line(line: str) -> str:
+    """Replace variable fields in a log line with typed placeholders."""
+    return _MASK_RE.sub(lambda match: _MASK_NAMES[match.lastgroup], line)
+
+
+def template_key(template: str) -> str:
+    """Stable identifier of a template string."""
+    return hashlib.sha1(template.encode("utf-8")).hexdigest()
+
+
+def _is_variable(token: str) -> bool:
+    return token.startswith("<") and token.endswith(">") or any(ch.isdigit() for ch in token)
+
+
+class LogCluster:
+    """A group of lines sharing a template."""
+
+    __slots__ = ("tokens", "count", "samples", "lines", "key", "known")
+
+    def __init__(self, tokens: List[str], key: Optional[str] = None, known: bool = False):
+        self.tokens = tokens
+        self.count = 0
+        self.samples: List[str] = []
+        self.lines: List[str] = []  # All lines (capped) of novel clusters
+        self.key = key
+        self.known = known
+
+    @property
+    def template(self) -> str:
+        return " ".join(self.tokens)
+
+    def similarity(self, tokens: List[str]) -> Tuple[float, int]:
+        """Return (fraction of equal non-wildcard tokens, wildcard count)."""
+        same = params = 0
+        for ours, theirs in zip(self.tokens, tokens):
+            if ours == WILDCARD:
+                params += 1
+            elif ours == theirs:
+                same += 1
+        return same / len(tokens), params
+
+    def fits(self, tokens: List[str]) -> bool:
+        """Whether the line matches the template without adding a wildcard."""
+        return all(ours in (WILDCARD, theirs) for ours, theirs in zip(self.tokens, tokens))
+
+    def merge(self, tokens: List[str]) -> None:
+        self.tokens = [
+            ours if ours == theirs else WILDCARD for ours, theirs in zip(self.tokens, tokens)
+        ]
+
+
+class _Node:
+    __slots__ = ("children", "clusters")
+
+    def __init__(self):
+        self.children: Dict[str, "_Node"] = {}
+        self.clusters: List[LogCluster] = []
+
+
+class DrainParser:
+    """Online log template miner with a fixed-depth parse tree."""
+
+    def __init__(
+        self,
+        depth: int = 4,
+        similarity_threshold: float = 0.5,
+        max_children: int = 100,
+        max_samples: int = 3,
+        max_novel_lines: int = 20,
+    ):
+        """
+        Initialize parser.
+
+        Args:
+            depth: Tree depth including the root and token-count layers
+            similarity_threshold: Minimum similarity to join an existing cluster
+            max_children: Maximum children per internal node
+            max_samples: Raw sample lines kept per cluster
+            max_novel_lines: Raw lines kept per novel (unseeded) cluster
+        """
+        self.prefix_depth = max(depth - 2, 1)
+        self.similarity_threshold = similarity_threshold
+        self.max_children = max_children
+        self.max_samples = max_samples
+        self.max_novel_lines = max_novel_lines
+        self._root = _Node()
+        self.clusters: List[LogCluster] = []
+
+    def _leaf(self, tokens: List[str]) -> _Node:
+        node = self._root.children.setdefault(str(len(tokens)), _Node())
+        for token in tokens[: self.prefix_depth]:
+            key = WILDCARD if _is_variable(token) else token
+            child = node.children.get(key)
+            if child is None:
+                if len(node.children) < self.max_children:
+                    child = node.children[key] = _Node()
+                else:
+                    child = node.children.setdefault(WILDCARD, _Node())
+            node = child
+        return node
+
+    def _match(self, leaf: _Node, tokens: List[str]) -> Optional[LogCluster]:
+        best: Optional[LogCluster] = None
+        best_score = (-1.0, -1)
+        for cluster in leaf.clusters:
+            if cluster.known and not cluster.fits(tokens):
+                continue
+            score = cluster.similarity(tokens)
+            if score > best_score:
+                best, best_score = cluster, score
+        if best is not None and best_score[0] >= self.similarity_threshold:
+            return best
+        return None
+
+    def seed(self, template: str, key: Optional[str] = None) -> LogCluster:
+        """
+        Add a previously mined template so matching lines are not novel.
+
+        Args:
+            template: Template string (space-separated tokens)
+            key: Stored template key (default: derived from the template)
+
+        Returns:
+            The seeded cluster
+        """
+        tokens = template.split()
+        cluster = LogCluster(tokens, key=key or template_key(template), known=True)
+        self._leaf(tokens).clusters.append(cluster)
+        self.clusters.append(cluster)
+        return cluster
+
+    def add(self, line: str) -> Optional[LogCluster]:
+        """
+        Add a log line.
+
+        Args:
+            line: Raw log line
+
+        Returns:
+            The cluster the line joined, or None for blank lines
+        """
+        tokens = mask_line(line).split()
+        if not tokens:
+            return None
+
+        leaf = self._leaf(tokens)
+        cluster = self._match(leaf, tokens)
+        if cluster is None:
+            cluster = LogCluster(tokens)
+            leaf.clusters.append(cluster)
+            self.clusters.append(cluster)
+        else:
+            cluster.merge(tokens)
+
+        cluster.count += 1
+        if len(cluster.samples) < self.max_samples:
+            cluster.samples.append(line)
+        if not cluster.known and len(cluster.lines) < self.max_novel_lines:
+            cluster.lines.append(line)
+        return cluster
+
+
+@dataclass
+class TemplateStats:
+    """Occurrences of one template in a batch."""
+
+    key: str
+    template: str
+    count: int
+    samples: List[str]
+    novel: bool
+    lines: List[str] = field(default_factory=list)
+
+
+@dataclass
+class LogSummary:
+    """Template-level summary of a batch of log lines."""
+
+    total_lines: int
+    templates: List[TemplateStats]
+
+    @property
+    def novel(self) -> List[TemplateStats]:
+        return [stats for stats in self.templates if stats.novel]
+
+    def render(self) -> str:
+        """Render the summary as compact text for an LLM prompt."""
+        novel = self.novel
+        known = [stats for stats in self.templates if not stats.novel]
+        out = [
+            f"Log summary: {self.total_lines} lines in {len(self.templates)} templates "
+            f"({len(novel)} not seen in earlier analyses). Variable fields are masked "
+            f"as <IP>, <NUM>, <HEX>, <TIME> etc. and <*> marks positions that vary.",
+        ]
+        if novel:
+            out.append("")
+            out.append("New templates (lines shown verbatim):")
+            for stats in novel:
+                out.append(f"[{stats.count}x] {stats.template}")
+                out.extend(f"  {line}" for line in stats.lines)
+                if stats.count > len(stats.lines):
+                    out.append(f"  ... {stats.count - len(stats.lines)} more")
+        if known:
+            out.append("")
+            out.append("Recurring templates (count, template, sample):")
+            for stats in known:
+                out.append(f"[{stats.count}x] {stats.template}")
+                out.extend(f"  e.g. {line}" for line in stats.samples[:1])
+        return "\n".join(out) + "\n"
+
+
+def summarize_logs(
+    text: str,
+    known_templates: Optional[Dict[str, str]] = None,
+    parser: Optional[DrainParser] = None,
+) -> LogSummary:
+    """
+    Mine templates from a batch of log text.
+
+    Args:
+        text: Raw log text
+        known_templates: {key: template} from earlier runs; lines matching them
+            are not novel
+        parser: Parser to use (default: a new DrainParser)
+
+    Returns:
+        LogSummary with templates ordered novel first, then by count
+    """
+    parser = parser or DrainParser()
+    for key, template in (known_templates or {}).items():
+        parser.seed(template, key)
+
+    total = 0
+    for line in text.splitlines():
+        if parser.add(line) is not None:
+            total += 1
+
+    templates = [
+        TemplateStats(
+            key=cluster.key or template_key(cluster.template),
+            template=cluster.template,
+            count=cluster.count,
+            samples=cluster.samples,
+            novel=not cluster.known,
+            lines=cluster.lines,
+        )
+        for cluster in parser.clusters
+        if cluster.count
+    ]
+    templates.sort(key=lambda stats: (not stats.novel, -stats.count))
+    return LogSummary(total_lines=total, templates=templates)
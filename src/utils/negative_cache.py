@@ -0,0 +1,65 @@
+"""Bounded negative-lookup cache."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Hashable
+
+
+class NegativeCache:
+    """
+    Remembers keys that recently failed a lookup.
+
+    Entries expire after ``ttl_seconds`` and the cache holds at most
+    ``max_entries`` keys, evicting the oldest first.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = 60.0,
+        max_entries: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize negative cache.
+
+        Args:
+            ttl_seconds: How long a miss is remembered
+            max_entries: Maximum number of remembered keys
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, float]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, key: Hashable) -> None:
+        """Remember a failed lookup for key."""
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = self._clock() + self.ttl_seconds
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def discard(self, key: Hashable) -> None:
+        """Forget key (e.g. once it becomes valid)."""
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            expires_at = self._entries.get(key)
+            if expires_at is None:
+                return False
+            if expires_at < self._clock():
+                del self._entries[key]
+                return False
+            return True
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Forget all keys."""
+        with self._lock:
+            self._entries.clear()
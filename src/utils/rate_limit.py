@@ -0,0 +1,127 @@
+"""In-memory token-bucket rate limiting."""
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+
+class TokenBucketLimiter:
+    """
+    Keyed token-bucket limiter with a bounded number of tracked keys.
+
+    Each key gets its own bucket holding up to ``burst`` tokens that refill at
+    ``rate`` tokens per second. Buckets are kept in LRU order and the least
+    recently used ones are dropped once ``max_keys`` is exceeded, so a flood of
+    distinct keys (e.g. spoofed source addresses) cannot grow memory unbounded.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        burst: float,
+        max_keys: int = 10000,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        """
+        Initialize limiter.
+
+        Args:
+            rate: Tokens added per second
+            burst: Bucket capacity (maximum burst size)
+            max_keys: Maximum number of buckets kept in memory
+            clock: Monotonic clock function (overridable for tests)
+        """
+        self.rate = float(rate)
+        self.burst = float(burst)
+        self.max_keys = max_keys
+        self._clock = clock
+        # key -> [tokens, last_refill]
+        self._buckets: "OrderedDict[str, List[float]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _bucket(self, key: str, now: float) -> List[float]:
+        """Return the refilled bucket for key, creating it if needed."""
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = [self.burst, now]
+            self._buckets[key] = bucket
+            if len(self._buckets) > self.max_keys:
+                self._buckets.popitem(last=False)
+        else:
+            self._buckets.move_to_end(key)
+            elapsed = now - bucket[1]
+            if elapsed > 0:
+                bucket[0] = min(self.burst, bucket[0] + elapsed * self.rate)
+                bucket[1] = now
+
+        return bucket
+
+    def allow(self, key: str, cost: float = 1.0) -> bool:
+        """
+        Consume ``cost`` tokens from the bucket for ``key`` if available.
+
+        Args:
+            key: Bucket key (e.g. source IP)
+            cost: Number of tokens to consume
+
+        Returns:
+            True if the tokens were consumed, False if the bucket is empty
+        """
+        with self._lock:
+            bucket = self._bucket(key, self._clock())
+            if bucket[0] >= cost:
+                bucket[0] -= cost
+                return True
+            return False
+
+    def consume(self, key: str, cost: float = 1.0) -> None:
+        """
+        Consume tokens unconditionally, letting the bucket go negative.
+
+        Used to charge penalties (e.g. for rejected requests) so that repeated
+        offenders stay throttled for longer.
+        """
+        with self._lock:
+            bucket = self._bucket(key, self._clock())
+            bucket[0] = max(bucket[0] - cost, -self.burst)
+
+    def has_tokens(self, key: str, cost: float = 1.0) -> bool:
+        """Check whether ``cost`` tokens are available without consuming them."""
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                return True
+            return self._bucket(key, self._clock())[0] >= cost
+
+    def wait_time(self, key: str, cost: float = 1.0) -> float:
+        """
+        Seconds until ``cost`` tokens will be available for ``key``.
+
+        Returns:
+            0.0 if tokens are available now
+        """
+        with self._lock:
+            bucket = self._bucket(key, self._clock())
+            missing = cost - bucket[0]
+            if missing <= 0:
+                return 0.0
+            if self.rate <= 0:
+                return float("inf")
+            return missing / self.rate
+
+    def reset(self, key: Optional[str] = None) -> None:
+        """Forget one bucket, or all buckets if key is None."""
+        with self._lock:
+            if key is None:
+                self._buckets.clear()
+            else:
+                self._buckets.pop(key, None)
+
+    def stats(self) -> Dict[str, float]:
+        """Return limiter configuration and size."""
+        with self._lock:
+            return {
+                "rate": self.rate,
+                "burst": self.burst,
+                "tracked_keys": len(self._buckets),
+            }
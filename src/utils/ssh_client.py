@@ -39,13 +39,24 @@ class SSHClient:
         self.timeout = timeout
         self._client: Optional[paramiko.SSHClient] = None
 
+    @property
+    def is_connected(self) -> bool:
+        """Whether the underlying transport is open and authenticated."""
+        if not self._client:
+            return False
+        transport = self._client.get_transport()
+        return bool(transport and transport.is_active() and transport.is_authenticated())
+
     def connect(self) -> bool:
         """
-        Establish SSH connection.
+        Establish SSH connection (no-op if already connected).
 
         Returns:
             True if successful, False otherwise
         """
+        if self.is_connected:
+            return True
+
         try:
             self._client = paramiko.SSHClient()
             self._client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
@@ -150,7 +161,7 @@ class SSHClient:
             self._client = None
 
     def __enter__(self):
-        """Context manager entry."""
+        """Context manager entry (connects; a later connect() call is a no-op)."""
         self.connect()
         return self
 
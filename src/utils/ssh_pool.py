@@ -0,0 +1,261 @@
+"""Pool of persistent SSH connections for repeated log retrieval.
+
+Connections are keyed by (hostname, port, username, key path). A checked-out
+connection is used by one caller at a time; when it is returned it stays open
+(with transport keepalives) so the next ``exec_command`` skips the TCP
+connect, key exchange and authentication. Connections idle for longer than
+the idle timeout, or whose transport died, are closed and replaced.
+"""
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from src.utils.ssh_client import SSHClient
+
+logger = logging.getLogger(__name__)
+
+PoolKey = Tuple[str, int, str, Optional[str]]
+
+
+@dataclass
+class _PooledConnection:
+    client: Optional[SSHClient]  # None while the connection is being opened
+    created_at: float
+    last_used: float
+    in_use: bool = False
+
+
+class SSHConnectionPool:
+    """Keyed pool of authenticated SSH connections."""
+
+    def __init__(
+        self,
+        max_per_host: int = 2,
+        idle_timeout: float = 3600,
+        keepalive_interval: int = 30,
+        connect_timeout: int = 30,
+    ):
+        """
+        Initialize pool.
+
+        Args:
+            max_per_host: Maximum open connections per key
+            idle_timeout: Seconds an unused connection is kept open
+            keepalive_interval: Seconds between transport keepalive packets (0 = off)
+            connect_timeout: SSH connect timeout, also the longest wait for a free slot
+        """
+        self.max_per_host = max_per_host
+        self.idle_timeout = idle_timeout
+        self.keepalive_interval = keepalive_interval
+        self.connect_timeout = connect_timeout
+        self._connections: Dict[PoolKey, List[_PooledConnection]] = {}
+        self._cond = threading.Condition()
+
+    @contextmanager
+    def connection(
+        self,
+        hostname: str,
+        username: str,
+        key_path: Optional[str] = None,
+        password: Optional[str] = None,
+        port: int = 22,
+    ) -> Iterator[SSHClient]:
+        """
+        Check out a connected SSHClient for exclusive use.
+
+        The connection is returned to the pool afterwards, unless the block
+        raised or the transport is no longer active, in which case it is closed.
+
+        Args:
+            hostname: Remote host address
+            username: SSH username
+            key_path: Path to SSH private key file
+            password: SSH password (if not using key)
+            port: SSH port
+
+        Yields:
+            Connected SSHClient
+
+        Raises:
+            ConnectionError: If no connection could be established
+            TimeoutError: If the host's connections stayed busy for connect_timeout
+        """
+        key = (hostname, port, username, key_path)
+        pooled = self._checkout(key)
+
+        if pooled is None:
+            client = SSHClient(
+                hostname=hostname,
+                username=username,
+                key_path=key_path,
+                password=password,
+                port=port,
+                timeout=self.connect_timeout,
+            )
+            try:
+                connected = client.connect()
+            except Exception:
+                connected = False
+            if not connected:
+                self._discard(key, None)
+                raise ConnectionError(f"Failed to connect to {hostname}")
+            self._enable_keepalive(client)
+            pooled = self._register(key, client)
+        else:
+            logger.debug(f"Reusing pooled SSH connection to {hostname}")
+
+        healthy = False
+        try:
+            yield pooled.client
+            healthy = pooled.client.is_connected
+        finally:
+            if healthy:
+                self._release(key, pooled)
+            else:
+                self._discard(key, pooled)
+
+    def _checkout(self, key: PoolKey) -> Optional[_PooledConnection]:
+        """Take an idle healthy connection, or reserve a slot for a new one (None)."""
+        deadline = time.monotonic() + self.connect_timeout
+        with self._cond:
+            while True:
+                self._evict_locked(key)
+                connections = self._connections.setdefault(key, [])
+                for pooled in connections:
+                    if not pooled.in_use:
+                        pooled.in_use = True
+                        return pooled
+
+                if len(connections) < self.max_per_host:
+                    # Placeholder keeps the slot while connecting outside the lock
+                    connections.append(
+                        _PooledConnection(client=None, created_at=0, last_used=0, in_use=True)
+                    )
+                    return None
+
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"All {self.max_per_host} SSH connections to {key[0]} busy")
+                self._cond.wait(remaining)
+
+    def _register(self, key: PoolKey, client: SSHClient) -> _PooledConnection:
+        now = time.monotonic()
+        with self._cond:
+            connections = self._connections.setdefault(key, [])
+            for pooled in connections:
+                if pooled.client is None:
+                    pooled.client = client
+                    pooled.created_at = pooled.last_used = now
+                    return pooled
+            pooled = _PooledConnection(client=client, created_at=now, last_used=now, in_use=True)
+            connections.append(pooled)
+            return pooled
+
+    def _release(self, key: PoolKey, pooled: _PooledConnection) -> None:
+        with self._cond:
+            pooled.in_use = False
+            pooled.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    def _discard(self, key: PoolKey, pooled: Optional[_PooledConnection]) -> None:
+        """Drop a connection (or an unfilled placeholder slot when pooled is None)."""
+        with self._cond:
+            connections = self._connections.get(key, [])
+            for index, candidate in enumerate(connections):
+                if candidate is pooled or (pooled is None and candidate.client is None):
+                    del connections[index]
+                    break
+            self._cond.notify_all()
+        if pooled is not None and pooled.client is not None:
+            pooled.client.close()
+
+    def _enable_keepalive(self, client: SSHClient) -> None:
+        if not self.keepalive_interval or not client._client:
+            return
+        transport = client._client.get_transport()
+        if transport:
+            transport.set_keepalive(self.keepalive_interval)
+
+    def _evict_locked(self, key: Optional[PoolKey] = None) -> int:
+        """Close idle-expired or dead connections (caller holds the lock)."""
+        now = time.monotonic()
+        evicted = 0
+        keys = [key] if key is not None else list(self._connections)
+        for pool_key in keys:
+            kept = []
+            for pooled in self._connections.get(pool_key, []):
+                stale = not pooled.in_use and (
+                    now - pooled.last_used > self.idle_timeout or not pooled.client.is_connected
+                )
+                if stale:
+                    pooled.client.close()
+                    evicted += 1
+                else:
+                    kept.append(pooled)
+            if kept:
+                self._connections[pool_key] = kept
+            else:
+                self._connections.pop(pool_key, None)
+        return evicted
+
+    def evict_idle(self) -> int:
+        """
+        Close connections that are idle past the timeout or no longer healthy.
+
+        Returns:
+            Number of connections closed
+        """
+        with self._cond:
+            evicted = self._evict_locked()
+        if evicted:
+            logger.info(f"Evicted {evicted} idle SSH connections")
+        return evicted
+
+    def close_all(self) -> None:
+        """Close all connections (e.g. on shutdown) and empty the pool."""
+        with self._cond:
+            connections = [pooled for pooled_list in self._connections.values() for pooled in pooled_list]
+            self._connections = {}
+            self._cond.notify_all()
+        for pooled in connections:
+            if pooled.client is not None:
+                pooled.client.close()
+
+    def stats(self) -> Dict[str, int]:
+        """Return counts of open and in-use connections."""
+        with self._cond:
+            connections = [pooled for pooled_list in self._connections.values() for pooled in pooled_list]
+        return {
+            "hosts": len(self._connections),
+            "open": sum(1 for pooled in connections if pooled.client is not None),
+            "in_use": sum(1 for pooled in connections if pooled.in_use),
+        }
+
+
+# Global pool instance
+_ssh_pool: Optional[SSHConnectionPool] = None
+_ssh_pool_lock = threading.Lock()
+
+
+def get_ssh_pool() -> SSHConnectionPool:
+    """
+    Get or create the process-wide SSH connection pool.
+
+    Returns:
+        SSHConnectionPool configured from settings
+    """
+    global _ssh_pool
+    with _ssh_pool_lock:
+        if _ssh_pool is None:
+            from src.config import get_settings
+
+            settings = get_settings()
+            _ssh_pool = SSHConnectionPool(
+                max_per_host=settings.ssh_pool_max_per_host,
+                idle_timeout=settings.ssh_pool_idle_timeout_seconds,
+                keepalive_interval=settings.ssh_pool_keepalive_seconds,
+            )
+    return _ssh_pool
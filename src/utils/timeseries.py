@@ -0,0 +1,197 @@
+"""Compact time-series chunk encoding.
+
+Chunks use the scheme popularised by Facebook's Gorilla TSDB: timestamps are
+stored as delta-of-deltas with variable-length prefixes and values are XORed
+with their predecessor so that unchanged values cost a single bit and slowly
+changing ones only their differing mantissa bits. A regular heartbeat
+interval costs one bit per timestamp.
+"""
+import struct
+from typing import List, Sequence, Tuple
+
+CHUNK_FORMAT_VERSION = 1
+
+# (prefix bits, prefix length, payload bits) for delta-of-delta ranges
+_DOD_BUCKETS = (
+    (0b10, 2, 7),
+    (0b110, 3, 9),
+    (0b1110, 4, 12),
+)
+
+
+def _float_to_bits(value: float) -> int:
+    return struct.unpack(">Q", struct.pack(">d", value))[0]
+
+
+def _bits_to_float(bits: int) -> float:
+    return struct.unpack(">d", struct.pack(">Q", bits))[0]
+
+
+class BitWriter:
+    """Append-only bit stream backed by a Python integer."""
+
+    def __init__(self):
+        self._acc = 0
+        self._nbits = 0
+
+    def write(self, value: int, nbits: int) -> None:
+        """Append the low ``nbits`` bits of value."""
+        self._acc = (self._acc << nbits) | (value & ((1 << nbits) - 1))
+        self._nbits += nbits
+
+    def to_bytes(self) -> bytes:
+        """Return the stream padded with zero bits to a whole byte."""
+        pad = -self._nbits % 8
+        nbytes = (self._nbits + pad) // 8
+        return (self._acc << pad).to_bytes(nbytes, "big")
+
+
+class BitReader:
+    """Sequential reader over bytes produced by BitWriter."""
+
+    def __init__(self, data: bytes):
+        self._value = int.from_bytes(data, "big")
+        self._total = len(data) * 8
+        self._pos = 0
+
+    def read(self, nbits: int) -> int:
+        """Read the next ``nbits`` bits as an unsigned integer."""
+        if self._pos + nbits > self._total:
+            raise ValueError("Unexpected end of chunk data")
+        shift = self._total - self._pos - nbits
+        self._pos += nbits
+        return (self._value >> shift) & ((1 << nbits) - 1)
+
+
+def encode_chunk(timestamps: Sequence[int], values: Sequence[float]) -> bytes:
+    """
+    Encode a series of (timestamp, value) samples.
+
+    Args:
+        timestamps: Unix timestamps in seconds, non-decreasing
+        values: Float values, same length as timestamps
+
+    Returns:
+        Encoded chunk bytes
+    """
+    if len(timestamps) != len(values):
+        raise ValueError("timestamps and values must have the same length")
+    if len(timestamps) >= 1 << 16:
+        raise ValueError("chunk too large")
+
+    writer = BitWriter()
+    writer.write(CHUNK_FORMAT_VERSION, 8)
+    writer.write(len(timestamps), 16)
+    if not timestamps:
+        return writer.to_bytes()
+
+    prev_ts = int(timestamps[0])
+    prev_bits = _float_to_bits(values[0])
+    writer.write(prev_ts, 64)
+    writer.write(prev_bits, 64)
+
+    prev_delta = 0
+    prev_leading = -1
+    prev_trailing = 0
+
+    for ts, value in zip(timestamps[1:], values[1:]):
+        ts = int(ts)
+        delta = ts - prev_ts
+        dod = delta - prev_delta
+        prev_ts, prev_delta = ts, delta
+
+        if dod == 0:
+            writer.write(0, 1)
+        else:
+            for prefix, prefix_len, payload in _DOD_BUCKETS:
+                low = -(1 << (payload - 1)) + 1
+                high = 1 << (payload - 1)
+                if low <= dod <= high:
+                    writer.write(prefix, prefix_len)
+                    writer.write(dod - low, payload)
+                    break
+            else:
+                writer.write(0b1111, 4)
+                writer.write(dod, 64)
+
+        bits = _float_to_bits(value)
+        xor = bits ^ prev_bits
+        prev_bits = bits
+
+        if xor == 0:
+            writer.write(0, 1)
+            continue
+
+        leading = min(64 - xor.bit_length(), 31)
+        trailing = (xor & -xor).bit_length() - 1
+
+        if prev_leading >= 0 and leading >= prev_leading and trailing >= prev_trailing:
+            writer.write(0b10, 2)
+            writer.write(xor >> prev_trailing, 64 - prev_leading - prev_trailing)
+        else:
+            significant = 64 - leading - trailing
+            writer.write(0b11, 2)
+            writer.write(leading, 5)
+            writer.write(significant - 1, 6)
+            writer.write(xor >> trailing, significant)
+            prev_leading, prev_trailing = leading, trailing
+
+    return writer.to_bytes()
+
+
+def decode_chunk(data: bytes) -> Tuple[List[int], List[float]]:
+    """
+    Decode a chunk produced by encode_chunk.
+
+    Args:
+        data: Encoded chunk bytes
+
+    Returns:
+        Tuple of (timestamps, values)
+    """
+    reader = BitReader(data)
+    version = reader.read(8)
+    if version != CHUNK_FORMAT_VERSION:
+        raise ValueError(f"Unsupported chunk format version: {version}")
+
+    count = reader.read(16)
+    if count == 0:
+        return [], []
+
+    ts = reader.read(64)
+    bits = reader.read(64)
+    timestamps = [ts]
+    values = [_bits_to_float(bits)]
+
+    delta = 0
+    leading = 0
+    trailing = 0
+
+    for _ in range(count - 1):
+        if reader.read(1) == 0:
+            dod = 0
+        elif reader.read(1) == 0:
+            dod = reader.read(7) - (1 << 6) + 1
+        elif reader.read(1) == 0:
+            dod = reader.read(9) - (1 << 8) + 1
+        elif reader.read(1) == 0:
+            dod = reader.read(12) - (1 << 11) + 1
+        else:
+            dod = reader.read(64)
+            if dod >= 1 << 63:
+                dod -= 1 << 64
+
+        delta += dod
+        ts += delta
+        timestamps.append(ts)
+
+        if reader.read(1) == 1:
+            if reader.read(1) == 1:
+                leading = reader.read(5)
+                significant = reader.read(6) + 1
+                trailing = 64 - leading - significant
+            bits ^= reader.read(64 - leading - trailing) << trailing
+
+        values.append(_bits_to_float(bits))
+
+    return timestamps, values
@@ -0,0 +1,83 @@
+"""Unit tests for manual log analysis requests run by the scheduler."""
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base, Host, LogAnalysisRequest
+from src.services import analysis_requests
+from src.services.analysis_requests import (
+    REQUEST_DONE,
+    REQUEST_EXPIRED,
+    load_result,
+    queue_analysis,
+    run_analysis_requests,
+    wait_for_result,
+)
+from src.services.llm_dispatcher import PRIORITY_MANUAL
+from src.services.log_analyzer import HostAnalysisResult
+
+
+@pytest.fixture
+def Session():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def db_context():
+        db = Session()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    with Session() as db:
+        db.add(Host(id=1, host_id="web", name="web", token="t" * 16, log_analysis_config="{}"))
+        db.commit()
+
+    with patch.object(analysis_requests, "get_db_context", db_context):
+        yield Session
+
+
+def test_requests_run_once_with_manual_priority(Session):
+    with Session() as db:
+        first = queue_analysis(db, 1).id
+        second = queue_analysis(db, 1).id
+
+    analyzer = MagicMock()
+    analyzer.analyze_hosts.return_value = [
+        HostAnalysisResult(host_id=1, host_name="web", status="analyzed", severity="none")
+    ]
+
+    assert wait_for_result(first, timeout=0) is None
+    assert run_analysis_requests(analyzer) == 2
+    assert run_analysis_requests(analyzer) == 0
+
+    analyzer.analyze_hosts.assert_called_once_with([1], priority=PRIORITY_MANUAL)
+    assert wait_for_result(first, timeout=0)["status"] == "analyzed"
+    with Session() as db:
+        assert load_result(db, second)["host_name"] == "web"
+
+
+def test_stale_requests_expire_without_running(Session):
+    with Session() as db:
+        request = queue_analysis(db, 1)
+        request.created_at = datetime.utcnow() - timedelta(hours=1)
+        db.commit()
+        request_id = request.id
+
+    analyzer = MagicMock()
+    assert run_analysis_requests(analyzer) == 0
+
+    analyzer.analyze_hosts.assert_not_called()
+    with Session() as db:
+        assert db.get(LogAnalysisRequest, request_id).status == REQUEST_DONE
+        assert load_result(db, request_id)["error"] == REQUEST_EXPIRED
@@ -0,0 +1,103 @@
+"""Tests for cron-driven heartbeat deadlines."""
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import patch
+
+import pytest
+
+from src.database import Host
+from src.utils.cron_schedule import CronSchedule, cron_deadline, get_cron_schedule
+
+
+def test_next_fire_after_skips_weekend():
+    schedule = CronSchedule("0 9-17 * * 1-5", "UTC")
+
+    # Friday 17:00 is the last run of the week
+    friday_last = datetime(2024, 3, 8, 17, 0, 5)
+    assert schedule.next_fire_after(friday_last) == datetime(2024, 3, 11, 9, 0)
+
+
+def test_deadline_during_business_hours():
+    schedule = CronSchedule("0 9-17 * * 1-5", "UTC")
+
+    deadline = schedule.deadline_after(datetime(2024, 3, 5, 10, 0, 30), 300)
+    assert deadline == datetime(2024, 3, 5, 11, 5)
+
+
+def test_overnight_gap_is_not_overdue():
+    schedule = CronSchedule("0 9-17 * * 1-5", "UTC")
+
+    deadline = schedule.deadline_after(datetime(2024, 3, 5, 17, 0, 10), 300)
+    assert deadline == datetime(2024, 3, 6, 9, 5)
+
+
+def test_early_heartbeat_counts_towards_upcoming_run():
+    schedule = CronSchedule("*/15 * * * *", "UTC")
+
+    # Host clock is 20s fast: heartbeat for 10:15 arrives at 10:14:40
+    deadline = schedule.deadline_after(datetime(2024, 3, 5, 10, 14, 40), 60)
+    assert deadline == datetime(2024, 3, 5, 10, 31)
+
+
+def test_expression_evaluated_in_timezone():
+    schedule = CronSchedule("0 9 * * *", "America/New_York")
+
+    # 09:00 EDT is 13:00 UTC
+    assert schedule.next_fire_after(datetime(2024, 7, 1, 0, 0)) == datetime(2024, 7, 1, 13, 0)
+
+
+def test_cache_handles_out_of_order_lookups():
+    schedule = CronSchedule("*/5 * * * *", "UTC")
+
+    late = schedule.next_fire_after(datetime(2024, 3, 5, 12, 1))
+    early = schedule.next_fire_after(datetime(2024, 3, 1, 0, 1))
+    far = schedule.next_fire_after(datetime(2025, 1, 1, 0, 1))
+
+    assert late == datetime(2024, 3, 5, 12, 5)
+    assert early == datetime(2024, 3, 1, 0, 5)
+    assert far == datetime(2025, 1, 1, 0, 5)
+
+
+def test_stale_lookups_do_not_rebuild_the_cache():
+    schedule = CronSchedule("*/5 * * * *", "UTC")
+    now = datetime(2024, 3, 5, 12, 0)
+
+    assert schedule.next_fire_after(datetime(2024, 3, 5, 11, 58), now=now) == now
+    cached = list(schedule._fire_times)
+
+    assert schedule.next_fire_after(datetime(2024, 3, 1, 0, 1), now=now) == datetime(
+        2024, 3, 1, 0, 5
+    )
+    assert schedule.next_fire_after(datetime(2025, 1, 1, 0, 1), now=now) == datetime(
+        2025, 1, 1, 0, 5
+    )
+    assert schedule._fire_times == cached
+
+
+def test_overdue_check_evaluates_the_schedule_at_current_time():
+    host = Host(
+        cron_expression="7 */2 * * *",
+        last_seen=datetime(2024, 3, 5, 10, 7, 30),
+        grace_period_seconds=300,
+        schedule_type="always",
+        adaptive_deadline=False,
+    )
+    settings = SimpleNamespace(cron_timezone="UTC")
+
+    with patch("src.config.get_settings", return_value=settings):
+        assert not host.is_overdue(datetime(2024, 3, 5, 12, 11))
+        assert host.is_overdue(datetime(2024, 3, 5, 12, 13))
+
+    # The shared cache is anchored at the given time, not the wall clock
+    fire_times = get_cron_schedule("7 */2 * * *", "UTC")._fire_times
+    assert fire_times[0] <= datetime(2024, 3, 5, 12, 13) < fire_times[-1]
+
+
+def test_schedules_are_shared():
+    assert get_cron_schedule("*/5 * * * *", "UTC") is get_cron_schedule("*/5 * * * *", "UTC")
+
+
+def test_invalid_expression():
+    with pytest.raises(ValueError):
+        CronSchedule("not a cron", "UTC")
+    assert cron_deadline("not a cron", datetime(2024, 3, 5), 60, timezone="UTC") is None
@@ -0,0 +1,51 @@
+"""Unit tests for HeartbeatGuard."""
+from src.services.heartbeat_ingest import HeartbeatGuard
+
+
+def test_unknown_host_is_answered_from_cache_until_forgotten():
+    guard = HeartbeatGuard(reject_burst=100)
+
+    assert guard.check("ghost", "10.0.0.1") is None
+    guard.reject("ghost", "10.0.0.1", "unknown_host")
+
+    assert guard.check("ghost", "10.0.0.1") == "unknown_host"
+    assert guard.counters["unknown_host_cached"] == 1
+
+    guard.forget_host("ghost")
+    assert guard.check("ghost", "10.0.0.1") is None
+
+
+def test_repeated_rejections_are_rate_limited_per_source():
+    guard = HeartbeatGuard(reject_rate_per_second=0.0, reject_burst=3)
+
+    for _ in range(3):
+        assert guard.check("web01", "10.0.0.1") is None
+        guard.reject("web01", "10.0.0.1", "invalid_token")
+
+    assert guard.check("web01", "10.0.0.1") == "rate_limited"
+    assert guard.check("web01", "10.0.0.2") is None
+    assert guard.stats()["rejections"]["invalid_token"] == 3
+
+
+def test_bad_agent_does_not_throttle_valid_hosts_behind_the_same_address():
+    guard = HeartbeatGuard(reject_rate_per_second=0.0, reject_burst=3)
+
+    for name in ("ghost1", "ghost2", "ghost3"):
+        guard.reject(name, "10.0.0.1", "unknown_host")
+    guard.reject("web01", "10.0.0.1", "invalid_token")
+
+    assert guard.check("ghost1", "10.0.0.1") == "rate_limited"
+    assert guard.check("web02", "10.0.0.1") is None
+    assert guard.check("db01", "10.0.0.1") is None
+
+
+def test_scanner_with_random_host_ids_is_throttled_per_source():
+    guard = HeartbeatGuard(reject_rate_per_second=0.0, reject_burst=3)
+
+    for i in range(3):
+        assert guard.check(f"random{i}", "10.0.0.1") is None
+        assert guard.reject_unknown(f"random{i}", "10.0.0.1") == "unknown_host"
+
+    assert guard.check("random9", "10.0.0.1") is None  # Could be a valid host
+    assert guard.reject_unknown("random9", "10.0.0.1") == "rate_limited"
+    assert guard.reject_unknown("random10", "10.0.0.2") == "unknown_host"
@@ -0,0 +1,73 @@
+"""Unit tests for learned heartbeat intervals."""
+from datetime import datetime, timedelta
+
+from src.database.models import Host
+from src.utils.interval_estimator import (
+    MIN_SAMPLES,
+    SHIFT_SAMPLES,
+    IntervalStats,
+    adaptive_threshold,
+    update_interval_stats,
+)
+
+
+def _learn(intervals):
+    stats = IntervalStats(mean=None, variance=None, samples=0)
+    for interval in intervals:
+        stats = update_interval_stats(stats, interval)
+    return stats
+
+
+def test_warmup_returns_no_threshold():
+    stats = _learn([60] * (MIN_SAMPLES - 1))
+
+    assert stats.mean == 60
+    assert adaptive_threshold(stats) is None
+
+
+def test_jittery_intervals_widen_the_deadline():
+    steady = adaptive_threshold(_learn([60] * 30))
+    jittery = adaptive_threshold(_learn([30, 90] * 15))
+
+    assert steady == 60 * 1.2
+    assert jittery > steady
+
+
+def test_single_outage_is_winsorized():
+    before = _learn([60] * 30)
+    after = update_interval_stats(before, 7200)
+
+    assert after.mean < 2 * before.mean
+
+
+def test_outages_between_normal_intervals_do_not_reset():
+    stats = _learn([60] * 30 + [7200, 60] * SHIFT_SAMPLES)
+
+    assert adaptive_threshold(stats) < 2 * 60
+
+
+def test_sustained_frequency_change_resets_the_estimate():
+    stats = _learn([60] * 30 + [300] * SHIFT_SAMPLES)
+
+    assert stats.mean == 300
+    assert adaptive_threshold(stats) >= 300
+
+
+def test_host_uses_learned_deadline_only_when_enabled():
+    last_seen = datetime(2025, 1, 1, 12, 0, 0)
+    host = Host(
+        expected_frequency_seconds=3600,
+        grace_period_seconds=0,
+        schedule_type="always",
+        adaptive_deadline=False,
+        interval_samples=0,
+    )
+    for i in range(MIN_SAMPLES + 1):
+        host.observe_heartbeat(last_seen + timedelta(minutes=i))
+        host.last_seen = last_seen + timedelta(minutes=i)
+
+    check_time = host.last_seen + timedelta(minutes=5)
+    assert not host.is_overdue(check_time)
+
+    host.adaptive_deadline = True
+    assert host.is_overdue(check_time)
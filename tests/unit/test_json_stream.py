@@ -0,0 +1,72 @@
+"""Unit tests for incremental findings parsing and streamed responses."""
+import json
+
+import requests
+
+from src.utils.json_stream import FindingsStreamParser, extract_findings
+from src.utils.llm_client import LLMClient
+
+FINDINGS = [
+    {"severity": "critical", "category": "error", "description": "Disk {full} \"sda\""},
+    {"severity": "info", "category": "other", "description": "cron ran"},
+]
+
+
+def test_findings_are_emitted_as_each_object_closes():
+    text = "```json\n" + json.dumps({"summary": "x", "findings": FINDINGS, "extra": [{"a": 1}]}) + "\n```"
+    parser = FindingsStreamParser()
+
+    emitted = [parser.feed(char) for char in text]
+
+    completed = [findings for findings in emitted if findings]
+    assert completed == [[FINDINGS[0]], [FINDINGS[1]]]
+    assert parser.findings == FINDINGS
+
+
+def test_malformed_and_truncated_findings_lose_only_themselves():
+    text = (
+        '{"findings": [{"severity": "warning", "description": "ok"}, '
+        '{"severity": "critical", description: bad}, '
+        '{"severity": "info", "description": "also ok"}, {"severity": "crit'
+    )
+
+    assert [finding["description"] for finding in extract_findings(text)] == ["ok", "also ok"]
+    assert extract_findings(json.dumps(FINDINGS)) == FINDINGS
+
+
+class FakeStreamResponse:
+    headers = {"Content-Type": "text/event-stream"}
+
+    def __init__(self, pieces, fail=False):
+        self.pieces = pieces
+        self.fail = fail
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def iter_lines(self, decode_unicode=False):
+        for piece in self.pieces:
+            yield "data: " + json.dumps({"choices": [{"delta": {"content": piece}}]})
+        if self.fail:
+            raise requests.exceptions.ChunkedEncodingError("connection reset")
+        yield "data: [DONE]"
+
+
+def test_streamed_response_alerts_early_and_salvages_cut_off_stream(monkeypatch):
+    body = json.dumps({"findings": FINDINGS})
+    response = FakeStreamResponse([body[:60], body[60:-30]], fail=True)
+    monkeypatch.setattr("src.utils.llm_client.requests.post", lambda *args, **kwargs: response)
+    client = LLMClient("http://llm", "key", stream=True)
+    seen = []
+
+    result = client.analyze_logs("disk full", "Find problems", on_finding=seen.append)
+
+    assert result["success"] and result["partial"]
+    assert result["findings"] == [FINDINGS[0]]
+    assert seen == [FINDINGS[0]]
@@ -0,0 +1,42 @@
+"""Unit tests for the mergeable latency histogram."""
+import random
+
+from src.utils.latency_histogram import LatencyHistogram, bucket_bounds, bucket_index
+
+
+def test_buckets_are_contiguous_and_contain_their_values():
+    previous_high = -1
+    for index in range(2000):
+        low, high = bucket_bounds(index)
+        assert low == previous_high + 1
+        previous_high = high
+
+    for value in (0, 127, 128, 1000, 123456, 10**9):
+        low, high = bucket_bounds(bucket_index(value))
+        assert low <= value <= high
+
+
+def test_percentiles_are_within_bucket_precision():
+    rng = random.Random(7)
+    values = sorted(round(rng.lognormvariate(5, 1)) for _ in range(20000))
+    histogram = LatencyHistogram()
+    for value in values:
+        histogram.record(value)
+
+    for q in (50, 95, 99):
+        exact = values[int(len(values) * q / 100) - 1]
+        assert abs(histogram.percentile(q) - exact) <= max(2, exact * 0.02)
+
+
+def test_merge_and_json_roundtrip():
+    a, b = LatencyHistogram(), LatencyHistogram()
+    for value in range(100):
+        a.record(value)
+        b.record(value + 1000)
+
+    merged = LatencyHistogram.from_json(LatencyHistogram.merged([a, b]).to_json())
+
+    assert merged.total == 200
+    assert merged.percentile(50) == 99
+    assert merged.min == 0
+    assert LatencyHistogram().percentile(99) is None
@@ -0,0 +1,162 @@
+"""Unit tests for cross-host batched LLM analysis."""
+import json
+import threading
+from unittest.mock import MagicMock
+
+import requests
+
+from src.services.llm_batcher import LLMBatcher
+from src.utils.llm_client import LLMClient
+
+
+def _fake_client():
+    client = MagicMock(default_model="m", chunk_tokens=1000)
+    client.batch_host_limit.return_value = 4
+
+    def analyze_batch(sections, prompt, model=None, priority=None):
+        # "web3" is missing from the response and must be analyzed alone
+        return {
+            name: {"success": True, "findings": [{"description": logs}], "batched": len(sections)}
+            for name, logs in sections
+            if name != "web3"
+        }
+
+    client.analyze_batch.side_effect = analyze_batch
+    client.analyze_logs.return_value = {"success": True, "findings": [], "batched": None}
+    return client
+
+
+def test_hosts_sharing_a_prompt_share_one_request():
+    client = _fake_client()
+    batcher = LLMBatcher(client, max_hosts=3, window_seconds=5)
+    results = {}
+
+    def run(name, prompt):
+        results[name] = batcher.analyze(name, f"logs of {name}", prompt)
+
+    threads = [
+        threading.Thread(target=run, args=(name, "firewall"))
+        for name in ("fw1", "fw2", "web3")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert client.analyze_batch.call_count == 1
+    assert results["fw1"]["findings"] == [{"description": "logs of fw1"}]
+    assert results["fw2"]["batched"] == 3
+    client.analyze_logs.assert_called_once()
+    assert batcher.stats()["batched_hosts"] == 3
+
+    # A lone host is analyzed normally once the window passes
+    batcher.window_seconds = 0.05
+    run("db", "database")
+    assert client.analyze_batch.call_count == 1
+    assert client.analyze_logs.call_count == 2
+
+
+def test_failed_batch_falls_back_to_single_host_requests():
+    client = _fake_client()
+    client.analyze_batch.side_effect = RuntimeError("502 Bad Gateway")
+    batcher = LLMBatcher(client, max_hosts=2, window_seconds=5)
+    results = {}
+
+    def run(name):
+        results[name] = batcher.analyze(name, f"logs of {name}", "firewall")
+
+    threads = [threading.Thread(target=run, args=(name,)) for name in ("fw1", "fw2")]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=5)
+
+    assert client.analyze_batch.call_count == 1
+    assert client.analyze_logs.call_count == 2
+    assert all(result["success"] for result in results.values())
+
+
+class FakeResponse:
+    headers = {"Content-Type": "application/json"}
+
+    def __init__(self, data):
+        self.data = data
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+    def raise_for_status(self):
+        pass
+
+    def json(self):
+        return self.data
+
+
+def test_batch_request_caches_shared_instructions(monkeypatch):
+    sent = []
+    answer = {"hosts": {"fw1": {"findings": [{"severity": "warning"}]}, "fw2": []}}
+
+    def post(url, **kwargs):
+        sent.append(kwargs["json"])
+        return FakeResponse(
+            {
+                "choices": [{"message": {"content": json.dumps(answer)}}],
+                "usage": {"prompt_tokens": 900, "completion_tokens": 50, "cache_read_input_tokens": 800},
+            }
+        )
+
+    monkeypatch.setattr("src.utils.llm_client.requests.post", post)
+    client = LLMClient("http://llm", "key", prompt_caching=True)
+
+    results = client.analyze_batch([("fw1", "a"), ("fw2", "b"), ("fw3", "c")], "Check the firewall")
+
+    system, user = sent[0]["messages"]
+    assert system["content"][0]["cache_control"] == {"type": "ephemeral"}
+    assert system["content"][0]["text"].startswith("Check the firewall")
+    assert "### Host: fw2" in user["content"] and "Check the firewall" not in user["content"]
+    assert sent[0]["max_tokens"] == 6000
+    assert results["fw1"]["findings"] == [{"severity": "warning"}]
+    assert results["fw2"]["findings"] == []
+    assert "fw3" not in results
+    usage = {"usage": {"prompt_tokens_details": {"cached_tokens": 7}}}
+    assert client._parse_usage(usage) == {"cached_prompt_tokens": 7}
+
+
+def test_batch_response_tokens_are_capped_per_model(monkeypatch):
+    sent = []
+
+    def post(url, **kwargs):
+        sent.append(kwargs["json"])
+        raise requests.exceptions.ConnectionError("down")
+
+    monkeypatch.setattr("src.utils.llm_client.requests.post", post)
+    client = LLMClient("http://llm", "key", default_model="m", max_output_tokens={"m": 3000})
+
+    results = client.analyze_batch([("fw1", "a"), ("fw2", "b"), ("fw3", "c")], "Check")
+
+    assert sent[0]["max_tokens"] == 3000
+    # Hosts of a failed request are left out so callers analyze them alone
+    assert results == {}
+
+
+def test_batches_are_limited_to_what_the_response_cap_can_answer():
+    client = LLMClient("http://llm", "key", default_model="m", max_output_tokens={"small": 4500})
+    assert client.batch_host_limit() == 4  # DEFAULT_MAX_OUTPUT_TOKENS // 2000
+    assert client.batch_host_limit("small") == 2
+
+    fake = _fake_client()
+    fake.batch_host_limit.return_value = 2
+    batcher = LLMBatcher(fake, max_hosts=10, window_seconds=5)
+    threads = [
+        threading.Thread(target=batcher.analyze, args=(name, "logs", "firewall"))
+        for name in ("fw1", "fw2", "fw3", "fw4")
+    ]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join(timeout=10)
+
+    assert [len(call.args[0]) for call in fake.analyze_batch.call_args_list] == [2, 2]
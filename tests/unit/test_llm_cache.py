@@ -0,0 +1,83 @@
+"""Unit tests for the LLM response cache."""
+import json
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, LLMCacheEntry
+from src.services.llm_cache import LLMResponseCache, cache_key, normalize_logs
+from src.utils.llm_client import LLMClient
+
+RESPONSE = json.dumps({"findings": [{"severity": "info", "description": "ok"}]})
+
+
+@pytest.fixture
+def db_context(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'db.sqlite'}")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def context():
+        db = Session()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    with patch("src.services.llm_cache.get_db_context", context):
+        yield context
+
+
+def test_key_ignores_timestamps_and_whitespace():
+    a = "2024-05-01T10:00:00Z sshd: accepted\n\nMay  1 10:00:00 cron: ran  job\n"
+    b = "2024-05-02T11:30:12Z sshd: accepted\nMay  2 11:30:12 cron: ran job\n"
+
+    assert normalize_logs(a) == normalize_logs(b) == "sshd: accepted\ncron: ran job"
+    assert cache_key("m", "p", a, 2000, 0.1) == cache_key("m", "p", b, 2000, 0.1)
+    assert cache_key("m", "p", a, 2000, 0.1) != cache_key("other", "p", a, 2000, 0.1)
+
+
+def test_client_serves_repeated_requests_from_cache(db_context):
+    client = LLMClient("http://llm", "key", default_model="m", cache=LLMResponseCache())
+
+    def fake_call(prompt, model, max_tokens, temperature, usage=None, **kwargs):
+        usage.update(prompt_tokens=1000, completion_tokens=200)
+        return RESPONSE
+
+    with patch.object(client, "_call_api", side_effect=fake_call) as call_api:
+        first = client.analyze_logs("10:00:00 disk ok\n", "Find problems")
+        second = client.analyze_logs("10:30:00 disk ok\n", "Find problems")
+
+    assert call_api.call_count == 1
+    assert first["cached"] is False and second["cached"] is True
+    assert second["findings"] == first["findings"]
+
+    stats = client.cache.stats()
+    assert stats["hits"] == 1 and stats["misses"] == 1 and stats["hit_rate"] == 0.5
+    assert stats["tokens_saved"] == 1200 and stats["stored_tokens_saved"] == 1200
+
+
+def test_expired_and_least_recently_used_entries_are_evicted(db_context):
+    cache = LLMResponseCache(ttl_seconds=3600, max_entries=2)
+    cache.put("old", "m", RESPONSE)
+    with db_context() as db:
+        db.query(LLMCacheEntry).update({"created_at": datetime.utcnow() - timedelta(hours=2)})
+    assert cache.get("old") is None
+
+    cache.put("a", "m", RESPONSE)
+    cache.put("b", "m", RESPONSE)
+    with db_context() as db:
+        db.query(LLMCacheEntry).filter(LLMCacheEntry.cache_key == "a").update(
+            {"last_used_at": datetime.utcnow() - timedelta(minutes=5)}
+        )
+    cache.put("c", "m", RESPONSE)
+
+    with db_context() as db:
+        keys = sorted(key for (key,) in db.query(LLMCacheEntry.cache_key))
+    assert keys == ["b", "c"]
@@ -0,0 +1,90 @@
+"""Unit tests for the LLM dispatcher."""
+import threading
+import time
+from unittest.mock import MagicMock
+
+import pytest
+import requests
+
+from src.services.llm_dispatcher import (
+    PRIORITY_CRITICAL,
+    PRIORITY_MANUAL,
+    PRIORITY_NORMAL,
+    LLMDispatcher,
+    MinuteRateBucket,
+    parse_pricing,
+)
+
+
+def _http_error(status, retry_after=None):
+    response = MagicMock(status_code=status, headers={"Retry-After": retry_after} if retry_after else {})
+    return requests.exceptions.HTTPError(f"{status} error", response=response)
+
+
+def test_token_bucket_waits_for_refill():
+    limiter = MinuteRateBucket(per_minute=60, capacity=2)
+    limiter.consume(2)
+
+    assert limiter.wait_time(1) == pytest.approx(1.0, abs=0.05)
+    assert MinuteRateBucket(per_minute=0).wait_time(10**6) == 0
+
+
+def test_retries_rate_limits_and_records_usage():
+    dispatcher = LLMDispatcher(backoff_base=0.01, pricing={"m": (3.0, 15.0)})
+    send = MagicMock(
+        side_effect=[_http_error(429, retry_after="0.01"), _http_error(503), {"usage": {}}]
+    )
+
+    data = dispatcher.execute(
+        send, "m", 100, usage_of=lambda _: {"prompt_tokens": 1000, "completion_tokens": 100}
+    )
+
+    assert data == {"usage": {}}
+    stats = dispatcher.stats()["models"]["m"]
+    assert stats["requests"] == 1 and stats["retries"] == 2 and stats["rate_limited"] == 1
+    assert stats["cost_usd"] == pytest.approx(0.0045)
+
+
+def test_client_errors_are_not_retried():
+    dispatcher = LLMDispatcher(backoff_base=0.01)
+    send = MagicMock(side_effect=_http_error(400))
+
+    with pytest.raises(requests.exceptions.HTTPError):
+        dispatcher.execute(send, "m", 100)
+
+    assert send.call_count == 1
+    assert dispatcher.stats()["models"]["m"]["failures"] == 1
+
+
+def test_waiting_requests_are_admitted_by_priority():
+    dispatcher = LLMDispatcher(requests_per_minute=0, tokens_per_minute=0, max_concurrency=1)
+    order = []
+    release = threading.Event()
+
+    def blocker():
+        release.wait(2)
+
+    first = threading.Thread(target=dispatcher.execute, args=(blocker, "m", 1))
+    first.start()
+    time.sleep(0.05)
+
+    threads = []
+    for name, priority in [("normal", PRIORITY_NORMAL), ("critical", PRIORITY_CRITICAL), ("manual", PRIORITY_MANUAL)]:
+        thread = threading.Thread(
+            target=dispatcher.execute, args=(lambda name=name: order.append(name), "m", 1, priority)
+        )
+        thread.start()
+        threads.append(thread)
+        time.sleep(0.02)
+
+    assert dispatcher.stats()["queued"] == 3
+    release.set()
+    for thread in [first, *threads]:
+        thread.join(2)
+
+    assert order == ["manual", "critical", "normal"]
+
+
+def test_parse_pricing_ignores_invalid_entries():
+    assert parse_pricing('{"a": [1, 2], "b": "x"}') == {"a": (1.0, 2.0)}
+    assert parse_pricing("not json") == {}
@@ -0,0 +1,70 @@
+"""Unit tests for tiered triage of log batches."""
+from unittest.mock import patch
+
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base
+from src.services import llm_metrics
+from src.services.llm_dispatcher import LLMDispatcher
+from src.utils.llm_client import LLMClient
+
+
+def _client():
+    return LLMClient("http://llm", "key", default_model="big", chunk_tokens=1000)
+
+
+def test_triage_verdicts_and_escalation_stats():
+    client = _client()
+    answers = iter(
+        [
+            '{"verdict": "routine", "reason": "only cron jobs"}',
+            '```json\n{"verdict": "SUSPICIOUS", "reason": "disk errors"}\n```',
+            "I am not sure",
+        ]
+    )
+
+    with patch.object(client, "_call_api", side_effect=lambda **kwargs: next(answers)) as call_api:
+        routine = client.triage_logs("cron ran\n", "Find problems", model="small")
+        suspicious = client.triage_logs("I/O error\n", "Find problems", model="small")
+        unparseable = client.triage_logs("???\n", "Find problems", model="small")
+
+    assert call_api.call_args.kwargs["model"] == "small"
+    assert call_api.call_args.kwargs["max_tokens"] == 100
+    assert routine["suspicious"] is False and routine["reason"] == "only cron jobs"
+    assert suspicious["suspicious"] is True
+    assert unparseable["suspicious"] is True and not unparseable["success"]
+
+    stats = client.triage_stats()
+    assert stats["triaged"] == 3 and stats["routine"] == 1
+    assert stats["escalated"] == 2 and stats["failed"] == 1
+    assert stats["escalation_rate"] == round(2 / 3, 4)
+
+
+def test_logs_too_large_for_one_request_escalate_without_triage():
+    client = _client()
+
+    with patch.object(client, "_call_api") as call_api:
+        result = client.triage_logs("x" * 10000, "Find problems", model="small")
+
+    assert result["suspicious"] is True
+    call_api.assert_not_called()
+
+
+def test_triage_counts_are_published_for_the_api():
+    client = _client()
+    with patch.object(client, "_call_api", return_value='{"verdict": "routine"}'):
+        client.triage_logs("cron ran\n", "Find problems", model="small")
+
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    with patch.object(llm_metrics, "get_llm_client", return_value=client), patch.object(
+        llm_metrics, "get_llm_dispatcher", return_value=LLMDispatcher()
+    ), patch.object(llm_metrics, "get_llm_batcher", return_value=None):
+        llm_metrics.publish_llm_metrics(db)
+    db.commit()
+
+    stored = llm_metrics.load_llm_metrics(db)
+    assert stored["triage"]["routine"] == 1
+    assert stored["batching"] is None and stored["updated_at"]
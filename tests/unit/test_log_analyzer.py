@@ -0,0 +1,244 @@
+"""Unit tests for parallel log analysis."""
+import json
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, Host, LogAnalysis
+from src.services.log_analyzer import ANALYSIS_RUNNING, LogAnalyzerService
+from src.utils.ssh_pool import SSHConnectionPool
+
+SSH_DELAY = 0.3
+
+
+class FakeSSHClient:
+    def __init__(self, hostname, **kwargs):
+        self.hostname = hostname
+        self.is_connected = False
+        self._client = None
+
+    def connect(self):
+        self.is_connected = True
+        return True
+
+    def close(self):
+        self.is_connected = False
+
+    def get_logs(self, command):
+        if self.hostname == "hang":
+            time.sleep(2)
+        time.sleep(SSH_DELAY)
+        return "error: disk full\n"
+
+
+@pytest.fixture
+def analyzer(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'db.sqlite'}", connect_args={"check_same_thread": False}
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    @contextmanager
+    def db_context():
+        db = Session()
+        try:
+            yield db
+            db.commit()
+        finally:
+            db.close()
+
+    llm = MagicMock()
+    llm.analyze_logs.return_value = {
+        "success": True,
+        "model": "test",
+        "findings": [{"severity": "warning", "description": "disk full"}],
+    }
+    settings = SimpleNamespace(
+        log_analysis_ssh_concurrency=8,
+        log_analysis_llm_concurrency=2,
+        log_analysis_deadline_seconds=60,
+        log_prefilter_enabled=True,
+        log_prefilter_anomaly_factor=3.0,
+        log_prefilter_anomaly_min_count=20,
+        llm_triage_model="",
+        syslog_spool_dir=str(tmp_path / "syslog"),
+    )
+    with patch("src.services.log_analyzer.get_db_context", db_context), patch(
+        "src.services.log_analyzer.get_settings", return_value=settings
+    ), patch("src.services.log_analyzer.load_prefilter_rules", return_value=None), patch(
+        "src.services.log_analyzer.get_llm_batcher", return_value=None
+    ), patch(
+        "src.services.log_analyzer.get_llm_client", return_value=llm
+    ), patch(
+        "src.services.log_analyzer.get_alert_service", return_value=MagicMock()
+    ), patch("src.services.log_analyzer.get_ssh_pool", return_value=SSHConnectionPool()), patch(
+        "src.utils.ssh_pool.SSHClient", FakeSSHClient
+    ):
+        yield LogAnalyzerService(), db_context
+
+
+def _add_host(db, name, ssh_host=None, enabled=True):
+    config = {
+        "enabled": enabled,
+        "method": "ssh",
+        "ssh_host": ssh_host or name,
+        "ssh_user": "monitor",
+        "ssh_password": "secret",
+        "log_command": "tail -n 100 /var/log/syslog",
+        "analysis_prompt": "Find problems",
+    }
+    db.add(Host(host_id=name, name=name, token="t" * 16, log_analysis_config=json.dumps(config)))
+
+
+def test_hosts_are_analyzed_in_parallel_with_timings(analyzer):
+    service, db_context = analyzer
+    with db_context() as db:
+        for i in range(6):
+            _add_host(db, f"web{i}")
+        _add_host(db, "off", enabled=False)
+
+    started = time.monotonic()
+    results = service.analyze_hosts()
+    elapsed = time.monotonic() - started
+
+    assert elapsed < 6 * SSH_DELAY
+    by_name = {result.host_name: result for result in results}
+    assert by_name["off"].status == "skipped"
+    analyzed = [result for result in results if result.status == "analyzed"]
+    assert len(analyzed) == 6
+    assert all(result.severity == "warning" and result.ssh_seconds >= SSH_DELAY for result in analyzed)
+    assert all(result.llm_seconds is not None and result.total_seconds for result in analyzed)
+
+    with db_context() as db:
+        assert db.query(LogAnalysis).count() == 6
+
+
+def test_run_deadline_reports_unfinished_hosts(analyzer):
+    service, db_context = analyzer
+    with db_context() as db:
+        _add_host(db, "fast")
+        _add_host(db, "slow", ssh_host="hang")
+
+    results = {result.host_name: result for result in service.analyze_hosts(deadline_seconds=1)}
+
+    assert results["fast"].status == "analyzed"
+    assert results["slow"].status == "timeout"
+    assert results["slow"].error
+
+
+def test_routine_batches_skip_the_llm(analyzer):
+    service, db_context = analyzer
+    with db_context() as db:
+        _add_host(db, "fw")
+
+    routine = "".join(f"accepted connection from 10.0.0.{i} port {1000 + i}\n" for i in range(30))
+    with db_context() as db:
+        host = db.query(Host).filter(Host.host_id == "fw").first()
+        service._analyze_logs_with_llm(host, routine, "ssh://fw", "Find problems")
+        service._analyze_logs_with_llm(host, routine, "ssh://fw", "Find problems")
+        service._analyze_logs_with_llm(
+            host, routine + "kernel: Out of memory: Killed process 42\n", "ssh://fw", "Find problems"
+        )
+
+    with db_context() as db:
+        models = [row.llm_model for row in db.query(LogAnalysis).order_by(LogAnalysis.id)]
+        severities = [row.severity for row in db.query(LogAnalysis).order_by(LogAnalysis.id)]
+    assert models == ["test", "prefilter", "test"]  # First run: all templates are new
+    assert severities[1] == "none"
+    assert service.llm_client.analyze_logs.call_count == 2
+
+
+def test_triage_routine_batches_skip_the_full_model(analyzer):
+    service, db_context = analyzer
+    llm = service.llm_client
+    llm.triage_logs.side_effect = [
+        {"success": True, "suspicious": False, "reason": "noise"},
+        {"success": True, "suspicious": True, "reason": "disk"},
+    ]
+    with db_context() as db:
+        _add_host(db, "fw")
+
+    with db_context() as db:
+        host = db.query(Host).filter(Host.host_id == "fw").first()
+        for _ in range(2):
+            service._analyze_logs_with_llm(
+                host, "disk nearly full\n", "ssh://fw", "Find problems",
+                prefilter=False, triage_model="small", model="big",
+            )
+
+    with db_context() as db:
+        models = [row.llm_model for row in db.query(LogAnalysis).order_by(LogAnalysis.id)]
+    assert models == ["small", "test"]
+    assert llm.analyze_logs.call_count == 1
+    assert llm.analyze_logs.call_args.kwargs["model"] == "big"
+
+
+def test_early_critical_alert_is_not_repeated(analyzer):
+    service, db_context = analyzer
+    critical = {"severity": "critical", "description": "kernel panic"}
+    warning = {"severity": "warning", "description": "disk full"}
+
+    def analyze_logs(on_finding=None, **kwargs):
+        on_finding(critical)
+        on_finding({"severity": "critical", "description": "second"})
+        return {"success": True, "model": "test", "findings": [critical, warning]}
+
+    service.llm_client.analyze_logs.side_effect = analyze_logs
+    with db_context() as db:
+        _add_host(db, "db1")
+
+    with db_context() as db:
+        host = db.query(Host).filter(Host.host_id == "db1").first()
+        service._analyze_logs_with_llm(host, "panic\n", "ssh://db1", "Find problems", prefilter=False)
+
+    calls = service.alert_service.log_analysis_alert.call_args_list
+    assert [call.kwargs["findings"] for call in calls] == [[critical], [warning]]
+    assert calls[1].kwargs["severity"] == "warning"
+
+
+def test_syslog_hosts_read_the_receiver_spool(analyzer, tmp_path):
+    service, db_context = analyzer
+    config = {"enabled": True, "method": "syslog", "analysis_prompt": "Find problems", "prefilter": False}
+    with db_context() as db:
+        db.add(Host(host_id="fw", name="fw", token="t" * 16, log_analysis_config=json.dumps(config)))
+
+    with db_context() as db:
+        host = db.query(Host).filter(Host.host_id == "fw").first()
+        assert service.analyze_host_logs(host) is None  # Nothing received yet
+
+        (tmp_path / "syslog").mkdir()
+        (tmp_path / "syslog" / "fw.log").write_text("fw kern.err kernel: disk full\n")
+        assert service.analyze_host_logs(host) is not None
+        assert service.analyze_host_logs(host) is None  # Already analyzed
+
+    assert service.llm_client.analyze_logs.call_count == 1
+    assert "disk full" in service.llm_client.analyze_logs.call_args.kwargs["logs"]
+
+
+def test_host_with_running_analysis_is_skipped(analyzer):
+    service, db_context = analyzer
+    with db_context() as db:
+        _add_host(db, "web1")
+        db.flush()
+        host = db.query(Host).one()
+        host_id = host.id
+        host.log_analysis_started_at = datetime.utcnow()
+
+    busy = service.analyze_hosts()[0]
+    assert busy.status == "skipped"
+    assert busy.error == ANALYSIS_RUNNING
+    service.llm_client.analyze_logs.assert_not_called()
+
+    # A lease left behind by a crashed process is taken over, then released
+    with db_context() as db:
+        db.get(Host, host_id).log_analysis_started_at = datetime.utcnow() - timedelta(hours=1)
+    assert service.analyze_hosts()[0].status == "analyzed"
+    with db_context() as db:
+        assert db.get(Host, host_id).log_analysis_started_at is None
@@ -0,0 +1,71 @@
+"""Unit tests for chunked log analysis."""
+import json
+import threading
+import time
+from unittest.mock import patch
+
+from src.utils.llm_client import LLMClient
+from src.utils.log_chunking import estimate_tokens, merge_findings, split_log_chunks
+
+
+def test_chunks_split_at_line_boundaries():
+    logs = "".join(f"line {i:04d} of the log\n" for i in range(1000))
+
+    chunks = split_log_chunks(logs, max_tokens=500)
+
+    assert len(chunks) > 1
+    assert "".join(chunks) == logs
+    assert all(chunk.endswith("\n") and estimate_tokens(chunk) <= 500 for chunk in chunks)
+    assert split_log_chunks("short\n", 500) == ["short\n"]
+
+
+def test_overlong_line_is_hard_split():
+    chunks = split_log_chunks("a\n" + "x" * 50 + "\nb\n", max_tokens=5)
+
+    assert "".join(chunks) == "a\n" + "x" * 50 + "\nb\n"
+    assert all(len(chunk) <= 20 for chunk in chunks)
+
+
+def test_merge_deduplicates_and_keeps_highest_severity():
+    merged = merge_findings(
+        [
+            [{"severity": "warning", "category": "error", "description": "Disk /dev/sda1 at 91%"}],
+            [
+                {"severity": "critical", "category": "error", "description": "disk /dev/sda1 at 99%"},
+                {"severity": "info", "category": "security", "description": "SSH login"},
+            ],
+        ]
+    )
+
+    assert [finding["severity"] for finding in merged] == ["critical", "info"]
+    assert merged[0]["occurrences"] == 2 and "99%" in merged[0]["description"]
+
+
+def test_large_logs_are_analyzed_concurrently_and_merged():
+    client = LLMClient("http://llm", "key", chunk_tokens=250, chunk_concurrency=4)
+    logs = "".join(f"kernel: event {i}\n" for i in range(400))
+    active = []
+    peak = []
+    lock = threading.Lock()
+
+    def fake_call(prompt, model, max_tokens, temperature, usage=None, **kwargs):
+        with lock:
+            active.append(1)
+            peak.append(len(active))
+        time.sleep(0.05)
+        with lock:
+            active.pop()
+        if "event 399" in prompt:
+            raise RuntimeError("boom")
+        return json.dumps({"findings": [{"severity": "info", "category": "other", "description": "events"}]})
+
+    with patch.object(client, "_call_api", side_effect=fake_call) as call_api:
+        result = client.analyze_logs(logs, "Find problems")
+
+    chunks = split_log_chunks(logs, 250)
+    assert call_api.call_count == len(chunks) > 4
+    assert max(peak) == 4
+    assert result["success"] and result["chunks"] == len(chunks) and result["failed_chunks"] == 1
+    assert result["findings"] == [
+        {"severity": "info", "category": "other", "description": "events", "occurrences": len(chunks) - 1}
+    ]
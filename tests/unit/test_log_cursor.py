@@ -0,0 +1,126 @@
+"""Unit tests for incremental log retrieval."""
+import os
+import subprocess
+
+from src.services.log_cursor import (
+    CursorState,
+    FileStat,
+    fetch_file_delta,
+    fetch_journal_delta,
+    plan_file_reads,
+)
+
+
+class LocalShell:
+    """Runs commands locally in place of a remote SSH session."""
+
+    def execute_command(self, command):
+        proc = subprocess.run(command, shell=True, capture_output=True)
+        return (
+            proc.returncode == 0,
+            proc.stdout.decode("utf-8", errors="replace"),
+            proc.stderr.decode("utf-8", errors="replace"),
+        )
+
+
+def test_plan_reads_delta_rotation_and_cap():
+    cursor = CursorState(source="/var/log/x", inode=7, offset=100)
+
+    assert plan_file_reads("/var/log/x", FileStat(7, 150), None, cursor) == (
+        [("/var/log/x", 100, 150)], False, 0
+    )
+    # Truncated in place
+    assert plan_file_reads("/var/log/x", FileStat(7, 40), None, cursor)[:2] == (
+        [("/var/log/x", 0, 40)], True
+    )
+    # Rotated: rest of the old file, then the new one
+    assert plan_file_reads("/var/log/x", FileStat(9, 30), FileStat(7, 120), cursor)[0] == [
+        ("/var/log/x.1", 100, 120),
+        ("/var/log/x", 0, 30),
+    ]
+    # Over the cap the oldest bytes are skipped
+    assert plan_file_reads("/var/log/x", FileStat(9, 30), FileStat(7, 120), cursor, 35) == (
+        [("/var/log/x.1", 115, 120), ("/var/log/x", 0, 30)], True, 15
+    )
+
+
+def test_file_delta_follows_appends_partial_lines_and_rotation(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_text("old 1\nold 2\n")
+    shell = LocalShell()
+
+    first = fetch_file_delta(shell, str(path), None)
+    assert first.text == "old 1\nold 2\n"
+
+    with path.open("a") as f:
+        f.write("new 3\npartial")
+    second = fetch_file_delta(shell, str(path), first.cursor)
+    assert second.text == "new 3\n"
+
+    with path.open("a") as f:
+        f.write(" line\n")
+    os.rename(path, f"{path}.1")
+    path.write_text("after rotation\n")
+    third = fetch_file_delta(shell, str(path), second.cursor)
+    assert third.rotated
+    assert third.text == "partial line\nafter rotation\n"
+    assert third.cursor.inode == os.stat(path).st_ino
+
+    assert fetch_file_delta(shell, str(path), third.cursor).text == ""
+
+
+class FakeJournal:
+    def __init__(self):
+        self.commands = []
+
+    def execute_command(self, command):
+        self.commands.append(command)
+        if "--after-cursor=s=stale" in command:
+            return False, "", "Failed to seek to cursor"
+        if "--after-cursor=s=quiet" in command:
+            return True, "-- No entries --\n", ""
+        return True, "2026-10-19T10:00:00 host sshd[1]: Accepted key\n-- cursor: s=abc;i=2\n", ""
+
+
+def test_partial_line_offset_is_counted_in_bytes(tmp_path):
+    path = tmp_path / "app.log"
+    path.write_bytes(b"line 1\npart \xff\xfe")
+    shell = LocalShell()
+
+    first = fetch_file_delta(shell, str(path), None)
+    assert first.text == "line 1\n"
+    assert first.cursor.offset == len(b"line 1\n")
+
+    with path.open("ab") as f:
+        f.write(b"done\n")
+    second = fetch_file_delta(shell, str(path), first.cursor)
+    assert second.text == "part \ufffd\ufffddone\n"
+
+
+def test_journal_delta_uses_and_recovers_cursor():
+    journal = FakeJournal()
+
+    delta = fetch_journal_delta(journal, "journal:sshd", None, unit="sshd", initial_lines=50)
+    assert delta.text.endswith("Accepted key\n")
+    assert delta.cursor.journal_cursor == "s=abc;i=2"
+    assert "-n 50" in journal.commands[-1] and "-u sshd" in journal.commands[-1]
+
+    fetch_journal_delta(journal, "journal:sshd", delta.cursor, unit="sshd")
+    assert "--after-cursor='s=abc;i=2'" in journal.commands[-1]
+
+    recovered = fetch_journal_delta(
+        journal, "journal:sshd", CursorState(source="journal:sshd", journal_cursor="s=stale")
+    )
+    assert recovered.rotated
+    assert recovered.cursor.journal_cursor == "s=abc;i=2"
+
+
+def test_empty_journal_delta_has_no_text():
+    journal = FakeJournal()
+    quiet = CursorState(source="journal:sshd", journal_cursor="s=quiet")
+
+    delta = fetch_journal_delta(journal, "journal:sshd", quiet)
+
+    assert delta.text == ""
+    assert delta.cursor.journal_cursor == "s=quiet"
+    assert "--quiet" in journal.commands[-1]
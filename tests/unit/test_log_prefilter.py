@@ -0,0 +1,130 @@
+"""Unit tests for the log prefilter."""
+import pytest
+
+from src.utils.log_prefilter import (
+    DEFAULT_RULES,
+    PrefilterRule,
+    RuleMatcher,
+    TemplateBaseline,
+    evaluate_batch,
+    parse_rules,
+    update_baseline,
+)
+from src.utils.log_templates import summarize_logs
+
+ROUTINE = "".join(f"sshd: accepted publickey for deploy from 10.0.0.{i}\n" for i in range(10))
+
+
+def _known(text):
+    return {stats.key: stats.template for stats in summarize_logs(text).templates}
+
+
+def test_matcher_counts_lines_per_rule():
+    matcher = RuleMatcher(parse_rules(DEFAULT_RULES))
+    text = (
+        "kernel: Out of memory: Killed process 123 (java)\n"
+        "app: write failed: No space left on device\n"
+        "app: write failed: no space left on device\n"
+        "sshd: accepted publickey\n"
+    )
+
+    assert matcher.match(text) == {"oom": 1, "disk_full": 2}
+
+
+def test_parse_rules_rejects_invalid_pattern():
+    assert parse_rules([{"name": "x"}, {"name": "ok", "pattern": "foo"}])[0].name == "ok"
+    with pytest.raises(ValueError):
+        parse_rules([{"name": "bad", "pattern": "("}])
+
+
+def test_patterns_that_cannot_share_the_alternation_still_match():
+    rules = parse_rules(
+        [
+            {"name": "flags", "pattern": "(?s)fatal.error"},
+            {"name": "inline_i", "pattern": "(?i)panic"},
+            {"name": "named_a", "pattern": "(?P<code>E\\d+) disk"},
+            {"name": "named_b", "pattern": "(?P<code>E\\d+) fan"},
+            {"name": "backref", "pattern": r"(\w+) \1 again"},
+            {"name": "plain", "pattern": "timeout"},
+        ]
+    )
+    matcher = RuleMatcher(rules)
+    text = (
+        "FATAL ERROR in worker\n"
+        "kernel PANIC\n"
+        "E12 disk failing\n"
+        "E13 fan stopped\n"
+        "retry retry again\n"
+        "retry later again\n"
+        "request timeout\n"
+    )
+
+    assert matcher.match(text) == {
+        "flags": 1,
+        "inline_i": 1,
+        "named_a": 1,
+        "named_b": 1,
+        "backref": 1,
+        "plain": 1,
+    }
+
+
+def test_matcher_rejects_invalid_pattern_with_value_error():
+    with pytest.raises(ValueError):
+        RuleMatcher([PrefilterRule(name="bad", pattern="(")])
+
+
+def test_routine_batch_is_not_analyzed():
+    known = _known(ROUTINE)
+    summary = summarize_logs(ROUTINE, known)
+    baselines = {key: TemplateBaseline(mean=10.0, samples=5) for key in known}
+
+    decision = evaluate_batch(ROUTINE, summary, baselines, RuleMatcher(parse_rules(DEFAULT_RULES)))
+
+    assert not decision.analyze
+    assert decision.reasons == []
+
+
+def test_new_template_and_rate_anomaly_trigger_analysis():
+    known = _known(ROUTINE)
+    matcher = RuleMatcher([])
+
+    novel = summarize_logs(ROUTINE + "cron: job backup started\n", known)
+    assert evaluate_batch("", novel, {}, matcher).novel_templates == 1
+
+    burst = ROUTINE * 10
+    key = next(iter(known))
+    decision = evaluate_batch(
+        burst, summarize_logs(burst, known), {key: TemplateBaseline(mean=10.0, samples=5)}, matcher
+    )
+    assert decision.analyze and decision.anomalies[0][1] == 100
+
+    # Baselines still warming up are ignored
+    warming = {key: TemplateBaseline(mean=10.0, samples=1)}
+    assert not evaluate_batch(burst, summarize_logs(burst, known), warming, matcher).analyze
+
+
+def test_lines_widening_a_known_template_are_novel():
+    known = _known(
+        "Oct 19 10:00:00 fw sshd[7]: Failed password for root from 10.0.0.1 port 22 ssh2\n"
+    )
+    batch = (
+        "Oct 19 10:05:00 fw sshd[8]: Accepted password for root from 10.0.0.2 port 22 ssh2\n"
+        "Oct 19 10:05:01 fw sshd[9]: Accepted publickey for root from 10.0.0.3 port 22 ssh2\n"
+    )
+    summary = summarize_logs(batch, known)
+    decision = evaluate_batch(batch, summary, {}, RuleMatcher([]))
+
+    assert [stats.count for stats in summary.novel] == [2]
+    assert decision.analyze
+    # The stored template is reported unchanged
+    assert all(
+        stats.template == known[stats.key] for stats in summary.templates if stats.key in known
+    )
+
+
+def test_update_baseline_is_ewma():
+    baseline = update_baseline(None, 10)
+    assert baseline == TemplateBaseline(mean=10.0, samples=1)
+    baseline = update_baseline(baseline, 20)
+    assert baseline.samples == 2 and baseline.mean == pytest.approx(12.0)
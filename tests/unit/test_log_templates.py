@@ -0,0 +1,59 @@
+"""Unit tests for log template mining."""
+from src.utils.log_templates import DrainParser, mask_line, summarize_logs
+
+
+def test_mask_line_replaces_variable_fields():
+    line = (
+        "2026-10-19T10:00:00Z fw kernel: BLOCK MAC=00:11:22:33:44:55 SRC=203.0.113.7:443 "
+        "id=0xdeadbeef req=9f86d081884c7d65 len=60 at 10:00:01 from fe80::1:2"
+    )
+    assert mask_line(line) == (
+        "<TS> fw kernel: BLOCK MAC=<MAC> SRC=<IP> id=<HEX> req=<HEX> len=<NUM> at <TIME> from <IP>"
+    )
+
+
+def test_drain_clusters_lines_into_templates():
+    parser = DrainParser()
+    for user in ("root", "admin", "oracle"):
+        parser.add(f"sshd[12]: Failed password for {user} from 10.0.0.{len(user)} port 22 ssh2")
+    parser.add("kernel: Out of memory: Killed process 1234 (nginx)")
+
+    templates = sorted(cluster.template for cluster in parser.clusters)
+    assert templates == [
+        "kernel: Out of memory: Killed process <NUM> (nginx)",
+        "sshd[<NUM>]: Failed password for <*> from <IP> port <NUM> ssh2",
+    ]
+
+
+def test_known_template_is_not_generalized():
+    stored = "Oct <NUM> <TIME> fw sshd[<NUM>]: Failed password for root from <IP> port <NUM> ssh2"
+    parser = DrainParser()
+    known = parser.seed(stored)
+
+    joined = parser.add("Oct 19 10:00:00 fw sshd[7]: Failed password for root from 10.0.0.1 port 22 ssh2")
+    other = parser.add("Oct 19 10:00:01 fw sshd[8]: Accepted password for root from 10.0.0.1 port 22 ssh2")
+
+    assert joined is known
+    assert other is not known and not other.known
+    assert known.template == stored
+
+
+def test_summary_keeps_novel_lines_and_compresses_known_ones():
+    routine = "".join(
+        f"Oct 19 10:00:{i % 60:02d} fw sshd[{i}]: Failed password for root from 10.0.{i % 256}.1 port {1000 + i} ssh2\n"
+        for i in range(500)
+    )
+    first = summarize_logs(routine)
+    assert len(first.templates) == 1 and first.templates[0].count == 500
+    known = {stats.key: stats.template for stats in first.templates}
+
+    batch = routine + "Oct 19 10:01:00 fw kernel: segfault at 0 ip 00007f3a sp 0 error 4 in libc.so\n"
+    second = summarize_logs(batch, known)
+    rendered = second.render()
+
+    assert [stats.count for stats in second.novel] == [1]
+    assert "segfault at 0 ip 00007f3a" in rendered
+    assert "[500x]" in rendered
+    assert len(rendered) * 10 < len(batch)
+    # Known templates keep their stored key
+    assert set(known) <= {stats.key for stats in second.templates}
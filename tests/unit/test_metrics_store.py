@@ -0,0 +1,65 @@
+"""Unit tests for MetricsStore head chunk checkpoints."""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, Host, MetricChunk
+from src.services.metrics_store import MetricsStore
+from src.utils.timeseries import decode_chunk
+
+START = datetime(2026, 10, 19, 12, 0, 0)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    session.add(Host(id=1, host_id="web", name="web", token="t" * 16))
+    session.commit()
+    yield session
+    session.close()
+
+
+def test_open_heads_survive_a_crash_and_sealing_updates_the_checkpoint(db):
+    store = MetricsStore(chunk_max_samples=3)
+    for i in range(3):
+        store.append(db, 1, {"load": float(i)}, START + timedelta(minutes=i))
+        db.commit()
+    assert db.query(MetricChunk).count() == 0  # Heartbeats never checkpoint
+    store.checkpoint(db)
+    db.commit()
+
+    # Process dies here: the open head is already in the database
+    rows = db.query(MetricChunk).all()
+    assert len(rows) == 1
+    assert decode_chunk(rows[0].data)[1] == [0.0, 1.0, 2.0]
+
+    store.append(db, 1, {"load": 3.0}, START + timedelta(minutes=3))
+    db.commit()
+    store.flush(db)
+    db.commit()
+
+    rows = db.query(MetricChunk).order_by(MetricChunk.start_time).all()
+    assert [row.sample_count for row in rows] == [3, 1]
+    points = store.query(db, 1, "load", START, START + timedelta(hours=1))["points"]
+    assert [value for _, value in points] == [0.0, 1.0, 2.0, 3.0]
+
+
+def test_checkpoint_never_updates_another_series_row(db):
+    store = MetricsStore()
+    store.append(db, 1, {"load": 1.0}, START)
+    store.checkpoint(db)
+    db.commit()
+    load_row = db.query(MetricChunk).one()
+
+    # A rolled-back checkpoint left a row id that now belongs to "load"
+    store.append(db, 1, {"mem": 5.0}, START)
+    store._head_rows[(1, "mem")] = load_row.id
+    store.checkpoint(db)
+    db.commit()
+
+    rows = {row.metric: decode_chunk(row.data)[1] for row in db.query(MetricChunk)}
+    assert rows == {"load": [1.0], "mem": [5.0]}
@@ -0,0 +1,353 @@
+"""Unit tests for the project service poller."""
+import asyncio
+from contextlib import contextmanager
+from datetime import datetime
+from types import SimpleNamespace
+from unittest.mock import MagicMock, patch
+
+import httpx
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.database import Base, ProjectService, ServiceHealthCheck
+from src.database.schemas import ProjectServiceCreate
+from src.services.check_executors import check_type
+from src.services.project_poller import (
+    CIRCUIT_CLOSED,
+    CIRCUIT_OPEN,
+    PollResult,
+    PollTarget,
+    ProjectPollerService,
+    check_target,
+    circuit_backoff,
+    next_due,
+)
+
+
+def _target(**overrides):
+    values = dict(
+        id=1,
+        project_name="shop",
+        service_name="api",
+        endpoint_url="http://shop.test/health",
+        endpoint_type="http",
+        poll_frequency_seconds=60,
+        timeout_seconds=1,
+        expected_status_code=200,
+        expected_response_pattern='"status":\\s*"ok"',
+    )
+    values.update(overrides)
+    return PollTarget(**values)
+
+
+def _check(target, handler):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            return await check_target(client, target)
+
+    return asyncio.run(run())
+
+
+def test_success_and_pattern_mismatch():
+    ok = _check(_target(), lambda request: httpx.Response(200, text='{"status": "ok"}'))
+    bad = _check(_target(), lambda request: httpx.Response(200, text='{"status": "down"}'))
+
+    assert ok.status == "success"
+    assert ok.status_code == 200
+    assert bad.status == "failure"
+    assert bad.error_message == "Response pattern mismatch"
+
+
+def test_unexpected_status_and_auth_header():
+    seen = {}
+
+    def handler(request):
+        seen["auth"] = request.headers.get("Authorization")
+        return httpx.Response(503)
+
+    result = _check(
+        _target(auth_type="bearer", auth_config='{"token": "abc"}'),
+        handler,
+    )
+
+    assert result.status == "failure"
+    assert result.error_message == "Unexpected status: 503"
+    assert seen["auth"] == "Bearer abc"
+
+
+def test_slow_endpoint_times_out():
+    async def handler(request):
+        await asyncio.sleep(5)
+        return httpx.Response(200)
+
+    result = _check(_target(timeout_seconds=0.1), handler)
+
+    assert result.status == "timeout"
+    assert result.response_time_ms < 1000
+
+
+def test_next_due_keeps_cadence_and_skips_backlog():
+    assert next_due(100.0, 101.0, 60) == 160.0
+    # Engine was paused for ten minutes: no catch-up burst
+    assert next_due(100.0, 700.0, 60) == 760.0
+    assert 154.0 <= next_due(100.0, 101.0, 60, jitter=0.1) <= 166.0
+
+
+def _streamed(chunks, produced):
+    async def body():
+        for chunk in chunks:
+            produced.append(chunk)
+            yield chunk
+
+    return body()
+
+
+def test_streaming_stops_once_pattern_matches():
+    produced = []
+    chunks = [b'{"status": "ok"}'] + [b"x" * 65536] * 100
+
+    result = _check(
+        _target(),
+        lambda request: httpx.Response(200, content=_streamed(chunks, produced)),
+    )
+
+    assert result.status == "success"
+    assert len(produced) < 5
+
+
+def test_pattern_spanning_chunks_and_byte_cap():
+    split = _check(
+        _target(),
+        lambda request: httpx.Response(200, content=_streamed([b'{"sta', b'tus": "ok"}'], [])),
+    )
+    capped = _check(
+        _target(max_response_bytes=4096),
+        lambda request: httpx.Response(
+            200, content=_streamed([b"x" * 4096, b'{"status": "ok"}'], [])
+        ),
+    )
+
+    assert split.status == "success"
+    assert capped.status == "failure"
+    assert capped.error_message == "Response pattern not found in first 4096 bytes"
+    assert len(capped.response_body) == 1000
+
+
+def test_invalid_pattern_is_reported():
+    result = _check(
+        _target(expected_response_pattern="(unclosed"),
+        lambda request: httpx.Response(200, text="ok"),
+    )
+
+    assert result.status == "failure"
+    assert result.error_message.startswith("Invalid response pattern")
+
+
+def test_invalid_url_and_unexpected_errors_are_failures():
+    ok = lambda request: httpx.Response(200, text="ok")
+    assert _check(_target(endpoint_url="http://[::1/health"), ok).status == "failure"
+
+    def boom(request):
+        raise RuntimeError("unexpected")
+
+    result = _check(_target(), boom)
+    assert result.status == "failure"
+    assert "unexpected" in result.error_message
+
+    with pytest.raises(ValueError):
+        ProjectServiceCreate(
+            project_name="shop", service_name="api", endpoint_url="http://:80/health"
+        )
+    ProjectServiceCreate(project_name="shop", service_name="db", endpoint_url="db:5432")
+
+
+def test_circuit_backoff_doubles_up_to_cap():
+    delays = [circuit_backoff(60, failures, 3, 1800) for failures in range(3, 9)]
+    assert delays == [120, 240, 480, 960, 1800, 1800]
+    # Cap never shortens the normal cadence
+    assert circuit_backoff(3600, 3, 3, 1800) == 3600
+
+
+def test_check_types_from_endpoint_type_and_scheme():
+    assert check_type("http", "https://shop.test/health") == "http"
+    assert check_type("post", "http://shop.test/health") == "http"
+    assert check_type("http", "tcp://db.shop.test:5432") == "tcp"
+    assert check_type("tls", "shop.test") == "tls"
+    assert check_type("DNS", "dns://shop.test") == "dns"
+
+
+def test_tcp_check_measures_connect_time_and_reports_refusal():
+    async def run():
+        server = await asyncio.start_server(lambda r, w: w.close(), "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        async with server:
+            ok = await check_target(None, _target(endpoint_url=f"tcp://127.0.0.1:{port}"))
+        refused = await check_target(None, _target(endpoint_url=f"tcp://127.0.0.1:{port}"))
+        return ok, refused
+
+    ok, refused = asyncio.run(run())
+    assert ok.status == "success" and ok.response_time_ms is not None
+    assert refused.status == "failure" and refused.error_message
+
+
+def test_dns_check_verifies_expected_addresses():
+    ok = asyncio.run(check_target(None, _target(endpoint_type="dns", endpoint_url="localhost")))
+    assert ok.status == "success"
+    assert "127.0.0.1" in ok.response_body or "::1" in ok.response_body
+
+    wrong = _target(
+        endpoint_type="dns",
+        endpoint_url="dns://localhost",
+        check_config='{"expected_addresses": ["192.0.2.1"]}',
+    )
+    result = asyncio.run(check_target(None, wrong))
+    assert result.status == "failure"
+    assert "expected 192.0.2.1" in result.error_message
+
+
+@pytest.fixture
+def poller():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    transactions = []
+
+    @contextmanager
+    def db_context():
+        transactions.append(1)
+        db = Session()
+        try:
+            yield db
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+        finally:
+            db.close()
+
+    settings = SimpleNamespace(
+        project_poll_max_concurrency=4,
+        project_poll_jitter=0.0,
+        project_poll_max_backoff_seconds=1800,
+        project_poll_write_interval=0.0,
+    )
+    with patch("src.services.project_poller.get_settings", return_value=settings), patch(
+        "src.services.project_poller.get_alert_service", return_value=MagicMock()
+    ), patch(
+        "src.services.project_poller.get_service_stats_recorder", return_value=MagicMock()
+    ), patch(
+        "src.services.project_poller.get_db_context", db_context
+    ):
+        service = ProjectPollerService()
+        service.Session = Session
+        service.transactions = transactions
+        yield service
+
+
+def _add_service(poller, **overrides):
+    values = dict(
+        project_name="shop",
+        service_name="api",
+        endpoint_url="http://shop.test/health",
+        timeout_seconds=1,
+        alert_threshold=2,
+    )
+    values.update(overrides)
+    with poller.Session() as db:
+        service = ProjectService(**values)
+        db.add(service)
+        db.commit()
+        return PollTarget.from_service(service)
+
+
+def _result(target, status="failure"):
+    return PollResult(
+        service_id=target.id,
+        timestamp=datetime.utcnow(),
+        status=status,
+        error_message=None if status == "success" else "down",
+    )
+
+
+def test_failure_alert_is_sent_once_when_the_circuit_opens(poller):
+    target = _add_service(poller)
+    for _ in range(5):
+        poller.record_result(target, _result(target))
+
+    with poller.Session() as db:
+        assert db.query(ProjectService).one().circuit_state == CIRCUIT_OPEN
+    assert poller.alert_service.project_service_failure_alert.call_count == 1
+
+
+def test_slow_healthy_probe_closes_the_circuit(poller):
+    target = _add_service(poller, timeout_seconds=30)
+    for _ in range(2):
+        poller.record_result(target, _result(target))
+
+    probe = asyncio.run(poller._half_open(target))
+
+    async def handler(request):
+        await asyncio.sleep(0.3)
+        return httpx.Response(200, text='{"status": "ok"}')
+
+    result = _check(probe, handler)
+    assert probe.timeout_seconds == 30
+    assert result.status == "success"
+
+    assert poller.record_result(probe, result) is None
+    with poller.Session() as db:
+        assert db.query(ProjectService).one().circuit_state == CIRCUIT_CLOSED
+    poller.alert_service.project_service_recovered_alert.assert_called_once()
+
+
+def _services(poller, count):
+    return [_add_service(poller, service_name=f"api-{i}") for i in range(count)]
+
+
+def test_batch_is_written_in_one_transaction(poller):
+    targets = _services(poller, 3)
+    poller.transactions.clear()
+
+    poller.record_results([(target, _result(target, "success")) for target in targets])
+
+    assert len(poller.transactions) == 1
+    with poller.Session() as db:
+        assert db.query(ServiceHealthCheck).count() == 3
+
+
+def test_bad_result_does_not_lose_the_rest_of_the_batch(poller):
+    targets = _services(poller, 3)
+    bad = targets[1]
+
+    def attach(db, service, check, body):
+        if service.id == bad.id:
+            raise ValueError("corrupt body")
+
+    with patch("src.services.project_poller.attach_response_body", side_effect=attach):
+        poller.record_results([(target, _result(target)) for target in targets])
+
+    with poller.Session() as db:
+        written = {check.service_id for check in db.query(ServiceHealthCheck)}
+        assert written == {targets[0].id, targets[2].id}
+        assert db.get(ProjectService, bad.id).consecutive_failures == 0
+
+
+def test_failed_commit_is_retried_one_result_at_a_time(poller):
+    targets = _services(poller, 3)
+    results = [_result(target) for target in targets]
+    # NOT NULL violation only surfaces when the transaction is committed
+    results[1].status = None
+    poller.transactions.clear()
+
+    written = poller.record_results(list(zip(targets, results)))
+
+    assert len(poller.transactions) == 1 + len(targets)
+    assert len(written) == 3
+    with poller.Session() as db:
+        stored = {check.service_id for check in db.query(ServiceHealthCheck)}
+        assert stored == {targets[0].id, targets[2].id}
@@ -0,0 +1,140 @@
+"""Unit tests for the project services API."""
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import StaticPool
+
+from src.api.routes import project_services
+from src.database import Base, ServiceHealthCheck, get_db
+
+
+@pytest.fixture
+def client():
+    engine = create_engine(
+        "sqlite://", connect_args={"check_same_thread": False}, poolclass=StaticPool
+    )
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+
+    def override_get_db():
+        db = Session()
+        try:
+            yield db
+        finally:
+            db.close()
+
+    app = FastAPI()
+    app.include_router(project_services.router, prefix="/api/v1")
+    app.dependency_overrides[get_db] = override_get_db
+    client = TestClient(app)
+    client.Session = Session
+    return client
+
+
+IMPORT_YAML = """
+services:
+  - project_name: shop
+    service_name: api
+    endpoint_url: http://shop/health
+  - project_name: shop
+    service_name: worker
+    endpoint_url: http://shop/worker
+    poll_frequency_seconds: 60
+"""
+
+
+def test_bulk_import_upserts_on_project_and_service(client):
+    first = client.post("/api/v1/project-services/import", content=IMPORT_YAML)
+    again = client.post(
+        "/api/v1/project-services/import",
+        json=[{"project_name": "shop", "service_name": "api", "endpoint_url": "http://shop/v2"}],
+    )
+    services = client.get("/api/v1/project-services", params={"project_name": "shop"}).json()
+
+    assert first.json()["created"] == 2
+    assert again.json()["updated"] == 1
+    assert [s["endpoint_url"] for s in services] == ["http://shop/v2", "http://shop/worker"]
+
+
+def test_invalid_import_writes_nothing(client):
+    response = client.post(
+        "/api/v1/project-services/import",
+        json=[
+            {"project_name": "shop", "service_name": "api", "endpoint_url": "http://shop"},
+            {"project_name": "shop", "service_name": "bad"},
+        ],
+    )
+
+    assert response.status_code == 422
+    assert response.json()["detail"]["errors"][0]["index"] == 1
+    assert client.get("/api/v1/project-services").json() == []
+
+
+def test_responses_do_not_return_credentials(client):
+    created = client.post(
+        "/api/v1/project-services",
+        json={
+            "project_name": "shop",
+            "service_name": "api",
+            "endpoint_url": "http://shop",
+            "auth_type": "bearer",
+            "auth_config": '{"token": "secret"}',
+        },
+    ).json()
+    listed = client.get("/api/v1/project-services").json()
+    fetched = client.get(f"/api/v1/project-services/{created['id']}").json()
+
+    for service in (created, listed[0], fetched):
+        assert "auth_config" not in service
+        assert service["auth_configured"] is True
+
+
+def test_null_only_clears_nullable_fields(client):
+    created = client.post(
+        "/api/v1/project-services",
+        json={
+            "project_name": "shop",
+            "service_name": "api",
+            "endpoint_url": "http://shop",
+            "timeout_seconds": 5,
+            "slo_target": 0.99,
+        },
+    ).json()
+
+    response = client.put(
+        f"/api/v1/project-services/{created['id']}",
+        json={"timeout_seconds": None, "endpoint_url": None, "enabled": None, "slo_target": None},
+    )
+    imported = client.post(
+        "/api/v1/project-services/import",
+        json=[{"project_name": "shop", "service_name": "api", "endpoint_url": "http://shop/v2",
+               "endpoint_id": None, "max_response_bytes": None}],
+    )
+
+    assert response.status_code == 200
+    updated = response.json()
+    assert (updated["timeout_seconds"], updated["endpoint_url"]) == (5, "http://shop")
+    assert updated["enabled"] is True and updated["slo_target"] is None
+    assert imported.status_code == 200
+
+
+def test_check_history_keyset_pagination(client):
+    service = client.post(
+        "/api/v1/project-services",
+        json={"project_name": "shop", "service_name": "api", "endpoint_url": "http://shop"},
+    ).json()
+    with client.Session() as db:
+        db.add_all(ServiceHealthCheck(service_id=service["id"], status="success") for _ in range(5))
+        db.commit()
+
+    page = client.get(f"/api/v1/project-services/{service['id']}/checks", params={"limit": 3}).json()
+    rest = client.get(
+        f"/api/v1/project-services/{service['id']}/checks",
+        params={"limit": 3, "before_id": page["next_before_id"]},
+    ).json()
+
+    assert [c["id"] for c in page["checks"]] == [5, 4, 3]
+    assert [c["id"] for c in rest["checks"]] == [2, 1]
+    assert rest["next_before_id"] is None
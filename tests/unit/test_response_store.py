@@ -0,0 +1,91 @@
+"""Unit tests for deduplicated response body storage."""
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.dialects import mysql, postgresql
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, ProjectService, ResponseBlob, ServiceHealthCheck
+from src.services.response_store import (
+    _insert_ignoring_duplicates,
+    attach_response_body,
+    delete_orphan_blobs,
+    store_response_body,
+)
+
+
+@pytest.fixture
+def db():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    session = sessionmaker(bind=engine)()
+    service = ProjectService(project_name="shop", service_name="api", endpoint_url="http://x")
+    session.add(service)
+    session.commit()
+    yield session
+    session.close()
+
+
+def _record(db, status, body):
+    service = db.query(ProjectService).one()
+    check = ServiceHealthCheck(service_id=service.id, status=status)
+    attach_response_body(db, service, check, body)
+    db.add(check)
+    db.commit()
+    return check
+
+
+def test_unchanged_healthy_bodies_are_stored_once(db):
+    first = _record(db, "success", '{"status": "ok"}')
+    second = _record(db, "success", '{"status": "ok"}')
+    changed = _record(db, "success", '{"status": "ok", "version": 2}')
+
+    assert first.response_body == '{"status": "ok"}'
+    assert second.response_blob_hash is None
+    assert changed.response_body == '{"status": "ok", "version": 2}'
+    assert db.query(ResponseBlob).count() == 2
+
+
+def test_failures_always_reference_their_body(db):
+    _record(db, "failure", "boom")
+    repeat = _record(db, "failure", "boom")
+
+    assert repeat.response_body == "boom"
+    assert db.query(ResponseBlob).count() == 1
+
+
+def test_orphan_blobs_are_deleted(db):
+    check = _record(db, "failure", "boom")
+    _record(db, "success", "ok")
+    db.delete(check)
+    db.commit()
+
+    assert delete_orphan_blobs(db) == 1
+    assert db.query(ResponseBlob).count() == 1
+
+
+def test_blob_of_last_response_survives_cleanup(db):
+    first = _record(db, "success", "ok")
+    db.delete(first)
+    db.commit()
+
+    assert delete_orphan_blobs(db) == 0
+    repeat = _record(db, "success", "ok")
+    assert repeat.response_blob_hash is None
+    assert db.query(ResponseBlob).one().hash == db.query(ProjectService).one().last_response_hash
+
+
+def test_duplicate_bodies_are_ignored_on_every_supported_database(db):
+    assert store_response_body(db, "boom") == store_response_body(db, "boom")
+    db.commit()
+    assert db.query(ResponseBlob).count() == 1
+
+    values = {"hash": "h", "data": b"", "size": 0}
+    statements = {
+        name: str(
+            _insert_ignoring_duplicates(name, values).compile(dialect=dialect.dialect())
+        )
+        for name, dialect in (("postgresql", postgresql), ("mysql", mysql))
+    }
+    assert "ON CONFLICT (hash) DO NOTHING" in statements["postgresql"]
+    assert statements["mysql"].startswith("INSERT IGNORE")
+    assert _insert_ignoring_duplicates("oracle", values) is None
@@ -0,0 +1,70 @@
+"""Unit tests for project service SLO tracking."""
+from datetime import datetime
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, ProjectService, ServiceLatencyBucket
+from src.services.service_slo import ServiceStatsRecorder, summarize_service
+
+
+def test_flush_merges_buckets_and_summarizes():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = ProjectService(
+        project_name="shop", service_name="api", endpoint_url="http://x", slo_target=0.9
+    )
+    db.add(service)
+    db.commit()
+
+    recorder = ServiceStatsRecorder()
+    for second in range(0, 50, 5):
+        recorder.record(service.id, datetime(2024, 3, 5, 12, 0, second), True, 100)
+    recorder.flush(db)
+    db.commit()
+
+    # A second flush for the same bucket merges into the existing row
+    recorder.record(service.id, datetime(2024, 3, 5, 12, 2), False, 900)
+    recorder.record(service.id, datetime(2024, 3, 5, 12, 7), False, None)
+    recorder.flush(db)
+    db.commit()
+
+    assert db.query(ServiceLatencyBucket).count() == 2
+
+    summary = summarize_service(
+        db, service, datetime(2024, 3, 5, 12, 0), datetime(2024, 3, 5, 13, 0)
+    )
+
+    assert summary["checks"] == 12
+    assert summary["failed_checks"] == 2
+    assert summary["latency_ms"]["p50"] == 100
+    assert 880 <= summary["latency_ms"]["p99"] <= 920
+    assert abs(summary["slo"]["error_budget_burn_rate"] - (2 / 12) / 0.1) < 1e-9
+    assert summary["slo"]["error_budget_remaining"] < 0
+
+
+def test_failed_flush_keeps_stats_and_deleted_services_are_skipped():
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    db = sessionmaker(bind=engine)()
+    service = ProjectService(project_name="shop", service_name="api", endpoint_url="http://x")
+    db.add(service)
+    db.commit()
+
+    recorder = ServiceStatsRecorder()
+    recorder.record(service.id, datetime(2024, 3, 5, 12, 0), True, 100)
+    recorder.record(service.id + 1, datetime(2024, 3, 5, 12, 0), True, 100)  # Deleted service
+
+    with patch.object(db, "commit", side_effect=RuntimeError("database is locked")):
+        with pytest.raises(RuntimeError):
+            recorder.flush(db)
+    assert db.query(ServiceLatencyBucket).count() == 0
+
+    recorder.record(service.id, datetime(2024, 3, 5, 12, 1), False, 200)
+    assert recorder.flush(db) == 1
+
+    row = db.query(ServiceLatencyBucket).one()
+    assert (row.service_id, row.total_checks, row.successful_checks) == (service.id, 2, 1)
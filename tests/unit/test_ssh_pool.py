@@ -0,0 +1,89 @@
+"""Unit tests for the SSH connection pool."""
+import threading
+from unittest.mock import patch
+
+import pytest
+
+from src.utils.ssh_pool import SSHConnectionPool
+
+
+class FakeSSHClient:
+    instances = []
+
+    def __init__(self, hostname, **kwargs):
+        self.hostname = hostname
+        self.is_connected = False
+        self.connects = 0
+        self._client = None
+        FakeSSHClient.instances.append(self)
+
+    def connect(self):
+        self.connects += 1
+        self.is_connected = self.hostname != "down"
+        return self.is_connected
+
+    def close(self):
+        self.is_connected = False
+
+
+@pytest.fixture(autouse=True)
+def fake_ssh():
+    FakeSSHClient.instances = []
+    with patch("src.utils.ssh_pool.SSHClient", FakeSSHClient):
+        yield
+
+
+def test_connection_is_reused_without_reconnecting():
+    pool = SSHConnectionPool()
+
+    with pool.connection("fw", "admin", password="x") as first:
+        pass
+    with pool.connection("fw", "admin", password="x") as second:
+        pass
+
+    assert first is second
+    assert first.connects == 1
+    assert pool.stats() == {"hosts": 1, "open": 1, "in_use": 0}
+
+
+def test_failed_block_and_dead_transport_are_discarded():
+    pool = SSHConnectionPool()
+
+    with pytest.raises(RuntimeError):
+        with pool.connection("fw", "admin", password="x") as client:
+            raise RuntimeError("command failed")
+    assert not client.is_connected
+
+    with pool.connection("fw", "admin", password="x") as client:
+        pass
+    client.is_connected = False  # transport died while idle
+    with pool.connection("fw", "admin", password="x") as replacement:
+        pass
+
+    assert replacement is not client
+    assert len(FakeSSHClient.instances) == 3
+
+    with pytest.raises(ConnectionError):
+        with pool.connection("down", "admin", password="x"):
+            pass
+    assert pool.stats()["open"] == 1
+
+
+def test_per_host_cap_and_idle_eviction():
+    pool = SSHConnectionPool(max_per_host=1, connect_timeout=0.2)
+    released = threading.Event()
+
+    with pool.connection("fw", "admin", password="x"):
+        with pytest.raises(TimeoutError):
+            with pool.connection("fw", "admin", password="x"):
+                pass
+        # Other hosts are not affected by the cap
+        with pool.connection("db", "admin", password="x"):
+            released.set()
+
+    assert released.is_set()
+    assert pool.stats()["open"] == 2
+
+    pool.idle_timeout = 0
+    assert pool.evict_idle() == 2
+    assert pool.stats() == {"hosts": 0, "open": 0, "in_use": 0}
@@ -0,0 +1,125 @@
+"""Unit tests for the syslog receiver."""
+import asyncio
+import json
+import os
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from unittest.mock import patch
+
+import pytest
+from sqlalchemy import create_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.database import Base, Host
+from src.services.log_cursor import read_local_file_delta
+from src.services.syslog_receiver import (
+    SyslogReceiver,
+    parse_syslog_message,
+    read_frame,
+    spool_path,
+)
+
+NOW = datetime(2026, 10, 19, 12, 0, 0, tzinfo=timezone.utc)
+
+
+@pytest.fixture
+def receiver(tmp_path):
+    receiver = SyslogReceiver(spool_dir=str(tmp_path), buffer_lines=3, spool_max_bytes=400)
+    receiver._addresses = {"10.0.0.1": "fw1"}
+    receiver._hostnames = {"web-01": "web"}
+    return receiver
+
+
+def test_parses_rfc3164_and_rfc5424():
+    legacy = parse_syslog_message(b"<34>Oct 11 22:14:15 mymachine su[123]: 'su root' failed\n")
+    modern = parse_syslog_message(
+        b'<165>1 2003-10-11T22:14:15.003Z web-01 evntslog - ID47 '
+        b'[exampleSDID@32473 iut="3" eventSource="App\\]"] \xef\xbb\xbfAn application event'
+    )
+    bare = parse_syslog_message(b"no header at all")
+
+    assert (legacy.facility, legacy.severity, legacy.hostname) == (4, 2, "mymachine")
+    assert (legacy.app_name, legacy.proc_id, legacy.message) == ("su", "123", "'su root' failed")
+    assert (modern.facility, modern.severity, modern.hostname) == (20, 5, "web-01")
+    assert modern.app_name == "evntslog" and modern.proc_id is None
+    assert modern.message == "An application event"
+    assert (bare.facility, bare.severity, bare.message) == (1, 5, "no header at all")
+    assert parse_syslog_message(b"\n") is None
+
+
+def test_tcp_framing():
+    async def frames():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b"10 <13>hello\n<14>world\n<15>tail")
+        reader.feed_eof()
+        return [await read_frame(reader) for _ in range(4)]
+
+    assert asyncio.run(frames()) == [b"<13>hello\n", b"<14>world\n", b"<15>tail", None]
+
+
+def test_messages_are_demultiplexed_and_bounded(receiver):
+    results = [
+        receiver.handle_message(b"<11>Oct 19 12:00:00 fw1 kernel: link down", "10.0.0.1", NOW),
+        receiver.handle_message(b"<14>1 - web-01 nginx 42 - - started", "10.9.9.9", NOW),
+        receiver.handle_message(b"<14>hello", "10.0.0.2", NOW),
+    ]
+    for i in range(4):
+        receiver.handle_message(f"<14>fw1 line {i}".encode(), "10.0.0.1", NOW)
+
+    assert results == ["accepted", "accepted", "unknown_source"]
+    assert list(receiver._buffers["web"]) == [
+        "2026-10-19T12:00:00+00:00 web-01 user.info nginx[42]: started\n"
+    ]
+    assert len(receiver._buffers["fw1"]) == 3
+    assert receiver.counters["dropped"] == 2
+
+
+def test_hosts_are_matched_by_sender_address_unless_hostnames_are_listed(receiver):
+    engine = create_engine("sqlite://")
+    Base.metadata.create_all(engine)
+    Session = sessionmaker(bind=engine)
+    with Session() as db:
+        for host_id, name, config in (
+            ("fw1", "fw1", {"method": "syslog", "ssh_host": "10.0.0.1"}),
+            ("web", "web-01", {"method": "syslog", "syslog_sources": ["10.0.0.8", "web-01"]}),
+        ):
+            db.add(
+                Host(host_id=host_id, name=name, token="t" * 16, log_analysis_config=json.dumps(config))
+            )
+        db.commit()
+
+    @contextmanager
+    def db_context():
+        with Session() as db:
+            yield db
+
+    with patch("src.services.syslog_receiver.get_db_context", db_context):
+        receiver.load_hosts()
+
+    assert receiver._addresses == {"10.0.0.1": "fw1", "10.0.0.8": "web"}
+    assert receiver._hostnames == {"web-01": "web"}
+    # Claiming to be fw1 from another address is not enough
+    assert receiver.handle_message(b"<14>Oct 19 12:00:00 fw1 sshd: ok", "10.6.6.6", NOW) == (
+        "unknown_source"
+    )
+    assert receiver.handle_message(b"<14>Oct 19 12:00:00 web-01 app: ok", "10.6.6.6", NOW) == (
+        "accepted"
+    )
+
+
+def test_spool_is_rotated_and_read_with_a_cursor(receiver):
+    path = spool_path(receiver.spool_dir, "fw1")
+    receiver.handle_message(b"<14>first", "10.0.0.1", NOW)
+    receiver.flush()
+    delta = read_local_file_delta(path, "syslog", None)
+    assert delta.text == "2026-10-19T12:00:00+00:00 10.0.0.1 user.info -: first\n"
+
+    for i in range(6):
+        receiver.handle_message(f"<14>message number {i:02d} {'x' * 40}".encode(), "10.0.0.1", NOW)
+        receiver.flush()
+
+    assert os.path.exists(f"{path}.1")
+    delta = read_local_file_delta(path, "syslog", delta.cursor)
+    lines = delta.text.splitlines()
+    assert delta.rotated
+    assert [line.split("message number ")[1][:2] for line in lines] == [f"{i:02d}" for i in range(6)]
@@ -0,0 +1,40 @@
+"""Unit tests for time-series chunk encoding and metric rollups."""
+from src.services.metrics_store import _rollup_group, sanitize_metrics
+from src.utils.timeseries import decode_chunk, encode_chunk
+
+
+def test_chunk_roundtrip_with_irregular_intervals():
+    timestamps = [1_700_000_000, 1_700_000_060, 1_700_000_120, 1_700_000_119 + 5000, 1_700_090_000]
+    values = [0.42, 0.42, 61.3, -3.5, 1e300]
+
+    assert decode_chunk(encode_chunk(timestamps, values)) == (timestamps, values)
+    assert decode_chunk(encode_chunk([], [])) == ([], [])
+
+
+def test_regular_constant_series_compresses_to_bits_per_sample():
+    timestamps = [1_700_000_000 + 60 * i for i in range(120)]
+    values = [1.0] * 120
+
+    encoded = encode_chunk(timestamps, values)
+
+    # Header (19 bytes) plus two bits per sample
+    assert len(encoded) < 19 + 120 // 4 + 2
+
+
+def test_sanitize_metrics_drops_invalid_entries():
+    metrics = sanitize_metrics(
+        {"load": 0.5, "Bad Name": 1, "memory": "high", "disk": float("nan"), "up": True, "temp": 48}
+    )
+
+    assert metrics == {"load": 0.5, "temp": 48.0}
+
+
+def test_raw_rollup_produces_avg_min_max_buckets():
+    base = 1_735_689_600  # 2025-01-01T00:00:00Z
+    series = [([base, base + 60, base + 300], [1.0, 3.0, 10.0])]
+
+    rollups = _rollup_group("raw", series, 300)
+
+    assert rollups["avg"] == ([base, base + 300], [2.0, 10.0])
+    assert rollups["min"][1] == [1.0, 10.0]
+    assert rollups["max"][1] == [3.0, 10.0]
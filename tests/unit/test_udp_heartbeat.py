@@ -0,0 +1,56 @@
+"""Unit tests for the UDP heartbeat listener."""
+import pytest
+
+from src.services.udp_heartbeat import (
+    UDPHeartbeatListener,
+    parse_heartbeat_datagram,
+    sign_heartbeat,
+)
+
+NOW = 1_700_000_000
+
+
+@pytest.fixture
+def listener():
+    listener = UDPHeartbeatListener(max_skew_seconds=60, rate_per_second=1, burst=3)
+    listener._hosts = {"router01": (7, b"secret-token")}
+    return listener
+
+
+def test_sign_and_parse_roundtrip():
+    datagram = sign_heartbeat("router01", NOW, "abcd", "secret-token")
+
+    parsed = parse_heartbeat_datagram(datagram)
+
+    assert parsed is not None
+    assert parsed.host_id == "router01"
+    assert parsed.timestamp == NOW
+    assert parse_heartbeat_datagram(b"garbage") is None
+
+
+def test_valid_heartbeat_is_queued_and_replay_rejected(listener):
+    datagram = sign_heartbeat("router01", NOW, "n1", "secret-token")
+
+    assert listener.handle_datagram(datagram, "10.0.0.1", now=NOW) == "accepted"
+    assert 7 in listener._pending
+    assert listener.handle_datagram(datagram, "10.0.0.1", now=NOW) == "replay"
+
+
+def test_rejects_bad_signature_stale_and_unknown(listener):
+    forged = sign_heartbeat("router01", NOW, "n1", "wrong-token")
+    stale = sign_heartbeat("router01", NOW - 600, "n2", "secret-token")
+    unknown = sign_heartbeat("nobody", NOW, "n3", "secret-token")
+
+    assert listener.handle_datagram(forged, "10.0.0.1", now=NOW) == "bad_signature"
+    assert listener.handle_datagram(stale, "10.0.0.2", now=NOW) == "stale"
+    assert listener.handle_datagram(unknown, "10.0.0.3", now=NOW) == "unknown_host"
+    assert not listener._pending
+
+
+def test_rate_limits_per_source(listener):
+    results = [
+        listener.handle_datagram(b"junk", "10.0.0.9", now=NOW) for _ in range(5)
+    ]
+
+    assert results[:3] == ["malformed"] * 3
+    assert results[3:] == ["rate_limited"] * 2